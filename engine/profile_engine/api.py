@@ -4,19 +4,35 @@
 This API provides REST endpoints for the React dashboard to fetch profile data.
 """
 
-import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from profile_engine.utils import json_codec
+from profile_engine.utils.snapshot_export import (
+    MEDIA_TYPES,
+    SNAPSHOTS_DIR,
+    SnapshotExportError,
+    export_snapshots,
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight to bytes by the shared JSON codec."""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps_bytes(content)
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Profile Engine API",
     description="REST API for GitHub Profile Dashboard",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json"
@@ -54,9 +70,8 @@ def load_json_file(file_path: str) -> Dict[str, Any]:
         )
     
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        return json_codec.load_path(path)
+    except json_codec.JSONDecodeError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Invalid JSON in file {file_path}: {str(e)}"
@@ -82,6 +97,8 @@ async def root():
             "soundcloud": "/api/soundcloud",
             "quote": "/api/quote",
             "theme": "/api/theme",
+            "analytics": "/api/analytics",
+            "export": "/api/export",
             "docs": "/api/docs"
         }
     }
@@ -97,21 +114,21 @@ async def health_check():
 async def get_weather():
     """Get current weather data."""
     data = load_json_file("weather/weather.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
 
 
 @app.get("/api/developer")
 async def get_developer():
     """Get GitHub developer statistics."""
     data = load_json_file("developer/stats.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
 
 
 @app.get("/api/oura")
 async def get_oura():
     """Get Oura health metrics."""
     data = load_json_file("oura/metrics.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
 
 
 @app.get("/api/mood")
@@ -119,11 +136,11 @@ async def get_mood():
     """Get Oura mood data."""
     try:
         data = load_json_file("oura/mood.json")
-        return JSONResponse(content=data)
+        return FastJSONResponse(content=data)
     except HTTPException as e:
         if e.status_code == 404:
             # Return default mood if file doesn't exist
-            return JSONResponse(content={
+            return FastJSONResponse(content={
                 "mood_name": "Unknown",
                 "mood_score": 50,
                 "date": None
@@ -135,28 +152,67 @@ async def get_mood():
 async def get_soundcloud():
     """Get SoundCloud track data."""
     data = load_json_file("assets/metadata.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
 
 
 @app.get("/api/quote")
 async def get_quote():
     """Get quote of the day."""
     data = load_json_file("quotes/quote.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
 
 
 @app.get("/api/theme")
 async def get_theme():
     """Get theme configuration."""
     data = load_json_file("config/theme.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
+
+
+@app.get("/api/analytics")
+async def get_analytics():
+    """Get snapshot history analytics (rolling means, percentiles, anomalies, trends)."""
+    data = load_json_file("data/snapshots/analytics.json")
+    return FastJSONResponse(content=data)
+
+
+@app.get("/api/export")
+async def export_history(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+):
+    """
+    Stream the daily snapshot history as NDJSON or CSV.
+    
+    Query parameters: format (ndjson or csv), fields (comma-separated fields
+    or sections), start and end (YYYY-MM-DD, inclusive).
+    """
+    try:
+        lines = export_snapshots(
+            SNAPSHOTS_DIR,
+            format,
+            fields=fields.split(",") if fields else None,
+            start=start,
+            end=end,
+        )
+    except SnapshotExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        lines,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="snapshots.{extension}"'},
+    )
 
 
 @app.get("/api/location")
 async def get_location():
     """Get location data."""
     data = load_json_file("location/location.json")
-    return JSONResponse(content=data)
+    return FastJSONResponse(content=data)
 
 
 if __name__ == "__main__":
@@ -241,13 +241,23 @@ def sanitize_svg_command(svg_file: Path, output: Optional[Path], strict: bool):
 @click.option("--directory", "-d", default=".", type=click.Path(exists=True, path_type=Path), help="Directory to scan")
 @click.option("--pattern", "-p", default="*.svg", help="Glob pattern for SVG files")
 @click.option("--strict", is_flag=True, help="Fail on any issues instead of trying to fix")
-def sanitize_all_command(directory: Path, pattern: str, strict: bool):
-    """Sanitize all SVG files in a directory."""
-    from profile_engine.utils.sanitize_svg import sanitize_all_svgs
+@click.option("--jobs", "-j", default=0, type=click.IntRange(min=0), help="Worker processes (default: one per CPU)")
+@click.option("--manifest", type=click.Path(path_type=Path), default=None, help="Manifest of sanitized files (default: .cache/sanitize-manifest.json)")
+@click.option("--force", is_flag=True, help="Sanitize every file, ignoring the manifest")
+def sanitize_all_command(directory: Path, pattern: str, strict: bool, jobs: int, manifest: Optional[Path], force: bool):
+    """Sanitize all SVG files in a directory.
+    
+    Files unchanged since they were last sanitized are skipped.
+    """
+    from profile_engine.utils.sanitize_svg import MANIFEST_PATH, sanitize_all_svgs
     
     click.echo(f"Scanning for SVG files in {directory}...")
     
-    results = sanitize_all_svgs(directory, pattern, strict=strict)
+    manifest_path = manifest or MANIFEST_PATH
+    if force and manifest_path.exists():
+        manifest_path.unlink()
+    
+    results = sanitize_all_svgs(directory, pattern, strict=strict, jobs=jobs, manifest_path=manifest_path)
     
     if not results:
         click.echo("No SVG files found.")
@@ -277,6 +287,201 @@ def sanitize_all_command(directory: Path, pattern: str, strict: bool):
         sys.exit(1)
 
 
+# =============================================================================
+# Optimize Command - Minify SVG files
+# =============================================================================
+
+@cli.command()
+@click.argument("directories", nargs=-1, type=click.Path(path_type=Path))
+@click.option("--pattern", "-p", default="*.svg", help="Glob pattern for SVG files")
+@click.option("--precision", default=2, type=click.IntRange(min=0), help="Decimal places kept for coordinates")
+@click.option("--jobs", "-j", default=0, type=click.IntRange(min=0), help="Worker processes (default: one per CPU)")
+@click.option("--manifest", type=click.Path(path_type=Path), default=None, help="Manifest of sanitized files (default: .cache/sanitize-manifest.json)")
+@click.option("--force", is_flag=True, help="Optimize every file, ignoring the manifest")
+def optimize(directories: tuple[Path, ...], pattern: str, precision: int, jobs: int, manifest: Optional[Path], force: bool):
+    """Minify and sanitize SVG files in one pass.
+    
+    Scans the given directories (default: current directory); missing
+    directories are skipped. Optimized files are recorded in the sanitize
+    manifest, so a following `sanitize all` skips them.
+    """
+    from profile_engine.utils.sanitize_svg import MANIFEST_PATH, sanitize_all_svgs
+    
+    manifest_path = manifest or MANIFEST_PATH
+    if force and manifest_path.exists():
+        manifest_path.unlink()
+    
+    total_before = 0
+    total_after = 0
+    failure_count = 0
+    
+    for directory in directories or (Path("."),):
+        if not directory.is_dir():
+            continue
+        
+        sizes = {str(path): path.stat().st_size for path in directory.rglob(pattern)}
+        results = sanitize_all_svgs(
+            directory,
+            pattern,
+            jobs=jobs,
+            manifest_path=manifest_path,
+            minify_precision=precision,
+        )
+        
+        for svg_path, (success, warnings) in results.items():
+            if not success:
+                failure_count += 1
+                click.echo(f"  ❌ {svg_path}")
+                for warning in warnings:
+                    click.echo(f"      ⚠️  {warning}")
+                continue
+            
+            before = sizes.get(svg_path, 0)
+            after = Path(svg_path).stat().st_size
+            total_before += before
+            total_after += after
+            if before != after:
+                reduction = 100 - (after * 100 // before) if before else 0
+                click.echo(f"  ✅ {svg_path}: {before} → {after} bytes ({reduction}% reduction)")
+    
+    click.echo(f"\nTotal: {total_before} → {total_after} bytes")
+    
+    if failure_count > 0:
+        click.echo(f"❌ {failure_count} files failed", err=True)
+        sys.exit(1)
+
+
+# =============================================================================
+# SVG Report Command - Byte budgets for generated SVG files
+# =============================================================================
+
+@cli.command("svg-report")
+@click.argument("paths", nargs=-1, type=click.Path(path_type=Path))
+@click.option("--pattern", "-p", default="*.svg", help="Glob pattern for SVG files")
+@click.option("--budgets", "-b", type=click.Path(path_type=Path), default=None, help="Budgets file (default: config/svg-budgets.json if present)")
+@click.option("--fail-over-budget", is_flag=True, help="Exit with an error if any card exceeds its budget")
+@click.option("--top", default=3, type=click.IntRange(min=0), help="Number of largest top-level groups to list per file")
+@click.option("--json", "as_json", is_flag=True, help="Output the reports as JSON")
+def svg_report(paths: tuple[Path, ...], pattern: str, budgets: Optional[Path], fail_over_budget: bool, top: int, as_json: bool):
+    """Attribute SVG bytes to groups, images, defs and text, and check budgets.
+    
+    Scans the given files and directories (default: current directory).
+    """
+    from profile_engine.utils import json_codec
+    from profile_engine.utils.svg_report import (
+        BUDGETS_PATH,
+        CATEGORIES,
+        SVGReportError,
+        analyze_svg,
+        budget_key,
+        check_budget,
+        find_svgs,
+        load_budgets,
+    )
+    
+    try:
+        if budgets is None and BUDGETS_PATH.exists():
+            budgets = BUDGETS_PATH
+        card_budgets = load_budgets(budgets) if budgets else {}
+    except SVGReportError as e:
+        click.echo(f"❌ {e}", err=True)
+        sys.exit(1)
+    
+    reports = []
+    over_budget = 0
+    errors = 0
+    for svg_path in find_svgs(list(paths) or [Path(".")], pattern):
+        try:
+            report = analyze_svg(svg_path)
+        except SVGReportError as e:
+            click.echo(f"❌ {e}", err=True)
+            errors += 1
+            continue
+        
+        limits = card_budgets.get(budget_key(svg_path))
+        report["budget"] = limits
+        report["violations"] = check_budget(report, limits) if limits else []
+        if report["violations"]:
+            over_budget += 1
+        reports.append(report)
+    
+    if as_json:
+        click.echo(json_codec.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            status = "❌" if report["violations"] else "✅" if report["budget"] else "  "
+            budget_note = f" / {report['budget']['total']}" if report["budget"] and "total" in report["budget"] else ""
+            click.echo(f"{status} {report['path']}: {report['bytes']}{budget_note} bytes, {report['elements']} elements")
+            
+            breakdown = ", ".join(
+                f"{name} {report['categories'][name]['bytes']}"
+                for name in CATEGORIES if report["categories"][name]["bytes"]
+            )
+            click.echo(f"      {breakdown}")
+            
+            largest = sorted(report["groups"], key=lambda group: -group["bytes"])[:top]
+            for group in largest:
+                count = f" ×{group['count']}" if group["count"] > 1 else ""
+                click.echo(f"      {group['bytes']:>8}  {group['label']}{count}")
+            
+            for violation in report["violations"]:
+                click.echo(f"      ⚠️  {violation}")
+        
+        total = sum(report["bytes"] for report in reports)
+        click.echo(f"\nTotal: {total} bytes in {len(reports)} files, {over_budget} over budget")
+    
+    if errors or (fail_over_budget and over_budget):
+        sys.exit(1)
+
+
+# =============================================================================
+# Export Command - Stream snapshot history as NDJSON or CSV
+# =============================================================================
+
+@cli.command()
+@click.option("--format", "-f", "fmt", default="ndjson", type=click.Choice(["ndjson", "csv"]), help="Output format")
+@click.option("--fields", help="Comma-separated fields (health.sleep_score) or sections (health); default: all")
+@click.option("--start", help="First date (YYYY-MM-DD, inclusive)")
+@click.option("--end", help="Last date (YYYY-MM-DD, inclusive)")
+@click.option("--snapshots-dir", default="data/snapshots", type=click.Path(path_type=Path), help="Snapshot directory")
+@click.option("--output", "-o", default="-", type=click.Path(path_type=Path, allow_dash=True), help="Output file (default: stdout)")
+def export(fmt: str, fields: Optional[str], start: Optional[str], end: Optional[str], snapshots_dir: Path, output: Path):
+    """Stream the daily snapshot history as NDJSON or CSV.
+    
+    Rows are read and written one day at a time, so memory use does not
+    depend on the length of the history.
+    """
+    from profile_engine.utils.snapshot_export import SnapshotExportError, export_snapshots
+    
+    try:
+        lines = export_snapshots(
+            snapshots_dir,
+            fmt,
+            fields=fields.split(",") if fields else None,
+            start=start,
+            end=end,
+        )
+    except SnapshotExportError as e:
+        click.echo(f"❌ {e}", err=True)
+        sys.exit(1)
+    
+    if str(output) == "-":
+        stream = sys.stdout.buffer
+        for line in lines:
+            stream.write(line)
+        stream.flush()
+        return
+    
+    output.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(output, "wb") as f:
+        for line in lines:
+            f.write(line)
+            count += 1
+    rows = count - 1 if fmt == "csv" else count
+    click.echo(f"✅ Exported {rows} rows to {output}", err=True)
+
+
 # =============================================================================
 # Serve Command - Start FastAPI server
 # =============================================================================
@@ -1,6 +1,5 @@
 """GitHub API client for fetching developer statistics."""
 
-import json
 import os
 import subprocess
 import sys
@@ -8,6 +7,7 @@
 from typing import Optional
 
 from profile_engine.models.developer import DeveloperStats
+from profile_engine.utils import json_codec
 
 
 class GitHubClient:
@@ -69,8 +69,7 @@ def fetch_developer_stats(self, username: str, output_path: Optional[Path] = Non
             raise RuntimeError(f"Failed to fetch developer stats: {result.stderr}")
         
         # Load and validate the output
-        with open(output_path, "r") as f:
-            data = json.load(f)
+        data = json_codec.load_path(output_path)
         
         # Convert to Pydantic model for validation
         # Note: The model may not match exactly yet, so we'll be flexible
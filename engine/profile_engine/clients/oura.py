@@ -1,12 +1,12 @@
 """Oura API client for fetching health metrics."""
 
-import json
 import os
 import subprocess
 from pathlib import Path
 from typing import Optional
 
 from profile_engine.models.oura import OuraHealthMetrics, OuraMood
+from profile_engine.utils import json_codec
 
 
 class OuraClient:
@@ -60,8 +60,7 @@ def fetch_health_metrics(self, output_path: Optional[Path] = None) -> OuraHealth
         
         # Load and validate the output
         if output_path.exists():
-            with open(output_path, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_path(output_path)
             return OuraHealthMetrics(**data)
         
         raise RuntimeError("Oura metrics file not created")
@@ -81,8 +80,7 @@ def fetch_mood(self, output_path: Optional[Path] = None) -> OuraMood:
         
         # Load mood data if it exists
         if output_path.exists():
-            with open(output_path, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_path(output_path)
             return OuraMood(**data)
         
         raise RuntimeError("Oura mood file not found")
@@ -1,11 +1,11 @@
 """Quote API client for fetching daily quotes."""
 
-import json
 import subprocess
 from pathlib import Path
 from typing import Optional
 
 from profile_engine.models.quote import Quote
+from profile_engine.utils import json_codec
 
 
 class QuoteClient:
@@ -48,8 +48,7 @@ def fetch_quote(self, output_path: Optional[Path] = None) -> Quote:
         
         # Load and validate the output
         if output_path.exists():
-            with open(output_path, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_path(output_path)
             return Quote(**data)
         
         raise RuntimeError("Quote file not created")
@@ -1,11 +1,11 @@
 """SoundCloud API client for fetching track data."""
 
-import json
 import subprocess
 from pathlib import Path
 from typing import Optional
 
 from profile_engine.models.soundcloud import SoundCloudTrack
+from profile_engine.utils import json_codec
 
 
 class SoundCloudClient:
@@ -49,8 +49,7 @@ def fetch_track(self, username: str, output_path: Optional[Path] = None) -> Soun
         
         # Load and validate the output
         if output_path.exists():
-            with open(output_path, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_path(output_path)
             return SoundCloudTrack(**data)
         
         raise RuntimeError("SoundCloud metadata file not created")
@@ -1,6 +1,5 @@
 """Weather API client for fetching weather data."""
 
-import json
 import os
 import subprocess
 import sys
@@ -8,6 +7,7 @@
 from typing import Optional
 
 from profile_engine.models.weather import WeatherData
+from profile_engine.utils import json_codec
 
 
 class WeatherClient:
@@ -50,8 +50,7 @@ def fetch_weather(self, output_path: Optional[Path] = None) -> WeatherData:
         
         # Load and validate the output
         if output_path.exists():
-            with open(output_path, "r") as f:
-                data = json.load(f)
+            data = json_codec.load_path(output_path)
             return WeatherData(**data)
         
         raise RuntimeError("Weather data file not created")
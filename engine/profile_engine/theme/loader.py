@@ -4,6 +4,8 @@
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from profile_engine.utils import json_codec
+
 # Cache for loaded theme to avoid re-reading file
 _theme_cache: Optional[Dict] = None
 
@@ -29,9 +31,8 @@ def load_theme(theme_path: Optional[Path] = None) -> Dict[str, Any]:
         theme_path = Path("config/theme.json")
     
     try:
-        with open(theme_path, "r") as f:
-            _theme_cache = json.load(f)
-            return _theme_cache
+        _theme_cache = json_codec.load_path(theme_path)
+        return _theme_cache
     except (FileNotFoundError, json.JSONDecodeError) as e:
         # Return minimal default theme if file not found
         print(f"Warning: Could not load theme from {theme_path}: {e}")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Pluggable JSON codec for artifact I/O.
+
+This module selects the fastest available JSON backend (orjson, then msgspec,
+then the standard library ``json`` module) and exposes a small bytes-oriented
+API so callers can read files as bytes and serialize straight to bytes without
+str/bytes round-trips.
+
+The backend can be pinned with the ``PROFILE_JSON_BACKEND`` environment
+variable (``orjson``, ``msgspec`` or ``json``). Requesting an unavailable
+backend falls back to the automatic selection.
+
+All backends accept and reject the same values and decode to the same
+result:
+
+- output is compact when ``indent`` is None and UTF-8 without ASCII escaping
+  unless ``ensure_ascii`` is requested;
+- NaN and infinity are written as ``null`` (as orjson does) instead of the
+  stdlib's non-standard ``NaN`` literals;
+- date/datetime, dataclass and other non-JSON types raise ``TypeError`` on
+  every backend (orjson's native datetime and dataclass support is turned
+  off); UUIDs and enums are written as their string/value, as orjson does;
+- decode errors are always raised as ``json.JSONDecodeError``.
+
+Float formatting may differ in the last detail (``1e16`` vs ``1e+16``), but
+the parsed values are identical. msgspec is only used for decoding, because
+its encoder cannot be stopped from serializing datetimes, sets and bytes.
+"""
+
+import enum
+import json
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+# Re-exported so callers only need to catch one exception type
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND_ENV_VAR = "PROFILE_JSON_BACKEND"
+
+
+def _select_backend() -> str:
+    """
+    Select the JSON backend to use.
+
+    Returns:
+        Backend name: 'orjson', 'msgspec' or 'json'.
+    """
+    available = {
+        "orjson": ORJSON_AVAILABLE,
+        "msgspec": MSGSPEC_AVAILABLE,
+        "json": True,
+    }
+
+    requested = os.environ.get(BACKEND_ENV_VAR, "").strip().lower()
+    if requested and available.get(requested):
+        return requested
+
+    for name in ("orjson", "msgspec", "json"):
+        if available[name]:
+            return name
+    return "json"
+
+
+BACKEND = _select_backend()
+
+
+def get_backend() -> str:
+    """
+    Get the name of the active JSON backend.
+
+    Returns:
+        Backend name: 'orjson', 'msgspec' or 'json'.
+    """
+    return BACKEND
+
+
+def _stdlib_default(obj: Any) -> Any:
+    """Serialize the extra types orjson supports natively (UUID, Enum)."""
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """Copy a value with NaN and infinity replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _stdlib_dumps_bytes(obj: Any, indent: Optional[int], sort_keys: bool, ensure_ascii: bool = False) -> bytes:
+    """Serialize with the standard library using the codec's canonical options."""
+    separators = (",", ":") if indent is None else (",", ": ")
+    options = dict(
+        indent=indent,
+        sort_keys=sort_keys,
+        separators=separators,
+        ensure_ascii=ensure_ascii,
+        allow_nan=False,
+        default=_stdlib_default,
+    )
+    try:
+        text = json.dumps(obj, **options)
+    except ValueError as e:
+        if "Out of range float" not in str(e):
+            raise  # circular reference
+        # Rare: only values that contain NaN/infinity pay for the copy
+        text = json.dumps(_finite(obj), **options)
+    return text.encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Parse JSON from bytes or str.
+
+    Args:
+        data: JSON document as bytes (preferred) or str.
+
+    Returns:
+        Parsed JSON value.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON or not UTF-8.
+    """
+    if BACKEND == "orjson":
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return orjson.loads(data)
+
+    if BACKEND == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except (msgspec.DecodeError, UnicodeDecodeError) as e:
+            raise JSONDecodeError(str(e), "", 0) from e
+
+    try:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+    except UnicodeDecodeError as e:
+        raise JSONDecodeError(f"Invalid UTF-8: {e}", "", 0) from e
+
+
+def dumps_bytes(
+    obj: Any,
+    indent: Optional[int] = None,
+    sort_keys: bool = False,
+    ensure_ascii: bool = False,
+) -> bytes:
+    """
+    Serialize a value to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: Value to serialize.
+        indent: Indentation level. None produces compact output.
+        sort_keys: Whether to sort object keys.
+        ensure_ascii: Escape non-ASCII characters as \\uXXXX (like the
+            stdlib default) instead of writing them as UTF-8.
+
+    Returns:
+        JSON document as bytes.
+
+    Raises:
+        TypeError: If the value is not JSON serializable.
+        ValueError: If the value contains circular references.
+    """
+    if BACKEND == "orjson" and indent in (None, 2):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            encoded = orjson.dumps(obj, option=option)
+        except TypeError:
+            # orjson rejects some values the stdlib accepts (e.g. ints
+            # wider than 64 bits, non-str keys); let the stdlib decide
+            pass
+        else:
+            # orjson cannot escape; ASCII-only output needs no escaping
+            if not ensure_ascii or encoded.isascii():
+                return encoded
+
+    return _stdlib_dumps_bytes(obj, indent, sort_keys, ensure_ascii)
+
+
+def dumps(obj: Any, indent: Optional[int] = None, sort_keys: bool = False) -> str:
+    """
+    Serialize a value to a JSON string.
+
+    Args:
+        obj: Value to serialize.
+        indent: Indentation level. None produces compact output.
+        sort_keys: Whether to sort object keys.
+
+    Returns:
+        JSON document as str.
+    """
+    return dumps_bytes(obj, indent=indent, sort_keys=sort_keys).decode("utf-8")
+
+
+def load_path(path: Union[str, Path]) -> Any:
+    """
+    Read and parse a JSON file in binary mode.
+
+    Args:
+        path: Path to the JSON file.
+
+    Returns:
+        Parsed JSON value.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_path(
+    obj: Any,
+    path: Union[str, Path],
+    indent: Optional[int] = 2,
+    sort_keys: bool = False,
+) -> None:
+    """
+    Serialize a value and write it to a file in binary mode.
+
+    Args:
+        obj: Value to serialize.
+        path: Destination path.
+        indent: Indentation level (default: 2).
+        sort_keys: Whether to sort object keys.
+    """
+    payload = dumps_bytes(obj, indent=indent, sort_keys=sort_keys)
+    with open(path, "wb") as f:
+        f.write(payload)
@@ -0,0 +1,427 @@
+"""
+SVG Minification Module
+
+This module provides an in-process SVG minifier that replaces the Node/SVGO
+optimize step. It reduces numeric precision, removes insignificant
+whitespace, cleans up attributes, shortens IDs (rewriting every url(#id) and
+href reference) and rewrites path data in its shortest form.
+
+The minifier does not parse documents itself. It plugs into the streaming
+SVG sanitizer, so a file is optimized and sanitized in the same single pass.
+"""
+
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+
+from profile_engine.utils.sanitize_svg import SVGSanitizationError, SVGSanitizer
+
+# Decimal places kept for coordinates and lengths
+DEFAULT_PRECISION = 2
+
+# Decimal places kept for transform matrices, where rounding is amplified
+TRANSFORM_PRECISION = 5
+
+# Attributes holding a number, a length or a list of them
+NUMERIC_ATTRIBUTES = {
+    'x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry', 'fx', 'fy',
+    'dx', 'dy', 'width', 'height', 'viewBox', 'points', 'offset',
+    'opacity', 'fill-opacity', 'stroke-opacity', 'stop-opacity',
+    'stroke-width', 'stroke-dasharray', 'stroke-dashoffset', 'stroke-miterlimit',
+    'font-size', 'letter-spacing', 'stdDeviation', 'radius', 'textLength',
+}
+
+TRANSFORM_ATTRIBUTES = {'transform', 'gradientTransform', 'patternTransform'}
+
+# Attributes dropped when empty
+REMOVABLE_WHEN_EMPTY = {'class', 'style', 'transform'}
+
+# Elements whose character data is rendered or interpreted
+TEXT_CONTENT_ELEMENTS = {'text', 'tspan', 'textPath', 'title', 'desc', 'style'}
+
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_WHITESPACE_RE = re.compile(r'\s+')
+_LIST_SEPARATOR_RE = re.compile(r'\s*,\s*|\s+')
+_STYLE_SEPARATOR_RE = re.compile(r'\s*([:;])\s*')
+_URL_REF_RE = re.compile(r'url\(\s*([\'"]?)#([^)\'"\s]+)\1\s*\)')
+
+_PATH_COMMANDS = 'MmZzLlHhVvCcSsQqTtAa'
+_PATH_ARITY = {
+    'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0,
+}
+
+_ID_ALPHABET = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def format_number(value: float, precision: int = DEFAULT_PRECISION) -> str:
+    """
+    Format a number in its shortest form at the given precision.
+
+    Args:
+        value: Number to format
+        precision: Decimal places to keep
+
+    Returns:
+        Shortest string representation (e.g. 0.5 -> ".5", 2.0 -> "2")
+    """
+    rounded = round(value, precision)
+    if rounded == int(rounded):
+        return str(int(rounded))
+    text = f"{rounded:.{precision}f}".rstrip('0')
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def round_numbers(value: str, precision: int = DEFAULT_PRECISION) -> str:
+    """
+    Round every number in an attribute value and normalize list separators.
+
+    Units and function names are preserved (e.g. "12.345px" -> "12.35px").
+
+    Args:
+        value: Attribute value
+        precision: Decimal places to keep
+
+    Returns:
+        Minified attribute value
+    """
+    value = _NUMBER_RE.sub(lambda m: format_number(float(m.group()), precision), value)
+    return _LIST_SEPARATOR_RE.sub(' ', value.strip())
+
+
+def _parse_path(d: str) -> list[Tuple[str, list[float]]]:
+    """
+    Split path data into (command, parameters) segments.
+
+    Implicit repeated commands are expanded, so every segment carries exactly
+    the parameters of one command.
+
+    Raises:
+        ValueError: If the path data is malformed
+    """
+    segments = []
+    pos = 0
+    length = len(d)
+    command = None
+
+    def skip_separators(pos: int) -> int:
+        while pos < length and (d[pos].isspace() or d[pos] == ','):
+            pos += 1
+        return pos
+
+    while True:
+        pos = skip_separators(pos)
+        if pos >= length:
+            break
+
+        if d[pos] in _PATH_COMMANDS:
+            command = d[pos]
+            pos += 1
+        elif command is None:
+            raise ValueError(f"Path data must start with a command: {d[:20]!r}")
+        elif command in 'Zz':
+            raise ValueError("Unexpected number after closepath")
+        elif command == 'M':
+            command = 'L'
+        elif command == 'm':
+            command = 'l'
+
+        params = []
+        for index in range(_PATH_ARITY[command.upper()]):
+            pos = skip_separators(pos)
+            if command in 'Aa' and index in (3, 4):
+                # Arc flags are single digits and may not be separated
+                if pos >= length or d[pos] not in '01':
+                    raise ValueError("Invalid arc flag")
+                params.append(float(d[pos]))
+                pos += 1
+                continue
+            match = _NUMBER_RE.match(d, pos)
+            if not match:
+                raise ValueError(f"Expected number at position {pos}")
+            params.append(float(match.group()))
+            pos = match.end()
+        segments.append((command, params))
+
+    return segments
+
+
+def _join_numbers(numbers: list[str]) -> str:
+    """Join formatted numbers, omitting separators where unambiguous."""
+    out = []
+    previous = None
+    for number in numbers:
+        if previous is not None and not (
+            number.startswith('-')
+            or (number.startswith('.') and '.' in previous and 'e' not in previous)
+        ):
+            out.append(' ')
+        out.append(number)
+        previous = number
+    return ''.join(out)
+
+
+def minify_path_data(d: str, precision: int = DEFAULT_PRECISION) -> str:
+    """
+    Rewrite path data in its shortest equivalent form.
+
+    Coordinates are rounded to the given precision, each segment is written
+    absolute or relative (whichever is shorter), lines parallel to an axis
+    become H/V, and repeated command letters are omitted. Relative offsets
+    are computed between rounded points, so rounding never accumulates.
+    Malformed path data is returned unchanged.
+
+    Args:
+        d: Path data
+        precision: Decimal places to keep
+
+    Returns:
+        Minified path data
+    """
+    try:
+        segments = _parse_path(d)
+    except ValueError:
+        return d
+
+    def fmt(value: float) -> str:
+        return format_number(value, precision)
+
+    def q(value: float) -> float:
+        return round(value, precision)
+
+    tx = ty = 0.0          # current point
+    tsx = tsy = 0.0        # current subpath start
+    cx = cy = 0.0          # current point after rounding
+    sx = sy = 0.0          # current subpath start after rounding
+    parts = []
+
+    for command, params in segments:
+        upper = command.upper()
+        # Offsets of relative input are measured from the exact current point
+        ox, oy = (tx, ty) if command.islower() else (0.0, 0.0)
+
+        if upper == 'Z':
+            parts.append(('z', []))
+            tx, ty, cx, cy = tsx, tsy, sx, sy
+            continue
+
+        # Exact absolute parameters and end point
+        if upper == 'H':
+            exact = [params[0] + ox]
+            exact_end = (exact[0], ty)
+        elif upper == 'V':
+            exact = [params[0] + oy]
+            exact_end = (tx, exact[0])
+        elif upper == 'A':
+            exact = params[:5] + [params[5] + ox, params[6] + oy]
+            exact_end = (exact[5], exact[6])
+        else:
+            exact = [value + (ox if i % 2 == 0 else oy) for i, value in enumerate(params)]
+            exact_end = (exact[-2], exact[-1])
+
+        absolute = [q(value) for value in exact]
+        if upper == 'H':
+            end = (absolute[0], cy)
+        elif upper == 'V':
+            end = (cx, absolute[0])
+        else:
+            end = (absolute[-2], absolute[-1])
+
+        if upper == 'L' and end[1] == cy and end[0] != cx:
+            upper, absolute = 'H', [end[0]]
+        elif upper == 'L' and end[0] == cx and end[1] != cy:
+            upper, absolute = 'V', [end[1]]
+
+        # Equivalent relative parameters
+        if upper == 'H':
+            rel = [q(absolute[0] - cx)]
+        elif upper == 'V':
+            rel = [q(absolute[0] - cy)]
+        elif upper == 'A':
+            rel = absolute[:5] + [q(end[0] - cx), q(end[1] - cy)]
+        else:
+            rel = [q(value - (cx if i % 2 == 0 else cy)) for i, value in enumerate(absolute)]
+
+        abs_text = [fmt(v) for v in absolute]
+        rel_text = [fmt(v) for v in rel]
+        if upper == 'M' and not parts:
+            parts.append(('M', abs_text))
+        elif len(_join_numbers(rel_text)) < len(_join_numbers(abs_text)):
+            parts.append((upper.lower(), rel_text))
+        else:
+            parts.append((upper, abs_text))
+
+        tx, ty = exact_end
+        cx, cy = end
+        if upper == 'M':
+            tsx, tsy, sx, sy = tx, ty, cx, cy
+
+    tokens = []
+    previous = None
+    for command, numbers in parts:
+        # Repeated commands are implicit; so is a lineto right after a moveto
+        if not (numbers and command == previous):
+            tokens.append(command)
+        tokens.extend(numbers)
+        previous = {'M': 'L', 'm': 'l'}.get(command, command)
+
+    out = []
+    numbers = []
+    for token in tokens:
+        if token in _PATH_COMMANDS:
+            out.append(_join_numbers(numbers))
+            out.append(token)
+            numbers = []
+        else:
+            numbers.append(token)
+    out.append(_join_numbers(numbers))
+    return ''.join(out)
+
+
+def _short_id(index: int) -> str:
+    """Generate the index-th shortest identifier (a, b, ..., Z, aa, ab, ...)."""
+    base = len(_ID_ALPHABET)
+    name = ''
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, base)
+        name = _ID_ALPHABET[remainder] + name
+    return name
+
+
+class SVGMinifier:
+    """Minify SVG elements as they stream through the sanitizer."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, minify_ids: bool = True):
+        """
+        Initialize minifier.
+
+        Args:
+            precision: Decimal places kept for coordinates and lengths
+            minify_ids: If True, shorten IDs and rewrite references to them
+        """
+        self.precision = precision
+        self.minify_ids = minify_ids
+        self._ids: dict[str, str] = {}
+        self._rename_ids = minify_ids
+        self.restart = False
+
+    def begin(self, svg_path: Path, keep_ids: bool = False) -> None:
+        """
+        Prepare for a new document.
+
+        IDs are renamed in order of first appearance, whether as a
+        definition or as a reference, so forward references stay consistent
+        without buffering the document. Documents containing a <style>
+        element keep their IDs, since CSS selectors may target them: the
+        element is detected in the same pass, and if IDs were already
+        renamed before it, ``restart`` is set so the caller streams the
+        document again with ``keep_ids=True``.
+
+        Args:
+            svg_path: Path to the document about to be streamed
+            keep_ids: If True, leave IDs unchanged for this document
+        """
+        self._ids = {}
+        self._rename_ids = self.minify_ids and not keep_ids
+        self.restart = False
+
+    def _map_id(self, name: str) -> str:
+        """Get the short ID for an original ID."""
+        if not self._rename_ids:
+            return name
+        if name not in self._ids:
+            self._ids[name] = _short_id(len(self._ids))
+        return self._ids[name]
+
+    def attributes(self, tag: str, attrs: dict) -> dict:
+        """
+        Minify the attributes of one element.
+
+        Args:
+            tag: Element name without namespace prefix
+            attrs: Element attributes in document order
+
+        Returns:
+            Minified attributes in document order
+        """
+        if tag == 'style' and self._rename_ids:
+            self._rename_ids = False
+            self.restart = bool(self._ids)
+
+        result = {}
+        for name, value in attrs.items():
+            local = name.rsplit(':', 1)[-1]
+            if name.startswith('data-'):
+                result[name] = value
+                continue
+
+            value = value.strip()
+            if local == 'id':
+                value = self._map_id(value)
+            elif local == 'href' and value.startswith('#'):
+                value = '#' + self._map_id(value[1:])
+            elif local == 'd' and tag == 'path':
+                value = minify_path_data(value, self.precision)
+            elif local in NUMERIC_ATTRIBUTES:
+                value = round_numbers(value, self.precision)
+            elif local in TRANSFORM_ATTRIBUTES:
+                value = round_numbers(value, TRANSFORM_PRECISION)
+            elif local == 'style':
+                value = _STYLE_SEPARATOR_RE.sub(r'\1', value).rstrip(';')
+            elif local == 'class':
+                value = _WHITESPACE_RE.sub(' ', value)
+
+            if 'url(' in value:
+                value = _URL_REF_RE.sub(lambda m: f'url(#{self._map_id(m.group(2))})', value)
+
+            if not value and local in REMOVABLE_WHEN_EMPTY:
+                continue
+            result[name] = value
+        return result
+
+    def text(self, tag: Optional[str], text: str) -> Optional[str]:
+        """
+        Minify character data.
+
+        Args:
+            tag: Name of the enclosing element without namespace prefix
+            text: Character data
+
+        Returns:
+            Text to write, or None to drop it
+        """
+        if tag not in TEXT_CONTENT_ELEMENTS and not text.strip():
+            return None
+        return _WHITESPACE_RE.sub(' ', text)
+
+
+def minify_svg(
+    svg_path: Path,
+    output_path: Optional[Path] = None,
+    precision: int = DEFAULT_PRECISION,
+    strict: bool = False
+) -> Tuple[bool, list[str]]:
+    """
+    Minify and sanitize an SVG file in one pass.
+
+    Args:
+        svg_path: Path to input SVG file
+        output_path: Path to output SVG file (defaults to overwriting input)
+        precision: Decimal places kept for coordinates and lengths
+        strict: If True, fail on any issues. If False, try to fix issues.
+
+    Returns:
+        Tuple of (success, warnings)
+    """
+    sanitizer = SVGSanitizer(strict=strict, minifier=SVGMinifier(precision))
+    try:
+        success = sanitizer.sanitize_file(svg_path, output_path)
+        return success, sanitizer.warnings
+    except SVGSanitizationError as e:
+        if strict:
+            raise
+        return False, [str(e)]
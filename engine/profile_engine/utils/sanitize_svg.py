@@ -5,11 +5,16 @@
 It removes invalid attributes, comments, unsafe content, and ensures proper structure.
 """
 
+import hashlib
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
-from xml.etree import ElementTree as ET
+from typing import BinaryIO, Optional, TextIO, Tuple
+from xml.parsers import expat
+
+from profile_engine.utils import json_codec
 
 
 class SVGSanitizationError(Exception):
@@ -17,6 +22,53 @@ class SVGSanitizationError(Exception):
     pass
 
 
+# Default location of the incremental sanitization manifest
+MANIFEST_PATH = Path(".cache") / "sanitize-manifest.json"
+
+# Bump whenever sanitizer output changes, so existing manifests are ignored
+MANIFEST_VERSION = 2
+
+# Directories never scanned by sanitize_all_svgs()
+EXCLUDED_DIRS = {'.git', 'node_modules', 'dist', 'logs'}
+
+# Python comment artifacts inside a tag, e.g. <text attr="value"  # noqa>
+_PY_TAG_COMMENT_RE = re.compile(rb'\s+#\s*(?:noqa|type:|pylint:|pyright:)[^\n/>]*(?=/?>)')
+# Standalone Python comment lines
+_PY_LINE_COMMENT_RE = re.compile(rb'^\s*#')
+# Python comment artifacts in text content
+_PY_TEXT_COMMENT_RE = re.compile(r'\s*#\s*(?:noqa|type:|pylint:|pyright:)[^\n]*')
+
+
+def _escape_text(text: str) -> str:
+    """Escape character data for XML output."""
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def _escape_attrib(value: str) -> str:
+    """Escape an attribute value for XML output (same rules as ElementTree)."""
+    value = _escape_text(value)
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if '\r' in value:
+        value = value.replace('\r', '&#13;')
+    if '\n' in value:
+        value = value.replace('\n', '&#10;')
+    if '\t' in value:
+        value = value.replace('\t', '&#09;')
+    return value
+
+
+def _local_name(name: str) -> str:
+    """Strip a namespace prefix from a tag or attribute name."""
+    return name.rsplit(':', 1)[-1]
+
+
 class SVGSanitizer:
     """Sanitize SVG files for GitHub compatibility."""
     
@@ -40,19 +92,29 @@ class SVGSanitizer:
     # Required SVG root attributes
     REQUIRED_ATTRIBUTES = {'xmlns', 'viewBox', 'width', 'height'}
     
-    def __init__(self, strict: bool = False):
+    def __init__(self, strict: bool = False, minifier=None):
         """
         Initialize sanitizer.
         
         Args:
             strict: If True, fail on any issues. If False, try to fix issues.
+            minifier: Optional SVGMinifier applied to the same event stream,
+                so a file is sanitized and minified in one pass
         """
         self.strict = strict
+        self.minifier = minifier
         self.warnings = []
     
     def sanitize_file(self, svg_path: Path, output_path: Optional[Path] = None) -> bool:
         """
-        Sanitize an SVG file.
+        Sanitize an SVG file in a single streaming pass.
+        
+        The input is tokenized line by line with expat (the parser behind
+        ElementTree's iterparse), and forbidden elements, forbidden
+        attributes, comments and Python comment artifacts are dropped as
+        they are encountered. Output is written once to a temporary file
+        that replaces the destination only if the whole document parsed, so
+        memory use does not grow with file size and nothing is read back.
         
         Args:
             svg_path: Path to input SVG file
@@ -65,50 +127,38 @@ def sanitize_file(self, svg_path: Path, output_path: Optional[Path] = None) -> b
             SVGSanitizationError: If sanitization fails in strict mode
         """
         self.warnings = []
-        output_path = output_path or svg_path
+        svg_path = Path(svg_path)
+        output_path = Path(output_path or svg_path)
         
         try:
-            # Read and preprocess the SVG content
-            with open(svg_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Check if xmlns exists in the original content
-            self._has_xmlns_in_original = 'xmlns=' in content
-            
-            # Remove Python-style comments (e.g., # noqa)
-            content = self._remove_python_comments(content)
-            
-            # Remove XML comments
-            content = self._remove_xml_comments(content)
-            
-            # Parse the SVG
-            tree = self._parse_svg(content)
-            root = tree.getroot()
-            
-            # Ensure root is svg element
-            if not root.tag.endswith('svg'):
-                # Try to find svg element
-                svg_elem = root.find('.//{http://www.w3.org/2000/svg}svg')
-                if svg_elem is None:
-                    svg_elem = root.find('.//svg')
-                if svg_elem is not None:
-                    root = svg_elem
-                else:
-                    raise SVGSanitizationError("No SVG root element found")
-            
-            # Sanitize the SVG
-            self._sanitize_element(root)
-            
-            # Ensure required attributes
-            self._ensure_required_attributes(root)
-            
-            # Write sanitized SVG
-            self._write_svg(tree, output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+            try:
+                keep_ids = False
+                while True:
+                    if self.minifier is not None:
+                        self.minifier.begin(svg_path, keep_ids)
+                    self.warnings = []
+                    with open(svg_path, 'rb') as src, \
+                            open(tmp_path, 'w', encoding='utf-8', newline='') as out:
+                        self._stream(src, out)
+                    # A <style> element after renamed IDs: stream once more
+                    # keeping every ID (rare; most documents have no <style>)
+                    if self.minifier is None or not self.minifier.restart:
+                        break
+                    keep_ids = True
+                os.replace(tmp_path, output_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
             
             return True
             
-        except SVGSanitizationError:
-            raise
+        except SVGSanitizationError as e:
+            if self.strict:
+                raise
+            self.warnings.append(f"Failed to sanitize {svg_path}: {e}")
+            return False
         except Exception as e:
             error_msg = f"Failed to sanitize {svg_path}: {e}"
             if self.strict:
@@ -117,137 +167,160 @@ def sanitize_file(self, svg_path: Path, output_path: Optional[Path] = None) -> b
                 self.warnings.append(error_msg)
                 return False
     
-    def _remove_python_comments(self, content: str) -> str:
+    def _remove_python_comments(self, line: bytes) -> bytes:
         """
-        Remove Python-style comments from SVG content.
+        Remove Python-style comments from one line of SVG source.
         
         These comments (e.g., # noqa: E501) can appear in SVG attributes
-        and cause GitHub to reject the SVG.
+        and cause GitHub to reject the SVG. They make the markup invalid XML,
+        so they are removed before the line reaches the parser.
         """
-        # Remove comments at end of lines within attributes
-        # Pattern: anything like # noqa or # type: ignore before closing > or />
-        # This handles cases like: <text attr="value"  # noqa>
-        pattern = r'\s+#\s*(?:noqa|type:|pylint:|pyright:)[^\n/>]*(?=/?>)'
-        content = re.sub(pattern, '', content)
-        
-        # Also remove standalone Python comments (lines starting with #)
-        pattern = r'^\s*#[^\n]*\n'
-        content = re.sub(pattern, '', content, flags=re.MULTILINE)
-        
-        return content
-    
-    def _remove_xml_comments(self, content: str) -> str:
-        """Remove XML/HTML comments from SVG content."""
-        # Remove <!-- ... --> comments
-        pattern = r'<!--.*?-->'
-        content = re.sub(pattern, '', content, flags=re.DOTALL)
-        return content
+        # Remove standalone Python comments (lines starting with #)
+        if _PY_LINE_COMMENT_RE.match(line):
+            return b''
+        # Remove comments at end of tags, e.g. <text attr="value"  # noqa>
+        return _PY_TAG_COMMENT_RE.sub(b'', line)
     
-    def _parse_svg(self, content: str) -> ET.ElementTree:
+    def _stream(self, src: BinaryIO, out: TextIO) -> None:
         """
-        Parse SVG content into ElementTree.
+        Parse SVG source from src and write the sanitized document to out.
         
         Args:
-            content: SVG content as string
-            
-        Returns:
-            ElementTree object
+            src: Input file opened in binary mode
+            out: Output file opened in text mode
             
         Raises:
-            SVGSanitizationError: If parsing fails
+            SVGSanitizationError: If the input is not well-formed or has no
+                SVG root element
         """
-        try:
-            # Register SVG namespace
-            ET.register_namespace('', 'http://www.w3.org/2000/svg')
-            ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
-            
-            # Parse the content
-            root = ET.fromstring(content)
-            return ET.ElementTree(root)
-        except ET.ParseError as e:
-            raise SVGSanitizationError(f"Invalid XML: {e}")
-    
-    def _sanitize_element(self, element: ET.Element) -> None:
-        """
-        Recursively sanitize an SVG element and its children.
-        
-        Args:
-            element: XML element to sanitize
-        """
-        # Get tag name without namespace
-        tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
-        
-        # Remove forbidden elements
-        if tag in self.FORBIDDEN_ELEMENTS:
-            self.warnings.append(f"Removed forbidden element: {tag}")
-            element.clear()
-            return
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
         
-        # Remove forbidden attributes
-        attrs_to_remove = []
-        for attr in element.attrib:
-            attr_name = attr.split('}')[-1] if '}' in attr else attr
-            if attr_name in self.FORBIDDEN_ATTRIBUTES:
-                attrs_to_remove.append(attr)
-                self.warnings.append(f"Removed forbidden attribute: {attr_name}")
+        minifier = self.minifier
+        empty_tag_end = '/>' if minifier is not None else ' />'
         
-        for attr in attrs_to_remove:
-            del element.attrib[attr]
+        state = {
+            'stack': [],           # local names of open elements
+            'skip_depth': 0,       # > 0 while inside a forbidden element
+            'open_tag': False,     # start tag written without its closing '>'
+            'text': [],            # pending character data
+            'seen_root': False,
+        }
         
-        # Clean element text content (remove Python comments from text)
-        if element.text:
-            original_text = element.text
-            # Remove leading/trailing Python comments from text content
-            element.text = re.sub(r'\s*#\s*(?:noqa|type:|pylint:|pyright:)[^\n]*', '', element.text)
-            if element.text != original_text and element.text.strip() == '':
-                # If text becomes empty after removing comment, set to None
-                element.text = None
+        def flush_text() -> None:
+            text = ''.join(state['text'])
+            state['text'] = []
+            if not text:
+                return
+            cleaned = _PY_TEXT_COMMENT_RE.sub('', text)
+            if cleaned != text and not cleaned.strip():
+                return
+            if minifier is not None:
+                cleaned = minifier.text(state['stack'][-1] if state['stack'] else None, cleaned)
+                if cleaned is None:
+                    return
+            close_open_tag()
+            out.write(_escape_text(cleaned))
         
-        # Clean tail text (text after element)
-        if element.tail:
-            element.tail = re.sub(r'\s*#\s*(?:noqa|type:|pylint:|pyright:)[^\n]*', '', element.tail)
+        def close_open_tag() -> None:
+            if state['open_tag']:
+                out.write('>')
+                state['open_tag'] = False
         
-        # Recursively sanitize children
-        for child in list(element):
-            tag = child.tag.split('}')[-1] if '}' in child.tag else child.tag
+        def start(name: str, attrs: dict) -> None:
+            if state['skip_depth']:
+                state['skip_depth'] += 1
+                return
+            
+            tag = _local_name(name)
             if tag in self.FORBIDDEN_ELEMENTS:
-                element.remove(child)
+                state['text'] = []
                 self.warnings.append(f"Removed forbidden element: {tag}")
+                state['skip_depth'] = 1
+                return
+            
+            flush_text()
+            close_open_tag()
+            
+            clean_attrs = {}
+            for attr, value in attrs.items():
+                attr_name = _local_name(attr)
+                if attr_name in self.FORBIDDEN_ATTRIBUTES:
+                    self.warnings.append(f"Removed forbidden attribute: {attr_name}")
+                else:
+                    clean_attrs[attr] = value
+            
+            if not state['seen_root']:
+                state['seen_root'] = True
+                if tag != 'svg':
+                    raise SVGSanitizationError("No SVG root element found")
+                self._ensure_required_attributes(clean_attrs)
+            
+            if minifier is not None:
+                clean_attrs = minifier.attributes(tag, clean_attrs)
+            
+            out.write(f'<{name}')
+            for attr, value in clean_attrs.items():
+                out.write(f' {attr}="{_escape_attrib(value)}"')
+            state['open_tag'] = True
+            state['stack'].append(tag)
+        
+        def end(name: str) -> None:
+            if state['skip_depth']:
+                state['skip_depth'] -= 1
+                return
+            flush_text()
+            if state['open_tag']:
+                out.write(empty_tag_end)
+                state['open_tag'] = False
             else:
-                self._sanitize_element(child)
+                out.write(f'</{name}>')
+            state['stack'].pop()
+        
+        def character_data(data: str) -> None:
+            # Text outside the root element is dropped, as ElementTree does
+            if not state['skip_depth'] and state['stack']:
+                state['text'].append(data)
+        
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = character_data
+        # Comments, processing instructions and the XML declaration have no
+        # handler, so they are dropped
+        
+        try:
+            for line in src:
+                parser.Parse(self._remove_python_comments(line), False)
+            parser.Parse(b'', True)
+        except expat.ExpatError as e:
+            raise SVGSanitizationError(f"Invalid XML: {e}")
+        
+        if not state['seen_root']:
+            raise SVGSanitizationError("No SVG root element found")
     
-    def _ensure_required_attributes(self, root: ET.Element) -> None:
+    def _ensure_required_attributes(self, attrs: dict) -> None:
         """
         Ensure SVG root has required attributes.
         
         Args:
-            root: SVG root element
+            attrs: SVG root element attributes (updated in place)
         """
-        # Ensure xmlns - only add if it wasn't in the original content
-        # ElementTree parsing might not preserve xmlns in attributes,
-        # but if it was in the original, it will be written back
-        if not self._has_xmlns_in_original:
-            has_xmlns = False
-            for attr in root.attrib:
-                if attr == 'xmlns' or attr.endswith('}xmlns'):
-                    has_xmlns = True
-                    break
-            
-            if not has_xmlns:
-                root.set('xmlns', 'http://www.w3.org/2000/svg')
-                self.warnings.append("Added missing xmlns attribute")
+        # Ensure xmlns
+        if 'xmlns' not in attrs:
+            attrs['xmlns'] = 'http://www.w3.org/2000/svg'
+            self.warnings.append("Added missing xmlns attribute")
         
         # Check for width, height, viewBox
-        has_width = 'width' in root.attrib
-        has_height = 'height' in root.attrib
-        has_viewbox = 'viewBox' in root.attrib
+        has_width = 'width' in attrs
+        has_height = 'height' in attrs
+        has_viewbox = 'viewBox' in attrs
         
         if not has_viewbox and (has_width and has_height):
             # Create viewBox from width/height
             try:
-                width = self._parse_dimension(root.get('width', ''))
-                height = self._parse_dimension(root.get('height', ''))
-                root.set('viewBox', f'0 0 {width} {height}')
+                width = self._parse_dimension(attrs.get('width', ''))
+                height = self._parse_dimension(attrs.get('height', ''))
+                attrs['viewBox'] = f'0 0 {width} {height}'
                 self.warnings.append(f"Added viewBox from width/height: 0 0 {width} {height}")
             except ValueError:
                 pass
@@ -272,37 +345,6 @@ def _parse_dimension(self, value: str) -> float:
         # Remove units
         value = re.sub(r'(px|pt|em|rem|%)', '', value.strip())
         return float(value)
-    
-    def _write_svg(self, tree: ET.ElementTree, output_path: Path) -> None:
-        """
-        Write sanitized SVG to file.
-        
-        Args:
-            tree: ElementTree to write
-            output_path: Output file path
-        """
-        # Ensure output directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write with proper encoding and XML declaration
-        tree.write(
-            output_path,
-            encoding='utf-8',
-            xml_declaration=False,  # SVG doesn't need XML declaration
-            method='xml'
-        )
-        
-        # Post-process to clean up formatting
-        with open(output_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Ensure it starts with <svg
-        if not content.strip().startswith('<svg'):
-            # Add newline before svg if needed
-            content = content.strip()
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
 
 
 def sanitize_svg(
@@ -331,32 +373,156 @@ def sanitize_svg(
         return False, [str(e)]
 
 
+def _hash_file(path: Path) -> Optional[str]:
+    """Hash a file's contents, returning None if it cannot be read."""
+    hasher = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> dict[str, dict]:
+    """
+    Load the sanitization manifest.
+    
+    The manifest maps resolved SVG paths to the content hash the file had
+    right after it was last sanitized ('hash') and the precision it was
+    minified at ('minified', None if it was only sanitized). A manifest
+    written by a different sanitizer version, or one that cannot be read,
+    is treated as empty.
+    
+    Args:
+        manifest_path: Path to the manifest file
+        
+    Returns:
+        Dictionary mapping file paths to manifest entries
+    """
+    try:
+        manifest = json_codec.load_path(manifest_path)
+    except (OSError, json_codec.JSONDecodeError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    files = manifest.get('files')
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(manifest_path: Path, files: dict[str, dict]) -> None:
+    """
+    Atomically write the sanitization manifest.
+    
+    Args:
+        manifest_path: Path to the manifest file
+        files: Dictionary mapping file paths to manifest entries
+    """
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    json_codec.dump_path(
+        {'version': MANIFEST_VERSION, 'files': dict(sorted(files.items()))},
+        tmp_path,
+    )
+    os.replace(tmp_path, manifest_path)
+
+
+def _sanitize_worker(job: Tuple[str, bool, Optional[int]]) -> Tuple[bool, list[str], Optional[str]]:
+    """
+    Sanitize (and optionally minify) one file in a worker process.
+    
+    Args:
+        job: Tuple of (svg path, strict, minify precision or None)
+        
+    Returns:
+        Tuple of (success, warnings, content hash of the sanitized file)
+    """
+    svg_path, strict, minify_precision = job
+    if minify_precision is None:
+        success, warnings = sanitize_svg(Path(svg_path), strict=strict)
+    else:
+        from profile_engine.utils.minify_svg import minify_svg
+        success, warnings = minify_svg(Path(svg_path), precision=minify_precision, strict=strict)
+    return success, warnings, _hash_file(Path(svg_path)) if success else None
+
+
 def sanitize_all_svgs(
     directory: Path,
     pattern: str = "*.svg",
-    strict: bool = False
+    strict: bool = False,
+    jobs: int = 1,
+    manifest_path: Optional[Path] = None,
+    minify_precision: Optional[int] = None,
 ) -> dict[str, Tuple[bool, list[str]]]:
     """
     Sanitize all SVG files in a directory.
     
+    With a manifest, files whose content hash matches the hash recorded
+    after their last successful sanitization are skipped and reported as
+    successful without warnings. Remaining files are sanitized across a
+    process pool when jobs > 1. Results are always ordered by path, so the
+    aggregated warnings do not depend on scheduling.
+    
+    When minifying, files are only skipped if they were also minified at
+    the same precision; files minified here count as sanitized for later
+    runs without minification.
+    
     Args:
         directory: Directory containing SVG files
         pattern: Glob pattern for SVG files
         strict: If True, fail on any issues. If False, try to fix issues.
+        jobs: Number of worker processes (0 uses one per CPU)
+        manifest_path: Manifest used to skip unchanged files (None disables it)
+        minify_precision: Also minify files, keeping this many decimal places
+            (None only sanitizes)
         
     Returns:
         Dictionary mapping file paths to (success, warnings) tuples
     """
-    results = {}
-    svg_files = list(directory.rglob(pattern))
+    svg_files = sorted(
+        svg_path for svg_path in directory.rglob(pattern)
+        # Skip files in certain directories
+        if not EXCLUDED_DIRS.intersection(svg_path.parts)
+    )
+    
+    manifest = load_manifest(manifest_path) if manifest_path else {}
     
+    results: dict[str, Tuple[bool, list[str]]] = {}
+    pending = []
     for svg_path in svg_files:
-        # Skip files in certain directories
-        if any(part in svg_path.parts for part in ['.git', 'node_modules', 'dist', 'logs']):
-            continue
-        
-        success, warnings = sanitize_svg(svg_path, strict=strict)
+        entry = manifest.get(str(svg_path.resolve()))
+        if (
+            isinstance(entry, dict)
+            and entry.get('hash') == _hash_file(svg_path)
+            and (minify_precision is None or entry.get('minified') == minify_precision)
+        ):
+            results[str(svg_path)] = (True, [])
+        else:
+            results[str(svg_path)] = (False, [])
+            pending.append(svg_path)
+    
+    workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+    work = [(str(svg_path), strict, minify_precision) for svg_path in pending]
+    if workers > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(work))) as pool:
+            outcomes = list(pool.map(_sanitize_worker, work))
+    else:
+        outcomes = [_sanitize_worker(job) for job in work]
+    
+    for svg_path, (success, warnings, digest) in zip(pending, outcomes):
         results[str(svg_path)] = (success, warnings)
+        key = str(svg_path.resolve())
+        if digest:
+            manifest[key] = {'hash': digest, 'minified': minify_precision}
+        else:
+            manifest.pop(key, None)
+    
+    if manifest_path and pending:
+        try:
+            save_manifest(manifest_path, manifest)
+        except OSError as e:
+            print(f"Warning: Could not write sanitize manifest: {e}", file=sys.stderr)
     
     return results
 
@@ -0,0 +1,347 @@
+"""
+Snapshot Export Module
+
+This module streams the daily snapshot history (data/snapshots) as flat rows
+in NDJSON or CSV, for feeding the history into external analytics.
+
+Rows are produced by generators that read the history one month at a time,
+taking the list of days from index.json when it is available: compacted
+months are read line by line from their gzip archive and daily files are
+loaded one at a time, so memory use does not grow with the length of the
+history. Each row has a "date" column plus one column per
+snapshot field, named "<section>.<field>" (e.g. "health.sleep_score").
+"""
+
+import csv
+import gzip
+import io
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from profile_engine.utils import json_codec
+
+# Default location of the snapshot history
+SNAPSHOTS_DIR = Path("data") / "snapshots"
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Snapshot sections exported as columns, in column order
+SECTIONS = ("health", "mood", "weather", "developer")
+
+# Snapshot tree layout, as written by scripts/lib/snapshot_index.py
+INDEX_FILE = "index.json"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+
+class SnapshotExportError(Exception):
+    """Raised when export arguments are invalid."""
+    pass
+
+
+def parse_date(value: Optional[Union[str, date]], name: str) -> Optional[date]:
+    """
+    Parse a YYYY-MM-DD date filter.
+
+    Args:
+        value: Date string, date or None
+        name: Argument name used in the error message
+
+    Returns:
+        Parsed date, or None if no value was given
+
+    Raises:
+        SnapshotExportError: If the value is not a valid date
+    """
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise SnapshotExportError(f"Invalid {name} date: {value!r} (expected YYYY-MM-DD)")
+
+
+def _new_month() -> dict:
+    """Sources of one month: daily files by date, the archive, and the archived dates to keep."""
+    return {"daily": {}, "archive": None, "archived": None}
+
+
+def _index_is_stale(root: Path, index_path: Path) -> bool:
+    """Check whether the newest daily/<year>/<month> directory changed after index.json."""
+    directory = root / "daily"
+    for _ in range(2):
+        try:
+            names = [name for name in os.listdir(directory) if name.isdigit()]
+        except OSError:
+            return False
+        if not names:
+            return False
+        directory = directory / max(names)
+    try:
+        return os.stat(directory).st_mtime_ns > os.stat(index_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def _indexed_months(root: Path) -> Optional[dict[str, dict]]:
+    """
+    Group the daily entries of index.json by month.
+
+    Returns:
+        {"YYYY-MM": month sources}, or None if there is no usable, current
+        index (the caller then walks the directory tree)
+    """
+    index_path = root / INDEX_FILE
+    try:
+        daily = json_codec.load_path(index_path)["daily"]
+        paths = {day: entry["path"] for day, entry in daily.items()}
+    except (OSError, json_codec.JSONDecodeError, KeyError, TypeError, AttributeError):
+        return None
+    if _index_is_stale(root, index_path):
+        return None
+
+    months: dict[str, dict] = {}
+    for day, relative in paths.items():
+        month = months.setdefault(day[:7], _new_month())
+        if relative.startswith("daily/"):
+            month["daily"][day] = root / relative
+        else:
+            month["archive"] = root / relative
+            if month["archived"] is None:
+                month["archived"] = set()
+            month["archived"].add(day)
+    return months
+
+
+def _scanned_months(root: Path) -> dict[str, dict]:
+    """Group the daily files and month archives found on disk by month."""
+    months: dict[str, dict] = {}
+    for path in root.glob(f"archive/*/*{ARCHIVE_SUFFIX}"):
+        if path.name[:4].isdigit():
+            months.setdefault(path.name[:7], _new_month())["archive"] = path
+    for path in root.glob("daily/*/*/*.json"):
+        if path.name[:4].isdigit():
+            months.setdefault(path.stem[:7], _new_month())["daily"][path.stem] = path
+    return months
+
+
+def _month_snapshots(month: dict) -> Iterator[dict]:
+    """Yield the snapshots of one month in date order (daily files win over the archive)."""
+    daily_files = month["daily"]
+    wanted = month["archived"]
+
+    archived: dict[str, bytes] = {}
+    if month["archive"] is not None:
+        try:
+            with gzip.open(month["archive"], "rb") as f:
+                for line in f:
+                    if line.strip():
+                        # At most one month of lines; parsed again when yielded
+                        day = json_codec.loads(line)["date"]
+                        if wanted is None or day in wanted:
+                            archived[day] = line
+        except (OSError, EOFError, json_codec.JSONDecodeError, KeyError):
+            archived = {}
+
+    for day in sorted(set(daily_files) | set(archived)):
+        try:
+            if day in daily_files:
+                snapshot = json_codec.load_path(daily_files[day])
+            else:
+                snapshot = json_codec.loads(archived[day])
+        except (OSError, json_codec.JSONDecodeError):
+            continue
+        if isinstance(snapshot, dict) and snapshot.get("date"):
+            yield snapshot
+
+
+def iter_snapshots(
+    root: Path = SNAPSHOTS_DIR,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[dict]:
+    """
+    Iterate daily snapshots in date order.
+
+    The days come from index.json (written by store-historical-snapshot.py)
+    when it is present and current, otherwise from a walk of the daily/
+    and archive/ directories. Months outside the date range are not opened.
+
+    Args:
+        root: Snapshot directory
+        start: First date (inclusive, default: no limit)
+        end: Last date (inclusive, default: no limit)
+
+    Yields:
+        Daily snapshot dictionaries
+    """
+    root = Path(root)
+    months = _indexed_months(root)
+    if months is None:
+        months = _scanned_months(root)
+
+    first = start.isoformat() if start else None
+    last = end.isoformat() if end else None
+    for key in sorted(months):
+        if first and key < first[:7]:
+            continue
+        if last and key > last[:7]:
+            break
+        for snapshot in _month_snapshots(months[key]):
+            day = snapshot["date"]
+            if first and day < first:
+                continue
+            if last and day > last:
+                break
+            yield snapshot
+
+
+def snapshot_row(snapshot: dict) -> dict[str, Any]:
+    """
+    Flatten a daily snapshot into an export row.
+
+    Args:
+        snapshot: Daily snapshot dictionary
+
+    Returns:
+        {"date": ..., "<section>.<field>": value} for every scalar field
+        with a value; nested values are left out
+    """
+    row: dict[str, Any] = {"date": snapshot["date"]}
+    for section in SECTIONS:
+        for field, value in (snapshot.get(section) or {}).items():
+            if value is not None and not isinstance(value, (dict, list)):
+                row[f"{section}.{field}"] = value
+    return row
+
+
+def _field_matcher(fields: Optional[Iterable[str]]):
+    """Build a predicate for selected columns; a bare section name selects the whole section."""
+    if fields is None:
+        return lambda name: True
+    exact = set(fields)
+    sections = {field for field in exact if "." not in field}
+    return lambda name: name in exact or name.partition(".")[0] in sections
+
+
+def _sort_key(name: str) -> tuple:
+    """Column order: sections in SECTIONS order, then field name."""
+    section, _, field = name.partition(".")
+    return (SECTIONS.index(section) if section in SECTIONS else len(SECTIONS), section, field)
+
+
+def resolve_columns(
+    root: Path,
+    fields: Optional[list[str]],
+    start: Optional[date],
+    end: Optional[date],
+) -> list[str]:
+    """
+    Determine the CSV columns.
+
+    Explicit "<section>.<field>" selections are used as given. Otherwise a
+    first pass over the history collects the field names that occur (memory
+    grows with the number of distinct fields, not with the history).
+
+    Args:
+        root: Snapshot directory
+        fields: Selected fields or sections, or None for all fields
+        start: First date
+        end: Last date
+
+    Returns:
+        Column names, starting with "date"
+    """
+    if fields is not None and all("." in field for field in fields):
+        return ["date"] + [field for field in fields if field != "date"]
+
+    matches = _field_matcher(fields)
+    names: set[str] = set()
+    for snapshot in iter_snapshots(root, start, end):
+        names.update(name for name in snapshot_row(snapshot) if name != "date" and matches(name))
+    return ["date"] + sorted(names, key=_sort_key)
+
+
+def _ndjson_lines(rows: Iterator[dict[str, Any]], matches) -> Iterator[bytes]:
+    """Encode rows as NDJSON lines."""
+    for row in rows:
+        selected = {name: value for name, value in row.items() if name == "date" or matches(name)}
+        yield json_codec.dumps_bytes(selected) + b"\n"
+
+
+def _csv_lines(rows: Iterator[dict[str, Any]], columns: list[str]) -> Iterator[bytes]:
+    """Encode rows as CSV lines, reusing one small buffer."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def take() -> bytes:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line.encode("utf-8")
+
+    writer.writerow(columns)
+    yield take()
+    for row in rows:
+        writer.writerow(["" if row.get(name) is None else row[name] for name in columns])
+        yield take()
+
+
+def export_snapshots(
+    root: Path = SNAPSHOTS_DIR,
+    fmt: str = "ndjson",
+    fields: Optional[list[str]] = None,
+    start: Optional[Union[str, date]] = None,
+    end: Optional[Union[str, date]] = None,
+) -> Iterator[bytes]:
+    """
+    Stream the snapshot history as NDJSON or CSV.
+
+    Arguments are validated immediately; the returned generator then reads
+    and encodes one day at a time.
+
+    Args:
+        root: Snapshot directory
+        fmt: "ndjson" or "csv"
+        fields: Fields ("health.sleep_score") or whole sections ("health")
+            to export; None exports every field. "date" is always included.
+        start: First date (YYYY-MM-DD, inclusive)
+        end: Last date (YYYY-MM-DD, inclusive)
+
+    Returns:
+        Iterator of encoded lines (NDJSON: one object per day; CSV: a header
+        line, then one line per day with empty cells for missing values)
+
+    Raises:
+        SnapshotExportError: If the format, a field or a date is invalid
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise SnapshotExportError(f"Unknown format: {fmt!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+    start_date = parse_date(start, "start")
+    end_date = parse_date(end, "end")
+    if start_date and end_date and start_date > end_date:
+        raise SnapshotExportError(f"Start date {start_date} is after end date {end_date}")
+    if fields is not None:
+        fields = [field.strip() for field in fields if field.strip()]
+        unknown = [field for field in fields if field != "date" and field.partition(".")[0] not in SECTIONS]
+        if unknown:
+            raise SnapshotExportError(
+                f"Unknown field(s): {', '.join(unknown)} (expected <section>.<field> with section in {', '.join(SECTIONS)})"
+            )
+
+    root = Path(root)
+    rows = (snapshot_row(snapshot) for snapshot in iter_snapshots(root, start_date, end_date))
+    if fmt == "ndjson":
+        return _ndjson_lines(rows, _field_matcher(fields))
+
+    def csv_stream() -> Iterator[bytes]:
+        columns = resolve_columns(root, fields, start_date, end_date)
+        yield from _csv_lines(rows, columns)
+
+    return csv_stream()
@@ -0,0 +1,256 @@
+"""
+SVG Byte-Budget Report Module
+
+This module attributes the bytes of generated SVG files to their parts so
+payload regressions can be tracked: every top-level group, plus totals for
+embedded images, definitions, stylesheets and text. Reports can be checked
+against per-card budgets stored in a JSON file.
+
+Byte spans are taken from the parser's byte offsets, so the numbers are the
+exact on-disk sizes and the categories always add up to the file size.
+"""
+
+from pathlib import Path
+from typing import Optional, Union
+from xml.parsers import expat
+
+from profile_engine.utils import json_codec
+from profile_engine.utils.sanitize_svg import EXCLUDED_DIRS
+
+# Default location of the budgets file
+BUDGETS_PATH = Path("config") / "svg-budgets.json"
+
+# Categories, in report order. Everything not claimed by another category
+# (shapes, the root element, whitespace) is counted as graphics.
+CATEGORIES = ("images", "defs", "style", "text", "graphics")
+
+# Element that starts a category; the outermost match wins, so an image
+# inside <defs> counts as defs
+_CATEGORY_ELEMENTS = {
+    "image": "images",
+    "defs": "defs",
+    "style": "style",
+    "text": "text",
+}
+
+
+class SVGReportError(Exception):
+    """Raised when an SVG or budgets file cannot be analyzed."""
+    pass
+
+
+def _local_name(name: str) -> str:
+    """Strip a namespace prefix from a tag name."""
+    return name.rsplit(":", 1)[-1]
+
+
+def _group_label(tag: str, attrs: dict) -> str:
+    """Build a readable label for a top-level element (e.g. g#header, g.volatile)."""
+    if attrs.get("id"):
+        return f"{tag}#{attrs['id']}"
+    if attrs.get("class"):
+        return f"{tag}." + ".".join(attrs["class"].split())
+    return tag
+
+
+def analyze_svg(svg_path: Union[str, Path]) -> dict:
+    """
+    Attribute the bytes of an SVG file to top-level groups and categories.
+
+    Args:
+        svg_path: Path to the SVG file
+
+    Returns:
+        Report dictionary with keys:
+            path: File path as given
+            bytes: File size
+            elements: Number of elements
+            categories: {category: {"bytes": int, "elements": int}}
+            groups: [{"label": str, "count": int, "bytes": int, "elements": int}]
+                for the top-level children of the root, aggregated by label
+                (e.g. 171 heatmap <rect>s form one "rect" entry) and listed in
+                order of first appearance
+
+    Raises:
+        SVGReportError: If the file cannot be read or is not well-formed
+    """
+    try:
+        data = Path(svg_path).read_bytes()
+    except OSError as e:
+        raise SVGReportError(f"Cannot read {svg_path}: {e}")
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = False
+
+    # Each open element: [tag, start offset, element count, category, group label]
+    stack: list[list] = []
+    pending: list[list] = []   # ended elements waiting for their end offset
+    groups: dict[str, dict] = {}
+    categories = {name: {"bytes": 0, "elements": 0} for name in CATEGORIES}
+    totals = {"elements": 0}
+
+    def close_pending(offset: int) -> None:
+        for tag, start, count, category, label in pending:
+            size = offset - start
+            if category is not None:
+                categories[category]["bytes"] += size
+                categories[category]["elements"] += count
+            if label is not None:
+                group = groups.setdefault(
+                    label, {"label": label, "count": 0, "bytes": 0, "elements": 0}
+                )
+                group["count"] += 1
+                group["bytes"] += size
+                group["elements"] += count
+        pending.clear()
+
+    def on_event(*_args) -> None:
+        close_pending(parser.CurrentByteIndex)
+
+    def start(name: str, attrs: dict) -> None:
+        close_pending(parser.CurrentByteIndex)
+        tag = _local_name(name)
+        totals["elements"] += 1
+        for element in stack:
+            element[2] += 1
+        claimed = any(element[3] is not None for element in stack)
+        category = None if claimed else _CATEGORY_ELEMENTS.get(tag)
+        label = _group_label(tag, attrs) if len(stack) == 1 else None
+        stack.append([tag, parser.CurrentByteIndex, 1, category, label])
+
+    def end(_name: str) -> None:
+        close_pending(parser.CurrentByteIndex)
+        tag, start_offset, count, category, label = stack.pop()
+        if category is not None or label is not None:
+            pending.append([tag, start_offset, count, category, label])
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = on_event
+    parser.CommentHandler = on_event
+    parser.ProcessingInstructionHandler = on_event
+
+    try:
+        parser.Parse(data, True)
+    except expat.ExpatError as e:
+        raise SVGReportError(f"Invalid XML in {svg_path}: {e}")
+    close_pending(len(data))
+
+    claimed_bytes = sum(categories[name]["bytes"] for name in CATEGORIES if name != "graphics")
+    claimed_elements = sum(categories[name]["elements"] for name in CATEGORIES if name != "graphics")
+    categories["graphics"] = {
+        "bytes": len(data) - claimed_bytes,
+        "elements": totals["elements"] - claimed_elements,
+    }
+
+    return {
+        "path": str(svg_path),
+        "bytes": len(data),
+        "elements": totals["elements"],
+        "categories": categories,
+        "groups": list(groups.values()),
+    }
+
+
+def find_svgs(paths: list[Path], pattern: str = "*.svg") -> list[Path]:
+    """
+    Expand files and directories into a sorted list of SVG files.
+
+    Missing paths are skipped.
+
+    Args:
+        paths: Files or directories to scan
+        pattern: Glob pattern for SVG files in directories
+
+    Returns:
+        Sorted, de-duplicated list of SVG paths
+    """
+    found = set()
+    for path in paths:
+        if path.is_file():
+            found.add(path)
+        elif path.is_dir():
+            found.update(
+                svg_path for svg_path in path.rglob(pattern)
+                if not EXCLUDED_DIRS.intersection(svg_path.parts)
+            )
+    return sorted(found)
+
+
+def load_budgets(budgets_path: Path) -> dict[str, dict[str, int]]:
+    """
+    Load per-card byte budgets.
+
+    The file maps SVG paths (relative to the repository root, with forward
+    slashes) to limits, either a total byte count or an object with a
+    "total" and/or per-category limits:
+
+        {"budgets": {"weather/weather-today.svg": 4096,
+                     "location/location-card.svg": {"total": 131072, "images": 122880}}}
+
+    Args:
+        budgets_path: Path to the budgets file
+
+    Returns:
+        Dictionary mapping SVG paths to {limit name: bytes}
+
+    Raises:
+        SVGReportError: If the file cannot be read or is malformed
+    """
+    try:
+        raw = json_codec.load_path(budgets_path)
+    except (OSError, json_codec.JSONDecodeError) as e:
+        raise SVGReportError(f"Cannot load budgets from {budgets_path}: {e}")
+
+    budgets = raw.get("budgets") if isinstance(raw, dict) else None
+    if not isinstance(budgets, dict):
+        raise SVGReportError(f"{budgets_path}: expected an object with a 'budgets' mapping")
+
+    result = {}
+    for svg_path, limits in budgets.items():
+        if isinstance(limits, int):
+            limits = {"total": limits}
+        if not isinstance(limits, dict) or not all(
+            name in ("total",) + CATEGORIES and isinstance(value, int) and value >= 0
+            for name, value in limits.items()
+        ):
+            raise SVGReportError(f"{budgets_path}: invalid budget for {svg_path}")
+        result[Path(svg_path).as_posix()] = limits
+    return result
+
+
+def budget_key(svg_path: Union[str, Path], root: Optional[Path] = None) -> str:
+    """
+    Get the budgets file key for an SVG path.
+
+    Args:
+        svg_path: SVG file path
+        root: Directory budget keys are relative to (default: current directory)
+
+    Returns:
+        Path relative to root with forward slashes
+    """
+    path = Path(svg_path).resolve()
+    try:
+        return path.relative_to((root or Path.cwd()).resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def check_budget(report: dict, limits: dict[str, int]) -> list[str]:
+    """
+    Compare a report against its budget.
+
+    Args:
+        report: Report from analyze_svg()
+        limits: {limit name: bytes}, where the name is "total" or a category
+
+    Returns:
+        Descriptions of exceeded limits (empty if within budget)
+    """
+    violations = []
+    for name, limit in limits.items():
+        actual = report["bytes"] if name == "total" else report["categories"][name]["bytes"]
+        if actual > limit:
+            violations.append(f"{name}: {actual} bytes exceeds budget of {limit} bytes (+{actual - limit})")
+    return violations
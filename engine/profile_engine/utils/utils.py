@@ -7,13 +7,25 @@
 SVG visualization helpers.
 """
 
+import hashlib
 import json
 import logging
+import math
 import os
+import re
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+try:
+    from . import json_codec
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    import json_codec  # type: ignore[no-redef]
 
 
 # Configure module logger for fallback operations
@@ -126,8 +138,7 @@ def load_json(path: str, description: str = "file") -> dict:
         SystemExit: If file not found or JSON is invalid.
     """
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        return json_codec.load_path(path)
     except FileNotFoundError:
         print(f"Error: {description} not found: {path}", file=sys.stderr)
         sys.exit(1)
@@ -245,8 +256,7 @@ def try_load_json(path: str, description: str = "file") -> Tuple[Optional[Dict],
         the error message.
     """
     try:
-        with open(path, "r") as f:
-            return json.load(f), None
+        return json_codec.load_path(path), None
     except FileNotFoundError:
         return None, f"{description} not found: {path}"
     except json.JSONDecodeError as e:
@@ -406,6 +416,180 @@ def handle_error_with_fallback(
         sys.exit(1)
 
 
+# Stable output: regions whose text changes on every run (staleness badges,
+# "Updated:" footers) are wrapped in <g class="volatile">. Their text is
+# ignored when fingerprinting a render, so a card whose data has not changed
+# is not rewritten just because the clock moved on.
+STABLE_OUTPUT_ENV_VAR = "PROFILE_STABLE_SVG"
+MAX_AGE_ENV_VAR = "PROFILE_SVG_MAX_AGE_HOURS"
+DEFAULT_SVG_MAX_AGE_HOURS = 24.0
+
+_VOLATILE_GROUP_RE = re.compile(
+    r'(<g\b[^>]*\bclass="volatile"[^>]*>)(.*?)(</g>)', re.DOTALL
+)
+_XML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TEXT_NODE_RE = re.compile(r">[^<]*<")
+_RENDER_STAMP_RE = re.compile(r'\s+data-render-(?:hash|at)="[^"]*"')
+_RENDER_HASH_RE = re.compile(r'data-render-hash="([^"]*)"')
+_RENDER_AT_RE = re.compile(r'data-render-at="([^"]*)"')
+
+
+def is_stable_output_enabled() -> bool:
+    """
+    Check whether output-stable SVG writing is enabled.
+
+    Controlled by the PROFILE_STABLE_SVG environment variable (enabled unless
+    set to 0, false or no).
+
+    Returns:
+        True if unchanged renders should skip the write.
+    """
+    value = os.environ.get(STABLE_OUTPUT_ENV_VAR, "1").strip().lower()
+    return value not in ("0", "false", "no")
+
+
+def get_svg_max_age_hours() -> Optional[float]:
+    """
+    Get the maximum age of an unchanged SVG before it is rewritten anyway.
+
+    Read from the PROFILE_SVG_MAX_AGE_HOURS environment variable so relative
+    timestamps such as "Updated: 3h ago" are still refreshed periodically.
+
+    Returns:
+        Maximum age in hours, or None if unchanged cards are never refreshed
+        (variable set to 0 or a negative value).
+    """
+    raw = os.environ.get(MAX_AGE_ENV_VAR, "").strip()
+    if not raw:
+        return DEFAULT_SVG_MAX_AGE_HOURS
+    try:
+        hours = float(raw)
+    except ValueError:
+        return DEFAULT_SVG_MAX_AGE_HOURS
+    return hours if hours > 0 else None
+
+
+def compute_render_fingerprint(svg: str) -> str:
+    """
+    Compute a fingerprint of an SVG render that ignores volatile content.
+
+    Comments, whitespace between tags, previously embedded render stamps and
+    the text inside <g class="volatile"> groups are excluded. Attributes of
+    volatile groups are kept, so a badge switching to its stale color still
+    changes the fingerprint.
+
+    Args:
+        svg: SVG markup.
+
+    Returns:
+        Hex digest identifying the stable content of the render.
+    """
+    normalized = _XML_COMMENT_RE.sub("", svg)
+    normalized = _RENDER_STAMP_RE.sub("", normalized)
+    normalized = _VOLATILE_GROUP_RE.sub(
+        lambda m: m.group(1) + _TEXT_NODE_RE.sub("><", m.group(2)) + m.group(3),
+        normalized,
+    )
+    normalized = re.sub(r">\s+<", "><", normalized)
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def read_render_stamp(svg_path: Union[str, Path]) -> Tuple[Optional[str], Optional[datetime]]:
+    """
+    Read the render fingerprint and render time embedded in an SVG file.
+
+    Args:
+        svg_path: Path to an SVG written by write_svg_if_changed().
+
+    Returns:
+        Tuple of (fingerprint, rendered_at). Either value is None if the file
+        is missing or carries no stamp.
+    """
+    try:
+        content = Path(svg_path).read_text(encoding="utf-8")
+    except (IOError, OSError, UnicodeDecodeError):
+        return None, None
+
+    hash_match = _RENDER_HASH_RE.search(content)
+    at_match = _RENDER_AT_RE.search(content)
+    fingerprint = hash_match.group(1) if hash_match else None
+    rendered_at = parse_timestamp(at_match.group(1)) if at_match else None
+    return fingerprint, rendered_at
+
+
+def stamp_render(svg: str, fingerprint: str, rendered_at: Optional[datetime] = None) -> str:
+    """
+    Embed the render fingerprint and time as data attributes on the root element.
+
+    Data attributes survive SVGO and the sanitizer, so the stamp can be read
+    back from the post-processed file on the next run.
+
+    Args:
+        svg: SVG markup.
+        fingerprint: Fingerprint from compute_render_fingerprint().
+        rendered_at: Render time (default: now).
+
+    Returns:
+        SVG markup with data-render-hash and data-render-at on the <svg> tag.
+    """
+    svg = _RENDER_STAMP_RE.sub("", svg)
+    stamp = (
+        f'<svg data-render-hash="{fingerprint}" '
+        f'data-render-at="{format_timestamp_iso(rendered_at)}"'
+    )
+    return re.sub(r"<svg\b", stamp, svg, count=1)
+
+
+def write_svg_if_changed(
+    output_path: Union[str, Path],
+    svg: str,
+    max_age_hours: Optional[float] = None,
+) -> bool:
+    """
+    Write an SVG only if its stable content differs from the existing file.
+
+    The existing file is kept when its embedded fingerprint matches the new
+    render and it is younger than the maximum age. Otherwise the new render
+    is stamped and written.
+
+    Args:
+        output_path: Path to the output SVG.
+        svg: Newly rendered SVG markup.
+        max_age_hours: Maximum age before an unchanged card is rewritten.
+            None reads PROFILE_SVG_MAX_AGE_HOURS; 0 disables the limit.
+
+    Returns:
+        True if the file was written, False if the existing file was kept.
+    """
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    if not is_stable_output_enabled():
+        output.write_text(svg, encoding="utf-8")
+        return True
+
+    if max_age_hours is None:
+        max_age_hours = get_svg_max_age_hours()
+    elif max_age_hours <= 0:
+        max_age_hours = None
+
+    now = datetime.now(timezone.utc)
+    fingerprint = compute_render_fingerprint(svg)
+    existing_hash, rendered_at = read_render_stamp(output)
+
+    if existing_hash == fingerprint:
+        fresh = max_age_hours is None or (
+            rendered_at is not None
+            and now - rendered_at < timedelta(hours=max_age_hours)
+        )
+        if fresh:
+            return False
+
+    output.write_text(stamp_render(svg, fingerprint, now), encoding="utf-8")
+    return True
+
+
 def generate_card_with_fallback(
     card_type: str,
     output_path: str,
@@ -490,12 +674,10 @@ def generate_card_with_fallback(
             )
             sys.exit(1)
 
-    # Try to write the SVG
+    # Try to write the SVG (skipped if only volatile content changed)
     try:
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, "w") as f:
-            f.write(svg)
+        if not write_svg_if_changed(output_path, svg):
+            print(f"{card_type} card unchanged: {output_path}", file=sys.stderr)
         return True
     except (IOError, OSError) as e:
         error_msg = f"Failed to write SVG: {e}"
@@ -900,8 +1082,7 @@ def load_timezone(timezone_path: Optional[str] = None) -> Dict:
         timezone_path = os.path.join(repo_root, "data", "timezone.json")
 
     try:
-        with open(timezone_path, "r") as f:
-            _timezone_cache = json.load(f)
+        _timezone_cache = json_codec.load_path(timezone_path)
     except (FileNotFoundError, json.JSONDecodeError):
         # Default to UTC if timezone file not found
         _timezone_cache = {
@@ -1152,7 +1333,7 @@ def generate_staleness_badge_svg(
     
     return f'''
   <!-- Staleness Badge -->
-  <g transform="translate({x_position}, {y_offset})">
+  <g class="volatile" transform="translate({x_position}, {y_offset})">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size}" fill="{badge_color}" text-anchor="end">
       {badge_icon}Updated: {time_since_escaped}
     </text>
@@ -1210,14 +1391,26 @@ def format_duration_ms(duration_ms: int) -> str:
 
 # Try to import Pillow for image optimization
 try:
-    from PIL import Image
+    from PIL import Image, ImageChops, ImageStat
     import io
     PILLOW_AVAILABLE = True
 except ImportError:
     PILLOW_AVAILABLE = False
 
+if PILLOW_AVAILABLE:
+    try:
+        # Registers AVIF with Pillow releases that lack native support
+        import pillow_avif  # type: ignore[import-not-found]  # noqa: F401
+    except ImportError:
+        pass
+    # Load all format plugins so Image.SAVE lists every available encoder
+    Image.init()
+
+WEBP_AVAILABLE = PILLOW_AVAILABLE and "WEBP" in Image.SAVE
+AVIF_AVAILABLE = PILLOW_AVAILABLE and "AVIF" in Image.SAVE
+
 
-def get_image_optimization_settings() -> Dict[str, Union[int, bool]]:
+def get_image_optimization_settings() -> Dict[str, Union[int, float, bool]]:
     """
     Get image optimization settings from theme configuration.
 
@@ -1227,6 +1420,15 @@ def get_image_optimization_settings() -> Dict[str, Union[int, bool]]:
         - png_colors: Number of colors for PNG quantization (default 256)
         - max_width: Maximum width for image resizing (default 600)
         - max_height: Maximum height for image resizing (default 400)
+        - target_bytes: Stop trying strategies once one is below this
+          size (default 0, always try every strategy)
+        - webp: Whether to try a WebP candidate (default False)
+        - webp_quality: WebP compression quality (1-100, default 80)
+        - avif: Whether to try an AVIF candidate if Pillow supports it
+          (default False)
+        - avif_quality: AVIF compression quality (1-100, default 60)
+        - min_psnr: Minimum PSNR in dB a lossy candidate must reach against
+          the resized source (default 0, no quality floor)
         - enabled: Whether optimization is enabled (default True)
     """
     theme = load_theme()
@@ -1236,10 +1438,166 @@ def get_image_optimization_settings() -> Dict[str, Union[int, bool]]:
         "png_colors": optimization.get("png_colors", 256),
         "max_width": optimization.get("max_width", 600),
         "max_height": optimization.get("max_height", 400),
+        "target_bytes": optimization.get("target_bytes", 0),
+        "webp": optimization.get("webp", False),
+        "webp_quality": optimization.get("webp_quality", 80),
+        "avif": optimization.get("avif", False),
+        "avif_quality": optimization.get("avif_quality", 60),
+        "min_psnr": optimization.get("min_psnr", 0),
         "enabled": optimization.get("enabled", True),
     }
 
 
+def _encode(img: "Image.Image", image_format: str, **params: Any) -> bytes:
+    """Encode an image to bytes in the given Pillow format."""
+    output = io.BytesIO()
+    img.save(output, format=image_format, **params)
+    return output.getvalue()
+
+
+def _has_alpha(img: "Image.Image") -> bool:
+    """Check whether an image carries transparency."""
+    return "A" in img.getbands() or "transparency" in img.info
+
+
+def compute_psnr(reference: "Image.Image", image_data: bytes) -> float:
+    """
+    Compute the peak signal-to-noise ratio of an encoded image.
+
+    Args:
+        reference: Image the encoding was produced from.
+        image_data: Encoded candidate bytes.
+
+    Returns:
+        PSNR in dB (infinity for an exact match).
+    """
+    mode = "RGBA" if _has_alpha(reference) else "RGB"
+    candidate = Image.open(io.BytesIO(image_data)).convert(mode)
+    rms = ImageStat.Stat(ImageChops.difference(reference.convert(mode), candidate)).rms
+    mse = sum(value * value for value in rms) / len(rms)
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255 * 255 / mse)
+
+
+def _image_candidates(
+    img: "Image.Image", fmt: str, settings: Dict[str, Any]
+) -> List[Tuple[str, Callable[[], Optional[bytes]]]]:
+    """
+    Build the encoding strategies for an already decoded and resized image.
+
+    Each strategy works on its own copy because Image.save() stores encoder
+    state on the image object, so sharing one across threads is not safe.
+    Lossy strategies return None when they fall below the min_psnr floor.
+
+    Args:
+        img: Decoded (and resized) image.
+        fmt: Normalized source format ('png' or 'jpeg').
+        settings: Effective optimization settings.
+
+    Returns:
+        List of (name, encode function) in order of preference.
+    """
+    min_psnr = settings["min_psnr"]
+
+    def lossy(encode: Callable[[], bytes]) -> Callable[[], Optional[bytes]]:
+        def checked() -> Optional[bytes]:
+            data = encode()
+            if min_psnr and compute_psnr(img, data) < min_psnr:
+                return None
+            return data
+        return checked
+
+    def modern_work() -> "Image.Image":
+        return img.convert("RGBA" if _has_alpha(img) else "RGB")
+
+    candidates: List[Tuple[str, Callable[[], Optional[bytes]]]] = []
+
+    # Modern formats first: they are usually the smallest payload
+    if settings["avif"] and AVIF_AVAILABLE:
+        candidates.append(("avif", lossy(lambda: _encode(
+            modern_work(), "AVIF", quality=settings["avif_quality"]
+        ))))
+    if settings["webp"] and WEBP_AVAILABLE:
+        candidates.append(("webp", lossy(lambda: _encode(
+            modern_work(), "WEBP", quality=settings["webp_quality"], method=6
+        ))))
+
+    if fmt == "png":
+        def quantized() -> bytes:
+            work = img if img.mode == "RGB" else img.convert("RGB")
+            quant = work.quantize(
+                colors=settings["png_colors"], method=Image.Quantize.MEDIANCUT
+            )
+            return _encode(quant, "PNG", optimize=True)
+
+        # Quantize + optimize (often best for photos/maps). RGBA is not
+        # quantized to preserve transparency, and P is already a palette,
+        # so for both it would duplicate the resized-only strategy.
+        if img.mode not in ("RGBA", "P"):
+            candidates.append(("quantized", lossy(quantized)))
+        # Just resize + optimize (better for some images)
+        candidates.append(("resized", lambda: _encode(img.copy(), "PNG", optimize=True)))
+    else:
+        def jpeg() -> bytes:
+            # Convert to RGB if necessary (JPEG doesn't support alpha)
+            work = img.convert("RGB") if img.mode in ("RGBA", "P") else img.copy()
+            return _encode(work, "JPEG", quality=settings["jpeg_quality"], optimize=True)
+
+        candidates.append(("jpeg", lossy(jpeg)))
+
+    return candidates
+
+
+def _pick_candidate(
+    candidates: List[Tuple[str, Callable[[], Optional[bytes]]]],
+    target_bytes: int,
+) -> List[Tuple[str, bytes]]:
+    """
+    Encode candidates in parallel, stopping early once one is small enough.
+
+    Pillow releases the GIL while encoding, so the strategies run concurrently
+    on a thread pool bounded by the CPU count. Candidates are submitted in
+    preference order, one more each time a result is consumed, and results
+    are consumed in that order, which keeps the choice deterministic: once a
+    candidate is below target_bytes the ones not yet started never run.
+
+    Args:
+        candidates: (name, encode function) pairs from _image_candidates().
+        target_bytes: Size at which to stop early (0 disables early stop).
+
+    Returns:
+        List of (name, encoded bytes) for the candidates that were encoded
+        and passed the quality floor.
+    """
+    results: List[Tuple[str, bytes]] = []
+    workers = max(1, min(len(candidates), os.cpu_count() or 1))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    queued = iter(candidates)
+    in_flight: Deque[Tuple[str, Future]] = deque(
+        (name, executor.submit(encode)) for name, encode in islice(queued, workers)
+    )
+    try:
+        while in_flight:
+            name, future = in_flight.popleft()
+            try:
+                data = future.result()
+            except (OSError, ValueError) as e:
+                print(f"Warning: {name} candidate failed: {e}", file=sys.stderr)
+                data = None
+            if data is not None:
+                results.append((name, data))
+                if target_bytes and len(data) <= target_bytes:
+                    break
+            # This one didn't fit: start the next candidate in line
+            for next_name, encode in islice(queued, 1):
+                in_flight.append((next_name, executor.submit(encode)))
+    finally:
+        # Encodes still running can no longer win; don't wait for them
+        executor.shutdown(wait=False)
+    return results
+
+
 def optimize_image(
     image_data: bytes,
     image_format: str,
@@ -1247,6 +1605,7 @@ def optimize_image(
     max_height: Optional[int] = None,
     jpeg_quality: Optional[int] = None,
     png_colors: Optional[int] = None,
+    target_bytes: Optional[int] = None,
 ) -> bytes:
     """
     Optimize an image for embedding in SVG.
@@ -1255,6 +1614,12 @@ def optimize_image(
     - Resizing large images to a maximum dimension
     - Compressing JPEG images with configurable quality
     - Quantizing PNG images to reduce color palette
+    - Optionally re-encoding as WebP or AVIF (see image_optimization in theme)
+
+    The image is decoded and resized once. The encoding strategies then run
+    in parallel and the smallest result that passes the quality floor wins,
+    so the returned bytes may be in a different format than the input. Use
+    detect_image_mime() to build the data URI.
 
     Args:
         image_data: Raw image bytes.
@@ -1263,6 +1628,8 @@ def optimize_image(
         max_height: Maximum height in pixels. Uses theme default if None.
         jpeg_quality: JPEG quality (1-100). Uses theme default if None.
         png_colors: Number of colors for PNG quantization. Uses theme default if None.
+        target_bytes: Accept the first strategy at or below this size without
+            waiting for the others. Uses theme default if None.
 
     Returns:
         Optimized image bytes. Returns original if Pillow not available
@@ -1277,106 +1644,52 @@ def optimize_image(
         return image_data
 
     # Use provided values or fall back to theme settings
-    max_width = max_width if max_width is not None else settings["max_width"]
-    max_height = max_height if max_height is not None else settings["max_height"]
-    jpeg_quality = jpeg_quality if jpeg_quality is not None else settings["jpeg_quality"]
-    png_colors = png_colors if png_colors is not None else settings["png_colors"]
+    overrides = {
+        "max_width": max_width,
+        "max_height": max_height,
+        "jpeg_quality": jpeg_quality,
+        "png_colors": png_colors,
+        "target_bytes": target_bytes,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            settings[key] = value
+
+    # Normalize format
+    fmt = image_format.lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in ("png", "jpeg"):
+        # Unknown format, return original
+        return image_data
 
     try:
-        # Open image from bytes
+        # Decode and resize once; every strategy starts from this image
         img = Image.open(io.BytesIO(image_data))
+        img.load()
+        if img.width > settings["max_width"] or img.height > settings["max_height"]:
+            img.thumbnail(
+                (settings["max_width"], settings["max_height"]), Image.Resampling.LANCZOS
+            )
 
         # Get original size for logging
         original_size = len(image_data)
-        
-        # Track if we need to resize
-        needs_resize = img.width > max_width or img.height > max_height
 
-        # Normalize format
-        fmt = image_format.lower()
-        
-        # For PNG, try multiple optimization strategies and use the smallest result
-        if fmt == "png":
-            candidates = []
-            
-            # Strategy 1: Quantize + optimize (often best for photos/maps)
-            # Skip quantization for RGBA images to preserve transparency
-            try:
-                img_work = Image.open(io.BytesIO(image_data))
-                if needs_resize:
-                    img_work.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                if img_work.mode == "RGBA":
-                    # Preserve transparency - skip quantization, just optimize
-                    output1 = io.BytesIO()
-                    img_work.save(output1, format="PNG", optimize=True)
-                    candidates.append(("rgba_optimized", output1.getvalue()))
-                elif img_work.mode == "RGB":
-                    img_quant = img_work.quantize(
-                        colors=png_colors, method=Image.Quantize.MEDIANCUT
-                    )
-                    output1 = io.BytesIO()
-                    img_quant.save(output1, format="PNG", optimize=True)
-                    candidates.append(("quantized", output1.getvalue()))
-                elif img_work.mode != "P":
-                    img_quant = img_work.convert("RGB").quantize(
-                        colors=png_colors, method=Image.Quantize.MEDIANCUT
-                    )
-                    output1 = io.BytesIO()
-                    img_quant.save(output1, format="PNG", optimize=True)
-                    candidates.append(("quantized", output1.getvalue()))
-                else:
-                    output1 = io.BytesIO()
-                    img_work.save(output1, format="PNG", optimize=True)
-                    candidates.append(("palette_optimized", output1.getvalue()))
-            except (OSError, ValueError):
-                pass
-            
-            # Strategy 2: Just resize + optimize (better for some images)
-            try:
-                img_work = Image.open(io.BytesIO(image_data))
-                if needs_resize:
-                    img_work.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                output2 = io.BytesIO()
-                img_work.save(output2, format="PNG", optimize=True)
-                candidates.append(("resized", output2.getvalue()))
-            except (OSError, ValueError):
-                pass
-            
-            # Strategy 3: Original (if already optimal)
-            candidates.append(("original", image_data))
-            
-            # Pick the smallest
-            best_name, best_data = min(candidates, key=lambda x: len(x[1]))
-            optimized_data = best_data
-            optimized_size = len(optimized_data)
-            
-        elif fmt in ["jpeg", "jpg"]:
-            # Resize if needed
-            if needs_resize:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-            
-            # Convert to RGB if necessary (JPEG doesn't support alpha)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")  # type: ignore[assignment]
-            
-            output = io.BytesIO()
-            img.save(output, format="JPEG", quality=jpeg_quality, optimize=True)
-            optimized_data = output.getvalue()
-            optimized_size = len(optimized_data)
-            
-            # Use original if optimization didn't help
-            if optimized_size >= original_size:
-                optimized_data = image_data
-                optimized_size = original_size
-        else:
-            # Unknown format, return original
-            return image_data
+        candidates = _pick_candidate(
+            _image_candidates(img, fmt, settings), settings["target_bytes"]
+        )
+        # Original (if already optimal)
+        candidates.append(("original", image_data))
+
+        # Pick the smallest (first in preference order on ties)
+        best_name, optimized_data = min(candidates, key=lambda x: len(x[1]))
+        optimized_size = len(optimized_data)
 
         # Log optimization results
         if optimized_size < original_size:
             reduction_pct = ((original_size - optimized_size) / original_size) * 100
             print(
-                f"Image optimized: {original_size:,} -> {optimized_size:,} bytes "
+                f"Image optimized ({best_name}): {original_size:,} -> {optimized_size:,} bytes "
                 f"({reduction_pct:.1f}% reduction)",
                 file=sys.stderr,
             )
@@ -1394,6 +1707,29 @@ def optimize_image(
         return image_data
 
 
+def detect_image_mime(image_data: bytes) -> Optional[str]:
+    """
+    Detect the MIME type of encoded image bytes from their signature.
+
+    Args:
+        image_data: Encoded image bytes.
+
+    Returns:
+        MIME type (e.g., "image/png"), or None if the format is not recognized.
+    """
+    if image_data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP":
+        return "image/webp"
+    if image_data[4:8] == b"ftyp" and image_data[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    if image_data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    return None
+
+
 def optimize_image_file(
     file_path: str,
     max_width: Optional[int] = None,
@@ -1474,18 +1810,18 @@ def safe_write_json(data: Dict, output_path: str, indent: int = 2) -> None:
         # Ensure parent directory exists
         output.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write to temporary file
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent)
+        # Serialize once; validate the bytes before they hit the disk
+        payload = json_codec.dumps_bytes(data, indent=indent, ensure_ascii=True)
+        json_codec.loads(payload)
         
-        # Validate the temp file can be loaded
-        with open(temp_path, 'r', encoding='utf-8') as f:
-            json.load(f)
+        # Write to temporary file
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
         
         # Atomic move to final location
         temp_path.replace(output)
         
-    except (IOError, OSError, ValueError, json.JSONDecodeError) as e:
+    except (IOError, OSError, TypeError, ValueError, json.JSONDecodeError) as e:
         # Clean up temp file on failure (missing_ok=True available in Python 3.8+)
         temp_path.unlink(missing_ok=True)
         raise IOError(f"Failed to write JSON to {output_path}: {e}") from e
@@ -0,0 +1,237 @@
+"""Tests for SVG minification module."""
+
+import re
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from profile_engine.utils.minify_svg import (
+    format_number,
+    minify_path_data,
+    minify_svg,
+    round_numbers,
+)
+from profile_engine.utils.sanitize_svg import load_manifest, sanitize_all_svgs
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for test files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def _path_points(d):
+    """Resolve simple M/L/H/V/Z path data (absolute or relative) to absolute points."""
+    points = []
+    x = y = 0.0
+    for command, args in re.findall(r'([MmLlHhVvZz])([^MmLlHhVvZz]*)', d):
+        numbers = [float(n) for n in re.findall(r'-?(?:\d+\.?\d*|\.\d+)', args)]
+        upper = command.upper()
+        relative = command.islower()
+        step = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'Z': 0}[upper]
+        for i in range(0, len(numbers), step or 1):
+            if upper == 'H':
+                x = numbers[i] + (x if relative else 0)
+            elif upper == 'V':
+                y = numbers[i] + (y if relative else 0)
+            elif step:
+                x = numbers[i] + (x if relative else 0)
+                y = numbers[i + 1] + (y if relative else 0)
+            points.append((round(x, 6), round(y, 6)))
+    return points
+
+
+def test_format_number():
+    """Test shortest number formatting."""
+    assert format_number(2.0) == "2"
+    assert format_number(0.5) == ".5"
+    assert format_number(-0.25) == "-.25"
+    assert format_number(12.3456) == "12.35"
+    assert format_number(-0.001) == "0"
+    assert format_number(1.23456, precision=3) == "1.235"
+
+
+def test_round_numbers_preserves_units():
+    """Test that numbers are rounded while units and functions are kept."""
+    assert round_numbers("12.3456px") == "12.35px"
+    assert round_numbers(" 0  0 200.0  150.0 ") == "0 0 200 150"
+    assert round_numbers("10.001,20.5 30,40") == "10 20.5 30 40"
+    assert round_numbers("translate(10.12345, 20) scale(0.5)", 5) == "translate(10.12345 20) scale(.5)"
+
+
+def test_minify_path_data_shorthands():
+    """Test axis-parallel lines, implicit commands and relative segments."""
+    assert minify_path_data("M 10.123 20.456 L 30 20.456 L 30 40 Z") == "M10.12 20.46H30V40z"
+    assert minify_path_data("M 0.5 0.5 L -0.5 0.25") == "M.5.5-.5.25"
+    assert (
+        minify_path_data("M 100 100 C 120.5 80 140 80 160 100 S 200 120 220 100")
+        == "M100 100c20.5-20 40-20 60 0s40 20 60 0"
+    )
+
+
+def test_minify_path_data_arcs():
+    """Test arcs, including compact flags written without separators."""
+    assert minify_path_data("M10 10 A 5 5 0 0 1 20 10") == "M10 10a5 5 0 0 1 10 0"
+    assert minify_path_data("M10 10a5 5 0 0120 0") == "M10 10a5 5 0 0 1 20 0"
+
+
+def test_minify_path_data_does_not_accumulate_rounding():
+    """Test that many relative segments stay within precision of the original."""
+    d = "M0 0" + " l1.004 0.996" * 50
+    minified = minify_path_data(d)
+
+    original = _path_points(d)
+    result = _path_points(minified)
+    assert len(result) == len(original)
+    for (ox, oy), (rx, ry) in zip(original, result):
+        assert abs(ox - rx) <= 0.005 + 1e-9
+        assert abs(oy - ry) <= 0.005 + 1e-9
+
+
+def test_minify_path_data_leaves_malformed_input():
+    """Test that unparsable path data is returned unchanged."""
+    assert minify_path_data("10 10 L 20") == "10 10 L 20"
+    assert minify_path_data("M 10 10 L 20") == "M 10 10 L 20"
+
+
+def test_minify_svg_rewrites_ids_and_references(temp_dir):
+    """Test that IDs are shortened and forward references stay consistent."""
+    svg_content = '''<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 100 100">
+    <rect width="100" height="100" fill="url(#bg-gradient)" filter="url(#glow)"/>
+    <use xlink:href="#shape"/>
+    <defs>
+        <linearGradient id="bg-gradient"><stop offset="0%" stop-color="#000"/></linearGradient>
+        <filter id="glow"><feGaussianBlur stdDeviation="2.5" result="blur"/></filter>
+        <circle id="shape" r="5"/>
+    </defs>
+</svg>'''
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+
+    success, warnings = minify_svg(svg_path)
+
+    assert success
+    result = svg_path.read_text()
+    ids = set(re.findall(r' id="([^"]+)"', result))
+    references = set(re.findall(r'url\(#([^)]+)\)', result)) | set(re.findall(r'href="#([^"]+)"', result))
+    assert ids == {"a", "b", "c"}
+    assert references == ids
+    assert 'result="blur"' in result
+
+
+def test_minify_svg_keeps_ids_with_style_element(temp_dir):
+    """Test that IDs are kept when CSS may reference them."""
+    svg_content = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">
+    <style>#panel { opacity: 0.5; }</style>
+    <rect id="panel" width="10" height="10"/>
+</svg>'''
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+
+    success, _ = minify_svg(svg_path)
+
+    assert success
+    assert 'id="panel"' in svg_path.read_text()
+
+
+def test_minify_svg_keeps_ids_with_late_style_element(temp_dir):
+    """Test that a <style> after renamed IDs restarts the pass keeping every ID."""
+    svg_content = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">
+    <defs><linearGradient id="fade"/></defs>
+    <rect id="panel" width="10" height="10" fill="url(#fade)"/>
+    <style>#panel { opacity: 0.5; }</style>
+</svg>'''
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+
+    success, warnings = minify_svg(svg_path)
+
+    assert success
+    assert warnings == []
+    result = svg_path.read_text()
+    assert 'id="panel"' in result
+    assert 'id="fade"' in result and 'fill="url(#fade)"' in result
+
+
+def test_minify_svg_whitespace_and_attributes(temp_dir):
+    """Test whitespace removal, attribute cleanup and preserved data attributes."""
+    svg_content = '''<svg xmlns="http://www.w3.org/2000/svg" width="200.0" height="100" viewBox="0 0 200 100" data-render-at="2024-01-01T00:00:00.000Z">
+    <g class=" volatile " style="fill: red; stroke: blue;">
+        <text x="10.004" y="20">Hello   <tspan>big</tspan> world</text>
+    </g>
+    <rect class="" width="50" height="50" opacity="0.50"/>
+</svg>'''
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+
+    success, _ = minify_svg(svg_path)
+
+    assert success
+    result = svg_path.read_text()
+    assert result.startswith('<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100"')
+    assert 'data-render-at="2024-01-01T00:00:00.000Z"' in result
+    assert '<g class="volatile" style="fill:red;stroke:blue">' in result
+    assert '<text x="10" y="20">Hello <tspan>big</tspan> world</text>' in result
+    assert '<rect width="50" height="50" opacity=".5"/>' in result
+    assert "\n" not in result
+
+
+def test_minify_svg_sanitizes_in_same_pass(temp_dir):
+    """Test that minification also applies the sanitizer rules."""
+    svg_content = '''<svg width="10" height="10">
+    <!-- comment -->
+    <script>alert('xss')</script>
+    <rect onclick="evil()" width="10" height="10"  # noqa: E501/>
+</svg>'''
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+
+    success, warnings = minify_svg(svg_path)
+
+    assert success
+    assert "Removed forbidden element: script" in warnings
+    assert svg_path.read_text() == (
+        '<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+        '<rect width="10" height="10"/></svg>'
+    )
+
+
+def test_minify_svg_is_idempotent(temp_dir):
+    """Test that minifying an already minified file changes nothing."""
+    svg_content = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+    <defs><linearGradient id="grad"><stop offset="0.5" stop-color="#fff"/></linearGradient></defs>
+    <path d="M 10.5 10.5 L 90.25 10.5 L 90.25 90.125 C 50 95 30 95 10.5 90 Z" fill="url(#grad)"/>
+</svg>'''
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+
+    minify_svg(svg_path)
+    first = svg_path.read_text()
+    minify_svg(svg_path)
+
+    assert svg_path.read_text() == first
+    assert len(first) < len(svg_content)
+
+
+def test_minified_files_are_skipped_by_sanitize_all(temp_dir):
+    """Test that files minified through the manifest count as sanitized."""
+    svg_dir = temp_dir / "svgs"
+    svg_dir.mkdir()
+    (svg_dir / "card.svg").write_text('<svg width="10" height="10"><script/></svg>')
+    manifest_path = temp_dir / "manifest.json"
+
+    sanitize_all_svgs(svg_dir, manifest_path=manifest_path, minify_precision=2)
+    entry = load_manifest(manifest_path)[str((svg_dir / "card.svg").resolve())]
+    assert entry["minified"] == 2
+
+    # A later sanitize-only run skips the file ...
+    results = sanitize_all_svgs(svg_dir, manifest_path=manifest_path)
+    assert results[str(svg_dir / "card.svg")] == (True, [])
+
+    # ... but a sanitized-only file is still minified
+    (svg_dir / "other.svg").write_text('<svg width="10.001" height="10"></svg>')
+    sanitize_all_svgs(svg_dir, manifest_path=manifest_path)
+    sanitize_all_svgs(svg_dir, manifest_path=manifest_path, minify_precision=2)
+    assert 'width="10"' in (svg_dir / "other.svg").read_text()
@@ -8,6 +8,7 @@
 from profile_engine.utils.sanitize_svg import (
     SVGSanitizationError,
     SVGSanitizer,
+    load_manifest,
     sanitize_all_svgs,
     sanitize_svg,
 )
@@ -325,3 +326,135 @@ def test_complex_svg_with_multiple_issues(temp_dir):
     # Should preserve safe content
     assert "<text" in result_content
     assert "<rect" in result_content
+
+
+def test_streaming_preserves_large_attributes(temp_dir):
+    """Test that large embedded images pass through the streaming parser intact."""
+    payload = "A" * (1024 * 1024)
+    svg_content = (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 10 10">\n'
+        f'<image xlink:href="data:image/png;base64,{payload}" width="10" height="10"/>\n'
+        '</svg>'
+    )
+    
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+    
+    success, warnings = sanitize_svg(svg_path)
+    
+    assert success
+    assert warnings == []
+    result_content = svg_path.read_text()
+    assert f'xlink:href="data:image/png;base64,{payload}"' in result_content
+    assert 'xmlns:xlink="http://www.w3.org/1999/xlink"' in result_content
+
+
+def test_streaming_drops_nested_forbidden_content(temp_dir):
+    """Test that everything inside a forbidden element is skipped."""
+    svg_content = '''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">
+    <foreignObject><div><script>alert('xss')</script><p>HTML</p></div></foreignObject>
+    <g><text>Kept &amp; escaped</text><rect width="1" height="1"/></g>
+</svg>'''
+    
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text(svg_content)
+    
+    success, warnings = sanitize_svg(svg_path)
+    
+    assert success
+    assert warnings == ["Removed forbidden element: foreignObject"]
+    result_content = svg_path.read_text()
+    assert "HTML" not in result_content
+    assert "alert" not in result_content
+    assert "<text>Kept &amp; escaped</text>" in result_content
+    assert '<rect width="1" height="1" />' in result_content
+
+
+def test_failed_sanitization_leaves_no_partial_output(temp_dir):
+    """Test that a parse error midway through leaves no output or temp files."""
+    svg_path = temp_dir / "test.svg"
+    svg_path.write_text('<svg xmlns="http://www.w3.org/2000/svg"><g><rect/></svg>')
+    output_path = temp_dir / "out.svg"
+    
+    success, warnings = sanitize_svg(svg_path, output_path)
+    
+    assert not success
+    assert any("Invalid XML" in w for w in warnings)
+    assert not output_path.exists()
+    assert [p.name for p in temp_dir.iterdir()] == ["test.svg"]
+
+
+def _write_dirty_svgs(directory, count):
+    """Write SVG files that each need sanitizing."""
+    for i in range(count):
+        (directory / f"card{i}.svg").write_text(
+            f'<svg width="{i + 1}" height="10"><script>x()</script></svg>'
+        )
+
+
+def test_sanitize_all_skips_unchanged_files(temp_dir):
+    """Test that files recorded in the manifest are not sanitized again."""
+    svg_dir = temp_dir / "svgs"
+    svg_dir.mkdir()
+    _write_dirty_svgs(svg_dir, 2)
+    manifest_path = temp_dir / "manifest.json"
+    
+    first = sanitize_all_svgs(svg_dir, manifest_path=manifest_path)
+    assert all(success and warnings for success, warnings in first.values())
+    assert len(load_manifest(manifest_path)) == 2
+    
+    # Regenerate one file; only that one is processed
+    (svg_dir / "card1.svg").write_text('<svg width="5" height="5"><script/></svg>')
+    second = sanitize_all_svgs(svg_dir, manifest_path=manifest_path)
+    
+    assert second[str(svg_dir / "card0.svg")] == (True, [])
+    assert second[str(svg_dir / "card1.svg")][1] == [
+        "Added missing xmlns attribute",
+        "Added viewBox from width/height: 0 0 5.0 5.0",
+        "Removed forbidden element: script",
+    ]
+
+
+def test_sanitize_all_ignores_manifest_from_other_version(temp_dir):
+    """Test that a manifest with a different version is discarded."""
+    svg_dir = temp_dir / "svgs"
+    svg_dir.mkdir()
+    _write_dirty_svgs(svg_dir, 1)
+    manifest_path = temp_dir / "manifest.json"
+    manifest_path.write_text('{"version": 0, "files": {}}')
+    
+    assert load_manifest(manifest_path) == {}
+    results = sanitize_all_svgs(svg_dir, manifest_path=manifest_path)
+    assert all(warnings for _, warnings in results.values())
+
+
+def test_sanitize_all_does_not_record_failures(temp_dir):
+    """Test that failed files stay out of the manifest and are retried."""
+    svg_dir = temp_dir / "svgs"
+    svg_dir.mkdir()
+    (svg_dir / "broken.svg").write_text("<svg><unclosed></svg>")
+    manifest_path = temp_dir / "manifest.json"
+    
+    for _ in range(2):
+        results = sanitize_all_svgs(svg_dir, manifest_path=manifest_path)
+        assert results[str(svg_dir / "broken.svg")][0] is False
+    assert load_manifest(manifest_path) == {}
+
+
+def test_sanitize_all_parallel_matches_serial(temp_dir):
+    """Test that a process pool produces the same ordered results as a serial run."""
+    serial_dir = temp_dir / "serial"
+    parallel_dir = temp_dir / "parallel"
+    for directory in (serial_dir, parallel_dir):
+        directory.mkdir()
+        _write_dirty_svgs(directory, 6)
+    
+    serial = sanitize_all_svgs(serial_dir, jobs=1)
+    parallel = sanitize_all_svgs(parallel_dir, jobs=3)
+    
+    assert [Path(p).name for p in parallel] == sorted(Path(p).name for p in parallel)
+    assert [Path(p).name for p in parallel] == [Path(p).name for p in serial]
+    assert list(parallel.values()) == list(serial.values())
+    for name in ("card0.svg", "card5.svg"):
+        assert (parallel_dir / name).read_text() == (serial_dir / name).read_text()
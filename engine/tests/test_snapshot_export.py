@@ -0,0 +1,158 @@
+"""Tests for the snapshot history export module."""
+
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from profile_engine.utils.snapshot_export import (
+    SnapshotExportError,
+    export_snapshots,
+    iter_snapshots,
+)
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for test files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def _snapshot(day, sleep, commits=None):
+    return {
+        "date": day,
+        "timestamp": f"{day}T23:00:00Z",
+        "health": {"sleep_score": sleep, "readiness_score": None},
+        "mood": {"mood_name": "Solar Focus"},
+        "weather": {},
+        "developer": {"commits_30d": commits} if commits is not None else {},
+    }
+
+
+@pytest.fixture
+def snapshots_dir(temp_dir):
+    """Snapshot tree with an archived month and daily files in two years."""
+    root = temp_dir / "snapshots"
+    (root / "archive" / "2024").mkdir(parents=True)
+    with gzip.open(root / "archive" / "2024" / "2024-11.jsonl.gz", "wb") as f:
+        for day, sleep in (("2024-11-02", 60), ("2024-11-01", 50)):
+            f.write(json.dumps(_snapshot(day, sleep)).encode() + b"\n")
+
+    for day, sleep, commits in (("2024-12-31", 70, 3), ("2025-01-01", 80, None), ("2025-01-15", 90, 7)):
+        path = root / "daily" / day[:4] / day[5:7] / f"{day}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(_snapshot(day, sleep, commits)))
+    return root
+
+
+def test_iter_snapshots_in_date_order(snapshots_dir):
+    """Test that archives and daily files are merged in date order."""
+    days = [s["date"] for s in iter_snapshots(snapshots_dir)]
+    assert days == ["2024-11-01", "2024-11-02", "2024-12-31", "2025-01-01", "2025-01-15"]
+
+
+def test_iter_snapshots_is_lazy(snapshots_dir):
+    """Test that rows are produced one at a time."""
+    rows = iter_snapshots(snapshots_dir)
+    assert next(rows)["date"] == "2024-11-01"
+
+
+def test_index_drives_enumeration(snapshots_dir):
+    """Test that only the days listed in index.json are read when it is present."""
+    (snapshots_dir / "index.json").write_text(json.dumps({"version": 1, "daily": {
+        "2024-11-02": {"path": "archive/2024/2024-11.jsonl.gz", "metrics": []},
+        "2025-01-15": {"path": "daily/2025/01/2025-01-15.json", "metrics": []},
+    }}))
+    days = [s["date"] for s in iter_snapshots(snapshots_dir)]
+    assert days == ["2024-11-02", "2025-01-15"]
+
+
+def test_stale_index_falls_back_to_walk(snapshots_dir):
+    """Test that daily files written after index.json are not missed."""
+    index_path = snapshots_dir / "index.json"
+    index_path.write_text(json.dumps({"version": 1, "daily": {}}))
+    os.utime(index_path, (0, 0))
+    days = [s["date"] for s in iter_snapshots(snapshots_dir)]
+    assert len(days) == 5
+
+
+def test_date_filters(snapshots_dir):
+    """Test inclusive start and end dates across months and years."""
+    days = [s["date"] for s in iter_snapshots(snapshots_dir, date(2024, 11, 2), date(2025, 1, 1))]
+    assert days == ["2024-11-02", "2024-12-31", "2025-01-01"]
+
+
+def test_ndjson_export(snapshots_dir):
+    """Test flat NDJSON rows with only the fields that have a value."""
+    lines = list(export_snapshots(snapshots_dir, "ndjson", start="2025-01-01"))
+    rows = [json.loads(line) for line in lines]
+
+    assert rows[0] == {"date": "2025-01-01", "health.sleep_score": 80, "mood.mood_name": "Solar Focus"}
+    assert rows[1]["developer.commits_30d"] == 7
+    assert all(line.endswith(b"\n") for line in lines)
+
+
+def test_field_selection(snapshots_dir):
+    """Test selecting single fields and whole sections."""
+    rows = [json.loads(line) for line in export_snapshots(snapshots_dir, fields=["developer", "health.sleep_score"])]
+    assert rows[2] == {"date": "2024-12-31", "health.sleep_score": 70, "developer.commits_30d": 3}
+    assert rows[0] == {"date": "2024-11-01", "health.sleep_score": 50}
+
+
+def test_csv_export_collects_columns(snapshots_dir):
+    """Test that CSV columns cover fields that only appear in later rows."""
+    text = b"".join(export_snapshots(snapshots_dir, "csv", fields=["health", "developer"])).decode()
+    rows = list(csv.reader(io.StringIO(text)))
+
+    assert rows[0] == ["date", "health.sleep_score", "developer.commits_30d"]
+    assert rows[1] == ["2024-11-01", "50", ""]
+    assert rows[-1] == ["2025-01-15", "90", "7"]
+
+
+def test_csv_explicit_fields_keep_order(snapshots_dir):
+    """Test that explicit fields are used as the header without a scan."""
+    lines = list(export_snapshots(snapshots_dir, "csv", fields=["developer.commits_30d", "health.sleep_score"], end="2024-11-01"))
+    assert lines == [b"date,developer.commits_30d,health.sleep_score\n", b"2024-11-01,,50\n"]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"fmt": "xml"},
+    {"start": "2025-13-01"},
+    {"start": "2025-02-01", "end": "2025-01-01"},
+    {"fields": ["location.city"]},
+])
+def test_invalid_arguments_raise_immediately(snapshots_dir, kwargs):
+    """Test that bad arguments fail before any output is streamed."""
+    with pytest.raises(SnapshotExportError):
+        export_snapshots(snapshots_dir, **kwargs)
+
+
+def test_missing_directory_exports_nothing(temp_dir):
+    """Test an empty history."""
+    assert list(export_snapshots(temp_dir / "missing")) == []
+    assert list(export_snapshots(temp_dir / "missing", "csv")) == [b"date\n"]
+
+
+def test_api_export_route(snapshots_dir, monkeypatch):
+    """Test the streaming /api/export route."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from profile_engine import api
+
+    monkeypatch.setattr(api, "SNAPSHOTS_DIR", snapshots_dir)
+    client = TestClient(api.app)
+
+    response = client.get("/api/export", params={"format": "csv", "fields": "health.sleep_score", "start": "2025-01-01"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text == "date,health.sleep_score\n2025-01-01,80\n2025-01-15,90\n"
+
+    assert client.get("/api/export", params={"start": "nope"}).status_code == 400
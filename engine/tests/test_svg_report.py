@@ -0,0 +1,134 @@
+"""Tests for SVG byte-budget report module."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from profile_engine.utils.svg_report import (
+    SVGReportError,
+    analyze_svg,
+    budget_key,
+    check_budget,
+    find_svgs,
+    load_budgets,
+)
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for test files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+SVG_CONTENT = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">\n'
+    '<defs><linearGradient id="g"><stop offset="0"/></linearGradient></defs>\n'
+    '<style>.a { fill: red; }</style>\n'
+    '<g id="header"><text>Title</text><rect width="1" height="1"/></g>\n'
+    '<rect width="2" height="2"/>\n'
+    '<rect width="3" height="3"/>\n'
+    '<g class="volatile"><image href="data:image/png;base64,AAAA" width="1" height="1"/></g>\n'
+    '<!-- comment -->\n'
+    '</svg>\n'
+)
+
+
+def test_categories_add_up_to_file_size(temp_dir):
+    """Test that every byte is attributed to exactly one category."""
+    svg_path = temp_dir / "card.svg"
+    svg_path.write_text(SVG_CONTENT)
+
+    report = analyze_svg(svg_path)
+
+    assert report["bytes"] == len(SVG_CONTENT.encode())
+    assert sum(c["bytes"] for c in report["categories"].values()) == report["bytes"]
+    assert report["elements"] == 12
+    assert sum(c["elements"] for c in report["categories"].values()) == report["elements"]
+
+
+def test_category_spans_are_exact(temp_dir):
+    """Test that categories cover exactly the markup of their elements."""
+    svg_path = temp_dir / "card.svg"
+    svg_path.write_text(SVG_CONTENT)
+
+    categories = analyze_svg(svg_path)["categories"]
+
+    image = '<image href="data:image/png;base64,AAAA" width="1" height="1"/>'
+    defs = '<defs><linearGradient id="g"><stop offset="0"/></linearGradient></defs>'
+    assert categories["images"] == {"bytes": len(image), "elements": 1}
+    assert categories["defs"] == {"bytes": len(defs), "elements": 3}
+    assert categories["style"]["bytes"] == len('<style>.a { fill: red; }</style>')
+    assert categories["text"] == {"bytes": len("<text>Title</text>"), "elements": 1}
+
+
+def test_groups_are_aggregated_by_label(temp_dir):
+    """Test that top-level children are grouped by tag, id and class."""
+    svg_path = temp_dir / "card.svg"
+    svg_path.write_text(SVG_CONTENT)
+
+    groups = {g["label"]: g for g in analyze_svg(svg_path)["groups"]}
+
+    assert list(groups) == ["defs", "style", "g#header", "rect", "g.volatile"]
+    assert groups["rect"]["count"] == 2
+    # Whitespace between top-level children is not part of any group
+    assert groups["rect"]["bytes"] == len('<rect width="2" height="2"/><rect width="3" height="3"/>')
+    assert groups["g#header"]["elements"] == 3
+
+
+def test_invalid_svg_raises(temp_dir):
+    """Test that malformed files are reported as errors."""
+    svg_path = temp_dir / "broken.svg"
+    svg_path.write_text("<svg><g></svg>")
+
+    with pytest.raises(SVGReportError):
+        analyze_svg(svg_path)
+
+
+def test_find_svgs_skips_excluded_and_missing(temp_dir):
+    """Test that scanning skips excluded directories and missing paths."""
+    (temp_dir / "cards").mkdir()
+    (temp_dir / "cards" / "b.svg").write_text("<svg/>")
+    (temp_dir / "cards" / "a.svg").write_text("<svg/>")
+    (temp_dir / "node_modules").mkdir()
+    (temp_dir / "node_modules" / "c.svg").write_text("<svg/>")
+
+    found = find_svgs([temp_dir, temp_dir / "cards" / "a.svg", temp_dir / "missing"])
+
+    assert [p.name for p in found] == ["a.svg", "b.svg"]
+
+
+def test_budgets(temp_dir):
+    """Test loading budgets and checking reports against them."""
+    budgets_path = temp_dir / "budgets.json"
+    budgets_path.write_text(
+        '{"budgets": {"weather/card.svg": 100, "location/card.svg": {"total": 500, "images": 10}}}'
+    )
+    svg_path = temp_dir / "card.svg"
+    svg_path.write_text(SVG_CONTENT)
+    report = analyze_svg(svg_path)
+
+    budgets = load_budgets(budgets_path)
+
+    assert budgets["weather/card.svg"] == {"total": 100}
+    assert check_budget(report, budgets["location/card.svg"]) == [
+        "images: 63 bytes exceeds budget of 10 bytes (+53)"
+    ]
+    assert check_budget(report, {"total": report["bytes"]}) == []
+    assert budget_key(svg_path, root=temp_dir) == "card.svg"
+
+
+@pytest.mark.parametrize("content", [
+    '{"cards": {}}',
+    '{"budgets": {"a.svg": -1}}',
+    '{"budgets": {"a.svg": {"animations": 10}}}',
+    'not json',
+])
+def test_invalid_budgets_raise(temp_dir, content):
+    """Test that malformed budgets files are rejected."""
+    budgets_path = temp_dir / "budgets.json"
+    budgets_path.write_text(content)
+
+    with pytest.raises(SVGReportError):
+        load_budgets(budgets_path)
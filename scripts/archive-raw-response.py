@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Store, list, replay and prune raw API responses in the raw-response archive.
+
+Fetch scripts pipe each raw response into "store"; debugging and backfills
+read them back with "list", "show" and "replay" without calling the APIs.
+
+Usage:
+    echo "$response" | python archive-raw-response.py store oura daily_sleep
+    python archive-raw-response.py list 2025-12-03
+    python archive-raw-response.py show <hash>
+    python archive-raw-response.py replay oura daily_sleep --as-of 2025-12-03
+    python archive-raw-response.py prune --keep-days 90
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.raw_archive import DEFAULT_ARCHIVE_DIR, DEFAULT_KEEP_DAYS, RawArchive, RawArchiveError
+
+
+def main() -> None:
+    """Parse arguments and run the archive command."""
+    parser = argparse.ArgumentParser(description="Raw API response archive")
+    parser.add_argument(
+        "--archive-dir",
+        default=str(DEFAULT_ARCHIVE_DIR),
+        help=f"Archive directory (default: {DEFAULT_ARCHIVE_DIR})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    store = commands.add_parser("store", help="Archive a response read from stdin")
+    store.add_argument("source", help="Data source (e.g. 'oura', 'developer')")
+    store.add_argument("name", help="Endpoint or payload name (e.g. 'daily_sleep')")
+    store.add_argument("--status", default="ok", help="Response status, e.g. 'invalid' (default: ok)")
+
+    listing = commands.add_parser("list", help="List the responses archived on a day")
+    listing.add_argument("day", help="Date (YYYY-MM-DD)")
+
+    show = commands.add_parser("show", help="Print an archived payload by hash")
+    show.add_argument("hash", help="Content hash")
+
+    replay = commands.add_parser("replay", help="Print the newest valid payload of an endpoint")
+    replay.add_argument("source", help="Data source")
+    replay.add_argument("name", help="Endpoint or payload name")
+    replay.add_argument("--as-of", help="Newest day considered (YYYY-MM-DD, default: any)")
+
+    prune = commands.add_parser("prune", help="Drop old manifests and unreferenced payloads")
+    prune.add_argument(
+        "--keep-days",
+        type=int,
+        default=DEFAULT_KEEP_DAYS,
+        help=f"Days of manifests to keep (default: {DEFAULT_KEEP_DAYS})",
+    )
+
+    args = parser.parse_args()
+    archive = RawArchive(Path(args.archive_dir))
+
+    try:
+        if args.command == "store":
+            payload = sys.stdin.buffer.read()
+            if not payload.strip():
+                print(f"Nothing to archive for {args.source}/{args.name}", file=sys.stderr)
+                return
+            digest = archive.store(args.source, args.name, payload, status=args.status)
+            print(f"Archived {args.source}/{args.name}: {digest}", file=sys.stderr)
+
+        elif args.command == "list":
+            for entry in archive.entries(args.day):
+                print(
+                    f"{entry['fetched_at']}  {entry['source']}/{entry['name']}  "
+                    f"{entry['status']}  {entry['hash']}  {entry['size']} bytes"
+                )
+
+        elif args.command in ("show", "replay"):
+            if args.command == "show":
+                payload = archive.load(args.hash)
+            else:
+                payload = archive.latest(args.source, args.name, args.as_of)
+                if payload is None:
+                    print(f"Error: No archived {args.source}/{args.name} response", file=sys.stderr)
+                    sys.exit(1)
+            sys.stdout.buffer.write(payload)
+
+        elif args.command == "prune":
+            manifests, objects = archive.prune(args.keep_days)
+            print(f"Pruned {manifests} manifests and {objects} payloads", file=sys.stderr)
+
+    except (RawArchiveError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -342,15 +342,16 @@ def fetch_developer_stats(username: str) -> Dict[str, Any]:
     return stats
 
 
-def save_raw_data(output_dir: Path, data: Dict[str, Any], filename: str) -> None:
-    """Save raw API response data for debugging."""
-    raw_dir = output_dir / "raw"
-    raw_dir.mkdir(parents=True, exist_ok=True)
-    
-    raw_path = raw_dir / filename
-    with open(raw_path, "w") as f:
-        json.dump(data, f, indent=2)
-    print(f"Saved raw data: {raw_path}", file=sys.stderr)
+def archive_raw_data(data: Dict[str, Any], name: str) -> None:
+    """Archive raw API response data for debugging and offline replay."""
+    try:
+        sys.path.insert(0, str(Path(__file__).parent / "lib"))
+        from raw_archive import RawArchive  # type: ignore[import-not-found]
+        archive = RawArchive(Path(os.environ.get("RAW_ARCHIVE_DIR", "data/raw")))
+        digest = archive.store("developer", name, json.dumps(data, indent=2))
+        print(f"Archived raw data: developer/{name} ({digest})", file=sys.stderr)
+    except (ImportError, OSError) as e:
+        print(f"Warning: Could not archive raw data: {e}", file=sys.stderr)
 
 
 def main() -> None:
@@ -400,9 +401,8 @@ def main() -> None:
         logger.info(f"Total commits (30 days): {stats.get('commit_activity', {}).get('total_30_days', 'N/A')}")
     print(f"Developer stats saved to: {output_path}", file=sys.stderr)
     
-    # Also save a copy of the raw stats data
-    output_dir = output.parent
-    save_raw_data(output_dir, stats, "stats_raw.json")
+    # Also archive a copy of the raw stats data
+    archive_raw_data(stats, "stats")
     
     if logger:
         logger.log_workflow_end(0)
@@ -71,7 +71,10 @@ oura_api_request() {
     # Validate JSON response
     if ! validate_api_response "$response"; then
         echo "Error: Invalid JSON from Oura API endpoint: ${endpoint}" >&2
-        echo "$response" > "${OUTPUT_DIR}/debug_invalid_response_${endpoint}.txt"
+        # personal_info (email, age, sex) is never archived
+        if [ "$endpoint" != "personal_info" ]; then
+            echo "$response" | archive_raw_response "oura" "$endpoint" "invalid"
+        fi
         return 1
     fi
     
@@ -88,10 +91,7 @@ fetch_personal_info() {
         return 0
     }
     
-    # Save raw response for debugging
-    echo "$response" > "${OUTPUT_DIR}/raw_personal_info.json"
-    echo "Personal info JSON saved to raw_personal_info.json" >&2
-    
+    # Not archived: the response is personal data (email, age, sex)
     echo "$response"
 }
 
@@ -101,9 +101,8 @@ fetch_daily_sleep() {
     local response
     response=$(oura_api_request "daily_sleep" "start_date=${START_DATE}&end_date=${END_DATE}") || return 1
     
-    # Save raw response for debugging
-    echo "$response" > "${OUTPUT_DIR}/raw_sleep.json"
-    echo "Sleep JSON saved to raw_sleep.json" >&2
+    # Archive raw response for debugging and offline replay
+    echo "$response" | archive_raw_response "oura" "daily_sleep"
     
     # Check if data array is empty (use .data NOT .items)
     local item_count
@@ -124,9 +123,8 @@ fetch_daily_readiness() {
     local response
     response=$(oura_api_request "daily_readiness" "start_date=${START_DATE}&end_date=${END_DATE}") || return 1
     
-    # Save raw response for debugging
-    echo "$response" > "${OUTPUT_DIR}/raw_readiness.json"
-    echo "Readiness JSON saved to raw_readiness.json" >&2
+    # Archive raw response for debugging and offline replay
+    echo "$response" | archive_raw_response "oura" "daily_readiness"
     
     # Check if data array is empty (use .data NOT .items)
     local item_count
@@ -147,9 +145,8 @@ fetch_daily_activity() {
     local response
     response=$(oura_api_request "daily_activity" "start_date=${START_DATE}&end_date=${END_DATE}") || return 1
     
-    # Save raw response for debugging
-    echo "$response" > "${OUTPUT_DIR}/raw_activity.json"
-    echo "Activity JSON saved to raw_activity.json" >&2
+    # Archive raw response for debugging and offline replay
+    echo "$response" | archive_raw_response "oura" "daily_activity"
     
     # Check if data array is empty (use .data NOT .items)
     local item_count
@@ -175,9 +172,8 @@ fetch_heart_rate() {
         return 0
     }
     
-    # Save raw response for debugging
-    echo "$response" > "${OUTPUT_DIR}/raw_heart_rate.json"
-    echo "Heart rate JSON saved to raw_heart_rate.json" >&2
+    # Archive raw response for debugging and offline replay
+    echo "$response" | archive_raw_response "oura" "heart_rate"
     
     # Check if data array is empty (use .data NOT .items)
     local item_count
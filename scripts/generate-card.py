@@ -5,11 +5,11 @@
 """
 
 import sys
-import base64
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
+from lib.image_cache import get_optimized_image
 from lib.utils import (
     escape_xml,
     load_and_validate_json,
@@ -25,10 +25,10 @@
     format_time_since,
     format_large_number,
     format_duration_ms,
-    optimize_image_file,
     fallback_exists,
     log_fallback_used,
     handle_error_with_fallback,
+    write_svg_if_changed,
 )
 
 
@@ -47,21 +47,21 @@ def get_artwork_base64(artwork_path: str) -> str:
     The image is optimized for embedding by:
     - Reducing resolution to max 100x100 (artwork thumbnail size)
     - Compressing JPEG with quality setting from theme
+    - Re-encoding as WebP/AVIF when that is smaller (theme image_optimization)
+
+    The optimized data URI is cached by content, so unchanged artwork is not
+    re-optimized on the next run.
     """
     try:
         path = Path(artwork_path)
         if path.exists():
             # Optimize image before encoding (100x100 is the artwork display size)
-            optimized_data = optimize_image_file(
+            _, data_uri = get_optimized_image(
                 artwork_path,
                 max_width=100,
                 max_height=100,
             )
-            data = base64.b64encode(optimized_data).decode("utf-8")
-            # Determine MIME type
-            suffix = path.suffix.lower()
-            mime = "image/jpeg" if suffix in [".jpg", ".jpeg"] else "image/png"
-            return f"data:{mime};base64,{data}"
+            return data_uri
     except (OSError, IOError) as e:
         print(f"Warning: Could not load artwork: {e}", file=sys.stderr)
     return ""
@@ -185,7 +185,7 @@ def generate_svg(
   </g>
 
   <!-- Staleness Badge -->
-  {f'''<g transform="translate({card_width - 10}, 10)">
+  {f'''<g class="volatile" transform="translate({card_width - 10}, 10)">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size_xs}" fill="{text_muted}" text-anchor="end">Updated: {staleness_escaped}</text>
   </g>''' if staleness else ''}
 
@@ -287,10 +287,7 @@ def main() -> None:
 
     # Try to write output
     try:
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, "w") as f:
-            f.write(svg)
+        write_svg_if_changed(output_path, svg)
         print(f"Generated SVG card: {output_path}", file=sys.stderr)
     except (IOError, OSError) as e:
         if handle_error_with_fallback("soundcloud", f"Failed to write SVG: {e}", output_path, has_fallback):
@@ -15,7 +15,6 @@
 
 import sys
 import json
-from pathlib import Path
 from datetime import datetime, timezone
 from typing import Dict, Optional
 
@@ -31,7 +30,9 @@
     format_timestamp_local,
     format_large_number,
     try_load_json,
+    write_svg_if_changed,
 )
+from lib.svg_defs import DefsRegistry
 
 
 def load_developer_stats() -> Optional[Dict]:
@@ -296,16 +297,18 @@ def generate_consolidated_dashboard() -> str:
       </text>
     </g>"""
     
+    # Shared definitions, interned by content
+    defs = DefsRegistry()
+    bg_id = defs.linear_gradient(
+        [("0%", bg_gradient[0]), ("100%", bg_gradient[1])],
+        def_id="bg-gradient",
+    )
+    
     svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="{card_width}" height="{card_height}" viewBox="0 0 {card_width} {card_height}">
-  <defs>
-    <linearGradient id="bg-gradient" x1="0%" y1="0%" x2="100%" y2="100%">
-      <stop offset="0%" style="stop-color:{bg_gradient[0]}"/>
-      <stop offset="100%" style="stop-color:{bg_gradient[1]}"/>
-    </linearGradient>
-  </defs>
+{defs.render()}
 
   <!-- Background -->
-  <rect width="{card_width}" height="{card_height}" rx="{border_radius}" fill="url(#bg-gradient)"/>
+  <rect width="{card_width}" height="{card_height}" rx="{border_radius}" fill="url(#{bg_id})"/>
   <rect width="{card_width}" height="{card_height}" rx="{border_radius}" fill="none" stroke="{accent_teal}" stroke-width="{stroke_width}" stroke-opacity="{stroke_opacity}"/>
 
   <!-- Header -->
@@ -324,7 +327,7 @@ def generate_consolidated_dashboard() -> str:
   {placeholder_section}
 
   <!-- Footer -->
-  <g transform="translate(20, {card_height - 10})">
+  <g class="volatile" transform="translate(20, {card_height - 10})">
     <text font-family="{font_family}" font-size="9" fill="{text_muted}">
       Updated: {escape_xml(format_timestamp_local(datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")))}
     </text>
@@ -346,10 +349,8 @@ def main() -> None:
         # Generate the SVG
         svg_content = generate_consolidated_dashboard()
         
-        # Write to file
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(svg_content, encoding="utf-8")
+        # Write to file (skipped if only the timestamp changed)
+        write_svg_if_changed(output_path, svg_content)
         
         print(f"Generated consolidated dashboard: {output_path}", file=sys.stderr)
     except Exception as e:
@@ -37,6 +37,7 @@
     generate_card_with_fallback,
     generate_sparkline_path,
 )
+from lib.svg_defs import DefsRegistry
 
 
 def generate_metric_badge(
@@ -61,6 +62,22 @@ def generate_metric_badge(
     </g>"""
 
 
+def _format_coord(value: float) -> str:
+    """Format a coordinate with one decimal, dropping redundant zeros."""
+    text = f"{value:.1f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _commit_label(counts: List[int]) -> str:
+    """Tooltip text for the commit counts sharing one heatmap bucket."""
+    low, high = min(counts), max(counts)
+    if high == 0:
+        return "No commits"
+    if low == high:
+        return f"{low} commit{'s' if low != 1 else ''}"
+    return f"{low}–{high} commits"
+
+
 def generate_activity_heatmap(
     activity_grid: List[List[int]],
     x: int,
@@ -68,20 +85,59 @@ def generate_activity_heatmap(
     width: int,
     height: int,
     accent_color: str,
+    encoding: str = "use",
+    tooltips: bool = False,
+    defs: Optional[DefsRegistry] = None,
 ) -> str:
-    """Generate a 7×24 heatmap of commit activity."""
+    """
+    Generate a 7-row heatmap of commit activity (7×24 hours, or 7×N weeks).
+
+    Args:
+        activity_grid: Commit counts, one row per weekday.
+        x, y: Top-left corner of the heatmap.
+        width, height: Size of the heatmap.
+        accent_color: Cell fill color.
+        encoding: "use" defines the cell once and places it with <use>,
+                  grouping cells of equal opacity under one <g>; "rects"
+                  emits a complete <rect> per cell. Both render identically,
+                  "use" at about half the size.
+        tooltips: Add a <title> per opacity group ("use") or per cell
+                  ("rects") with the commit counts.
+        defs: Registry the shared cell is registered in ("use" only). The
+              caller renders it with the card's other definitions; without
+              one, the heatmap emits its own <defs> block.
+
+    Returns:
+        SVG markup for the heatmap cells.
+    """
     if not activity_grid or len(activity_grid) != 7:
         return ""
+    if encoding not in ("use", "rects"):
+        raise ValueError(f"Unknown heatmap encoding: {encoding}")
     
-    cell_width = width / 24
+    columns = max(len(row) for row in activity_grid) or 1
+    cell_width = width / columns
     cell_height = height / 7
     
     # Find max for normalization
-    max_commits = max(max(row) for row in activity_grid) if activity_grid else 1
+    max_commits = max(max(row, default=0) for row in activity_grid) if activity_grid else 1
     if max_commits == 0:
         max_commits = 1
     
     cells = []
+    standalone = defs is None
+    if encoding == "use":
+        if standalone:
+            defs = DefsRegistry()
+        # <use> places the shared cell at (x, y) and it inherits the group's fill
+        cell_id = defs.register(
+            "rect",
+            {"width": f"{cell_width - 1:.1f}", "height": f"{cell_height - 1:.1f}", "rx": 1},
+            def_id="heatmap-cell",
+        )
+    # Cells grouped by formatted opacity, in first-seen order:
+    # opacity -> ([<use> elements], [commit counts])
+    buckets: Dict[str, tuple] = {}
     for day_idx, day_row in enumerate(activity_grid):
         for hour_idx, count in enumerate(day_row):
             # Calculate opacity based on commit count
@@ -94,11 +150,33 @@ def generate_activity_heatmap(
             cx = x + hour_idx * cell_width
             cy = y + day_idx * cell_height
             
-            cells.append(
-                f'<rect x="{cx:.1f}" y="{cy:.1f}" width="{cell_width - 1:.1f}" '
-                f'height="{cell_height - 1:.1f}" rx="1" fill="{accent_color}" '
-                f'fill-opacity="{opacity:.2f}"/>'
-            )
+            if encoding == "rects":
+                rect = (
+                    f'<rect x="{cx:.1f}" y="{cy:.1f}" width="{cell_width - 1:.1f}" '
+                    f'height="{cell_height - 1:.1f}" rx="1" fill="{accent_color}" '
+                    f'fill-opacity="{opacity:.2f}"'
+                )
+                if tooltips:
+                    cells.append(f"{rect}><title>{_commit_label([count])}</title></rect>")
+                else:
+                    cells.append(f"{rect}/>")
+            else:
+                uses, counts = buckets.setdefault(f"{opacity:.2f}", ([], []))
+                uses.append(
+                    f'<use href="#{cell_id}" x="{_format_coord(cx)}" y="{_format_coord(cy)}"/>'
+                )
+                counts.append(count)
+    
+    if encoding == "rects":
+        return "\n".join(cells)
+    
+    if standalone:
+        cells.append(defs.render(indent=""))
+    for opacity, (uses, counts) in buckets.items():
+        title = f"<title>{_commit_label(counts)}</title>" if tooltips else ""
+        cells.append(
+            f'<g fill="{accent_color}" fill-opacity="{opacity}">{title}{"".join(uses)}</g>'
+        )
     
     return "\n".join(cells)
 
@@ -306,9 +384,22 @@ def generate_svg(stats: Dict) -> str:
         daily_commits, 25, 100, 350, 50, accent_commits, panel_bg
     )
     
+    # Shared definitions, interned by content
+    defs = DefsRegistry()
+    bg_id = defs.linear_gradient(
+        [("0%", bg_gradient[0]), ("100%", bg_gradient[1])],
+        def_id="bg-gradient",
+    )
+    defs.linear_gradient(
+        [("0%", accent_commits), ("100%", accent_teal)],
+        x2="100%", y2="0%",
+        def_id="commit-gradient",
+    )
+    defs.glow_filter(glow_std, def_id="glow")
+    
     # Generate activity heatmap
     heatmap = generate_activity_heatmap(
-        activity_grid, 400, 100, 375, 50, accent_commits
+        activity_grid, 400, 100, 375, 50, accent_commits, defs=defs
     )
     
     # Generate top repositories bar chart
@@ -349,33 +440,17 @@ def generate_svg(stats: Dict) -> str:
         time_since_escaped = escape_xml(time_since)
         staleness_badge = f'''
   <!-- Staleness Badge -->
-  <g transform="translate({card_width - 10}, 10)">
+  <g class="volatile" transform="translate({card_width - 10}, 10)">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size_xs}" fill="{badge_color}" text-anchor="end">
       {badge_icon}Updated: {time_since_escaped}
     </text>
   </g>'''
     
     svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="{card_width}" height="{card_height}" viewBox="0 0 {card_width} {card_height}">
-  <defs>
-    <linearGradient id="bg-gradient" x1="0%" y1="0%" x2="100%" y2="100%">
-      <stop offset="0%" style="stop-color:{bg_gradient[0]}"/>
-      <stop offset="100%" style="stop-color:{bg_gradient[1]}"/>
-    </linearGradient>
-    <linearGradient id="commit-gradient" x1="0%" y1="0%" x2="100%" y2="0%">
-      <stop offset="0%" style="stop-color:{accent_commits}"/>
-      <stop offset="100%" style="stop-color:{accent_teal}"/>
-    </linearGradient>
-    <filter id="glow" x="-20%" y="-20%" width="140%" height="140%">
-      <feGaussianBlur stdDeviation="{glow_std}" result="coloredBlur"/>
-      <feMerge>
-        <feMergeNode in="coloredBlur"/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>
-  </defs>
+{defs.render()}
 
   <!-- Background -->
-  <rect width="{card_width}" height="{card_height}" rx="{border_radius}" fill="url(#bg-gradient)"/>
+  <rect width="{card_width}" height="{card_height}" rx="{border_radius}" fill="url(#{bg_id})"/>
   <rect width="{card_width}" height="{card_height}" rx="{border_radius}" fill="none" stroke="{accent_teal}" stroke-width="{stroke_width}" stroke-opacity="{stroke_opacity}"/>
 
   <!-- Header -->
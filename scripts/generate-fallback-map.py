@@ -4,101 +4,203 @@
 Creates a simple PNG with location coordinates.
 """
 
+import io
+import os
+import shutil
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Union
 from PIL import Image, ImageDraw, ImageFont
 
 
-def generate_fallback_map(output_path: str, lat: float, lon: float) -> None:
+# Everything except the coordinate line is the same for every location, so
+# the base image is rendered once and reused; finished maps are cached by
+# their (rounded) coordinates.
+CACHE_DIR = Path(".cache") / "fallback-maps"
+
+# Bump when the design changes to invalidate cached images
+RENDER_VERSION = 1
+
+WIDTH, HEIGHT = 600, 400
+GRADIENT_TOP = (26, 26, 46)       # #1a1a2e
+GRADIENT_BOTTOM = (22, 33, 62)    # #16213e
+GRID_COLOR = (15, 52, 96)         # #0f3460
+GRID_SPACING = 40
+COORD_COLOR = '#64748b'
+COORD_POSITION = (WIDTH // 2, 240)
+
+FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+
+@lru_cache(maxsize=None)
+def _load_font(path: str, size: int) -> ImageFont.ImageFont:
+    """Load a TrueType font once, falling back to Pillow's default font."""
+    try:
+        return ImageFont.truetype(path, size)  # type: ignore[return-value]
+    except IOError:
+        return ImageFont.load_default()
+
+
+def format_coordinates(lat: float, lon: float) -> str:
+    """Format coordinates as shown on the map (e.g., "40.7128°N, 74.0060°W")."""
+    lat_dir = "N" if lat >= 0 else "S"
+    lon_dir = "E" if lon >= 0 else "W"
+    return f"{abs(lat):.4f}°{lat_dir}, {abs(lon):.4f}°{lon_dir}"
+
+
+def _gradient_background() -> Image.Image:
+    """Build the vertical background gradient with a single composite."""
+    # 256-step vertical ramp stretched to the image height
+    mask = Image.linear_gradient("L").resize((WIDTH, HEIGHT))
+    top = Image.new("RGB", (WIDTH, HEIGHT), GRADIENT_TOP)
+    bottom = Image.new("RGB", (WIDTH, HEIGHT), GRADIENT_BOTTOM)
+    return Image.composite(bottom, top, mask)
+
+
+def render_base_image() -> Image.Image:
     """
-    Generate a fallback map image as PNG.
-    
-    Args:
-        output_path: Path where the PNG should be saved
-        lat: Latitude coordinate
-        lon: Longitude coordinate
+    Render the coordinate-independent part of the fallback map.
+
+    Returns:
+        RGB image with background, grid, messages and corner accents.
     """
-    # Create image with dark gradient background
-    width, height = 600, 400
-    img = Image.new('RGB', (width, height), color='#16213e')
+    img = _gradient_background()
     draw = ImageDraw.Draw(img)
-    
-    # Draw gradient effect (simple approximation)
-    for i in range(height):
-        # Interpolate between two colors
-        ratio = i / height
-        r = int(26 * (1 - ratio) + 22 * ratio)
-        g = int(26 * (1 - ratio) + 33 * ratio)
-        b = int(46 * (1 - ratio) + 62 * ratio)
-        color = (r, g, b)
-        draw.rectangle([(0, i), (width, i + 1)], fill=color)
-    
+
     # Draw grid pattern
-    grid_color = (15, 52, 96)  # #0f3460
-    for x in range(0, width, 40):
-        draw.line([(x, 0), (x, height)], fill=grid_color, width=1)
-    for y in range(0, height, 40):
-        draw.line([(0, y), (width, y)], fill=grid_color, width=1)
-    
-    # Try to use a nice font, fall back to default if not available
-    try:
-        title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 32)
-        text_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 20)
-        small_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-        coord_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)
-    except IOError:
-        # Use default font if custom fonts not available
-        title_font = ImageFont.load_default()  # type: ignore[assignment]
-        text_font = ImageFont.load_default()  # type: ignore[assignment]
-        small_font = ImageFont.load_default()  # type: ignore[assignment]
-        coord_font = ImageFont.load_default()  # type: ignore[assignment]
-    
+    for x in range(0, WIDTH, GRID_SPACING):
+        draw.line([(x, 0), (x, HEIGHT)], fill=GRID_COLOR, width=1)
+    for y in range(0, HEIGHT, GRID_SPACING):
+        draw.line([(0, y), (WIDTH, y)], fill=GRID_COLOR, width=1)
+
     # Draw emoji/icon (simplified as text)
-    icon_text = "📍"
-    # For emoji, we need to use default font
-    draw.text((width // 2, 120), icon_text, fill='#e94560', anchor='mm', font=title_font)
-    
+    draw.text((WIDTH // 2, 120), "📍", fill='#e94560', anchor='mm', font=_load_font(FONT_BOLD, 32))
+
     # Draw main text
-    main_text = "Map Temporarily Unavailable"
-    draw.text((width // 2, 175), main_text, fill='#ffffff', anchor='mm', font=text_font)
-    
+    draw.text((WIDTH // 2, 175), "Map Temporarily Unavailable", fill='#ffffff', anchor='mm',
+              font=_load_font(FONT_REGULAR, 20))
+
     # Draw subtitle
-    subtitle = "Location data is still available"
-    draw.text((width // 2, 210), subtitle, fill='#94a3b8', anchor='mm', font=small_font)
-    
-    # Draw coordinates
-    lat_dir = "N" if lat >= 0 else "S"
-    lon_dir = "E" if lon >= 0 else "W"
-    coords_text = f"{abs(lat):.4f}°{lat_dir}, {abs(lon):.4f}°{lon_dir}"
-    draw.text((width // 2, 240), coords_text, fill='#64748b', anchor='mm', font=coord_font)
-    
+    draw.text((WIDTH // 2, 210), "Location data is still available", fill='#94a3b8', anchor='mm',
+              font=_load_font(FONT_REGULAR, 16))
+
     # Draw corner accents
     accent_color = '#e94560'
     accent_length = 40
     accent_width = 4
-    
-    # Top-left
-    draw.rectangle([(10, 10), (10 + accent_length, 10 + accent_width)], fill=accent_color)
-    draw.rectangle([(10, 10), (10 + accent_width, 10 + accent_length)], fill=accent_color)
-    
-    # Top-right
-    draw.rectangle([(width - 10 - accent_length, 10), (width - 10, 10 + accent_width)], fill=accent_color)
-    draw.rectangle([(width - 10 - accent_width, 10), (width - 10, 10 + accent_length)], fill=accent_color)
-    
-    # Bottom-left
-    draw.rectangle([(10, height - 10 - accent_width), (10 + accent_length, height - 10)], fill=accent_color)
-    draw.rectangle([(10, height - 10 - accent_length), (10 + accent_width, height - 10)], fill=accent_color)
-    
-    # Bottom-right
-    draw.rectangle([(width - 10 - accent_length, height - 10 - accent_width), (width - 10, height - 10)], fill=accent_color)
-    draw.rectangle([(width - 10 - accent_width, height - 10 - accent_length), (width - 10, height - 10)], fill=accent_color)
-    
-    # Save the image
+    for x, y, dx, dy in (
+        (10, 10, 1, 1),                             # Top-left
+        (WIDTH - 10, 10, -1, 1),                    # Top-right
+        (10, HEIGHT - 10, 1, -1),                   # Bottom-left
+        (WIDTH - 10, HEIGHT - 10, -1, -1),          # Bottom-right
+    ):
+        for length_x, length_y in ((accent_length, accent_width), (accent_width, accent_length)):
+            x2, y2 = x + dx * length_x, y + dy * length_y
+            draw.rectangle([(min(x, x2), min(y, y2)), (max(x, x2), max(y, y2))], fill=accent_color)
+
+    return img
+
+
+def _encode_png(img: Image.Image) -> bytes:
+    """Encode an image as PNG bytes."""
+    output = io.BytesIO()
+    img.save(output, 'PNG')
+    return output.getvalue()
+
+
+def _write_atomic(payload: bytes, path: Path) -> None:
+    """Write a cache file so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=1)
+def get_base_image(cache_dir: Path = CACHE_DIR) -> Image.Image:
+    """
+    Get the coordinate-independent base image, rendering it at most once.
+
+    Args:
+        cache_dir: Directory holding the cached base image.
+
+    Returns:
+        Base image. Callers must copy it before drawing on it.
+    """
+    base_path = cache_dir / f"base-v{RENDER_VERSION}.png"
+    try:
+        with Image.open(base_path) as cached:
+            return cached.convert("RGB")
+    except (OSError, ValueError):
+        pass
+
+    img = render_base_image()
+    try:
+        _write_atomic(_encode_png(img), base_path)
+    except OSError as e:
+        print(f"⚠️  Could not cache fallback map base image: {e}", file=sys.stderr)
+    return img
+
+
+def render_fallback_map(lat: float, lon: float, cache_dir: Path = CACHE_DIR) -> Image.Image:
+    """
+    Render a fallback map by compositing the coordinates onto the base image.
+
+    Args:
+        lat: Latitude coordinate
+        lon: Longitude coordinate
+        cache_dir: Directory holding the cached base image.
+
+    Returns:
+        Finished 600x400 RGB image.
+    """
+    img = get_base_image(cache_dir).copy()
+    draw = ImageDraw.Draw(img)
+    draw.text(COORD_POSITION, format_coordinates(lat, lon), fill=COORD_COLOR, anchor='mm',
+              font=_load_font(FONT_REGULAR, 14))
+    return img
+
+
+def generate_fallback_map(
+    output_path: str,
+    lat: float,
+    lon: float,
+    cache_dir: Union[str, Path] = CACHE_DIR,
+) -> None:
+    """
+    Generate a fallback map image as PNG.
+
+    Maps are cached by coordinates rounded to the displayed precision, so a
+    repeated outage at the same location only copies a file.
+
+    Args:
+        output_path: Path where the PNG should be saved
+        lat: Latitude coordinate
+        lon: Longitude coordinate
+        cache_dir: Directory for cached base and finished images
+    """
+    cache_dir = Path(cache_dir)
     output = Path(output_path)
     output.parent.mkdir(parents=True, exist_ok=True)
-    img.save(output, 'PNG')
-    
+
+    cached_map = cache_dir / f"map-v{RENDER_VERSION}_{lat:.4f}_{lon:.4f}.png"
+    if cached_map.is_file():
+        shutil.copyfile(cached_map, output)
+        print(f"✅ Fallback map image saved to {output_path} (cached)", file=sys.stderr)
+        return
+
+    # Encode once; the same bytes go to the output and the cache
+    payload = _encode_png(render_fallback_map(lat, lon, cache_dir))
+
+    # Save the image
+    output.write_bytes(payload)
+    try:
+        _write_atomic(payload, cached_map)
+    except OSError as e:
+        print(f"⚠️  Could not cache fallback map: {e}", file=sys.stderr)
+
     print(f"✅ Fallback map image saved to {output_path}", file=sys.stderr)
 
 
@@ -216,7 +216,7 @@ def generate_svg(snapshot: dict) -> str:
         time_since_escaped = escape_xml(time_since)
         staleness_badge = f'''
   <!-- Staleness Badge -->
-  <g transform="translate({card_width - 10}, 10)">
+  <g class="volatile" transform="translate({card_width - 10}, 10)">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size_xs}" fill="{badge_color}" text-anchor="end">
       {badge_icon}Updated: {time_since_escaped}
     </text>
@@ -5,11 +5,11 @@
 with the static map image embedded.
 """
 
-import base64
 import sys
 from pathlib import Path
 from typing import Dict, Any
 
+from lib.image_cache import get_optimized_image
 from lib.utils import (
     escape_xml,
     load_json,
@@ -24,19 +24,23 @@
     format_timestamp_local,
     format_time_since,
     is_data_stale,
-    optimize_image_file,
     fallback_exists,
     log_fallback_used,
     handle_error_with_fallback,
+    write_svg_if_changed,
 )
 
 
-def encode_image_base64(image_path: str) -> str:
-    """Encode and optimize an image file to base64 for embedding in SVG.
+def encode_image_data_uri(image_path: str) -> str:
+    """Encode and optimize an image file to a base64 data URI for embedding in SVG.
     
     The image is optimized by:
     - Reducing resolution to fit the map display area
     - Compressing PNG with color quantization from theme settings
+    - Re-encoding as WebP/AVIF when that is smaller (theme image_optimization)
+
+    The optimized payload is cached by content, so an unchanged map is not
+    re-optimized on the next run.
     """
     # Get theme settings for map dimensions
     theme = load_theme()
@@ -46,13 +50,13 @@ def encode_image_base64(image_path: str) -> str:
     map_width = card_width - (map_margin * 2)  # Match the SVG map width
     map_height = map_config.get("height", 350)  # Match the SVG map height
     
-    # Optimize the image before encoding
-    optimized_data = optimize_image_file(
+    # Optimize the image before encoding (cached by content and settings)
+    _, data_uri = get_optimized_image(
         image_path,
         max_width=map_width,
         max_height=map_height,
     )
-    return base64.b64encode(optimized_data).decode("utf-8")
+    return data_uri
 
 
 def generate_svg(
@@ -60,7 +64,7 @@ def generate_svg(
     display_name: str,
     lat: float,
     lon: float,
-    map_image_base64: str,
+    map_image_data_uri: str,
     updated_at: str,
 ) -> str:
     """
@@ -71,7 +75,7 @@ def generate_svg(
         display_name: Full human-readable location name.
         lat: Latitude coordinate.
         lon: Longitude coordinate.
-        map_image_base64: Base64-encoded map image.
+        map_image_data_uri: Map image as a base64 data URI (PNG, WebP or AVIF).
         updated_at: ISO 8601 timestamp when card was generated.
     
     Returns:
@@ -149,7 +153,7 @@ def generate_svg(
         time_since_escaped = escape_xml(time_since)
         staleness_badge = f'''
   <!-- Staleness Badge -->
-  <g transform="translate({card_width - 10}, 10)">
+  <g class="volatile" transform="translate({card_width - 10}, 10)">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size_xs}" fill="{badge_color}" text-anchor="end">
       {badge_icon}Updated: {time_since_escaped}
     </text>
@@ -194,7 +198,7 @@ def generate_svg(
   <!-- Map image -->
   <g clip-path="url(#map-clip)">
     <image x="{map_margin}" y="70" width="{map_width}" height="{map_height}" preserveAspectRatio="xMidYMid slice"
-           xlink:href="data:image/png;base64,{map_image_base64}"/>
+           xlink:href="{map_image_data_uri}"/>
   </g>
 
   <!-- Map border -->
@@ -275,7 +279,7 @@ def main() -> None:
 
     # Try to read and encode map image
     try:
-        map_image_base64 = encode_image_base64(map_path)
+        map_image_data_uri = encode_image_data_uri(map_path)
     except FileNotFoundError:
         error_msg = f"Map image not found: {map_path}"
         print(f"❌ FAILURE: {error_msg}", file=sys.stderr)
@@ -305,11 +309,11 @@ def main() -> None:
     # Validate map image base64 is not empty
     # Base64 encoding of even a minimal 1x1 PNG is ~100 chars, so this is a reasonable sanity check
     MIN_BASE64_LENGTH = 100
-    if not map_image_base64 or len(map_image_base64) < MIN_BASE64_LENGTH:
+    if not map_image_data_uri or len(map_image_data_uri) < MIN_BASE64_LENGTH:
         error_msg = "Map image encoding produced empty or invalid result"
         print(f"❌ FAILURE: {error_msg}", file=sys.stderr)
         print(f"   → The map file may be empty or corrupted", file=sys.stderr)
-        print(f"   → Encoded length: {len(map_image_base64) if map_image_base64 else 0} (minimum: {MIN_BASE64_LENGTH})", file=sys.stderr)
+        print(f"   → Encoded length: {len(map_image_data_uri) if map_image_data_uri else 0} (minimum: {MIN_BASE64_LENGTH})", file=sys.stderr)
         if handle_error_with_fallback("location", error_msg, output_path, has_fallback):
             print(f"   → Using fallback location SVG card: {output_path}", file=sys.stderr)
             return
@@ -325,7 +329,7 @@ def main() -> None:
             display_name=metadata.get("display_name", ""),
             lat=coordinates.get("lat", 0),
             lon=coordinates.get("lon", 0),
-            map_image_base64=map_image_base64,
+            map_image_data_uri=map_image_data_uri,
             updated_at=updated_at_raw,
         )
     except Exception as e:
@@ -348,7 +352,7 @@ def main() -> None:
         sys.exit(1)
 
     # Validate SVG contains the embedded image
-    if "data:image/png;base64," not in svg:
+    if ";base64," not in svg:
         error_msg = "SVG does not contain embedded map image"
         print(f"❌ FAILURE: {error_msg}", file=sys.stderr)
         print(f"   → The map image failed to embed in the SVG", file=sys.stderr)
@@ -359,13 +363,10 @@ def main() -> None:
 
     # Try to write output
     try:
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, "w") as f:
-            f.write(svg)
+        write_svg_if_changed(output_path, svg)
         print(f"✅ Generated location SVG card: {output_path}", file=sys.stderr)
         print(f"   → Card size: {len(svg)} characters", file=sys.stderr)
-        print(f"   → Base64 image size: {len(map_image_base64)} characters", file=sys.stderr)
+        print(f"   → Base64 image size: {len(map_image_data_uri)} characters", file=sys.stderr)
     except (IOError, OSError) as e:
         error_msg = f"Failed to write SVG: {e}"
         print(f"❌ FAILURE: {error_msg}", file=sys.stderr)
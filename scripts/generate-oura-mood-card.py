@@ -7,7 +7,6 @@
 
 import json
 import sys
-from pathlib import Path
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
@@ -35,6 +34,7 @@
     fallback_exists,
     log_fallback_used,
     handle_error_with_fallback,
+    write_svg_if_changed,
 )
 
 
@@ -214,7 +214,7 @@ def generate_svg(mood: dict, metrics: dict) -> str:
         time_since_escaped = escape_xml(time_since)
         staleness_badge = f'''
   <!-- Staleness Badge -->
-  <g transform="translate({card_width - 10}, 10)">
+  <g class="volatile" transform="translate({card_width - 10}, 10)">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size_xs}" fill="{badge_color}" text-anchor="end">
       {badge_icon}Updated: {time_since_escaped}
     </text>
@@ -381,10 +381,7 @@ def main() -> None:
 
     # Try to write output
     try:
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, "w") as f:
-            f.write(svg)
+        write_svg_if_changed(output_path, svg)
         print(f"Generated Oura mood dashboard SVG: {output_path}", file=sys.stderr)
     except (IOError, OSError) as e:
         if handle_error_with_fallback("mood", f"Failed to write SVG: {e}", output_path, has_fallback):
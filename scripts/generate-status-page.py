@@ -25,7 +25,8 @@
     get_theme_font_size,
     get_theme_spacing,
     get_theme_status_color,
-    load_theme
+    load_theme,
+    write_svg_if_changed,
 )
 
 
@@ -128,10 +129,12 @@ def generate_status_page_svg(output_path: str = "data/status/status-page.svg") -
           font-size="{font_size_lg + 4}" fill="{text_color}" class="title">
         System Status
     </text>
-    <text x="{card_padding}" y="{card_padding + 45}" 
-          font-size="{font_size_sm}" fill="{text_secondary}" class="value">
-        Last updated: {datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")}
-    </text>
+    <g class="volatile">
+        <text x="{card_padding}" y="{card_padding + 45}" 
+              font-size="{font_size_sm}" fill="{text_secondary}" class="value">
+            Last updated: {datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")}
+        </text>
+    </g>
     
     <!-- Column headers -->
     <text x="{card_padding + 30}" y="{header_height + 10}" 
@@ -256,9 +259,7 @@ def generate_status_page_svg(output_path: str = "data/status/status-page.svg") -
     
     # Write to file
     svg = '\n'.join(svg_parts)
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write(svg)
+    write_svg_if_changed(output_path, svg)
     
     print(f"Status page generated: {output_path}")
 
@@ -12,8 +12,8 @@
 import sys
 import json
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Dict, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
 
 from lib.utils import (
     escape_xml,
@@ -27,27 +27,85 @@
     format_timestamp_local,
     format_large_number,
     try_load_json,
+    write_svg_if_changed,
 )
+from lib.snapshot_index import SnapshotIndex
 
 
 def load_latest_snapshot(period: str, snapshots_dir: str = "data/snapshots") -> Optional[Dict]:
-    """Load the latest weekly or monthly snapshot."""
-    now = datetime.now(timezone.utc)
-    snapshots_path = Path(snapshots_dir)
+    """Load the latest weekly or monthly snapshot, as listed in the snapshot index."""
+    if period not in ("weekly", "monthly"):
+        return None
     
-    if period == "weekly":
-        year, week, _ = now.isocalendar()
-        snapshot_file = snapshots_path / "weekly" / f"{year}-W{week:02d}.json"
-    elif period == "monthly":
-        snapshot_file = snapshots_path / "monthly" / f"{now.strftime('%Y-%m')}.json"
-    else:
+    index = SnapshotIndex.load(Path(snapshots_dir))
+    latest = index.latest(period)
+    if latest is None:
         return None
     
-    if snapshot_file.exists():
-        data, error = try_load_json(str(snapshot_file))
-        return data
+    name, entry = latest
+    data, error = try_load_json(str(index.path(entry)))
+    return data
+
+
+def describe_period(snapshot: Dict, period: str, today: Optional[date] = None) -> Tuple[str, str]:
+    """
+    Build the card title and subtitle for a summary.
+    
+    The latest stored summary is not necessarily the current week or month,
+    so the title names the period the summary covers, and the subtitle says
+    when no data has been stored since it ended.
+    
+    Args:
+        snapshot: Weekly or monthly summary.
+        period: "weekly" or "monthly".
+        today: Reference date (default: today, UTC).
     
-    return None
+    Returns:
+        Tuple of (title, subtitle).
+    """
+    start_date = snapshot.get("start_date", "")
+    end_date = snapshot.get("end_date", "")
+    days_count = snapshot.get("days_count", 0)
+    title = f"{period.capitalize()} Summary"
+    subtitle = f"{start_date} to {end_date} ({days_count} days)"
+    try:
+        first = date.fromisoformat(start_date)
+    except ValueError:
+        return title, subtitle
+    
+    if period == "weekly":
+        period_start = first - timedelta(days=first.weekday())
+        period_end = period_start + timedelta(days=6)
+        title += f" · {period_start:%b} {period_start.day}–{period_end:%b} {period_end.day}, {period_end.year}"
+    else:
+        period_start = first.replace(day=1)
+        period_end = (period_start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        title += f" · {period_start:%B %Y}"
+    
+    today = today or datetime.now(timezone.utc).date()
+    if period_end < today:
+        subtitle += f" · ⚠️ No newer data since {end_date}"
+    return title, subtitle
+
+
+def load_analytics(snapshots_dir: str = "data/snapshots") -> Optional[Dict]:
+    """Load the snapshot analytics written by store-historical-snapshot.py."""
+    analytics_file = Path(snapshots_dir) / "analytics.json"
+    if not analytics_file.exists():
+        return None
+    data, error = try_load_json(str(analytics_file))
+    return data
+
+
+def format_trend(label: str, metric: Optional[Dict]) -> str:
+    """Format a metric's weekly trend as e.g. 'Sleep ↑ +1.2/wk'."""
+    slope = (metric or {}).get("trend_per_week")
+    if slope is None:
+        return f"{label} —"
+    arrow = "↑" if slope > 0 else "↓" if slope < 0 else "→"
+    magnitude = format_large_number(round(abs(slope))) if abs(slope) >= 1000 else f"{abs(slope):.1f}"
+    sign = "+" if slope > 0 else "−" if slope < 0 else ""
+    return f"{label} {arrow} {sign}{magnitude}/wk"
 
 
 def generate_metric_row_summary(label: str, value: str, x: int, y: int) -> str:
@@ -71,7 +129,7 @@ def generate_metric_row_summary(label: str, value: str, x: int, y: int) -> str:
     </g>"""
 
 
-def generate_summary_svg(snapshot: Dict, period: str) -> str:
+def generate_summary_svg(snapshot: Dict, period: str, analytics: Optional[Dict] = None) -> str:
     """Generate SVG for weekly or monthly summary card."""
     
     # Load theme values
@@ -103,11 +161,9 @@ def generate_summary_svg(snapshot: Dict, period: str) -> str:
     developer = snapshot.get("developer", {})
     start_date = snapshot.get("start_date", "")
     end_date = snapshot.get("end_date", "")
-    days_count = snapshot.get("days_count", 0)
     
     # Format period title
-    period_title = f"{period.capitalize()} Summary"
-    period_subtitle = f"{start_date} to {end_date} ({days_count} days)"
+    period_title, period_subtitle = describe_period(snapshot, period)
     
     # Health metrics
     avg_sleep = health.get("avg_sleep_score")
@@ -162,6 +218,30 @@ def generate_summary_svg(snapshot: Dict, period: str) -> str:
       </text>
     </g>"""
     
+    # Trends for weekly (monthly uses the panel for the sleep range)
+    elif analytics:
+        trend_metrics = analytics.get("metrics", {})
+        trends = "  •  ".join(
+            format_trend(label, trend_metrics.get(name))
+            for label, name in (("Sleep", "sleep"), ("Readiness", "readiness"), ("Steps", "steps"))
+        )
+        anomalies = sum(
+            1 for metric in trend_metrics.values()
+            for anomaly in metric.get("anomalies", [])
+            if start_date <= anomaly.get("date", "") <= end_date
+        )
+        anomaly_note = f"  •  ⚠️ {anomalies} unusual reading{'s' if anomalies != 1 else ''}" if anomalies else ""
+        extra_stats = f"""
+    <g transform="translate(30, 310)">
+      <rect width="420" height="60" rx="{border_radius_md}" fill="{panel_bg}" stroke="{accent_teal}" stroke-width="1" stroke-opacity="0.2"/>
+      <text x="10" y="20" font-family="{font_family}" font-size="11" fill="{accent_teal}" font-weight="600">
+        📈 30-Day Trends{escape_xml(anomaly_note)}
+      </text>
+      <text x="10" y="40" font-family="{font_family}" font-size="10" fill="{text_secondary}">
+        {escape_xml(trends)}
+      </text>
+    </g>"""
+    
     svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="{card_width}" height="{card_height}" viewBox="0 0 {card_width} {card_height}">
   <defs>
     <linearGradient id="bg-gradient" x1="0%" y1="0%" x2="100%" y2="100%">
@@ -198,7 +278,7 @@ def generate_summary_svg(snapshot: Dict, period: str) -> str:
   {extra_stats}
 
   <!-- Footer -->
-  <g transform="translate(30, {card_height - 15})">
+  <g class="volatile" transform="translate(30, {card_height - 15})">
     <text font-family="{font_family}" font-size="9" fill="{text_muted}">
       Generated: {escape_xml(format_timestamp_local(datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")))}
     </text>
@@ -236,12 +316,10 @@ def main() -> None:
             sys.exit(1)
         
         # Generate SVG
-        svg_content = generate_summary_svg(snapshot, args.period)
+        svg_content = generate_summary_svg(snapshot, args.period, load_analytics(args.snapshots_dir))
         
-        # Write to file
-        output_file = Path(args.output)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(svg_content, encoding="utf-8")
+        # Write to file (skipped if only the timestamp changed)
+        write_svg_if_changed(args.output, svg_content)
         
         print(f"Generated {args.period} summary card: {args.output}", file=sys.stderr)
     except Exception as e:
@@ -12,7 +12,6 @@
 import sys
 import os
 import json
-from pathlib import Path
 from datetime import datetime, timezone
 from typing import Dict, Optional
 
@@ -31,6 +30,7 @@
     format_timestamp_local,
     format_large_number,
     try_load_json,
+    write_svg_if_changed,
 )
 
 
@@ -327,7 +327,7 @@ def generate_themed_dashboard(theme_name: str = "dark") -> str:
   {theme_indicator}
 
   <!-- Footer -->
-  <g transform="translate(20, {card_height - 10})">
+  <g class="volatile" transform="translate(20, {card_height - 10})">
     <text font-family="{font_family}" font-size="9" fill="{text_muted}">
       Updated: {escape_xml(format_timestamp_local(datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")))}
     </text>
@@ -355,10 +355,8 @@ def main() -> None:
         # Generate the SVG
         svg_content = generate_themed_dashboard(args.theme)
         
-        # Write to file
-        output_file = Path(args.output)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(svg_content, encoding="utf-8")
+        # Write to file (skipped if only the timestamp changed)
+        write_svg_if_changed(args.output, svg_content)
         
         print(f"Generated {args.theme} themed dashboard: {args.output}", file=sys.stderr)
     except Exception as e:
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 """
 Incremental SVG generation wrapper with change detection.
-This script checks if source data has changed before regenerating SVGs,
-significantly reducing unnecessary processing.
+This script checks if any input of a card has changed before regenerating
+its SVG, significantly reducing unnecessary processing.
+
+A card's inputs are its data file, any extra arguments that name existing
+files (e.g. artwork or map images), files declared with --depends-on=PATH,
+the shared theme and timezone configuration, and the generator script
+together with every lib module it imports.
 """
 
 import sys
@@ -10,13 +15,51 @@
 from pathlib import Path
 from typing import List, Optional
 
-from lib.change_detection import should_regenerate_svg, update_hash_cache
+from lib.change_detection import (
+    find_changed_inputs,
+    find_module_dependencies,
+    should_regenerate_svg,
+    update_inputs_cache,
+)
 
 
 # Define cache location
 CACHE_DIR = Path(".cache")
 HASH_CACHE_FILE = CACHE_DIR / "svg_hashes.json"
 
+# Configuration every card reads through lib.utils
+SHARED_INPUTS = [Path("config/theme.json"), Path("data/timezone.json")]
+
+
+def collect_card_inputs(
+    data_path: str,
+    generator_script: str,
+    extra_args: Optional[List[str]] = None,
+    depends_on: Optional[List[str]] = None
+) -> List[Path]:
+    """
+    Collect every input a card depends on.
+    
+    Args:
+        data_path: Path to source data file
+        generator_script: Path to the generator script
+        extra_args: Generator arguments; those naming existing files are inputs
+        depends_on: Additional files declared with --depends-on
+        
+    Returns:
+        De-duplicated list of input paths
+    """
+    inputs = [Path(data_path)]
+    inputs.extend(Path(arg) for arg in (extra_args or []) if Path(arg).is_file())
+    inputs.extend(Path(path) for path in (depends_on or []))
+    inputs.extend(SHARED_INPUTS)
+    inputs.extend(find_module_dependencies(Path(generator_script)))
+    
+    unique: dict = {}
+    for path in inputs:
+        unique.setdefault(path.resolve(), path)
+    return list(unique.values())
+
 
 def generate_with_change_detection(
     data_path: str,
@@ -24,10 +67,11 @@ def generate_with_change_detection(
     generator_script: str,
     cache_key: str,
     extra_args: Optional[List[str]] = None,
-    force: bool = False
+    force: bool = False,
+    depends_on: Optional[List[str]] = None
 ) -> bool:
     """
-    Generate SVG only if data has changed.
+    Generate SVG only if one of its inputs has changed.
     
     Args:
         data_path: Path to source data file
@@ -35,10 +79,11 @@ def generate_with_change_detection(
         generator_script: Path to the generator script (must be in scripts/ directory)
         cache_key: Unique key for this generation task
         extra_args: Additional arguments for the generator
-        force: Force regeneration even if data unchanged
+        force: Force regeneration even if inputs unchanged
+        depends_on: Additional input files not passed to the generator
         
     Returns:
-        True if SVG was regenerated, False if skipped
+        True if SVG is up to date (regenerated or skipped), False on failure
     """
     data_file = Path(data_path)
     svg_file = Path(svg_path)
@@ -53,12 +98,21 @@ def generate_with_change_detection(
         print(f"❌ Error: Generator script must be in scripts/ directory: {generator_script}", file=sys.stderr)
         return False
     
+    inputs = collect_card_inputs(data_path, generator_script, extra_args, depends_on)
+    
     # Check if we should regenerate
-    if not should_regenerate_svg(data_file, svg_file, HASH_CACHE_FILE, cache_key, force):
-        print(f"⏭️  Skipping {svg_file.name} - data unchanged")
-        return False
+    if not should_regenerate_svg(
+        data_file, svg_file, HASH_CACHE_FILE, cache_key, force, extra_inputs=inputs[1:]
+    ):
+        print(f"⏭️  Skipping {svg_file.name} - inputs unchanged")
+        return True
     
-    print(f"🔄 Generating {svg_file.name} - data changed or new")
+    changed = [] if force else find_changed_inputs(inputs, HASH_CACHE_FILE, cache_key)
+    if changed and len(changed) < len(inputs):
+        names = ", ".join(str(path) for path in changed)
+        print(f"🔄 Generating {svg_file.name} - changed: {names}")
+    else:
+        print(f"🔄 Generating {svg_file.name} - inputs changed or new")
     
     # Build command
     cmd = ["python", generator_script, data_path, svg_path]
@@ -72,7 +126,7 @@ def generate_with_change_detection(
             print(result.stdout)
         
         # Update hash cache on success
-        update_hash_cache(data_file, HASH_CACHE_FILE, cache_key)
+        update_inputs_cache(inputs, HASH_CACHE_FILE, cache_key)
         print(f"✅ Generated {svg_file.name}")
         return True
         
@@ -86,7 +140,10 @@ def generate_with_change_detection(
 def main() -> None:
     """Main entry point for CLI usage."""
     if len(sys.argv) < 5:
-        print("Usage: incremental-generate.py <data_path> <svg_path> <generator_script> <cache_key> [extra_args...]")
+        print(
+            "Usage: incremental-generate.py <data_path> <svg_path> <generator_script> <cache_key> "
+            "[--depends-on=PATH ...] [--force] [extra_args...]"
+        )
         sys.exit(1)
     
     data_path = sys.argv[1]
@@ -100,8 +157,12 @@ def main() -> None:
     if force:
         extra_args.remove("--force")
     
+    # Collect declared dependencies that are not generator arguments
+    depends_on = [arg.split("=", 1)[1] for arg in extra_args if arg.startswith("--depends-on=")]
+    extra_args = [arg for arg in extra_args if not arg.startswith("--depends-on=")]
+    
     success = generate_with_change_detection(
-        data_path, svg_path, generator_script, cache_key, extra_args, force
+        data_path, svg_path, generator_script, cache_key, extra_args, force, depends_on
     )
     
     sys.exit(0 if success else 1)
@@ -8,7 +8,6 @@
 """
 
 from abc import ABC, abstractmethod
-from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from .utils import (
@@ -20,7 +19,9 @@
     get_theme_font_size,
     get_theme_card_dimension,
     get_theme_border_radius,
+    write_svg_if_changed,
 )
+from .svg_defs import DefsRegistry
 
 
 class CardBase(ABC):
@@ -44,6 +45,9 @@ class CardBase(ABC):
         theme: Cached theme configuration dictionary.
         width: Card width in pixels.
         height: Card height in pixels.
+        defs: Registry of shared definitions for the document being rendered.
+              Subclasses can register gradients and filters from
+              generate_content() and reference the returned IDs.
     """
 
     def __init__(self, card_type: str):
@@ -58,6 +62,7 @@ def __init__(self, card_type: str):
         self.theme = load_theme()
         self.width = get_theme_card_dimension("widths", card_type)
         self.height = get_theme_card_dimension("heights", card_type)
+        self.defs = DefsRegistry()
 
     # -------------------------------------------------------------------------
     # Theme accessors
@@ -239,19 +244,28 @@ def build_defs(
         include_glow: bool = True,
         include_shadow: bool = False,
         extra_defs: str = "",
+        used_in: Optional[str] = None,
     ) -> str:
         """
         Build the SVG defs section with gradients and filters.
 
+        The standard definitions are registered in self.defs under their
+        well-known IDs (bg-gradient, glow, shadow), together with anything
+        the content already registered. Extra defs identical to another
+        definition are interned under that definition's ID; call
+        self.defs.rewrite_references() on the content to follow them.
+
         Args:
             bg_gradient: Tuple of (start_color, end_color) for background gradient.
                         If None, uses theme default background gradient.
             include_glow: Whether to include the glow filter.
             include_shadow: Whether to include the shadow filter.
             extra_defs: Additional defs content to include.
+            used_in: If given, only definitions referenced by this markup are
+                     emitted.
 
         Returns:
-            Complete defs section string.
+            Complete defs section string (empty if nothing is emitted).
         """
         if bg_gradient is None:
             gradient = self.get_gradient("background.default")
@@ -260,36 +274,35 @@ def build_defs(
         glow = self.get_glow_settings()
         shadow = self.get_shadow_settings()
 
-        defs_parts = ['  <defs>']
-
         # Background gradient
-        defs_parts.append(f'''    <linearGradient id="bg-gradient" x1="0%" y1="0%" x2="100%" y2="100%">
-      <stop offset="0%" style="stop-color:{bg_gradient[0]}"/>
-      <stop offset="100%" style="stop-color:{bg_gradient[1]}"/>
-    </linearGradient>''')
+        self.defs.linear_gradient(
+            [("0%", bg_gradient[0]), ("100%", bg_gradient[1])],
+            def_id="bg-gradient",
+        )
 
         # Glow filter
         if include_glow:
-            defs_parts.append(f'''    <filter id="glow" x="-20%" y="-20%" width="140%" height="140%">
-      <feGaussianBlur stdDeviation="{glow.get('stdDeviation', 2)}" result="coloredBlur"/>
-      <feMerge>
-        <feMergeNode in="coloredBlur"/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>''')
+            self.defs.glow_filter(glow.get('stdDeviation', 2), def_id="glow")
 
         # Shadow filter
         if include_shadow:
-            defs_parts.append(f'''    <filter id="shadow" x="-20%" y="-20%" width="140%" height="140%">
-      <feDropShadow dx="{shadow.get('dx', 0)}" dy="{shadow.get('dy', 2)}" stdDeviation="{shadow.get('stdDeviation', 3)}" flood-opacity="{shadow.get('flood_opacity', 0.3)}"/>
-    </filter>''')
+            self.defs.shadow_filter(
+                dx=shadow.get('dx', 0),
+                dy=shadow.get('dy', 2),
+                std_deviation=shadow.get('stdDeviation', 3),
+                flood_opacity=shadow.get('flood_opacity', 0.3),
+                def_id="shadow",
+            )
 
         # Extra defs
+        raw_defs = ""
         if extra_defs:
-            defs_parts.append(extra_defs)
+            try:
+                self.defs.register_markup(extra_defs)
+            except ValueError:
+                raw_defs = extra_defs
 
-        defs_parts.append('  </defs>')
-        return '\n'.join(defs_parts)
+        return self.defs.render(used_in=used_in, extra=raw_defs)
 
     def build_background(
         self,
@@ -355,6 +368,7 @@ def build_footer(
         text: str,
         x: int = 20,
         y: Optional[int] = None,
+        volatile: bool = False,
     ) -> str:
         """
         Build a footer text element (typically for timestamps).
@@ -363,6 +377,8 @@ def build_footer(
             text: Footer text content.
             x: X position of the footer.
             y: Y position of the footer. If None, positioned near bottom of card.
+            volatile: Mark the footer as volatile (e.g., a generation timestamp)
+                so a change in its text alone does not rewrite the card.
 
         Returns:
             Footer SVG string.
@@ -374,10 +390,11 @@ def build_footer(
         font_size = self.get_font_size("base")
         text_muted = self.get_color("text", "muted")
         escaped_text = escape_xml(str(text))
+        class_attr = ' class="volatile"' if volatile else ""
 
         return f'''
   <!-- Footer -->
-  <g transform="translate({x}, {y})">
+  <g{class_attr} transform="translate({x}, {y})">
     <text font-family="{font_family}" font-size="{font_size}" fill="{text_muted}">
       {escaped_text}
     </text>
@@ -430,7 +447,7 @@ def build_staleness_badge(
         
         return f'''
   <!-- Staleness Badge -->
-  <g transform="translate({x}, {y})">
+  <g class="volatile" transform="translate({x}, {y})">
     <text x="0" y="12" font-family="{font_family}" font-size="{font_size}" fill="{badge_color}" text-anchor="{text_anchor}">
       {badge_icon}Updated: {escaped_time}
     </text>
@@ -462,10 +479,13 @@ def generate_svg(
         extra_defs: str = "",
         include_decorative_accent: bool = True,
         footer_text: Optional[str] = None,
+        footer_volatile: bool = False,
     ) -> str:
         """
         Generate the complete SVG card.
 
+        Definitions are emitted only if the rendered card references them.
+
         Args:
             bg_gradient: Tuple of (start_color, end_color) for background gradient.
             stroke_color: Color for the border stroke.
@@ -474,41 +494,51 @@ def generate_svg(
             extra_defs: Additional defs content to include.
             include_decorative_accent: Whether to include the decorative accent.
             footer_text: Optional footer text (e.g., timestamp).
+            footer_volatile: Whether the footer text changes on every run.
 
         Returns:
             Complete SVG string.
         """
-        parts = [
-            self.build_svg_open(),
-            self.build_defs(
-                bg_gradient=bg_gradient,
-                include_glow=include_glow,
-                include_shadow=include_shadow,
-                extra_defs=extra_defs,
-            ),
+        self.defs = DefsRegistry()
+
+        body = [
             self.build_background(stroke_color=stroke_color),
             self.generate_content(),
         ]
 
         if include_decorative_accent:
-            parts.append(self.build_decorative_accent())
+            body.append(self.build_decorative_accent())
 
         if footer_text is not None:
-            parts.append(self.build_footer(footer_text))
+            body.append(self.build_footer(footer_text, volatile=footer_volatile))
+
+        body_markup = '\n'.join(body)
+        defs = self.build_defs(
+            bg_gradient=bg_gradient,
+            include_glow=include_glow,
+            include_shadow=include_shadow,
+            extra_defs=extra_defs,
+            used_in=body_markup,
+        )
 
+        parts = [self.build_svg_open()]
+        if defs:
+            parts.append(defs)
+        parts.append(self.defs.rewrite_references(body_markup))
         parts.append('</svg>')
 
         return '\n'.join(parts)
 
-    def write_svg(self, output_path: str, svg_content: str) -> None:
+    def write_svg(self, output_path: str, svg_content: str) -> bool:
         """
-        Write SVG content to a file.
+        Write SVG content to a file, skipping the write if only volatile
+        content (timestamps, staleness badges) changed.
 
         Args:
             output_path: Path to the output file.
             svg_content: SVG content to write.
+
+        Returns:
+            True if the file was written, False if the existing file was kept.
         """
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-        with open(output, "w") as f:
-            f.write(svg_content)
+        return write_svg_if_changed(output_path, svg_content)
@@ -3,13 +3,46 @@
 Change detection utilities for incremental SVG regeneration.
 This module provides hash-based change detection to skip SVG regeneration
 when the source data hasn't changed.
+
+Cache entries record the file's stat signature (size, mtime_ns, inode)
+alongside a BLAKE2b content hash, so an unchanged file costs one ``stat``
+call. Content is only hashed when the stat signature differs.
+
+Cards can also be tracked against multiple inputs (data files, theme,
+timezone, the generator script and the lib modules it imports); the cache
+then stores one entry per input, and the card is current only while every
+entry is and the set of inputs is the same.
+
+Writes go through hash_cache_transaction(), which holds an advisory
+``fcntl.flock`` lock on a sidecar ``.lock`` file and saves the cache once,
+so concurrent generators can share the cache without losing updates.
+update_hash_cache() and update_inputs_cache() hash before taking the lock
+and keep entries whose stat signature still holds, so an unchanged card
+neither waits for the lock nor rewrites the cache.
 """
 
+import ast
+import copy
 import hashlib
 import json
+import os
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Advisory locking is unavailable on Windows; transactions still batch writes
+    FCNTL_AVAILABLE = False
+
+try:
+    from . import json_codec
+except ImportError:
+    import json_codec  # type: ignore[no-redef]
 
 
 def compute_file_hash(file_path: Path) -> Optional[str]:
@@ -47,14 +80,168 @@ def compute_json_hash(json_path: Path) -> Optional[str]:
         return None
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json_codec.load_path(json_path)
         
         # Normalize JSON by sorting keys and using compact representation
-        normalized = json.dumps(data, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        normalized = json_codec.dumps_bytes(data, sort_keys=True)
+        return hashlib.sha256(normalized).hexdigest()
+    except (IOError, OSError, json.JSONDecodeError):
+        return None
+
+
+# Prefix stored with each content hash so algorithm changes invalidate entries
+CONTENT_HASH_PREFIX = "blake2b:"
+
+# Files modified this close to the time their entry was recorded may change
+# again within the same mtime tick, so their stat signature is not trusted
+# (the same "racy" window git applies to its index).
+RACY_WINDOW_NS = 2_000_000_000
+
+StatSignature = Tuple[int, int, int]
+
+# In-process memo of content hashes keyed by (path, stat signature), so the
+# check before generation and the update after it hash each file at most once
+_content_hash_memo: Dict[Tuple[str, StatSignature], str] = {}
+
+
+def get_stat_signature(file_path: Path) -> Optional[StatSignature]:
+    """
+    Get the stat signature of a file.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        Tuple of (size, mtime_ns, inode), or None if the file doesn't exist
+    """
+    try:
+        st = os.stat(file_path)
+    except (IOError, OSError):
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def compute_content_hash(file_path: Path) -> Optional[str]:
+    """
+    Compute the BLAKE2b content hash used by the hash cache.
+    
+    JSON files are normalized (sorted keys, compact separators) before hashing
+    so formatting changes don't count as data changes.
+    
+    Args:
+        file_path: Path to the file to hash
+        
+    Returns:
+        Prefixed hexadecimal digest, or None if the file is missing or invalid
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            payload = f.read()
+        if file_path.suffix == '.json':
+            payload = json_codec.dumps_bytes(json_codec.loads(payload), sort_keys=True)
     except (IOError, OSError, json.JSONDecodeError):
         return None
+    
+    return CONTENT_HASH_PREFIX + hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _memoized_content_hash(file_path: Path, signature: StatSignature) -> Optional[str]:
+    """Compute a content hash, reusing the result while the stat signature holds."""
+    # Recently modified files may change again without changing their signature
+    if signature[1] >= time.time_ns() - RACY_WINDOW_NS:
+        return compute_content_hash(file_path)
+    
+    key = (str(file_path.resolve()), signature)
+    cached = _content_hash_memo.get(key)
+    if cached is not None:
+        return cached
+    
+    content_hash = compute_content_hash(file_path)
+    if content_hash is not None:
+        _content_hash_memo[key] = content_hash
+    return content_hash
+
+
+def _stat_matches(entry: dict, signature: StatSignature) -> bool:
+    """
+    Check whether a cache entry's stat signature can vouch for the file.
+    
+    Args:
+        entry: Cache entry with size, mtime_ns, inode and checked_ns fields
+        signature: Current stat signature of the file
+        
+    Returns:
+        True if the file is unchanged according to its stat signature
+    """
+    size, mtime_ns, inode = signature
+    if (entry.get("size"), entry.get("mtime_ns"), entry.get("inode")) != (size, mtime_ns, inode):
+        return False
+    
+    # Racy entry: the file could have been rewritten within the same tick
+    checked_ns = entry.get("checked_ns", 0)
+    return mtime_ns < checked_ns - RACY_WINDOW_NS
+
+
+def make_cache_entry(file_path: Path) -> Optional[dict]:
+    """
+    Build a hash cache entry for a file.
+    
+    Args:
+        file_path: Path to the data file
+        
+    Returns:
+        Dictionary with hash, size, mtime_ns, inode and checked_ns,
+        or None if the file can't be hashed
+    """
+    signature = get_stat_signature(file_path)
+    if signature is None:
+        return None
+    
+    content_hash = _memoized_content_hash(file_path, signature)
+    if content_hash is None:
+        return None
+    
+    size, mtime_ns, inode = signature
+    return {
+        "hash": content_hash,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "inode": inode,
+        "checked_ns": time.time_ns(),
+    }
+
+
+def is_entry_current(file_path: Path, entry: object) -> bool:
+    """
+    Check whether a hash cache entry still describes a file.
+    
+    Uses the stat signature when possible and falls back to hashing the
+    content. Legacy entries (plain SHA-256 strings) are compared against
+    the SHA-256 hash so existing caches stay valid after upgrading.
+    
+    Args:
+        file_path: Path to the data file
+        entry: Cached entry (dict, legacy hash string, or None)
+        
+    Returns:
+        True if the file is unchanged since the entry was recorded
+    """
+    signature = get_stat_signature(file_path)
+    if signature is None or entry is None:
+        return False
+    
+    if isinstance(entry, str):
+        if file_path.suffix == '.json':
+            return entry == compute_json_hash(file_path)
+        return entry == compute_file_hash(file_path)
+    
+    if not isinstance(entry, dict):
+        return False
+    
+    if _stat_matches(entry, signature):
+        return True
+    
+    return entry.get("hash") == _memoized_content_hash(file_path, signature)
 
 
 def load_hash_cache(cache_path: Path) -> dict:
@@ -71,8 +258,7 @@ def load_hash_cache(cache_path: Path) -> dict:
         return {}
     
     try:
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_codec.load_path(cache_path)
     except (IOError, OSError, json.JSONDecodeError):
         return {}
 
@@ -89,13 +275,13 @@ def save_hash_cache(cache_path: Path, cache_data: dict) -> None:
     temp_path = cache_path.parent / f"{cache_path.name}.tmp"
     
     try:
-        # Write to temporary file
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2)
+        # Serialize once and validate the bytes before writing
+        payload = json_codec.dumps_bytes(cache_data, indent=2)
+        json_codec.loads(payload)
         
-        # Validate the temp file can be loaded
-        with open(temp_path, 'r', encoding='utf-8') as f:
-            json.load(f)
+        # Write to temporary file
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
         
         # Atomic move to final location
         temp_path.replace(cache_path)
@@ -107,6 +293,42 @@ def save_hash_cache(cache_path: Path, cache_data: dict) -> None:
         print(f"Warning: Could not save hash cache to {cache_path}: {e}", file=sys.stderr)
 
 
+@contextmanager
+def hash_cache_transaction(cache_path: Path) -> Iterator[dict]:
+    """
+    Open the hash cache for a batch of updates under an exclusive lock.
+    
+    The cache is loaded after the lock is acquired and written once on exit,
+    only if it was modified. Nothing is written if the block raises.
+    
+    Example:
+        with hash_cache_transaction(cache_path) as cache:
+            record_data_hash(cache, weather_json, "weather")
+            record_data_hash(cache, location_json, "location")
+    
+    Args:
+        cache_path: Path to the cache file
+        
+    Yields:
+        Mutable cache dictionary
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = cache_path.parent / f"{cache_path.name}.lock"
+    
+    with open(lock_path, 'a') as lock_file:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            cache = load_hash_cache(cache_path)
+            original = copy.deepcopy(cache)
+            yield cache
+            if cache != original:
+                save_hash_cache(cache_path, cache)
+        finally:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
 def has_data_changed(
     data_path: Path,
     cache_path: Path,
@@ -123,21 +345,38 @@ def has_data_changed(
     Returns:
         True if data has changed or is new, False if unchanged
     """
-    # Compute current hash
-    if data_path.suffix == '.json':
-        current_hash = compute_json_hash(data_path)
-    else:
-        current_hash = compute_file_hash(data_path)
+    cache = load_hash_cache(cache_path)
+    return not is_entry_current(data_path, cache.get(cache_key))
+
+
+def _refresh_entry(data_path: Path, existing: object) -> Optional[dict]:
+    """
+    Build the cache entry to record for a data file.
     
-    if current_hash is None:
-        return True  # File doesn't exist, consider it changed
+    Returns ``existing`` itself while its stat signature still vouches for
+    the file, so unchanged files keep their ``checked_ns`` and the cache is
+    not rewritten. Returns None if the file can't be hashed.
+    """
+    signature = get_stat_signature(data_path)
+    if isinstance(existing, dict) and signature is not None and _stat_matches(existing, signature):
+        return existing
+    return make_cache_entry(data_path)
+
+
+def record_data_hash(cache: dict, data_path: Path, cache_key: str) -> None:
+    """
+    Record the current hash of a data file in an open cache.
     
-    # Load cache
-    cache = load_hash_cache(cache_path)
+    Args:
+        cache: Cache dictionary from hash_cache_transaction()
+        data_path: Path to the data file
+        cache_key: Key to use in the cache
+    """
+    entry = _refresh_entry(data_path, cache.get(cache_key))
+    if entry is None:
+        return  # Can't compute hash, don't update cache
     
-    # Check if hash changed
-    cached_hash = cache.get(cache_key)
-    return cached_hash != current_hash
+    cache[cache_key] = entry
 
 
 def update_hash_cache(
@@ -148,28 +387,220 @@ def update_hash_cache(
     """
     Update hash cache with current data file hash.
     
+    The file is hashed before the lock is taken; the lock is only held to
+    merge the entry and write the cache, and not at all if nothing changed.
+    
     Args:
         data_path: Path to the data file
         cache_path: Path to the hash cache file
         cache_key: Key to use in the cache
     """
-    # Compute current hash
-    if data_path.suffix == '.json':
-        current_hash = compute_json_hash(data_path)
+    existing = load_hash_cache(cache_path).get(cache_key)
+    entry = _refresh_entry(data_path, existing)
+    if entry is None or entry is existing:
+        return
+    
+    with hash_cache_transaction(cache_path) as cache:
+        cache[cache_key] = entry
+
+
+# Directory containing the shared lib modules generators import
+LIB_DIR = Path(__file__).resolve().parent
+
+
+def _resolve_lib_import(
+    module: Optional[str],
+    names: Sequence[str],
+    level: int,
+    lib_dir: Path,
+) -> List[Path]:
+    """
+    Map one import statement to the lib module files it loads.
+    
+    Handles ``lib.x`` imports from scripts, bare ``x`` imports from scripts
+    that put lib/ on sys.path, and relative imports inside lib itself.
+    """
+    if level > 1:
+        return []
+    
+    parts = module.split(".") if module else []
+    if level == 0 and parts and parts[0] == lib_dir.name:
+        parts = parts[1:]
+        found = [lib_dir / "__init__.py"]
+    elif level == 0 and len(parts) > 1:
+        return []  # Dotted import of some other package
     else:
-        current_hash = compute_file_hash(data_path)
+        found = []
     
-    if current_hash is None:
-        return  # Can't compute hash, don't update cache
+    if parts:
+        candidates = [lib_dir / f"{parts[0]}.py"]
+    else:
+        # "from lib import utils" / "from . import json_codec"
+        candidates = [lib_dir / f"{name}.py" for name in names]
+    
+    return found + [path for path in candidates if path.exists()]
+
+
+def find_module_dependencies(script_path: Path, lib_dir: Path = LIB_DIR) -> List[Path]:
+    """
+    Find a script and the lib modules it imports, transitively.
+    
+    Args:
+        script_path: Path to the generator script
+        lib_dir: Directory holding the shared lib modules
+        
+    Returns:
+        Sorted list of the script and every lib module it depends on
+    """
+    seen: Dict[Path, None] = {}
+    pending = [script_path.resolve()]
     
-    # Load existing cache
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.exists():
+            continue
+        seen[path] = None
+        
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (SyntaxError, ValueError, IOError, OSError):
+            continue
+        
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    pending.extend(_resolve_lib_import(alias.name, [], 0, lib_dir))
+            elif isinstance(node, ast.ImportFrom):
+                names = [alias.name for alias in node.names]
+                pending.extend(_resolve_lib_import(node.module, names, node.level, lib_dir))
+    
+    return sorted(seen, key=str)
+
+
+def _input_key(path: Path) -> str:
+    """Cache key for an input: relative to the working directory when possible."""
+    resolved = path.resolve()
+    try:
+        return resolved.relative_to(Path.cwd().resolve()).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def _make_input_entry(path: Path, existing: object = None) -> dict:
+    """Build a cache entry for one input, recording missing files explicitly."""
+    if not path.exists():
+        return {"missing": True}
+    return _refresh_entry(path, existing) or {"missing": True}
+
+
+def _make_inputs_entry(input_paths: Sequence[Path], existing: object) -> dict:
+    """Build the cache entry for a card, reusing input entries that are still current."""
+    recorded = existing.get("inputs") if isinstance(existing, dict) else None
+    if not isinstance(recorded, dict):
+        recorded = {}
+    
+    inputs = {}
+    for path in input_paths:
+        key = _input_key(path)
+        inputs[key] = _make_input_entry(path, recorded.get(key))
+    return {"inputs": inputs}
+
+
+def _is_input_current(path: Path, entry: object) -> bool:
+    """Check one input against its recorded entry."""
+    if isinstance(entry, dict) and entry.get("missing"):
+        return not path.exists()
+    return is_entry_current(path, entry)
+
+
+def find_changed_inputs(
+    input_paths: Sequence[Path],
+    cache_path: Path,
+    cache_key: str
+) -> List[Path]:
+    """
+    Find the inputs of a card that changed since it was last generated.
+    
+    Args:
+        input_paths: Every file the card depends on
+        cache_path: Path to the hash cache file
+        cache_key: Key to use in the cache
+        
+    Returns:
+        List of changed inputs; all inputs if the card has no valid entry
+    """
     cache = load_hash_cache(cache_path)
+    entry = cache.get(cache_key)
+    if not isinstance(entry, dict) or not isinstance(entry.get("inputs"), dict):
+        return list(input_paths)
     
-    # Update cache
-    cache[cache_key] = current_hash
+    recorded = entry["inputs"]
+    keyed = {_input_key(path): path for path in input_paths}
+    
+    changed = [
+        path for key, path in keyed.items()
+        if key not in recorded or not _is_input_current(path, recorded[key])
+    ]
+    if not changed and set(recorded) - set(keyed):
+        # An input was dropped, so the last build used a different input set
+        return list(input_paths)
+    return changed
+
+
+def have_inputs_changed(
+    input_paths: Sequence[Path],
+    cache_path: Path,
+    cache_key: str
+) -> bool:
+    """
+    Check if any input of a card changed since it was last generated.
+    
+    Args:
+        input_paths: Every file the card depends on
+        cache_path: Path to the hash cache file
+        cache_key: Key to use in the cache
+        
+    Returns:
+        True if any input changed or the card is new, False if all unchanged
+    """
+    return bool(find_changed_inputs(input_paths, cache_path, cache_key))
+
+
+def record_inputs_hash(cache: dict, input_paths: Sequence[Path], cache_key: str) -> None:
+    """
+    Record the current state of every input of a card in an open cache.
+    
+    Args:
+        cache: Cache dictionary from hash_cache_transaction()
+        input_paths: Every file the card depends on
+        cache_key: Key to use in the cache
+    """
+    cache[cache_key] = _make_inputs_entry(input_paths, cache.get(cache_key))
+
+
+def update_inputs_cache(
+    input_paths: Sequence[Path],
+    cache_path: Path,
+    cache_key: str
+) -> None:
+    """
+    Record the current state of every input of a card.
+    
+    Inputs are hashed before the lock is taken; the lock is only held to
+    merge the entry and write the cache, and not at all if nothing changed.
+    
+    Args:
+        input_paths: Every file the card depends on
+        cache_path: Path to the hash cache file
+        cache_key: Key to use in the cache
+    """
+    existing = load_hash_cache(cache_path).get(cache_key)
+    entry = _make_inputs_entry(input_paths, existing)
+    if entry == existing:
+        return
     
-    # Save cache
-    save_hash_cache(cache_path, cache)
+    with hash_cache_transaction(cache_path) as cache:
+        cache[cache_key] = entry
 
 
 def should_regenerate_svg(
@@ -177,7 +608,8 @@ def should_regenerate_svg(
     svg_path: Path,
     cache_path: Path,
     cache_key: str,
-    force: bool = False
+    force: bool = False,
+    extra_inputs: Optional[Sequence[Path]] = None
 ) -> bool:
     """
     Determine if SVG should be regenerated based on data changes.
@@ -188,6 +620,9 @@ def should_regenerate_svg(
         cache_path: Path to the hash cache file
         cache_key: Key to use in the cache
         force: If True, always regenerate (default: False)
+        extra_inputs: Other files the card depends on (theme, generator,
+            lib modules, ...). When given, the card is tracked against all
+            inputs with update_inputs_cache instead of the data file alone.
         
     Returns:
         True if SVG should be regenerated, False to skip
@@ -204,5 +639,7 @@ def should_regenerate_svg(
     if not data_path.exists():
         return True
     
-    # Check if data has changed
+    # Check if data (or any other input) has changed
+    if extra_inputs is not None:
+        return have_inputs_changed([data_path, *extra_inputs], cache_path, cache_key)
     return has_data_changed(data_path, cache_path, cache_key)
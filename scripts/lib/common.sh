@@ -433,6 +433,41 @@ save_cached_response() {
     echo "Cached response for ${cache_type}:${cache_key}" >&2
 }
 
+# Archive a raw API response in the content-addressed raw-response archive.
+# Identical payloads are stored once; each fetch is recorded in the day's
+# manifest (see scripts/lib/raw_archive.py). Archiving never fails the caller.
+#
+# Usage:
+#   echo "$response" | archive_raw_response "oura" "daily_sleep"
+#   echo "$response" | archive_raw_response "oura" "daily_sleep" "invalid"
+#
+# Arguments:
+#   $1 - Data source (e.g., "oura")
+#   $2 - Endpoint or payload name
+#   $3 - Optional: response status (default: "ok")
+#
+# Environment variables:
+#   RAW_ARCHIVE_DIR - Archive directory (default: data/raw)
+#
+# Input:
+#   Response content via stdin
+#
+# Returns:
+#   0 always
+archive_raw_response() {
+    local source=$1
+    local name=$2
+    local status="${3:-ok}"
+    local lib_dir
+    lib_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+    
+    python3 "${lib_dir}/../archive-raw-response.py" \
+        --archive-dir "${RAW_ARCHIVE_DIR:-data/raw}" \
+        store "$source" "$name" --status "$status" \
+        || echo "Warning: Could not archive raw ${source}/${name} response" >&2
+    return 0
+}
+
 # Validate JSON response from an API.
 # Checks if the response is valid JSON and optionally validates structure.
 #
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for optimized embedded images.
+
+Card generators embed artwork and maps as base64 data URIs. Optimizing and
+encoding the same source image on every run is the slowest part of those
+cards, so the result is cached on disk under a key derived from the source
+bytes and every setting that affects the output (target dimensions, quality,
+palette size). Each entry stores the optimized bytes and the ready-to-embed
+data URI, so a hit costs two small file reads.
+
+Entries are evicted least-recently-used once the cache exceeds its size cap.
+Recency is tracked with file modification times, which are refreshed on
+every hit, so no shared index has to be kept consistent between concurrent
+generators.
+"""
+
+import base64
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    from . import json_codec
+    from .utils import detect_image_mime, get_image_optimization_settings, optimize_image
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    import json_codec  # type: ignore[no-redef]
+    from utils import (  # type: ignore[no-redef]
+        detect_image_mime,
+        get_image_optimization_settings,
+        optimize_image,
+    )
+
+
+CACHE_DIR = Path(".cache") / "images"
+
+# Bump when optimize_image() output changes for the same settings
+CACHE_VERSION = 1
+
+MAX_BYTES_ENV_VAR = "PROFILE_IMAGE_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+DATA_SUFFIX = ".bin"
+URI_SUFFIX = ".uri"
+
+
+def get_cache_max_bytes() -> int:
+    """
+    Get the image cache size cap.
+
+    Read from the PROFILE_IMAGE_CACHE_MAX_BYTES environment variable.
+
+    Returns:
+        Maximum total size of cached entries in bytes.
+    """
+    try:
+        return int(os.environ.get(MAX_BYTES_ENV_VAR, DEFAULT_MAX_BYTES))
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+def make_cache_key(image_data: bytes, image_format: str, settings: Dict) -> str:
+    """
+    Compute the cache key for an image and its optimization settings.
+
+    Args:
+        image_data: Source image bytes.
+        image_format: Source format ('png', 'jpeg', ...).
+        settings: Effective optimization settings.
+
+    Returns:
+        Hex digest identifying the optimized output.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(
+        json_codec.dumps_bytes(
+            {"version": CACHE_VERSION, "format": image_format, "settings": settings},
+            sort_keys=True,
+        )
+    )
+    hasher.update(b"\0")
+    hasher.update(image_data)
+    return hasher.hexdigest()
+
+
+def _image_format(path: Path) -> str:
+    """Determine the optimize_image() format name from a file extension."""
+    suffix = path.suffix.lower()
+    if suffix in (".jpg", ".jpeg"):
+        return "jpeg"
+    return suffix.lstrip(".")
+
+
+def _touch(*paths: Path) -> None:
+    """Mark cache files as recently used."""
+    for path in paths:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write a cache file so concurrent readers never see a partial entry."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def prune_cache(cache_dir: Path = CACHE_DIR, max_bytes: Optional[int] = None) -> int:
+    """
+    Evict least-recently-used entries until the cache fits its size cap.
+
+    Args:
+        cache_dir: Cache directory.
+        max_bytes: Size cap in bytes. Uses PROFILE_IMAGE_CACHE_MAX_BYTES if None.
+
+    Returns:
+        Number of entries evicted.
+    """
+    if max_bytes is None:
+        max_bytes = get_cache_max_bytes()
+
+    entries = []
+    total = 0
+    for uri_path in cache_dir.glob(f"*{URI_SUFFIX}"):
+        data_path = uri_path.with_suffix(DATA_SUFFIX)
+        try:
+            uri_stat = uri_path.stat()
+            size = uri_stat.st_size + data_path.stat().st_size
+        except OSError:
+            continue
+        entries.append((uri_stat.st_mtime_ns, size, uri_path, data_path))
+        total += size
+
+    evicted = 0
+    for _, size, uri_path, data_path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        for path in (uri_path, data_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        total -= size
+        evicted += 1
+    return evicted
+
+
+def get_optimized_image(
+    image_path: Union[str, Path],
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    cache_dir: Path = CACHE_DIR,
+    max_bytes: Optional[int] = None,
+) -> Tuple[bytes, str]:
+    """
+    Optimize an image for embedding, reusing a cached result when possible.
+
+    Args:
+        image_path: Path to the source image.
+        max_width: Maximum width in pixels. Uses theme default if None.
+        max_height: Maximum height in pixels. Uses theme default if None.
+        cache_dir: Cache directory.
+        max_bytes: Cache size cap. Uses PROFILE_IMAGE_CACHE_MAX_BYTES if None.
+
+    Returns:
+        Tuple of (optimized bytes, data URI).
+
+    Raises:
+        FileNotFoundError: If the image file doesn't exist.
+        IOError: If the file cannot be read.
+    """
+    path = Path(image_path)
+    with open(path, "rb") as f:
+        image_data = f.read()
+
+    image_format = _image_format(path)
+    settings = dict(get_image_optimization_settings())
+    if max_width is not None:
+        settings["max_width"] = max_width
+    if max_height is not None:
+        settings["max_height"] = max_height
+
+    key = make_cache_key(image_data, image_format, settings)
+    data_path = cache_dir / f"{key}{DATA_SUFFIX}"
+    uri_path = cache_dir / f"{key}{URI_SUFFIX}"
+
+    try:
+        optimized = data_path.read_bytes()
+        data_uri = uri_path.read_text(encoding="ascii")
+        _touch(data_path, uri_path)
+        return optimized, data_uri
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    optimized = optimize_image(
+        image_data,
+        image_format,
+        max_width=settings["max_width"],
+        max_height=settings["max_height"],
+    )
+    mime = detect_image_mime(optimized) or f"image/{image_format}"
+    data_uri = f"data:{mime};base64,{base64.b64encode(optimized).decode('ascii')}"
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(data_path, optimized)
+        # The URI is written last: its presence marks a complete entry
+        _write_atomic(uri_path, data_uri.encode("ascii"))
+        prune_cache(cache_dir, max_bytes)
+    except OSError as e:
+        print(f"Warning: Could not cache optimized image: {e}", file=sys.stderr)
+
+    return optimized, data_uri
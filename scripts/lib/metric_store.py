@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Columnar time-series store for historical snapshot metrics.
+
+Daily snapshots are nested JSON documents, one file per day. Reading a month
+of one metric means opening a month of files. This store keeps every numeric
+snapshot field as its own column instead: one file per metric per year,
+holding 366 little-endian float64 slots indexed by day of year, with NaN
+marking days without a value.
+
+Layout:
+
+    columns/
+        schema.json                 # metric names and value kinds
+        2025/
+            health.sleep_score.f64
+            developer.commits_30d.f64
+            ...
+
+Because the date index is implicit in the slot position, appending a day is
+a single 8-byte write at a fixed offset, and a date range of one metric is a
+single contiguous read per year. Values are returned as array('d'), which
+NumPy can wrap without copying (numpy.frombuffer).
+
+Metric names are "<section>.<field>" (e.g. "health.sleep_score"). Text fields
+such as the mood name stay in the daily JSON files only.
+"""
+
+import math
+import os
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    from . import json_codec
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    import json_codec  # type: ignore[no-redef]
+
+
+SCHEMA_FILE = "schema.json"
+SCHEMA_VERSION = 1
+
+COLUMN_SUFFIX = ".f64"
+SLOTS_PER_YEAR = 366
+SLOT_SIZE = 8
+
+# Snapshot sections whose numeric fields become columns
+SECTIONS = ("health", "mood", "weather", "developer")
+
+_NAN = float("nan")
+_EMPTY_YEAR = array("d", [_NAN] * SLOTS_PER_YEAR)
+
+
+def _as_date(value: Union[date, datetime, str]) -> date:
+    """Convert a date, datetime or YYYY-MM-DD string to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def _to_disk(values: array) -> bytes:
+    """Serialize doubles in the on-disk (little-endian) byte order."""
+    if sys.byteorder == "big":
+        values = array("d", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_disk(data: bytes) -> array:
+    """Deserialize little-endian doubles."""
+    values = array("d")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write a file so concurrent readers never see a partial one."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def flatten_snapshot(snapshot: Dict) -> Dict[str, Union[int, float]]:
+    """
+    Extract the numeric fields of a snapshot as column values.
+
+    Args:
+        snapshot: Daily snapshot dictionary.
+
+    Returns:
+        Dictionary mapping metric names ("section.field") to numbers.
+        Missing values, text and booleans are left out.
+    """
+    values = {}
+    for section in SECTIONS:
+        fields = snapshot.get(section) or {}
+        for field, value in fields.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if not (isinstance(value, float) and math.isnan(value)):
+                    values[f"{section}.{field}"] = value
+    return values
+
+
+class MetricStore:
+    """
+    Per-year, per-metric columns of daily snapshot values.
+
+    Example:
+        store = MetricStore(Path("data/snapshots/columns"))
+        store.append(snapshot)
+        dates, sleep = store.read("health.sleep_score", "2025-01-01", "2025-12-31")
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the schema and the per-year columns.
+        """
+        self.root = Path(root)
+        self._schema: Optional[Dict[str, str]] = None
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    def exists(self) -> bool:
+        """Check whether the store has been created."""
+        return (self.root / SCHEMA_FILE).exists()
+
+    def _load_schema(self) -> Dict[str, str]:
+        """Load metric kinds ({metric: "int" | "float"})."""
+        if self._schema is None:
+            try:
+                data = json_codec.load_path(self.root / SCHEMA_FILE)
+                self._schema = dict(data.get("metrics", {}))
+            except (OSError, json_codec.JSONDecodeError, AttributeError):
+                self._schema = {}
+        return self._schema
+
+    def _save_schema(self) -> None:
+        """Persist the schema atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = json_codec.dumps_bytes(
+            {"version": SCHEMA_VERSION, "metrics": dict(sorted(self._load_schema().items()))},
+            indent=2,
+        )
+        _write_atomic(self.root / SCHEMA_FILE, payload)
+
+    def metrics(self) -> List[str]:
+        """
+        List stored metrics.
+
+        Returns:
+            Sorted metric names.
+        """
+        return sorted(self._load_schema())
+
+    def kind(self, metric: str) -> Optional[str]:
+        """
+        Get the value kind of a metric.
+
+        Args:
+            metric: Metric name.
+
+        Returns:
+            "int", "float", or None if the metric is unknown.
+        """
+        return self._load_schema().get(metric)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _column_path(self, metric: str, year: int) -> Path:
+        """Get the column file of a metric for a year."""
+        return self.root / str(year) / f"{metric}{COLUMN_SUFFIX}"
+
+    def write(self, day: Union[date, datetime, str], values: Dict[str, Optional[float]]) -> int:
+        """
+        Write metric values for one day, in place.
+
+        A value of None clears the day. Each value costs one seek and one
+        8-byte write; a column file is only created (pre-filled with NaN)
+        the first time a metric appears in a year.
+
+        Args:
+            day: Date the values belong to.
+            values: Dictionary mapping metric names to numbers or None.
+
+        Returns:
+            Number of values written.
+        """
+        self.write_many([(day, values)])
+        return len(values)
+
+    def write_many(self, rows: Iterable[Tuple[Union[date, datetime, str], Dict[str, Optional[float]]]]) -> int:
+        """
+        Write metric values for many days, opening each column file once.
+
+        Args:
+            rows: (day, values) pairs as accepted by write().
+
+        Returns:
+            Number of days written.
+        """
+        schema = self._load_schema()
+        schema_changed = False
+        # (metric, year) -> {slot offset: value}
+        columns: Dict[Tuple[str, int], Dict[int, Optional[float]]] = {}
+        count = 0
+
+        for day, values in rows:
+            day = _as_date(day)
+            offset = (day.timetuple().tm_yday - 1) * SLOT_SIZE
+            count += 1
+            for metric, value in values.items():
+                if value is not None:
+                    kind = "int" if isinstance(value, int) else "float"
+                    if schema.get(metric) not in (kind, "float"):
+                        schema[metric] = kind
+                        schema_changed = True
+                columns.setdefault((metric, day.year), {})[offset] = value
+
+        for (metric, year), slots in columns.items():
+            path = self._column_path(metric, year)
+            if not path.exists():
+                if all(value is None for value in slots.values()):
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(path, _to_disk(_EMPTY_YEAR))
+
+            with open(path, "r+b") as f:
+                for offset in sorted(slots):
+                    value = slots[offset]
+                    f.seek(offset)
+                    f.write(_to_disk(array("d", [_NAN if value is None else float(value)])))
+
+        if schema_changed or (count and not self.exists()):
+            self._save_schema()
+        return count
+
+    def append(self, snapshot: Dict) -> int:
+        """
+        Store the numeric fields of a daily snapshot.
+
+        Metrics the store knows but the snapshot lacks are cleared for that
+        day, so rewriting a day replaces it entirely.
+
+        Args:
+            snapshot: Daily snapshot dictionary with a "date" key.
+
+        Returns:
+            Number of values written.
+        """
+        values: Dict[str, Optional[float]] = {metric: None for metric in self._load_schema()}
+        values.update(flatten_snapshot(snapshot))
+        return self.write(snapshot["date"], values)
+
+    def import_daily(self, snapshots: Iterable[Dict]) -> int:
+        """
+        Store many daily snapshots in one batch.
+
+        Like append(), each day is replaced entirely: metrics known to the
+        store or present in any of the snapshots are cleared on the days
+        that lack them.
+
+        Args:
+            snapshots: Daily snapshot dictionaries.
+
+        Returns:
+            Number of snapshots stored.
+        """
+        flattened = [
+            (snapshot["date"], flatten_snapshot(snapshot)) for snapshot in snapshots if snapshot.get("date")
+        ]
+        known = set(self._load_schema())
+        for _, values in flattened:
+            known.update(values)
+
+        rows = []
+        for day, values in flattened:
+            row: Dict[str, Optional[float]] = dict.fromkeys(known)
+            row.update(values)
+            rows.append((day, row))
+        return self.write_many(rows)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read(
+        self,
+        metric: str,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str],
+    ) -> Tuple[List[date], array]:
+        """
+        Read one metric over a date range.
+
+        Costs one read per calendar year in the range. Days without a value
+        are NaN.
+
+        Args:
+            metric: Metric name.
+            start: First date (inclusive).
+            end: Last date (inclusive).
+
+        Returns:
+            Tuple of (dates, values), one entry per day in the range.
+        """
+        start, end = _as_date(start), _as_date(end)
+        dates: List[date] = []
+        values = array("d")
+        if end < start:
+            return dates, values
+
+        for year in range(start.year, end.year + 1):
+            first = max(start, date(year, 1, 1))
+            last = min(end, date(year, 12, 31))
+            count = (last - first).days + 1
+            dates.extend(first + timedelta(days=i) for i in range(count))
+
+            path = self._column_path(metric, year)
+            try:
+                with open(path, "rb") as f:
+                    f.seek((first.timetuple().tm_yday - 1) * SLOT_SIZE)
+                    values.extend(_from_disk(f.read(count * SLOT_SIZE)))
+            except FileNotFoundError:
+                values.extend(_EMPTY_YEAR[:count])
+
+        return dates, values
+
+    def read_columns(
+        self,
+        metrics: Optional[Iterable[str]],
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str],
+    ) -> Tuple[List[date], Dict[str, array]]:
+        """
+        Read several metrics over the same date range.
+
+        Args:
+            metrics: Metric names, or None for all stored metrics.
+            start: First date (inclusive).
+            end: Last date (inclusive).
+
+        Returns:
+            Tuple of (dates, {metric: values}).
+        """
+        start, end = _as_date(start), _as_date(end)
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        columns = {}
+        for metric in (self.metrics() if metrics is None else metrics):
+            _, columns[metric] = self.read(metric, start, end)
+        return dates, columns
+
+    def _python_value(self, metric: str, value: float) -> Union[int, float]:
+        """Convert a stored double back to the metric's original kind."""
+        return int(value) if self.kind(metric) == "int" else value
+
+    def rows(
+        self,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str],
+        metrics: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict]:
+        """
+        Rebuild snapshot-shaped dictionaries from the columns.
+
+        Days without any value are skipped. Only numeric fields are present.
+
+        Args:
+            start: First date (inclusive).
+            end: Last date (inclusive).
+            metrics: Metric names, or None for all stored metrics.
+
+        Yields:
+            Dictionaries like {"date": "2025-12-03", "health": {...}, ...}.
+        """
+        dates, columns = self.read_columns(metrics, start, end)
+        for i, day in enumerate(dates):
+            row: Dict = {"date": day.isoformat()}
+            found = False
+            for metric, values in columns.items():
+                value = values[i]
+                if not math.isnan(value):
+                    section, _, field = metric.partition(".")
+                    row.setdefault(section, {})[field] = self._python_value(metric, value)
+                    found = True
+            if found:
+                for section in SECTIONS:
+                    row.setdefault(section, {})
+                yield row
+
+    def export_json(
+        self,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str],
+        metrics: Optional[Iterable[str]] = None,
+    ) -> Dict:
+        """
+        Export a date range in a JSON-compatible column layout.
+
+        Args:
+            start: First date (inclusive).
+            end: Last date (inclusive).
+            metrics: Metric names, or None for all stored metrics.
+
+        Returns:
+            Dictionary {"dates": [...], "metrics": {metric: [value | None, ...]}}.
+        """
+        dates, columns = self.read_columns(metrics, start, end)
+        return {
+            "dates": [day.isoformat() for day in dates],
+            "metrics": {
+                metric: [
+                    None if math.isnan(value) else self._python_value(metric, value)
+                    for value in values
+                ]
+                for metric, values in columns.items()
+            },
+        }
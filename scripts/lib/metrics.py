@@ -16,6 +16,16 @@
 from pathlib import Path
 from typing import Dict, Optional, List
 
+try:
+    from . import json_codec
+except ImportError:
+    import json_codec  # type: ignore[no-redef]
+
+
+# Environment variable naming an optional SQLite store (lib.ops_store) that
+# every recorded run is also written to
+OPS_DB_ENV = "OPS_DB_PATH"
+
 
 def get_metrics_dir() -> Path:
     """Get the metrics data directory path."""
@@ -60,8 +70,7 @@ def load_workflow_metrics(workflow_name: str) -> Dict:
         }
     
     try:
-        with open(metrics_file, 'r') as f:
-            return json.load(f)
+        return json_codec.load_path(metrics_file)
     except (json.JSONDecodeError, IOError) as e:
         print(f"Warning: Failed to load metrics for {workflow_name}: {e}", file=sys.stderr)
         return {
@@ -91,13 +100,13 @@ def save_workflow_metrics(workflow_name: str, metrics: Dict) -> None:
     temp_file = metrics_file.parent / f"{metrics_file.name}.tmp"
     
     try:
-        # Write to temporary file
-        with open(temp_file, 'w') as f:
-            json.dump(metrics, f, indent=2)
+        # Serialize once and validate the bytes before writing
+        payload = json_codec.dumps_bytes(metrics, indent=2)
+        json_codec.loads(payload)
         
-        # Validate the temp file can be loaded
-        with open(temp_file, 'r') as f:
-            json.load(f)
+        # Write to temporary file
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
         
         # Atomic move to final location
         temp_file.replace(metrics_file)
@@ -181,9 +190,43 @@ def record_workflow_run(
     # Save updated metrics
     save_workflow_metrics(workflow_name, metrics)
     
+    # Mirror the run into the SQLite store, if one is configured
+    db_path = os.environ.get(OPS_DB_ENV)
+    if db_path:
+        _record_in_ops_store(
+            Path(db_path), workflow_name, success, run_time_seconds,
+            api_calls, error_message, timestamp
+        )
+    
     return metrics
 
 
+def _record_in_ops_store(
+    db_path: Path,
+    workflow_name: str,
+    success: bool,
+    run_time_seconds: Optional[float],
+    api_calls: Optional[Dict[str, int]],
+    error_message: Optional[str],
+    timestamp: str
+) -> None:
+    """Record a run in the SQLite store; failures only produce a warning."""
+    try:
+        from .ops_store import OpsStore
+    except ImportError:
+        from ops_store import OpsStore  # type: ignore[no-redef]
+    import sqlite3
+    
+    try:
+        with OpsStore(db_path) as store:
+            store.record_workflow_run(
+                workflow_name, success, run_time_seconds,
+                api_calls, error_message, timestamp=timestamp
+            )
+    except sqlite3.Error as e:
+        print(f"Warning: Failed to record {workflow_name} run in {db_path}: {e}", file=sys.stderr)
+
+
 def get_all_workflow_metrics() -> List[Dict]:
     """
     Load metrics for all workflows.
@@ -196,9 +239,8 @@ def get_all_workflow_metrics() -> List[Dict]:
     
     for metrics_file in metrics_dir.glob("*.json"):
         try:
-            with open(metrics_file, 'r') as f:
-                metrics = json.load(f)
-                all_metrics.append(metrics)
+            metrics = json_codec.load_path(metrics_file)
+            all_metrics.append(metrics)
         except (json.JSONDecodeError, IOError) as e:
             print(f"Warning: Failed to load {metrics_file}: {e}", file=sys.stderr)
     
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite store for workflow metrics (data/ops.sqlite3).
+
+Workflow metrics normally live in data/metrics/<workflow>.json, each with
+its own read-modify-write cycle and only the last 20 runs of history.
+
+This module keeps the same counters, plus the full run history, in one
+SQLite database in WAL mode, so readers never block the writer, concurrent
+writers are serialized by SQLite's lock instead of temp-file renames, and
+questions like "last 20 runs of all workflows" are one indexed query.
+lib.metrics writes every run here as well when OPS_DB_PATH is set, and
+migrate_from_files() imports data/metrics (idempotently), so the database
+can be (re)built at any time; the JSON files remain the source of truth.
+
+Tables:
+
+    workflow_metrics(workflow PK, counters..., api_calls JSON)
+    run_history(id PK, workflow, timestamp, success, run_time_seconds, error_message)
+
+The schema version is kept in PRAGMA user_version; _migrate_schema()
+upgrades older databases in place.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    from . import json_codec
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    import json_codec  # type: ignore[no-redef]
+
+
+DEFAULT_DB_PATH = Path("data") / "ops.sqlite3"
+SCHEMA_VERSION = 2
+
+# Tables of schema version 1 that nothing read; dropped on upgrade
+_OBSOLETE_TABLES = ("hash_cache", "http_cache", "circuit_breaker", "snapshots")
+
+# Runs returned in a workflow's run_history, matching data/metrics/*.json
+RUN_HISTORY_LIMIT = 20
+
+# Weight of the newest run in the run-time moving average (as lib.metrics)
+RUN_TIME_ALPHA = 0.2
+
+# Seconds a writer waits for the database lock before failing
+BUSY_TIMEOUT_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_metrics (
+    workflow TEXT PRIMARY KEY,
+    total_runs INTEGER NOT NULL DEFAULT 0,
+    successful_runs INTEGER NOT NULL DEFAULT 0,
+    failed_runs INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_success TEXT,
+    last_failure TEXT,
+    last_run_time_seconds REAL,
+    avg_run_time_seconds REAL,
+    api_calls TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS run_history (
+    id INTEGER PRIMARY KEY,
+    workflow TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    run_time_seconds REAL,
+    error_message TEXT
+);
+CREATE INDEX IF NOT EXISTS run_history_workflow_time ON run_history (workflow, timestamp);
+CREATE INDEX IF NOT EXISTS run_history_time ON run_history (timestamp);
+"""
+
+
+def _now() -> str:
+    """Current UTC time in the metrics timestamp format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _dumps(value: object) -> str:
+    """Serialize a value for a JSON column."""
+    return json_codec.dumps(value)
+
+
+class OpsStore:
+    """
+    SQLite database holding workflow metrics and run history.
+
+    Example:
+        with OpsStore(Path("data/ops.sqlite3")) as store:
+            store.migrate_from_files(Path("."))
+            store.record_workflow_run("oura", success=True, run_time_seconds=12.5)
+            runs = store.recent_runs(limit=20)
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_DB_PATH):
+        """
+        Open (and create or upgrade) the database.
+
+        Args:
+            path: Database file, or ":memory:".
+        """
+        self.path = path
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate_schema()
+
+    def __enter__(self) -> "OpsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block of writes atomically.
+
+        The write lock is taken up front (BEGIN IMMEDIATE), so concurrent
+        read-modify-write cycles are serialized instead of racing.
+
+        Yields:
+            The connection.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _migrate_schema(self) -> None:
+        """Create the tables, or upgrade an older schema in place."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                f"{self.path}: schema version {version} is newer than supported ({SCHEMA_VERSION})"
+            )
+        if version < SCHEMA_VERSION:
+            with self.transaction() as conn:
+                for table in _OBSOLETE_TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # ------------------------------------------------------------------
+    # Workflow metrics and run history
+    # ------------------------------------------------------------------
+
+    def record_workflow_run(
+        self,
+        workflow: str,
+        success: bool,
+        run_time_seconds: Optional[float] = None,
+        api_calls: Optional[Dict[str, int]] = None,
+        error_message: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> Dict:
+        """
+        Record a workflow run and update its counters, like lib.metrics.
+
+        Args:
+            workflow: Workflow name (e.g. 'oura').
+            success: Whether the run succeeded.
+            run_time_seconds: Duration of the run in seconds.
+            api_calls: API endpoint names and call counts.
+            error_message: Error message if the run failed.
+            timestamp: Run time (default: now, UTC).
+
+        Returns:
+            Updated metrics in the data/metrics/<workflow>.json format.
+        """
+        timestamp = timestamp or _now()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM workflow_metrics WHERE workflow = ?", (workflow,)
+            ).fetchone()
+            metrics = dict(row) if row else {
+                "workflow": workflow, "total_runs": 0, "successful_runs": 0,
+                "failed_runs": 0, "consecutive_failures": 0, "last_success": None,
+                "last_failure": None, "last_run_time_seconds": None,
+                "avg_run_time_seconds": None, "api_calls": "{}",
+            }
+
+            metrics["total_runs"] += 1
+            if success:
+                metrics["successful_runs"] += 1
+                metrics["consecutive_failures"] = 0
+                metrics["last_success"] = timestamp
+            else:
+                metrics["failed_runs"] += 1
+                metrics["consecutive_failures"] += 1
+                metrics["last_failure"] = timestamp
+
+            if run_time_seconds is not None:
+                metrics["last_run_time_seconds"] = run_time_seconds
+                if metrics["avg_run_time_seconds"] is None:
+                    metrics["avg_run_time_seconds"] = run_time_seconds
+                else:
+                    metrics["avg_run_time_seconds"] = (
+                        RUN_TIME_ALPHA * run_time_seconds
+                        + (1 - RUN_TIME_ALPHA) * metrics["avg_run_time_seconds"]
+                    )
+
+            calls = json_codec.loads(metrics["api_calls"])
+            for endpoint, count in (api_calls or {}).items():
+                calls[endpoint] = calls.get(endpoint, 0) + count
+            metrics["api_calls"] = _dumps(calls)
+
+            self._put_metrics(conn, metrics)
+            conn.execute(
+                "INSERT INTO run_history (workflow, timestamp, success, run_time_seconds, error_message)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (workflow, timestamp, int(success), run_time_seconds, error_message),
+            )
+        return self.workflow_metrics(workflow)
+
+    def _put_metrics(self, conn: sqlite3.Connection, metrics: Dict) -> None:
+        """Insert or replace a workflow_metrics row."""
+        conn.execute(
+            "INSERT OR REPLACE INTO workflow_metrics (workflow, total_runs, successful_runs,"
+            " failed_runs, consecutive_failures, last_success, last_failure,"
+            " last_run_time_seconds, avg_run_time_seconds, api_calls)"
+            " VALUES (:workflow, :total_runs, :successful_runs, :failed_runs,"
+            " :consecutive_failures, :last_success, :last_failure,"
+            " :last_run_time_seconds, :avg_run_time_seconds, :api_calls)",
+            metrics,
+        )
+
+    def workflow_metrics(self, workflow: str) -> Optional[Dict]:
+        """
+        Get a workflow's metrics.
+
+        Args:
+            workflow: Workflow name.
+
+        Returns:
+            Metrics in the data/metrics/<workflow>.json format (run_history
+            holds the last RUN_HISTORY_LIMIT runs), or None if unknown.
+        """
+        row = self.conn.execute(
+            "SELECT * FROM workflow_metrics WHERE workflow = ?", (workflow,)
+        ).fetchone()
+        if row is None:
+            return None
+        metrics = dict(row)
+        metrics["workflow_name"] = metrics.pop("workflow")
+        metrics["api_calls"] = json_codec.loads(metrics["api_calls"])
+        runs = self.recent_runs(RUN_HISTORY_LIMIT, workflow)
+        metrics["run_history"] = [
+            {key: run[key] for key in ("timestamp", "success", "run_time_seconds", "error_message")}
+            for run in reversed(runs)
+        ]
+        return metrics
+
+    def all_workflow_metrics(self) -> List[Dict]:
+        """
+        Get the metrics of every workflow.
+
+        Returns:
+            List of metrics dictionaries, sorted by workflow name.
+        """
+        names = [row[0] for row in self.conn.execute("SELECT workflow FROM workflow_metrics ORDER BY workflow")]
+        return [self.workflow_metrics(name) for name in names]
+
+    def recent_runs(self, limit: int = RUN_HISTORY_LIMIT, workflow: Optional[str] = None) -> List[Dict]:
+        """
+        Get the most recent runs, newest first.
+
+        Args:
+            limit: Maximum number of runs.
+            workflow: Only runs of this workflow (default: all workflows).
+
+        Returns:
+            Run dictionaries with workflow, timestamp, success,
+            run_time_seconds and error_message.
+        """
+        query = "SELECT workflow, timestamp, success, run_time_seconds, error_message FROM run_history"
+        params: tuple = ()
+        if workflow is not None:
+            query += " WHERE workflow = ?"
+            params = (workflow,)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        return [
+            dict(row, success=bool(row["success"]))
+            for row in self.conn.execute(query, params + (limit,))
+        ]
+
+    # ------------------------------------------------------------------
+    # Migration from the file-based state
+    # ------------------------------------------------------------------
+
+    def migrate_from_files(self, repo_root: Path = Path(".")) -> Dict[str, int]:
+        """
+        Import the file-based workflow metrics (data/metrics/*.json).
+
+        Rows are replaced, not duplicated, so running the migration again
+        brings the database up to date with the files.
+
+        Args:
+            repo_root: Repository root.
+
+        Returns:
+            Number of imported items per table.
+        """
+        repo_root = Path(repo_root)
+        counts = {"workflow_metrics": 0, "run_history": 0}
+
+        for metrics_file in sorted((repo_root / "data" / "metrics").glob("*.json")):
+            try:
+                metrics = json_codec.load_path(metrics_file)
+            except (OSError, json_codec.JSONDecodeError):
+                continue
+            workflow = metrics.get("workflow_name") or metrics_file.stem
+            with self.transaction() as conn:
+                self._put_metrics(conn, {
+                    "workflow": workflow,
+                    "total_runs": metrics.get("total_runs", 0),
+                    "successful_runs": metrics.get("successful_runs", 0),
+                    "failed_runs": metrics.get("failed_runs", 0),
+                    "consecutive_failures": metrics.get("consecutive_failures", 0),
+                    "last_success": metrics.get("last_success"),
+                    "last_failure": metrics.get("last_failure"),
+                    "last_run_time_seconds": metrics.get("last_run_time_seconds"),
+                    "avg_run_time_seconds": metrics.get("avg_run_time_seconds"),
+                    "api_calls": _dumps(metrics.get("api_calls") or {}),
+                })
+                conn.execute("DELETE FROM run_history WHERE workflow = ?", (workflow,))
+                runs = metrics.get("run_history") or []
+                conn.executemany(
+                    "INSERT INTO run_history (workflow, timestamp, success, run_time_seconds, error_message)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (workflow, run.get("timestamp"), int(bool(run.get("success"))),
+                         run.get("run_time_seconds"), run.get("error_message"))
+                        for run in runs
+                    ],
+                )
+            counts["workflow_metrics"] += 1
+            counts["run_history"] += len(runs)
+
+        return counts
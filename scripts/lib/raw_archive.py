@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Content-addressed archive of raw API responses (data/raw/).
+
+Fetchers used to write their raw responses to fixed debug files
+(oura/raw_*.json, developer/raw/stats_raw.json, debug_invalid_response_*.txt)
+that every run overwrote. The archive keeps them instead: each payload is
+compressed once and stored under its content hash, and a per-day manifest
+records which source/endpoint returned which payload when. Identical
+payloads (e.g. an unchanged daily_sleep response) are stored once, so
+history can be replayed offline at little disk cost.
+
+Layout:
+
+    data/raw/
+        objects/3f/3fa9...c1.zst        # payload bytes, zstd or gzip
+        manifests/2025/2025-12-03.json  # {"version": 1, "date": ...,
+                                        #  "entries": [{"source": "oura",
+                                        #   "name": "daily_sleep",
+                                        #   "hash": "3fa9...c1", ...}]}
+
+Payloads are compressed with zstd when the zstandard package is installed
+and with gzip otherwise; the codec is part of the object file name, so
+archives written with either can be read as long as the codec is available.
+"""
+
+import gzip
+import hashlib
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+    HAS_ZSTD = False
+
+try:
+    from . import json_codec
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    import json_codec  # type: ignore[no-redef]
+
+
+DEFAULT_ARCHIVE_DIR = Path("data") / "raw"
+MANIFEST_VERSION = 1
+
+# Object file suffix per codec, in lookup order
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+# Days of manifests kept by prune(); older payloads are dropped unless a
+# newer manifest still references them
+DEFAULT_KEEP_DAYS = 90
+
+ZSTD_LEVEL = 10
+
+# Errors raised by reading or decompressing a damaged object file
+_READ_ERRORS = (OSError, EOFError) + ((zstandard.ZstdError,) if HAS_ZSTD else ())
+
+
+class RawArchiveError(Exception):
+    """Raised when a payload cannot be stored or read."""
+    pass
+
+
+def _as_date(value: Union[date, datetime, str]) -> date:
+    """Convert a date, datetime or YYYY-MM-DD string to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def payload_hash(payload: bytes) -> str:
+    """
+    Compute the content hash a payload is stored under.
+
+    Args:
+        payload: Raw response bytes.
+
+    Returns:
+        32-character hex BLAKE2b digest.
+    """
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write a file so concurrent readers never see a partial one."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _compress(payload: bytes, codec: str) -> bytes:
+    """Compress a payload (gzip output is deterministic: no name or mtime)."""
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return gzip.compress(payload, compresslevel=9, mtime=0)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    """Decompress an object file."""
+    if codec == "zstd":
+        if not HAS_ZSTD:
+            raise RawArchiveError("zstd-compressed payload needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RawArchive:
+    """
+    Raw API responses stored by content hash, with per-day manifests.
+
+    Example:
+        archive = RawArchive(Path("data/raw"))
+        digest = archive.store("oura", "daily_sleep", response_bytes)
+        payload = archive.latest("oura", "daily_sleep", "2025-12-03")
+    """
+
+    def __init__(self, root: Path = DEFAULT_ARCHIVE_DIR, codec: Optional[str] = None):
+        """
+        Initialize the archive.
+
+        Args:
+            root: Archive directory.
+            codec: "zstd" or "gzip" for new objects (default: zstd when
+                installed, gzip otherwise).
+        """
+        if codec is None:
+            codec = "zstd" if HAS_ZSTD else "gzip"
+        if codec not in CODEC_SUFFIXES:
+            raise ValueError(f"Unknown codec: {codec!r} (expected one of {', '.join(CODEC_SUFFIXES)})")
+        if codec == "zstd" and not HAS_ZSTD:
+            raise RawArchiveError("zstd codec needs the zstandard package")
+        self.root = Path(root)
+        self.codec = codec
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        """Get the object file of a payload for a codec."""
+        return self.root / "objects" / digest[:2] / f"{digest}{CODEC_SUFFIXES[codec]}"
+
+    def _find_object(self, digest: str) -> Optional[Tuple[Path, str]]:
+        """Find the stored object of a payload, in any codec."""
+        for codec in CODEC_SUFFIXES:
+            path = self._object_path(digest, codec)
+            if path.exists():
+                return path, codec
+        return None
+
+    def load(self, digest: str) -> bytes:
+        """
+        Read a payload by content hash.
+
+        Args:
+            digest: Hash returned by store() or listed in a manifest.
+
+        Returns:
+            Payload bytes.
+
+        Raises:
+            RawArchiveError: If the payload is missing, unreadable or corrupt.
+        """
+        found = self._find_object(digest)
+        if found is None:
+            raise RawArchiveError(f"No archived payload {digest}")
+        path, codec = found
+        try:
+            payload = _decompress(path.read_bytes(), codec)
+        except _READ_ERRORS as e:
+            raise RawArchiveError(f"Cannot read {path}: {e}")
+        if payload_hash(payload) != digest:
+            raise RawArchiveError(f"Archived payload {digest} is corrupt")
+        return payload
+
+    # ------------------------------------------------------------------
+    # Manifests
+    # ------------------------------------------------------------------
+
+    def _manifest_path(self, day: date) -> Path:
+        """Get the manifest file of a day."""
+        return self.root / "manifests" / str(day.year) / f"{day.isoformat()}.json"
+
+    def entries(self, day: Union[date, datetime, str]) -> List[Dict]:
+        """
+        List the payloads recorded on a day.
+
+        Args:
+            day: Date (UTC).
+
+        Returns:
+            Manifest entries in the order they were recorded.
+        """
+        try:
+            manifest = json_codec.load_path(self._manifest_path(_as_date(day)))
+            return list(manifest.get("entries", []))
+        except (OSError, json_codec.JSONDecodeError, AttributeError):
+            return []
+
+    def days(self) -> List[date]:
+        """
+        List the days that have a manifest.
+
+        Returns:
+            Sorted dates.
+        """
+        days = []
+        for path in self.root.glob("manifests/*/*.json"):
+            try:
+                days.append(date.fromisoformat(path.stem))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def store(
+        self,
+        source: str,
+        name: str,
+        payload: Union[bytes, str],
+        status: str = "ok",
+        fetched_at: Optional[datetime] = None,
+    ) -> str:
+        """
+        Archive a raw response and record it in the day's manifest.
+
+        The payload is only written if no object with the same hash exists.
+        A fetch that returns the same payload as the previous fetch of the
+        same endpoint on that day only updates the entry's last_seen time.
+
+        Args:
+            source: Data source (e.g. "oura", "developer").
+            name: Endpoint or payload name (e.g. "daily_sleep").
+            payload: Response body.
+            status: "ok", or e.g. "invalid" for responses that failed validation.
+            fetched_at: Fetch time (default: now, UTC).
+
+        Returns:
+            Content hash of the payload.
+        """
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        timestamp = fetched_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+        digest = payload_hash(payload)
+
+        found = self._find_object(digest)
+        if found is None:
+            stored = _compress(payload, self.codec)
+            _write_atomic(self._object_path(digest, self.codec), stored)
+            stored_size = len(stored)
+        else:
+            stored_size = found[0].stat().st_size
+
+        day = fetched_at.date()
+        entries = self.entries(day)
+        previous = next(
+            (e for e in reversed(entries) if e["source"] == source and e["name"] == name),
+            None,
+        )
+        if previous and previous["hash"] == digest and previous.get("status") == status:
+            previous["last_seen"] = timestamp
+        else:
+            entries.append({
+                "source": source,
+                "name": name,
+                "hash": digest,
+                "status": status,
+                "size": len(payload),
+                "stored_size": stored_size,
+                "fetched_at": timestamp,
+                "last_seen": timestamp,
+            })
+
+        manifest = {"version": MANIFEST_VERSION, "date": day.isoformat(), "entries": entries}
+        _write_atomic(self._manifest_path(day), json_codec.dumps_bytes(manifest, indent=2))
+        return digest
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+
+    def history(
+        self,
+        source: str,
+        name: str,
+        start: Optional[Union[date, datetime, str]] = None,
+        end: Optional[Union[date, datetime, str]] = None,
+        status: Optional[str] = "ok",
+    ) -> Iterator[Tuple[Dict, bytes]]:
+        """
+        Replay the archived payloads of one endpoint in fetch order.
+
+        Args:
+            source: Data source.
+            name: Endpoint or payload name.
+            start: First day (default: first archived day).
+            end: Last day (default: last archived day).
+            status: Only entries with this status (None for all).
+
+        Yields:
+            Tuples of (manifest entry, payload bytes).
+        """
+        first = _as_date(start) if start else None
+        last = _as_date(end) if end else None
+        for day in self.days():
+            if (first and day < first) or (last and day > last):
+                continue
+            for entry in self.entries(day):
+                if entry["source"] != source or entry["name"] != name:
+                    continue
+                if status is not None and entry.get("status") != status:
+                    continue
+                yield entry, self.load(entry["hash"])
+
+    def latest(
+        self,
+        source: str,
+        name: str,
+        day: Optional[Union[date, datetime, str]] = None,
+    ) -> Optional[bytes]:
+        """
+        Get the newest valid payload of an endpoint as of a day.
+
+        Args:
+            source: Data source.
+            name: Endpoint or payload name.
+            day: Last day considered (default: any day).
+
+        Returns:
+            Payload bytes, or None if nothing was archived.
+        """
+        last = _as_date(day) if day else None
+        for manifest_day in reversed(self.days()):
+            if last and manifest_day > last:
+                continue
+            for entry in reversed(self.entries(manifest_day)):
+                if entry["source"] == source and entry["name"] == name and entry.get("status") == "ok":
+                    return self.load(entry["hash"])
+        return None
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def prune(
+        self,
+        keep_days: int = DEFAULT_KEEP_DAYS,
+        today: Optional[date] = None,
+    ) -> Tuple[int, int]:
+        """
+        Drop manifests older than keep_days and the payloads only they used.
+
+        Args:
+            keep_days: Number of most recent days whose manifests are kept.
+            today: Reference date (default: today, UTC).
+
+        Returns:
+            Tuple of (manifests removed, objects removed).
+        """
+        today = today or datetime.now(timezone.utc).date()
+        cutoff = today - timedelta(days=keep_days - 1)
+
+        manifests_removed = 0
+        for day in self.days():
+            if day < cutoff:
+                self._manifest_path(day).unlink()
+                manifests_removed += 1
+
+        referenced = {entry["hash"] for day in self.days() for entry in self.entries(day)}
+        objects_removed = 0
+        for path in self.root.glob("objects/*/*"):
+            digest = path.name.split(".", 1)[0]
+            if digest not in referenced:
+                path.unlink()
+                objects_removed += 1
+
+        for directory in list(self.root.glob("manifests/*")) + list(self.root.glob("objects/*")):
+            if directory.is_dir() and not any(directory.iterdir()):
+                directory.rmdir()
+        return manifests_removed, objects_removed
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Mergeable summary statistics for incremental aggregation.
+
+RunningStats keeps count, sum, sum of squares, minimum and maximum. Adding a
+value or merging two states is O(1), and the state serializes to a small
+dictionary, so a period summary can be extended one day at a time instead of
+being recomputed from every day in the period.
+
+Values cannot be removed (the minimum and maximum would be lost), so
+correcting a value that was already added means rebuilding the state.
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Union
+
+Number = Union[int, float]
+
+
+class RunningStats:
+    """
+    Count, sum, sum of squares, minimum and maximum of a stream of numbers.
+
+    Example:
+        stats = RunningStats()
+        for value in (80, 75, 90):
+            stats.add(value)
+        stats.mean()  # 81.67
+    """
+
+    __slots__ = ("count", "total", "total_sq", "minimum", "maximum")
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total: Number = 0
+        self.total_sq: Number = 0
+        self.minimum: Optional[Number] = None
+        self.maximum: Optional[Number] = None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RunningStats):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"RunningStats({self.to_dict()})"
+
+    def add(self, value: Optional[Number]) -> None:
+        """
+        Add a value. None and NaN are ignored.
+
+        Args:
+            value: Number to add.
+        """
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def update(self, values: Iterable[Optional[Number]]) -> "RunningStats":
+        """
+        Add several values.
+
+        Args:
+            values: Numbers to add.
+
+        Returns:
+            self, for chaining.
+        """
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Fold another state into this one.
+
+        Args:
+            other: Statistics of a disjoint set of values.
+
+        Returns:
+            self, for chaining.
+        """
+        if other.count:
+            self.count += other.count
+            self.total += other.total
+            self.total_sq += other.total_sq
+            if self.minimum is None or other.minimum < self.minimum:
+                self.minimum = other.minimum
+            if self.maximum is None or other.maximum > self.maximum:
+                self.maximum = other.maximum
+        return self
+
+    def mean(self) -> Optional[float]:
+        """Get the mean, or None if no values were added."""
+        return self.total / self.count if self.count else None
+
+    def variance(self) -> Optional[float]:
+        """Get the population variance, or None if no values were added."""
+        if not self.count:
+            return None
+        mean = self.total / self.count
+        return max(self.total_sq / self.count - mean * mean, 0.0)
+
+    def stdev(self) -> Optional[float]:
+        """Get the population standard deviation, or None if no values were added."""
+        variance = self.variance()
+        return math.sqrt(variance) if variance is not None else None
+
+    def to_dict(self) -> Dict[str, Optional[Number]]:
+        """Serialize the state."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "sum_sq": self.total_sq,
+            "min": self.minimum,
+            "max": self.maximum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RunningStats":
+        """
+        Restore a state serialized with to_dict().
+
+        Args:
+            data: Serialized state.
+
+        Returns:
+            RunningStats instance.
+        """
+        stats = cls()
+        stats.count = int(data.get("count", 0))
+        stats.total = data.get("sum", 0)
+        stats.total_sq = data.get("sum_sq", 0)
+        stats.minimum = data.get("min")
+        stats.maximum = data.get("max")
+        return stats
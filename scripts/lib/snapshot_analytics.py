@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Analytics over snapshot history: rolling means, percentiles, anomalies, trends.
+
+Metrics are read as whole columns from the metric store (one read per
+metric) and processed as arrays. NumPy is used when installed; otherwise an
+equivalent pure-Python implementation runs, so the results do not depend
+on which backend computed them.
+
+Missing days are NaN in the columns and are ignored by every statistic.
+"""
+
+import math
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+try:
+    from .metric_store import MetricStore
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    from metric_store import MetricStore  # type: ignore[no-redef]
+
+
+ANALYTICS_VERSION = 1
+
+# Analyzed metrics: name -> metric store column
+ANALYTICS_METRICS = {
+    "sleep": "health.sleep_score",
+    "readiness": "health.readiness_score",
+    "steps": "health.activity_steps",
+    "commits": "developer.commits_30d",
+}
+
+PERCENTILES = (10, 25, 50, 75, 90)
+ROLLING_WINDOWS = (7, 30)
+
+# Days of history analyzed, and the recent window the trend is fitted on
+DEFAULT_HISTORY_DAYS = 365
+TREND_DAYS = 30
+
+# |z| at or above which a day is flagged as an anomaly
+ANOMALY_THRESHOLD = 2.0
+
+Values = Union[array, Sequence[float]]
+
+
+def _use_numpy(use_numpy: Optional[bool]) -> bool:
+    """Resolve the backend choice (None = NumPy when installed)."""
+    return HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+
+
+def _valid(values: Values) -> List[float]:
+    """Values that are not NaN."""
+    return [v for v in values if not math.isnan(v)]
+
+
+def rolling_mean(values: Values, window: int, use_numpy: Optional[bool] = None) -> List[float]:
+    """
+    Trailing rolling mean that skips missing days.
+
+    Args:
+        values: Daily values, NaN for missing days.
+        window: Window length in days.
+        use_numpy: Force the backend (default: NumPy when installed).
+
+    Returns:
+        One mean per day over that day and the window - 1 days before it;
+        NaN where the window has no values.
+    """
+    if _use_numpy(use_numpy):
+        data = np.asarray(values, dtype=float)
+        valid = ~np.isnan(data)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(valid, data, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(valid)))
+        window_sums = sums[1:] - sums[np.maximum(np.arange(1, len(data) + 1) - window, 0)]
+        window_counts = counts[1:] - counts[np.maximum(np.arange(1, len(data) + 1) - window, 0)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(window_counts > 0, window_sums / np.maximum(window_counts, 1), np.nan).tolist()
+
+    result = []
+    total, count = 0.0, 0
+    for i, value in enumerate(values):
+        if not math.isnan(value):
+            total += value
+            count += 1
+        if i >= window and not math.isnan(values[i - window]):
+            total -= values[i - window]
+            count -= 1
+        result.append(total / count if count else math.nan)
+    return result
+
+
+def percentiles(
+    values: Values,
+    qs: Sequence[float] = PERCENTILES,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, Optional[float]]:
+    """
+    Percentiles with linear interpolation, ignoring missing days.
+
+    Args:
+        values: Daily values, NaN for missing days.
+        qs: Percentiles to compute (0-100).
+        use_numpy: Force the backend (default: NumPy when installed).
+
+    Returns:
+        Dictionary like {"p50": 81.0}; values are None if there is no data.
+    """
+    if _use_numpy(use_numpy):
+        data = np.asarray(values, dtype=float)
+        data = data[~np.isnan(data)]
+        if not data.size:
+            return {f"p{q:g}": None for q in qs}
+        return {f"p{q:g}": float(v) for q, v in zip(qs, np.percentile(data, qs))}
+
+    data = sorted(_valid(values))
+    result: Dict[str, Optional[float]] = {}
+    for q in qs:
+        if not data:
+            result[f"p{q:g}"] = None
+            continue
+        position = (len(data) - 1) * q / 100
+        lower = math.floor(position)
+        upper = min(lower + 1, len(data) - 1)
+        result[f"p{q:g}"] = data[lower] + (data[upper] - data[lower]) * (position - lower)
+    return result
+
+
+def zscores(values: Values, use_numpy: Optional[bool] = None) -> List[float]:
+    """
+    Standard scores against the mean and population deviation of the values.
+
+    Args:
+        values: Daily values, NaN for missing days.
+        use_numpy: Force the backend (default: NumPy when installed).
+
+    Returns:
+        One z-score per day; NaN for missing days, 0 if the values are constant.
+    """
+    if _use_numpy(use_numpy):
+        data = np.asarray(values, dtype=float)
+        if np.isnan(data).all():
+            return [math.nan] * len(data)
+        mean = np.nanmean(data)
+        std = np.nanstd(data)
+        if std == 0:
+            return np.where(np.isnan(data), np.nan, 0.0).tolist()
+        return ((data - mean) / std).tolist()
+
+    data = _valid(values)
+    if not data:
+        return [math.nan] * len(values)
+    mean = sum(data) / len(data)
+    std = math.sqrt(sum((v - mean) ** 2 for v in data) / len(data))
+    return [
+        math.nan if math.isnan(v) else (0.0 if std == 0 else (v - mean) / std)
+        for v in values
+    ]
+
+
+def trend_slope(values: Values, use_numpy: Optional[bool] = None) -> Optional[float]:
+    """
+    Least-squares slope of the values against the day number.
+
+    Args:
+        values: Daily values, NaN for missing days.
+        use_numpy: Force the backend (default: NumPy when installed).
+
+    Returns:
+        Change per day, or None with fewer than two values.
+    """
+    if _use_numpy(use_numpy):
+        data = np.asarray(values, dtype=float)
+        days = np.arange(len(data), dtype=float)
+        valid = ~np.isnan(data)
+        if valid.sum() < 2:
+            return None
+        x, y = days[valid], data[valid]
+        x_centered = x - x.mean()
+        return float((x_centered * (y - y.mean())).sum() / (x_centered ** 2).sum())
+
+    points = [(float(i), v) for i, v in enumerate(values) if not math.isnan(v)]
+    if len(points) < 2:
+        return None
+    x_mean = sum(x for x, _ in points) / len(points)
+    y_mean = sum(y for _, y in points) / len(points)
+    numerator = sum((x - x_mean) * (y - y_mean) for x, y in points)
+    denominator = sum((x - x_mean) ** 2 for x, _ in points)
+    return numerator / denominator
+
+
+def _rounded(value: Optional[float], digits: int = 2) -> Optional[float]:
+    """Round a statistic, mapping NaN to None."""
+    if value is None or math.isnan(value):
+        return None
+    return round(value, digits)
+
+
+def analyze_metric(
+    dates: List[date],
+    values: Values,
+    use_numpy: Optional[bool] = None,
+    anomaly_threshold: float = ANOMALY_THRESHOLD,
+    trend_days: int = TREND_DAYS,
+) -> Dict:
+    """
+    Compute all analytics for one metric column.
+
+    Args:
+        dates: One date per value.
+        values: Daily values, NaN for missing days.
+        use_numpy: Force the backend (default: NumPy when installed).
+        anomaly_threshold: |z| at or above which a day is an anomaly.
+        trend_days: Most recent days the trend slope is fitted on.
+
+    Returns:
+        Dictionary with count, latest, mean_7d, mean_30d, percentiles,
+        trend_per_week, anomalies and the rolling_7d/rolling_30d series.
+    """
+    present = _valid(values)
+    rolling = {window: rolling_mean(values, window, use_numpy) for window in ROLLING_WINDOWS}
+    scores = zscores(values, use_numpy)
+    slope = trend_slope(values[-trend_days:], use_numpy)
+
+    return {
+        "count": len(present),
+        "latest": _rounded(present[-1]) if present else None,
+        "mean_7d": _rounded(rolling[7][-1]) if values else None,
+        "mean_30d": _rounded(rolling[30][-1]) if values else None,
+        "percentiles": {name: _rounded(v) for name, v in percentiles(values, use_numpy=use_numpy).items()},
+        "trend_per_week": _rounded(slope * 7) if slope is not None else None,
+        "anomalies": [
+            {"date": day.isoformat(), "value": _rounded(value), "z": _rounded(score)}
+            for day, value, score in zip(dates, values, scores)
+            if not math.isnan(score) and abs(score) >= anomaly_threshold
+        ],
+        "rolling_7d": [_rounded(v) for v in rolling[7]],
+        "rolling_30d": [_rounded(v) for v in rolling[30]],
+    }
+
+
+def compute_snapshot_analytics(
+    store: MetricStore,
+    end: Optional[date] = None,
+    days: int = DEFAULT_HISTORY_DAYS,
+    metrics: Optional[Dict[str, str]] = None,
+    use_numpy: Optional[bool] = None,
+) -> Dict:
+    """
+    Analyze the recent history of the tracked metrics.
+
+    Args:
+        store: Metric store to read columns from.
+        end: Last day analyzed (default: today, UTC).
+        days: Number of days analyzed, ending at end.
+        metrics: {name: column} to analyze (default: ANALYTICS_METRICS).
+        use_numpy: Force the backend (default: NumPy when installed).
+
+    Returns:
+        JSON-serializable analytics document.
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = end - timedelta(days=days - 1)
+    metrics = metrics or ANALYTICS_METRICS
+
+    dates, columns = store.read_columns(metrics.values(), start, end)
+    return {
+        "version": ANALYTICS_VERSION,
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "backend": "numpy" if _use_numpy(use_numpy) else "python",
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "dates": [day.isoformat() for day in dates],
+        "metrics": {
+            name: dict(column=column, **analyze_metric(dates, columns[column], use_numpy))
+            for name, column in metrics.items()
+        },
+    }
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Manifest of stored historical snapshots (data/snapshots/index.json).
+
+Every snapshot write updates the manifest, so readers can answer "latest
+weekly summary" or "daily snapshots between two dates" from one small file
+instead of listing directories or probing the filesystem day by day.
+
+Layout:
+
+    {
+      "version": 1,
+      "daily": {
+        "2025-12-03": {"path": "daily/2025/12/2025-12-03.json",
+                       "metrics": ["health.sleep_score", ...]},
+        "2025-01-30": {"path": "archive/2025/2025-01.jsonl.gz", ...}
+      },
+      "weekly":  {"2025-W49": {"path": "weekly/2025-W49.json",
+                               "start_date": ..., "end_date": ...,
+                               "days_count": 3, "metrics": [...]}},
+      "monthly": {...},
+      "yearly":  {...}
+    }
+
+Paths are relative to the snapshot directory. "metrics" lists the fields
+that have a value in the file, so coverage questions need no file reads.
+
+The manifest is rewritten atomically (temp file + rename), so readers never
+see a partial index. If it is missing it is rebuilt by scanning once, and
+likewise if the newest daily month directory changed after the index was
+written (daily files added by something that didn't update the index).
+"""
+
+import gzip
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from . import json_codec
+    from .metric_store import flatten_snapshot
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    import json_codec  # type: ignore[no-redef]
+    from metric_store import flatten_snapshot  # type: ignore[no-redef]
+
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+PERIODS = ("weekly", "monthly", "yearly")
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+
+def _newest_daily_dir(root: Path) -> Optional[Path]:
+    """Find the newest daily/<year>/<month> directory without walking the tree."""
+    directory = root / "daily"
+    for _ in range(2):
+        try:
+            names = [name for name in os.listdir(directory) if name.isdigit()]
+        except OSError:
+            return None
+        if not names:
+            return None
+        directory = directory / max(names)
+    return directory
+
+
+def _period_metrics(summary: Dict) -> List[str]:
+    """List the summary fields that have a value."""
+    return sorted(
+        f"{section}.{field}"
+        for section in ("health", "developer")
+        for field, value in (summary.get(section) or {}).items()
+        if value is not None
+    )
+
+
+class SnapshotIndex:
+    """
+    In-memory view of index.json with atomic persistence.
+
+    Example:
+        index = SnapshotIndex.load(Path("data/snapshots"))
+        name, entry = index.latest("weekly")
+        days = index.daily_range("2025-01-01", "2025-01-31")
+    """
+
+    def __init__(self, root: Path, data: Optional[Dict] = None):
+        """
+        Initialize the index.
+
+        Args:
+            root: Snapshot directory the index describes.
+            data: Parsed index.json contents (default: empty index).
+        """
+        self.root = Path(root)
+        data = data or {}
+        self.daily: Dict[str, Dict] = dict(data.get("daily", {}))
+        self.periods: Dict[str, Dict[str, Dict]] = {
+            period: dict(data.get(period, {})) for period in PERIODS
+        }
+
+    @classmethod
+    def load(cls, root: Path) -> "SnapshotIndex":
+        """
+        Load the index of a snapshot directory, rebuilding it if needed.
+
+        A missing, unreadable, outdated or stale index is rebuilt in memory
+        by scanning the directory; call save() to persist it.
+
+        Args:
+            root: Snapshot directory.
+
+        Returns:
+            SnapshotIndex instance.
+        """
+        path = Path(root) / INDEX_FILE
+        try:
+            data = json_codec.load_path(path)
+            if isinstance(data, dict) and data.get("version") == INDEX_VERSION and not cls._is_stale(path):
+                return cls(root, data)
+        except (OSError, json_codec.JSONDecodeError):
+            pass
+        return cls.rebuild(root)
+
+    @staticmethod
+    def _is_stale(index_path: Path) -> bool:
+        """
+        Check whether daily files were added after the index was written.
+
+        Writers save the index after the daily file, so a newest month
+        directory modified later than index.json means a day was stored
+        without updating it. Costs two small listings and two stats.
+        """
+        newest = _newest_daily_dir(index_path.parent)
+        if newest is None:
+            return False
+        try:
+            return os.stat(newest).st_mtime_ns > os.stat(index_path).st_mtime_ns
+        except OSError:
+            return False
+
+    @classmethod
+    def rebuild(cls, root: Path) -> "SnapshotIndex":
+        """
+        Build the index by scanning a snapshot directory.
+
+        Args:
+            root: Snapshot directory.
+
+        Returns:
+            SnapshotIndex instance (not saved).
+        """
+        index = cls(root)
+        root = Path(root)
+
+        for archive_file in sorted(root.glob(f"archive/*/*{ARCHIVE_SUFFIX}")):
+            try:
+                with gzip.open(archive_file, "rb") as f:
+                    for line in f:
+                        if line.strip():
+                            index.record_daily(json_codec.loads(line), archive_file)
+            except (OSError, EOFError, json_codec.JSONDecodeError):
+                continue
+
+        for daily_file in sorted(root.glob("daily/*/*/*.json")):
+            try:
+                snapshot = json_codec.load_path(daily_file)
+            except (OSError, json_codec.JSONDecodeError):
+                continue
+            if isinstance(snapshot, dict) and snapshot.get("date"):
+                index.record_daily(snapshot, daily_file)
+
+        for period in PERIODS:
+            for summary_file in sorted(root.glob(f"{period}/*.json")):
+                try:
+                    summary = json_codec.load_path(summary_file)
+                except (OSError, json_codec.JSONDecodeError):
+                    continue
+                if isinstance(summary, dict):
+                    index.record_period(period, summary_file.stem, summary_file, summary)
+
+        return index
+
+    def save(self) -> None:
+        """Write index.json atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "daily": dict(sorted(self.daily.items()))}
+        for period in PERIODS:
+            data[period] = dict(sorted(self.periods[period].items()))
+
+        path = self.root / INDEX_FILE
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json_codec.dumps_bytes(data, indent=2))
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _relative(self, path: Union[str, Path]) -> str:
+        """Express a path relative to the snapshot directory."""
+        path = Path(path)
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def record_daily(self, snapshot: Dict, path: Union[str, Path]) -> None:
+        """
+        Record where a daily snapshot is stored and which metrics it has.
+
+        Args:
+            snapshot: Daily snapshot (needs "date").
+            path: Daily file or month archive holding it.
+        """
+        self.daily[snapshot["date"]] = {
+            "path": self._relative(path),
+            "metrics": sorted(flatten_snapshot(snapshot)),
+        }
+
+    def record_period(self, period: str, name: str, path: Union[str, Path], summary: Dict) -> None:
+        """
+        Record a weekly, monthly or yearly summary.
+
+        Args:
+            period: "weekly", "monthly" or "yearly".
+            name: Period name (e.g. "2025-W49", "2025-12", "2025").
+            path: Summary file.
+            summary: Summary contents.
+        """
+        self.periods[period][name] = {
+            "path": self._relative(path),
+            "start_date": summary.get("start_date"),
+            "end_date": summary.get("end_date"),
+            "days_count": summary.get("days_count"),
+            "metrics": _period_metrics(summary),
+        }
+
+    def path(self, entry: Dict) -> Path:
+        """Resolve an entry's path against the snapshot directory."""
+        return self.root / entry["path"]
+
+    def latest(self, period: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Get the newest summary of a period type.
+
+        Args:
+            period: "weekly", "monthly" or "yearly".
+
+        Returns:
+            Tuple of (name, entry), or None if there is none.
+        """
+        entries = self.periods.get(period) or {}
+        if not entries:
+            return None
+        name = max(entries)
+        return name, entries[name]
+
+    def daily_range(self, start: str, end: str) -> List[Tuple[str, Dict]]:
+        """
+        Get the stored days in a date range.
+
+        Args:
+            start: First date (YYYY-MM-DD, inclusive).
+            end: Last date (YYYY-MM-DD, inclusive).
+
+        Returns:
+            Sorted list of (date, entry).
+        """
+        return sorted(
+            (day, entry) for day, entry in self.daily.items() if start <= day <= end
+        )
+
+    def latest_daily(self) -> Optional[Tuple[str, Dict]]:
+        """Get the newest stored day as (date, entry), or None."""
+        if not self.daily:
+            return None
+        day = max(self.daily)
+        return day, self.daily[day]
+
+    def coverage(self, metric: str) -> List[str]:
+        """
+        List the days that have a value for a metric.
+
+        Args:
+            metric: Metric name (e.g. "health.sleep_score").
+
+        Returns:
+            Sorted dates.
+        """
+        return sorted(day for day, entry in self.daily.items() if metric in entry["metrics"])
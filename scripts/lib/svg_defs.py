@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Registry for shared SVG definitions (gradients, filters, patterns).
+
+Generators register the definitions they need while rendering and get back
+the ID to reference. Definitions are interned by content, so identical
+gradients or filters requested by different panels of a composed dashboard
+are emitted once per document under a single ID. Callers may ask for a
+well-known ID (e.g. "bg-gradient"); anonymous definitions get short IDs
+assigned in registration order, so output is stable between runs.
+
+When rendering, definitions that the document never references can be left
+out, which keeps unused filters out of the output entirely.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.etree import ElementTree as ET
+
+try:
+    from .utils import escape_xml
+except ImportError:
+    # Imported as a top-level module (scripts that put lib/ on sys.path)
+    from utils import escape_xml  # type: ignore[no-redef]
+
+
+# Prefixes for generated IDs, by element name
+ID_PREFIXES = {
+    "linearGradient": "g",
+    "radialGradient": "g",
+    "filter": "f",
+    "pattern": "p",
+    "clipPath": "c",
+    "mask": "m",
+}
+
+_BETWEEN_TAGS_RE = re.compile(r">\s+<")
+_EMPTY_TAG_END_RE = re.compile(r"\s+/>")
+_REFERENCE_RE = re.compile(r'url\(#([^)\s]+)\)|href="#([^"]+)"')
+
+
+def _normalize_markup(markup: str) -> str:
+    """Normalize child markup so formatting differences don't defeat interning."""
+    return _EMPTY_TAG_END_RE.sub("/>", _BETWEEN_TAGS_RE.sub("><", markup.strip()))
+
+
+class DefsRegistry:
+    """
+    Interns SVG definitions by content and renders them as one <defs> block.
+
+    Example:
+        defs = DefsRegistry()
+        glow = defs.glow_filter(2)
+        content = f'<text filter="url(#{glow})">Hi</text>'
+        svg = f'<svg ...>{defs.render(used_in=content)}{content}</svg>'
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._markup: Dict[str, str] = {}
+        self._ids_by_key: Dict[Tuple, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._counters: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._markup)
+
+    def __contains__(self, def_id: str) -> bool:
+        return def_id in self._markup or def_id in self._aliases
+
+    def _next_id(self, tag: str) -> str:
+        """Generate the next unused short ID for an element type."""
+        prefix = ID_PREFIXES.get(tag, "d")
+        while True:
+            index = self._counters.get(prefix, 0)
+            self._counters[prefix] = index + 1
+            candidate = f"{prefix}{index}"
+            if candidate not in self:
+                return candidate
+
+    def register(
+        self,
+        tag: str,
+        attrs: Optional[Dict[str, object]] = None,
+        children: str = "",
+        def_id: Optional[str] = None,
+    ) -> str:
+        """
+        Register a definition and get the ID to reference it by.
+
+        Args:
+            tag: Element name (e.g. 'linearGradient', 'filter').
+            attrs: Element attributes, excluding id.
+            children: Child markup.
+            def_id: Preferred ID. Ignored if identical content is already
+                    registered, in which case the preferred ID becomes an
+                    alias resolved by rewrite_references().
+
+        Returns:
+            ID of the interned definition.
+        """
+        attrs = {name: str(value) for name, value in (attrs or {}).items() if name != "id"}
+        children = _normalize_markup(children)
+        key = (tag, tuple(sorted(attrs.items())), children)
+
+        existing = self._ids_by_key.get(key)
+        if existing is not None:
+            if def_id and def_id != existing and def_id not in self:
+                self._aliases[def_id] = existing
+            return existing
+
+        if not def_id or def_id in self:
+            def_id = self._next_id(tag)
+
+        attr_markup = "".join(f' {name}="{escape_xml(value)}"' for name, value in attrs.items())
+        self._markup[def_id] = f'<{tag} id="{def_id}"{attr_markup}>{children}</{tag}>'
+        self._ids_by_key[key] = def_id
+        return def_id
+
+    def register_markup(self, markup: str) -> List[str]:
+        """
+        Register every top-level element of a defs fragment.
+
+        Elements keep their own id as the preferred ID. Markup that is not
+        well-formed XML (e.g. uses undeclared namespace prefixes) cannot be
+        interned and raises ValueError, so callers can fall back to emitting
+        it verbatim.
+
+        Args:
+            markup: Definitions markup, as it would appear inside <defs>.
+
+        Returns:
+            IDs of the registered definitions, in document order.
+
+        Raises:
+            ValueError: If the markup cannot be parsed.
+        """
+        try:
+            fragment = ET.fromstring(f"<defs>{markup}</defs>")
+        except ET.ParseError as e:
+            raise ValueError(f"Cannot parse defs markup: {e}") from e
+
+        ids = []
+        for element in fragment:
+            children = (element.text or "") + "".join(
+                ET.tostring(child, encoding="unicode") for child in element
+            )
+            ids.append(self.register(element.tag, dict(element.attrib), children, element.get("id")))
+        return ids
+
+    def linear_gradient(
+        self,
+        stops: Sequence[Tuple[str, str]],
+        x1: str = "0%",
+        y1: str = "0%",
+        x2: str = "100%",
+        y2: str = "100%",
+        def_id: Optional[str] = None,
+    ) -> str:
+        """
+        Register a linear gradient.
+
+        Args:
+            stops: Sequence of (offset, color) pairs.
+            x1, y1, x2, y2: Gradient vector (default: diagonal).
+            def_id: Preferred ID.
+
+        Returns:
+            ID of the interned gradient.
+        """
+        children = "".join(
+            f'<stop offset="{offset}" style="stop-color:{color}"/>' for offset, color in stops
+        )
+        return self.register(
+            "linearGradient", {"x1": x1, "y1": y1, "x2": x2, "y2": y2}, children, def_id
+        )
+
+    def glow_filter(self, std_deviation: float = 2, def_id: Optional[str] = None) -> str:
+        """
+        Register a glow filter (blurred copy merged under the source).
+
+        Args:
+            std_deviation: Blur radius.
+            def_id: Preferred ID.
+
+        Returns:
+            ID of the interned filter.
+        """
+        children = (
+            f'<feGaussianBlur stdDeviation="{std_deviation}" result="coloredBlur"/>'
+            '<feMerge><feMergeNode in="coloredBlur"/><feMergeNode in="SourceGraphic"/></feMerge>'
+        )
+        return self.register(
+            "filter", {"x": "-20%", "y": "-20%", "width": "140%", "height": "140%"}, children, def_id
+        )
+
+    def shadow_filter(
+        self,
+        dx: float = 0,
+        dy: float = 2,
+        std_deviation: float = 3,
+        flood_opacity: float = 0.3,
+        def_id: Optional[str] = None,
+    ) -> str:
+        """
+        Register a drop shadow filter.
+
+        Args:
+            dx: Horizontal offset.
+            dy: Vertical offset.
+            std_deviation: Blur radius.
+            flood_opacity: Shadow opacity.
+            def_id: Preferred ID.
+
+        Returns:
+            ID of the interned filter.
+        """
+        children = (
+            f'<feDropShadow dx="{dx}" dy="{dy}" stdDeviation="{std_deviation}" '
+            f'flood-opacity="{flood_opacity}"/>'
+        )
+        return self.register(
+            "filter", {"x": "-20%", "y": "-20%", "width": "140%", "height": "140%"}, children, def_id
+        )
+
+    def resolve(self, def_id: str) -> str:
+        """
+        Resolve an alias to the ID the definition is emitted under.
+
+        Args:
+            def_id: Registered ID or alias.
+
+        Returns:
+            Emitted ID.
+        """
+        return self._aliases.get(def_id, def_id)
+
+    def rewrite_references(self, markup: str) -> str:
+        """
+        Point url(#alias) and href="#alias" references at the emitted IDs.
+
+        Args:
+            markup: SVG markup referencing definitions.
+
+        Returns:
+            Markup with aliased references rewritten.
+        """
+        if not self._aliases:
+            return markup
+
+        def replace(match: re.Match) -> str:
+            if match.group(1) is not None:
+                return f"url(#{self.resolve(match.group(1))})"
+            return f'href="#{self.resolve(match.group(2))}"'
+
+        return _REFERENCE_RE.sub(replace, markup)
+
+    def _referenced_ids(self, markup: str) -> set:
+        """Collect registered IDs referenced by markup, including via other definitions."""
+        pending = [markup]
+        found = set()
+        while pending:
+            for match in _REFERENCE_RE.finditer(pending.pop()):
+                def_id = self.resolve(match.group(1) or match.group(2))
+                if def_id in self._markup and def_id not in found:
+                    found.add(def_id)
+                    pending.append(self._markup[def_id])
+        return found
+
+    def render(self, indent: str = "  ", used_in: Optional[str] = None, extra: str = "") -> str:
+        """
+        Render the registered definitions as a <defs> block.
+
+        Args:
+            indent: Indentation of the <defs> element.
+            used_in: If given, only definitions referenced by this markup
+                     (directly or through other definitions) are emitted.
+            extra: Markup appended to the block verbatim (e.g. definitions
+                   that could not be interned).
+
+        Returns:
+            The <defs> block, or an empty string if nothing is emitted.
+        """
+        if used_in is None:
+            ids = list(self._markup)
+        else:
+            referenced = self._referenced_ids(used_in)
+            ids = [def_id for def_id in self._markup if def_id in referenced]
+
+        if not ids and not extra:
+            return ""
+
+        lines = [f"{indent}<defs>"]
+        lines.extend(f"{indent}  {self._markup[def_id]}" for def_id in ids)
+        if extra:
+            lines.append(extra)
+        lines.append(f"{indent}</defs>")
+        return "\n".join(lines)
@@ -323,7 +323,7 @@ def generate_dashboard_svg(output_path: str = "dashboard.svg") -> None:
     timestamp = datetime.now(timezone.utc).strftime("Updated: %Y-%m-%d %H:%M UTC")
 
     # Generate SVG
-    svg_content = card.generate_svg(footer_text=timestamp)
+    svg_content = card.generate_svg(footer_text=timestamp, footer_volatile=True)
 
     # Write to file
     card.write_svg(output_path, svg_content)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Manage the optional SQLite metrics store (see lib/ops_store.py).
+
+Usage:
+    python ops-store.py migrate              # import data/metrics
+    python ops-store.py runs --limit 20      # last runs of all workflows
+    python ops-store.py metrics oura         # one workflow's metrics as JSON
+
+Set OPS_DB_PATH to the database path to make record-workflow-metrics.py
+write every run to the store as well.
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib import json_codec
+from lib.ops_store import DEFAULT_DB_PATH, RUN_HISTORY_LIMIT, OpsStore
+
+
+def main() -> None:
+    """Parse arguments and run the store command."""
+    parser = argparse.ArgumentParser(description="SQLite workflow metrics store")
+    parser.add_argument(
+        "--db",
+        default=str(DEFAULT_DB_PATH),
+        help=f"Database file (default: {DEFAULT_DB_PATH})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Import data/metrics")
+    migrate.add_argument("--root", default=".", help="Repository root (default: current directory)")
+
+    runs = commands.add_parser("runs", help="List recent workflow runs")
+    runs.add_argument("--limit", type=int, default=RUN_HISTORY_LIMIT, help="Number of runs")
+    runs.add_argument("--workflow", help="Only runs of this workflow")
+
+    metrics = commands.add_parser("metrics", help="Print workflow metrics as JSON")
+    metrics.add_argument("workflow", nargs="?", help="Workflow name (default: all)")
+
+    args = parser.parse_args()
+
+    try:
+        with OpsStore(Path(args.db)) as store:
+            if args.command == "migrate":
+                counts = store.migrate_from_files(Path(args.root))
+                summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+                print(f"✅ Migrated into {args.db}: {summary}")
+
+            elif args.command == "runs":
+                for run in store.recent_runs(args.limit, args.workflow):
+                    status = "✅" if run["success"] else "❌"
+                    duration = f"{run['run_time_seconds']:.1f}s" if run["run_time_seconds"] is not None else "-"
+                    error = f"  {run['error_message']}" if run["error_message"] else ""
+                    print(f"{run['timestamp']}  {status} {run['workflow']:<16} {duration:>8}{error}")
+
+            elif args.command == "metrics":
+                if args.workflow:
+                    data = store.workflow_metrics(args.workflow)
+                    if data is None:
+                        print(f"❌ No metrics for workflow: {args.workflow}", file=sys.stderr)
+                        sys.exit(1)
+                else:
+                    data = store.all_workflow_metrics()
+                print(json_codec.dumps(data, indent=2))
+
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,60 @@
 Oura Mood Engine - Compute mood classification from Oura Ring metrics.
 This script reads normalized Oura metrics from JSON and computes a mood state
 based on sleep, readiness, activity, HRV, resting HR, and temperature deviation.
+
+With --history it computes mood scores and categories for every stored day
+at once from the snapshot metric columns, and caches the result next to the
+snapshot history (recomputed only when the inputs or weights change).
 """
 
+import hashlib
 import json
+import math
+import os
 import sys
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Any, Dict
-
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+from lib import json_codec
+from lib.metric_store import MetricStore
 from lib.utils import safe_get, load_json
 
 
+# Mood score weights; sleep and readiness are most important. Inverted
+# inputs contribute (100 - value), e.g. a lower resting HR is better.
+MOOD_WEIGHTS = {
+    "sleep_score": 0.30,
+    "readiness_score": 0.30,
+    "activity_score": 0.15,
+    "hrv": 0.10,
+    "resting_hr": 0.05,
+    "temp_deviation": 0.10,
+}
+INVERTED_INPUTS = {"resting_hr"}
+
+# Snapshot metric columns the mood inputs are read from for --history
+MOOD_HISTORY_COLUMNS = {
+    "sleep_score": "health.sleep_score",
+    "readiness_score": "health.readiness_score",
+    "activity_score": "health.activity_score",
+    "hrv": "health.readiness_hrv",
+    "resting_hr": "health.resting_hr",
+    "temp_deviation": "health.readiness_body_temp",
+}
+
+# Bump when scoring or classification changes so cached history is recomputed
+MOOD_HISTORY_VERSION = 1
+MOOD_HISTORY_FILE = "mood_history.json"
+
+
 # Mood definitions with thresholds and visual attributes
 MOOD_CATEGORIES = {
     "cosmic_clarity": {
@@ -78,23 +121,12 @@ def compute_mood_score(metrics: Dict[str, Any]) -> float:
     Compute overall mood score from 0-100 based on metrics.
     Higher score = better overall state.
     """
-    sleep_score = normalize_score(metrics.get("sleep_score"))
-    readiness_score = normalize_score(metrics.get("readiness_score"))
-    activity_score = normalize_score(metrics.get("activity_score"))
-    hrv = normalize_score(metrics.get("hrv"))
-    resting_hr = normalize_score(metrics.get("resting_hr"))
-    temp_deviation = normalize_score(metrics.get("temp_deviation"))
-
     # Weighted average - sleep and readiness are most important
     # For resting HR, lower is generally better (invert the contribution)
-    score = (
-        sleep_score * 0.30
-        + readiness_score * 0.30
-        + activity_score * 0.15
-        + hrv * 0.10
-        + (100 - resting_hr) * 0.05  # Lower HR is better
-        + temp_deviation * 0.10
-    )
+    score = 0.0
+    for name, weight in MOOD_WEIGHTS.items():
+        value = normalize_score(metrics.get(name))
+        score += (100 - value if name in INVERTED_INPUTS else value) * weight
 
     return round(max(0, min(100, score)), 1)
 
@@ -228,17 +260,203 @@ def compute_mood(metrics: dict) -> dict:
     }
 
 
+# ============================================================================
+# Batch computation over history
+# ============================================================================
+
+def _normalize_column(values: Sequence[Any]) -> List[float]:
+    """Apply normalize_score() to a column; NaN counts as missing."""
+    return [
+        50.0 if isinstance(v, float) and math.isnan(v) else normalize_score(v)
+        for v in values
+    ]
+
+
+def compute_mood_batch(
+    columns: Mapping[str, Sequence[Any]],
+    weights: Optional[Mapping[str, float]] = None,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, List]:
+    """
+    Compute mood scores and categories for many days at once.
+
+    Gives the same results as compute_mood_score() and classify_mood() per
+    day. Missing inputs (None, NaN or absent columns) count as neutral.
+
+    Args:
+        columns: Input name (see MOOD_WEIGHTS) -> one value per day.
+        weights: Score weights (default: MOOD_WEIGHTS).
+        use_numpy: Force the backend (default: NumPy when installed).
+
+    Returns:
+        {"mood_score": [float, ...], "mood_key": [str, ...]}
+
+    Raises:
+        ValueError: If weights name an input that is not in MOOD_WEIGHTS.
+    """
+    weights = weights or MOOD_WEIGHTS
+    unknown = sorted(set(weights) - set(MOOD_WEIGHTS))
+    if unknown:
+        raise ValueError(f"Unknown mood weight(s): {', '.join(unknown)} (expected {', '.join(MOOD_WEIGHTS)})")
+
+    length = max((len(values) for values in columns.values()), default=0)
+    inputs = {}
+    for name in MOOD_WEIGHTS:
+        # Columns may be NumPy arrays, whose truth value is ambiguous
+        values = columns.get(name)
+        inputs[name] = _normalize_column([None] * length if values is None else values)
+
+    if HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY):
+        data = {name: np.asarray(values, dtype=float) for name, values in inputs.items()}
+        score = np.zeros(length)
+        for name, weight in weights.items():
+            score = score + (100 - data[name] if name in INVERTED_INPUTS else data[name]) * weight
+        scores = np.clip(score, 0, 100).tolist()
+
+        sleep, readiness = data["sleep_score"], data["readiness_score"]
+        activity, hrv = data["activity_score"], data["hrv"]
+        # Same decision tree as classify_mood(), first match wins
+        keys = np.select(
+            [
+                (sleep >= 80) & (readiness >= 80) & (hrv >= 70),
+                (readiness >= 75) & (activity >= 70),
+                (sleep >= 75) & (readiness < 70) & (activity < 60),
+                (activity >= 80) & ((readiness < 60) | (sleep < 60)),
+                (sleep < 50) | (readiness < 50),
+                (sleep >= 70) & (readiness >= 60) & (activity < 70),
+            ],
+            [
+                "cosmic_clarity", "solar_focus", "restorative_drift",
+                "chaotic_overdrive", "storm_state", "energetic_compression",
+            ],
+            default="quiet_neutrality",
+        ).tolist()
+    else:
+        scores, keys = [], []
+        for i in range(length):
+            day = {name: values[i] for name, values in inputs.items()}
+            score = 0.0
+            for name, weight in weights.items():
+                score += (100 - day[name] if name in INVERTED_INPUTS else day[name]) * weight
+            scores.append(max(0, min(100, score)))
+            keys.append(classify_mood(day))
+
+    # Python rounding, so results match compute_mood_score() exactly
+    return {"mood_score": [round(score, 1) for score in scores], "mood_key": keys}
+
+
+def compute_mood_history(
+    snapshots_dir: Path,
+    start: date,
+    end: date,
+    weights: Optional[Mapping[str, float]] = None,
+) -> Dict:
+    """
+    Compute the mood of every day in a range from the snapshot metric columns.
+
+    The result is cached in <snapshots_dir>/mood_history.json under a key
+    derived from the input columns, the weights and MOOD_HISTORY_VERSION,
+    so it is only recomputed when one of them changes.
+
+    Args:
+        snapshots_dir: Snapshot directory (holds the metric columns).
+        start: First day.
+        end: Last day.
+        weights: Score weights (default: MOOD_WEIGHTS).
+
+    Returns:
+        {"dates": [...], "mood_score": [...], "mood_key": [...], ...}; days
+        without any input have None for score and key.
+
+    Raises:
+        ValueError: If weights name an input that is not in MOOD_WEIGHTS.
+    """
+    weights = dict(weights or MOOD_WEIGHTS)
+    store = MetricStore(snapshots_dir / "columns")
+    dates, raw = store.read_columns(MOOD_HISTORY_COLUMNS.values(), start, end)
+    columns = {name: raw[column] for name, column in MOOD_HISTORY_COLUMNS.items()}
+
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(json_codec.dumps_bytes(
+        {"version": MOOD_HISTORY_VERSION, "weights": weights, "start": str(start), "end": str(end)},
+        sort_keys=True,
+    ))
+    for name in MOOD_HISTORY_COLUMNS:
+        hasher.update(columns[name].tobytes())
+    key = hasher.hexdigest()
+
+    cache_file = snapshots_dir / MOOD_HISTORY_FILE
+    if cache_file.exists():
+        try:
+            cached = json_codec.load_path(cache_file)
+            if cached.get("key") == key:
+                return cached
+        except (OSError, json_codec.JSONDecodeError, AttributeError):
+            pass
+
+    batch = compute_mood_batch(columns, weights)
+    has_data = [
+        any(not math.isnan(columns[name][i]) for name in MOOD_HISTORY_COLUMNS)
+        for i in range(len(dates))
+    ]
+    history = {
+        "version": MOOD_HISTORY_VERSION,
+        "key": key,
+        "weights": weights,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "dates": [day.isoformat() for day in dates],
+        "mood_score": [s if ok else None for s, ok in zip(batch["mood_score"], has_data)],
+        "mood_key": [k if ok else None for k, ok in zip(batch["mood_key"], has_data)],
+    }
+
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        snapshots_dir.mkdir(parents=True, exist_ok=True)
+        json_codec.dump_path(history, tmp_file)
+        os.replace(tmp_file, cache_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    return history
+
+
 def main() -> None:
     """Main entry point."""
-    if len(sys.argv) < 2:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute mood state from Oura metrics")
+    parser.add_argument("metrics", nargs="?", help="Metrics JSON file")
+    parser.add_argument("output", nargs="?", default="oura/mood.json", help="Output path (default: oura/mood.json)")
+    parser.add_argument("--history", action="store_true", help="Compute the mood of every stored day from the snapshot history")
+    parser.add_argument("--snapshots-dir", default="data/snapshots", help="Snapshot directory for --history")
+    parser.add_argument("--start", help="First day for --history (YYYY-MM-DD, default: first stored day)")
+    parser.add_argument("--end", help="Last day for --history (YYYY-MM-DD, default: today)")
+    args = parser.parse_args()
+
+    if args.history:
+        snapshots_dir = Path(args.snapshots_dir)
+        try:
+            end = date.fromisoformat(args.end) if args.end else datetime.now(timezone.utc).date()
+            start = date.fromisoformat(args.start) if args.start else None
+        except ValueError as e:
+            parser.error(f"dates must be YYYY-MM-DD: {e}")
+        if start is None:
+            years = sorted(p.name for p in (snapshots_dir / "columns").glob("[0-9][0-9][0-9][0-9]"))
+            start = date(int(years[0]), 1, 1) if years else end
+        history = compute_mood_history(snapshots_dir, start, end)
+        days = sum(1 for key in history["mood_key"] if key)
+        print(f"Mood history: {days} days ({start} to {end}) in {snapshots_dir / MOOD_HISTORY_FILE}", file=sys.stderr)
+        return
+
+    if not args.metrics:
         print(
             "Usage: oura-mood-engine.py <metrics.json> [output_path]",
             file=sys.stderr,
         )
         sys.exit(1)
 
-    metrics_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else "oura/mood.json"
+    metrics_path = args.metrics
+    output_path = args.output
 
     # Read metrics
     metrics = load_json(metrics_path, "Metrics file")
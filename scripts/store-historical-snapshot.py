@@ -9,58 +9,122 @@
 - data/snapshots/daily/YYYY/MM/YYYY-MM-DD.json
 - data/snapshots/weekly/YYYY-WW.json (aggregated)
 - data/snapshots/monthly/YYYY-MM.json (aggregated)
+- data/snapshots/columns/YYYY/<metric>.f64 (numeric fields, one column per metric)
+- data/snapshots/archive/YYYY/YYYY-MM.jsonl.gz (compacted daily snapshots, see --compact)
+- data/snapshots/yearly/YYYY.json (derived when months are compacted)
+- data/snapshots/index.json (manifest of all of the above, see lib/snapshot_index.py)
+- data/snapshots/analytics.json (rolling means, percentiles, anomalies and
+  trends of the last year, see lib/snapshot_analytics.py)
+
+Weekly (ISO week) and monthly summaries carry mergeable running statistics
+(count, sum, sum of squares, min, max), so each new day is folded in without
+reloading the period. A period is only rebuilt, from the metric columns at
+one read per metric, when a day it already counted has been corrected.
+
+Past days can be rebuilt with --backfill START END, which reads the data
+files as they were committed at the end of each day.
 
 Usage:
     python store-historical-snapshot.py [--output-dir data/snapshots]
+    python store-historical-snapshot.py --backfill 2025-01-01 2025-03-31 [--jobs 4]
 """
 
+import os
 import sys
 import json
+import bisect
+import hashlib
+import functools
+import gzip
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
-import statistics
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from lib.utils import (
     try_load_json,
     safe_get,
 )
+from lib import json_codec
+from lib.metric_store import MetricStore
+from lib.rolling_stats import RunningStats
+from lib.snapshot_index import ARCHIVE_SUFFIX, SnapshotIndex
+from lib.snapshot_analytics import compute_snapshot_analytics
+
+
+# Aggregated metrics: summary statistic name -> snapshot (section, field)
+AGGREGATE_METRICS = {
+    "sleep_score": ("health", "sleep_score"),
+    "readiness_score": ("health", "readiness_score"),
+    "activity_score": ("health", "activity_score"),
+    "steps": ("health", "activity_steps"),
+    "commits": ("developer", "commits_30d"),
+}
+
+# Bump when the aggregate state layout changes; older summaries are rebuilt
+AGGREGATE_STATE_VERSION = 1
+
+# Months of full-resolution daily files kept by --compact
+DEFAULT_KEEP_MONTHS = 12
+
+# Data files snapshots are built from, by snapshot section
+SOURCE_FILES = {
+    "health": "oura/health_snapshot.json",
+    "mood": "oura/mood.json",
+    "weather": "weather/weather.json",
+    "developer": "developer/stats.json",
+}
+
+
+def get_metric_store(output_dir: Path) -> MetricStore:
+    """Get the columnar metric store under the snapshot directory."""
+    return MetricStore(output_dir / "columns")
 
 
 def load_current_health_data() -> Optional[Dict]:
     """Load current Oura health data."""
-    data, error = try_load_json("oura/health_snapshot.json")
+    data, error = try_load_json(SOURCE_FILES["health"])
     return data
 
 
 def load_mood_data() -> Optional[Dict]:
     """Load current mood data."""
-    data, error = try_load_json("oura/mood.json")
+    data, error = try_load_json(SOURCE_FILES["mood"])
     return data
 
 
 def load_weather_data() -> Optional[Dict]:
     """Load current weather data."""
-    data, error = try_load_json("weather/weather.json")
+    data, error = try_load_json(SOURCE_FILES["weather"])
     return data
 
 
 def load_developer_stats() -> Optional[Dict]:
     """Load current developer stats."""
-    data, error = try_load_json("developer/stats.json")
+    data, error = try_load_json(SOURCE_FILES["developer"])
     return data
 
 
 def create_daily_snapshot() -> Dict:
     """Create a daily snapshot of all metrics."""
-    now = datetime.now(timezone.utc)
-    
-    # Load all data sources
-    health_data = load_current_health_data()
-    mood_data = load_mood_data()
-    weather_data = load_weather_data()
-    dev_stats = load_developer_stats()
-    
+    return build_daily_snapshot(
+        datetime.now(timezone.utc),
+        load_current_health_data(),
+        load_mood_data(),
+        load_weather_data(),
+        load_developer_stats(),
+    )
+
+
+def build_daily_snapshot(
+    now: datetime,
+    health_data: Optional[Dict],
+    mood_data: Optional[Dict],
+    weather_data: Optional[Dict],
+    dev_stats: Optional[Dict],
+) -> Dict:
+    """Build a daily snapshot from the data files as they were at a point in time."""
     snapshot = {
         "timestamp": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
         "date": now.strftime("%Y-%m-%d"),
@@ -85,6 +149,7 @@ def create_daily_snapshot() -> Dict:
             "readiness_score": readiness.get("score"),
             "readiness_hrv": readiness.get("hrv_balance"),
             "readiness_temp": readiness.get("temperature_deviation"),
+            "readiness_body_temp": readiness.get("body_temperature"),
             "resting_hr": readiness.get("resting_heart_rate"),
             "activity_score": activity.get("score"),
             "activity_steps": activity.get("steps"),
@@ -128,149 +193,702 @@ def create_daily_snapshot() -> Dict:
     return snapshot
 
 
-def save_snapshot(snapshot: Dict, output_dir: Path) -> None:
-    """Save snapshot to appropriate files."""
-    date = snapshot["date"]
-    year, month, day = date.split("-")
+def write_daily_file(snapshot: Dict, output_dir: Path) -> Path:
+    """Write a daily snapshot file and return its path."""
+    date_str = snapshot["date"]
+    year, month, day = date_str.split("-")
     
-    # Daily snapshot
     daily_dir = output_dir / "daily" / year / month
     daily_dir.mkdir(parents=True, exist_ok=True)
-    daily_file = daily_dir / f"{date}.json"
+    daily_file = daily_dir / f"{date_str}.json"
     
     with open(daily_file, "w") as f:
         json.dump(snapshot, f, indent=2)
-    
+    return daily_file
+
+
+def save_snapshot(snapshot: Dict, output_dir: Path) -> None:
+    """Save snapshot to appropriate files."""
+    daily_file = write_daily_file(snapshot, output_dir)
     print(f"Saved daily snapshot: {daily_file}", file=sys.stderr)
+    
+    index = SnapshotIndex.load(output_dir)
+    index.record_daily(snapshot, daily_file)
+    index.save()
+    
+    # Columnar copy of the numeric fields; the first run imports older history
+    store = get_metric_store(output_dir)
+    if store.exists():
+        store.append(snapshot)
+    else:
+        rebuild_metric_store(output_dir)
+
+
+def rebuild_metric_store(output_dir: Path) -> int:
+    """Rebuild the columnar metric store from the daily JSON snapshots."""
+    store = get_metric_store(output_dir)
+    count = store.import_daily(iter_daily_snapshots(output_dir))
+    print(f"Rebuilt metric columns from {count} daily snapshots", file=sys.stderr)
+    return count
+
+
+def iter_daily_snapshots(output_dir: Path) -> Iterator[Dict]:
+    """Yield every stored daily snapshot, archived or not, in date order."""
+    snapshots: Dict[str, Dict] = {}
+    for archive_file in (output_dir / "archive").glob(f"*/*{ARCHIVE_SUFFIX}"):
+        year, month = archive_file.name[:7].split("-")
+        snapshots.update(load_archived_month(output_dir, int(year), int(month)))
+    for daily_file in (output_dir / "daily").glob("*/*/*.json"):
+        data, error = try_load_json(str(daily_file))
+        if data and data.get("date"):
+            snapshots[data["date"]] = data
+    for date_str in sorted(snapshots):
+        yield snapshots[date_str]
 
 
 def load_daily_snapshots(output_dir: Path, start_date: datetime, end_date: datetime) -> List[Dict]:
-    """Load all daily snapshots within a date range."""
+    """Load all daily snapshots within a date range, including compacted months."""
+    index = SnapshotIndex.load(output_dir)
     snapshots = []
-    current = start_date
+    archives: Dict[str, Dict[str, Dict]] = {}
     
-    while current <= end_date:
-        date_str = current.strftime("%Y-%m-%d")
-        year, month, day = date_str.split("-")
-        
-        daily_file = output_dir / "daily" / year / month / f"{date_str}.json"
-        if daily_file.exists():
-            data, error = try_load_json(str(daily_file))
-            if data:
-                snapshots.append(data)
-        
-        current += timedelta(days=1)
+    for date_str, entry in index.daily_range(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")):
+        if entry["path"].endswith(ARCHIVE_SUFFIX):
+            if entry["path"] not in archives:
+                archives[entry["path"]] = load_archived_month(output_dir, int(date_str[:4]), int(date_str[5:7]))
+            data = archives[entry["path"]].get(date_str)
+        else:
+            data, error = try_load_json(str(index.path(entry)))
+        if data:
+            snapshots.append(data)
     
     return snapshots
 
 
-def aggregate_weekly_snapshot(snapshots: List[Dict]) -> Dict:
-    """Aggregate daily snapshots into weekly summary."""
-    if not snapshots:
-        return {}
-    
-    # Extract values for aggregation
-    sleep_scores = [s.get("health", {}).get("sleep_score") for s in snapshots if s.get("health", {}).get("sleep_score") is not None]
-    readiness_scores = [s.get("health", {}).get("readiness_score") for s in snapshots if s.get("health", {}).get("readiness_score") is not None]
-    activity_scores = [s.get("health", {}).get("activity_score") for s in snapshots if s.get("health", {}).get("activity_score") is not None]
-    steps = [s.get("health", {}).get("activity_steps") for s in snapshots if s.get("health", {}).get("activity_steps") is not None]
-    commits = [s.get("developer", {}).get("commits_30d") for s in snapshots if s.get("developer", {}).get("commits_30d") is not None]
-    
-    first_snapshot = snapshots[0]
-    last_snapshot = snapshots[-1]
+def _day_values(snapshot: Dict) -> List:
+    """Extract the aggregated metrics of one day, in AGGREGATE_METRICS order."""
+    return [(snapshot.get(section) or {}).get(field) for section, field in AGGREGATE_METRICS.values()]
+
+
+def _day_fingerprint(snapshot: Dict) -> str:
+    """Fingerprint the aggregated metrics of one day to detect corrections."""
+    return hashlib.blake2b(json_codec.dumps_bytes(_day_values(snapshot)), digest_size=8).hexdigest()
+
+
+def collect_period_stats(snapshots: List[Dict]) -> Dict[str, RunningStats]:
+    """Fold daily snapshots into per-metric running statistics in one pass."""
+    stats = {name: RunningStats() for name in AGGREGATE_METRICS}
+    for snapshot in snapshots:
+        for name, value in zip(AGGREGATE_METRICS, _day_values(snapshot)):
+            stats[name].add(value)
+    return stats
+
+
+def _rounded(value: Optional[float], digits: int) -> Optional[float]:
+    """Round a statistic, passing None through."""
+    return round(value, digits) if value is not None else None
+
+
+def build_period_summary(
+    period: str,
+    start_date: str,
+    end_date: str,
+    days_count: int,
+    stats: Dict[str, RunningStats],
+) -> Dict:
+    """Build a weekly or monthly summary from running statistics."""
+    health = {"avg_sleep_score": _rounded(stats["sleep_score"].mean(), 1)}
+    if period in ("monthly", "yearly"):
+        health["max_sleep_score"] = stats["sleep_score"].maximum
+        health["min_sleep_score"] = stats["sleep_score"].minimum
+    health.update({
+        "avg_readiness_score": _rounded(stats["readiness_score"].mean(), 1),
+        "avg_activity_score": _rounded(stats["activity_score"].mean(), 1),
+        "total_steps": stats["steps"].total if stats["steps"].count else None,
+        "avg_steps": _rounded(stats["steps"].mean(), 0),
+    })
     
     return {
-        "period": "weekly",
-        "start_date": first_snapshot.get("date"),
-        "end_date": last_snapshot.get("date"),
-        "days_count": len(snapshots),
-        "health": {
-            "avg_sleep_score": round(statistics.mean(sleep_scores), 1) if sleep_scores else None,
-            "avg_readiness_score": round(statistics.mean(readiness_scores), 1) if readiness_scores else None,
-            "avg_activity_score": round(statistics.mean(activity_scores), 1) if activity_scores else None,
-            "total_steps": sum(steps) if steps else None,
-            "avg_steps": round(statistics.mean(steps), 0) if steps else None,
-        },
+        "period": period,
+        "start_date": start_date,
+        "end_date": end_date,
+        "days_count": days_count,
+        "health": health,
         "developer": {
-            "avg_commits": round(statistics.mean(commits), 1) if commits else None,
+            "avg_commits": _rounded(stats["commits"].mean(), 1),
         }
     }
 
 
+def aggregate_weekly_snapshot(snapshots: List[Dict]) -> Dict:
+    """Aggregate daily snapshots into weekly summary."""
+    if not snapshots:
+        return {}
+    
+    return build_period_summary(
+        "weekly",
+        snapshots[0].get("date"),
+        snapshots[-1].get("date"),
+        len(snapshots),
+        collect_period_stats(snapshots),
+    )
+
+
 def aggregate_monthly_snapshot(snapshots: List[Dict]) -> Dict:
     """Aggregate daily snapshots into monthly summary."""
     if not snapshots:
         return {}
     
-    # Extract values for aggregation
-    sleep_scores = [s.get("health", {}).get("sleep_score") for s in snapshots if s.get("health", {}).get("sleep_score") is not None]
-    readiness_scores = [s.get("health", {}).get("readiness_score") for s in snapshots if s.get("health", {}).get("readiness_score") is not None]
-    activity_scores = [s.get("health", {}).get("activity_score") for s in snapshots if s.get("health", {}).get("activity_score") is not None]
-    steps = [s.get("health", {}).get("activity_steps") for s in snapshots if s.get("health", {}).get("activity_steps") is not None]
-    commits = [s.get("developer", {}).get("commits_30d") for s in snapshots if s.get("developer", {}).get("commits_30d") is not None]
+    return build_period_summary(
+        "monthly",
+        snapshots[0].get("date"),
+        snapshots[-1].get("date"),
+        len(snapshots),
+        collect_period_stats(snapshots),
+    )
+
+
+def update_period_summary(
+    summary_file: Path,
+    period: str,
+    period_start: date,
+    period_end: date,
+    day_snapshot: Dict,
+    store: MetricStore,
+) -> Dict:
+    """
+    Fold one day into a period summary.
+    
+    The summary file keeps the running statistics of the period and a
+    fingerprint of every day folded in. A new day is added in O(1); the
+    period is only rebuilt from the metric columns when a day that was
+    already counted has changed (or the state is missing or outdated).
     
-    first_snapshot = snapshots[0]
-    last_snapshot = snapshots[-1]
+    Args:
+        summary_file: Weekly or monthly summary file.
+        period: "weekly" or "monthly".
+        period_start: First day of the period.
+        period_end: Last day of the period.
+        day_snapshot: Snapshot of the day to fold in (needs "date").
+        store: Metric store to rebuild from.
     
-    return {
-        "period": "monthly",
-        "start_date": first_snapshot.get("date"),
-        "end_date": last_snapshot.get("date"),
-        "days_count": len(snapshots),
-        "health": {
-            "avg_sleep_score": round(statistics.mean(sleep_scores), 1) if sleep_scores else None,
-            "max_sleep_score": max(sleep_scores) if sleep_scores else None,
-            "min_sleep_score": min(sleep_scores) if sleep_scores else None,
-            "avg_readiness_score": round(statistics.mean(readiness_scores), 1) if readiness_scores else None,
-            "avg_activity_score": round(statistics.mean(activity_scores), 1) if activity_scores else None,
-            "total_steps": sum(steps) if steps else None,
-            "avg_steps": round(statistics.mean(steps), 0) if steps else None,
-        },
-        "developer": {
-            "avg_commits": round(statistics.mean(commits), 1) if commits else None,
+    Returns:
+        The updated summary.
+    """
+    existing = None
+    if summary_file.exists():
+        existing, error = try_load_json(str(summary_file))
+    
+    state = (existing or {}).get("state") or {}
+    days = state.get("days") if state.get("version") == AGGREGATE_STATE_VERSION else None
+    day = day_snapshot["date"]
+    fingerprint = _day_fingerprint(day_snapshot)
+    
+    if days is not None and days.get(day) == fingerprint:
+        return existing
+    
+    if days is not None and day not in days:
+        stats = {
+            name: RunningStats.from_dict(state.get("stats", {}).get(name, {}))
+            for name in AGGREGATE_METRICS
         }
+        for name, value in zip(AGGREGATE_METRICS, _day_values(day_snapshot)):
+            stats[name].add(value)
+        days[day] = fingerprint
+    else:
+        # First run for the period, outdated state, or a corrected day
+        rows = list(store.rows(period_start, period_end))
+        print(f"Rebuilt {period} aggregate from {len(rows)} days", file=sys.stderr)
+        return write_period_summary(summary_file, period, rows)
+    
+    return _write_summary(summary_file, period, days, stats)
+
+
+def write_period_summary(
+    summary_file: Path,
+    period: str,
+    snapshots: List[Dict],
+    index: Optional[SnapshotIndex] = None,
+) -> Dict:
+    """
+    Write a period summary, with fresh aggregate state, from its daily snapshots.
+    
+    Args:
+        summary_file: Weekly or monthly summary file.
+        period: "weekly" or "monthly".
+        snapshots: Daily snapshots (or metric store rows) of the period.
+        index: Open snapshot index to record the summary in; the caller
+            saves it. Without one, the index is loaded and saved here.
+    
+    Returns:
+        The written summary.
+    """
+    stats = collect_period_stats(snapshots)
+    days = {snapshot["date"]: _day_fingerprint(snapshot) for snapshot in snapshots}
+    return _write_summary(summary_file, period, days, stats, index)
+
+
+def _write_summary(
+    summary_file: Path,
+    period: str,
+    days: Dict[str, str],
+    stats: Dict[str, RunningStats],
+    index: Optional[SnapshotIndex] = None,
+) -> Dict:
+    """Write a period summary together with its aggregate state."""
+    days = dict(sorted(days.items()))
+    summary = build_period_summary(period, min(days), max(days), len(days), stats)
+    summary["state"] = {
+        "version": AGGREGATE_STATE_VERSION,
+        "days": days,
+        "stats": {name: stats[name].to_dict() for name in AGGREGATE_METRICS},
     }
+    
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_file, "w") as f:
+        json.dump(summary, f, indent=2)
+    
+    if index is None:
+        index = SnapshotIndex.load(summary_file.parent.parent)
+        index.record_period(period, summary_file.stem, summary_file, summary)
+        index.save()
+    else:
+        index.record_period(period, summary_file.stem, summary_file, summary)
+    
+    return summary
+
+
+def weekly_period(day: date) -> Tuple[str, date, date]:
+    """Get the ISO week (name, Monday, Sunday) a day belongs to."""
+    year, week, weekday = day.isocalendar()
+    week_start = day - timedelta(days=weekday - 1)
+    return f"{year}-W{week:02d}", week_start, week_start + timedelta(days=6)
+
 
+def monthly_period(day: date) -> Tuple[str, date, date]:
+    """Get the calendar month (name, first day, last day) a day belongs to."""
+    month_start = day.replace(day=1)
+    month_end = (month_start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    return day.strftime("%Y-%m"), month_start, month_end
 
-def update_aggregated_snapshots(output_dir: Path) -> None:
-    """Update weekly and monthly aggregated snapshots."""
-    now = datetime.now(timezone.utc)
+
+def update_aggregated_snapshots(output_dir: Path, day: Optional[date] = None) -> None:
+    """Fold a day (default: today) into its weekly and monthly summaries."""
+    day = day or datetime.now(timezone.utc).date()
+    store = get_metric_store(output_dir)
     
-    # Weekly snapshot (last 7 days)
-    week_start = now - timedelta(days=6)
-    weekly_snapshots = load_daily_snapshots(output_dir, week_start, now)
+    # History written before the column store existed
+    if not store.exists():
+        rebuild_metric_store(output_dir)
     
-    if weekly_snapshots:
-        weekly_summary = aggregate_weekly_snapshot(weekly_snapshots)
-        
-        weekly_dir = output_dir / "weekly"
-        weekly_dir.mkdir(parents=True, exist_ok=True)
-        
-        # ISO week number
-        year, week, _ = now.isocalendar()
-        weekly_file = weekly_dir / f"{year}-W{week:02d}.json"
-        
-        with open(weekly_file, "w") as f:
-            json.dump(weekly_summary, f, indent=2)
-        
-        print(f"Saved weekly snapshot: {weekly_file}", file=sys.stderr)
+    day_snapshot = next(store.rows(day, day), None)
+    if day_snapshot is None:
+        print(f"No snapshot data for {day}, skipping aggregates", file=sys.stderr)
+        return
     
-    # Monthly snapshot (current month)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    monthly_snapshots = load_daily_snapshots(output_dir, month_start, now)
+    # Weekly snapshot (ISO week, Monday to Sunday)
+    name, week_start, week_end = weekly_period(day)
+    weekly_file = output_dir / "weekly" / f"{name}.json"
+    update_period_summary(weekly_file, "weekly", week_start, week_end, day_snapshot, store)
+    print(f"Saved weekly snapshot: {weekly_file}", file=sys.stderr)
     
-    if monthly_snapshots:
-        monthly_summary = aggregate_monthly_snapshot(monthly_snapshots)
-        
-        monthly_dir = output_dir / "monthly"
-        monthly_dir.mkdir(parents=True, exist_ok=True)
+    # Monthly snapshot (calendar month)
+    name, month_start, month_end = monthly_period(day)
+    monthly_file = output_dir / "monthly" / f"{name}.json"
+    update_period_summary(monthly_file, "monthly", month_start, month_end, day_snapshot, store)
+    print(f"Saved monthly snapshot: {monthly_file}", file=sys.stderr)
+
+
+def rebuild_aggregates(
+    output_dir: Path,
+    start: date,
+    end: date,
+    index: Optional[SnapshotIndex] = None,
+) -> int:
+    """
+    Rebuild every weekly and monthly summary overlapping a date range.
+    
+    All days of the affected periods are read from the metric columns at
+    once (one read per metric) and grouped in a single pass.
+    
+    Args:
+        output_dir: Snapshot directory.
+        start: First day of the range.
+        end: Last day of the range.
+        index: Open snapshot index to record the summaries in; the caller
+            saves it. Without one, the index is saved once here.
+    
+    Returns:
+        Number of summaries written.
+    """
+    store = get_metric_store(output_dir)
+    first = min(weekly_period(start)[1], monthly_period(start)[1])
+    last = max(weekly_period(end)[2], monthly_period(end)[2])
+    
+    periods: Dict[Tuple[str, str], List[Dict]] = {}
+    for row in store.rows(first, last):
+        day = date.fromisoformat(row["date"])
+        periods.setdefault(("weekly", weekly_period(day)[0]), []).append(row)
+        periods.setdefault(("monthly", monthly_period(day)[0]), []).append(row)
+    
+    owns_index = index is None
+    if owns_index:
+        index = SnapshotIndex.load(output_dir)
+    for (period, name), rows in periods.items():
+        write_period_summary(output_dir / period / f"{name}.json", period, rows, index)
+    if owns_index and periods:
+        index.save()
+    
+    print(f"Rebuilt {len(periods)} weekly/monthly summaries", file=sys.stderr)
+    return len(periods)
+
+
+def write_analytics(output_dir: Path, day: Optional[date] = None) -> Dict:
+    """
+    Compute analytics over the metric columns and write analytics.json.
+    
+    The file is read by the summary card and served by the API.
+    
+    Args:
+        output_dir: Snapshot directory.
+        day: Last day analyzed (default: today, UTC).
+    
+    Returns:
+        The analytics document.
+    """
+    analytics = compute_snapshot_analytics(get_metric_store(output_dir), day)
+    analytics_file = output_dir / "analytics.json"
+    tmp_file = analytics_file.with_name(f"{analytics_file.name}.{os.getpid()}.tmp")
+    try:
+        json_codec.dump_path(analytics, tmp_file)
+        os.replace(tmp_file, analytics_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    
+    print(f"Saved analytics ({analytics['backend']} backend): {analytics_file}", file=sys.stderr)
+    return analytics
+
+
+# ============================================================================
+# Retention
+# ============================================================================
+
+def archive_path(output_dir: Path, year: int, month: int) -> Path:
+    """Get the compacted archive file of a month."""
+    return output_dir / "archive" / f"{year:04d}" / f"{year:04d}-{month:02d}{ARCHIVE_SUFFIX}"
+
+
+def load_archived_month(output_dir: Path, year: int, month: int) -> Dict[str, Dict]:
+    """
+    Load the daily snapshots of a compacted month.
+    
+    Args:
+        output_dir: Snapshot directory.
+        year: Year of the month.
+        month: Month number.
+    
+    Returns:
+        Dictionary mapping dates (YYYY-MM-DD) to snapshots; empty if the
+        month has not been compacted.
+    """
+    path = archive_path(output_dir, year, month)
+    if not path.exists():
+        return {}
+    
+    snapshots = {}
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                snapshot = json_codec.loads(line)
+                snapshots[snapshot["date"]] = snapshot
+    return snapshots
+
+
+def _write_archive(path: Path, snapshots: Dict[str, Dict]) -> None:
+    """Write a month archive atomically, byte-for-byte reproducible."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        # Fixed mtime and no file name in the header keep the output stable
+        with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", filename="", mtime=0) as f:
+            for date_str in sorted(snapshots):
+                f.write(json_codec.dumps_bytes(snapshots[date_str], sort_keys=True) + b"\n")
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def compact_month(output_dir: Path, year: int, month: int) -> int:
+    """
+    Move the daily files of a month into its compressed archive.
+    
+    Days already in the archive are replaced by their daily file. Daily
+    files are only deleted after the archive has been written and read
+    back; files that are not valid snapshots are left in place.
+    
+    Args:
+        output_dir: Snapshot directory.
+        year: Year of the month.
+        month: Month number.
+    
+    Returns:
+        Number of daily files compacted.
+    """
+    month_dir = output_dir / "daily" / f"{year:04d}" / f"{month:02d}"
+    compacted = {}
+    for daily_file in sorted(month_dir.glob("*.json")):
+        data, error = try_load_json(str(daily_file))
+        if data and data.get("date"):
+            compacted[data["date"]] = (daily_file, data)
+    if not compacted:
+        return 0
+    
+    snapshots = load_archived_month(output_dir, year, month)
+    snapshots.update({date_str: data for date_str, (_, data) in compacted.items()})
+    _write_archive(archive_path(output_dir, year, month), snapshots)
+    
+    archived = load_archived_month(output_dir, year, month)
+    index = SnapshotIndex.load(output_dir)
+    for date_str, (daily_file, data) in compacted.items():
+        if archived.get(date_str) == data:
+            index.record_daily(data, archive_path(output_dir, year, month))
+            daily_file.unlink()
+    index.save()
+    
+    for directory in (month_dir, month_dir.parent):
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+    
+    print(f"Compacted {len(compacted)} daily snapshots into {archive_path(output_dir, year, month)}", file=sys.stderr)
+    return len(compacted)
+
+
+def write_yearly_summary(output_dir: Path, year: int) -> Optional[Dict]:
+    """
+    Derive a yearly summary by merging the aggregate state of its months.
+    
+    Monthly summaries without current state are rebuilt from the metric
+    columns first.
+    
+    Args:
+        output_dir: Snapshot directory.
+        year: Year to summarize.
+    
+    Returns:
+        The written summary, or None if the year has no monthly summaries.
+    """
+    store = get_metric_store(output_dir)
+    days: Dict[str, str] = {}
+    stats = {name: RunningStats() for name in AGGREGATE_METRICS}
+    
+    for monthly_file in sorted((output_dir / "monthly").glob(f"{year:04d}-*.json")):
+        summary, error = try_load_json(str(monthly_file))
+        state = (summary or {}).get("state") or {}
+        if state.get("version") != AGGREGATE_STATE_VERSION:
+            _, month_start, month_end = monthly_period(date.fromisoformat(f"{monthly_file.stem}-01"))
+            rows = list(store.rows(month_start, month_end))
+            if not rows:
+                continue
+            state = write_period_summary(monthly_file, "monthly", rows)["state"]
         
-        monthly_file = monthly_dir / f"{now.strftime('%Y-%m')}.json"
+        days.update(state["days"])
+        for name in AGGREGATE_METRICS:
+            stats[name].merge(RunningStats.from_dict(state["stats"].get(name, {})))
+    
+    if not days:
+        return None
+    
+    yearly_file = output_dir / "yearly" / f"{year:04d}.json"
+    summary = _write_summary(yearly_file, "yearly", days, stats)
+    print(f"Saved yearly snapshot: {yearly_file}", file=sys.stderr)
+    return summary
+
+
+def apply_retention(
+    output_dir: Path,
+    keep_months: int = DEFAULT_KEEP_MONTHS,
+    today: Optional[date] = None,
+) -> int:
+    """
+    Compact daily files older than the retention window into monthly archives.
+    
+    The current month and the keep_months before it stay as daily files.
+    Yearly summaries are (re)derived for every year that had months
+    compacted. Archived days remain readable through load_daily_snapshots()
+    and the metric columns.
+    
+    Args:
+        output_dir: Snapshot directory.
+        keep_months: Months of full-resolution daily files to keep.
+        today: Reference date (default: today, UTC).
+    
+    Returns:
+        Number of daily files compacted.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    cutoff_index = today.year * 12 + today.month - 1 - keep_months
+    
+    compacted = 0
+    years = set()
+    for month_dir in sorted((output_dir / "daily").glob("*/*")):
+        try:
+            year, month = int(month_dir.parent.name), int(month_dir.name)
+        except ValueError:
+            continue
+        if month_dir.is_dir() and year * 12 + month - 1 < cutoff_index:
+            count = compact_month(output_dir, year, month)
+            if count:
+                compacted += count
+                years.add(year)
+    
+    for year in sorted(years):
+        write_yearly_summary(output_dir, year)
+    
+    print(f"Retention: compacted {compacted} daily snapshots (keeping {keep_months} months)", file=sys.stderr)
+    return compacted
+
+
+# ============================================================================
+# Backfill
+# ============================================================================
+
+def _git(*args: str) -> bytes:
+    """Run a git command in the current repository and return its output."""
+    return subprocess.run(["git", *args], check=True, capture_output=True).stdout
+
+
+def _file_history(path: str) -> List[Tuple[int, str]]:
+    """Get the commits that changed a file as (commit time, hash), oldest first."""
+    history = []
+    for line in _git("log", "--format=%ct %H", "--", path).decode().splitlines():
+        timestamp, commit = line.split()
+        history.append((int(timestamp), commit))
+    return sorted(history)
+
+
+def plan_backfill(start: date, end: date) -> List[Tuple[str, Dict[str, Tuple[int, str]]]]:
+    """
+    Pick, for each day, the version of every data file at the end of that day.
+    
+    The history of each data file is read once; days before any data file
+    existed are left out.
+    
+    Args:
+        start: First day to backfill.
+        end: Last day to backfill; days after today (UTC) are left out.
+    
+    Returns:
+        List of (date, {section: (commit time, commit)}) jobs.
+    """
+    # A future day would just repeat the latest data under a date not yet lived
+    end = min(end, datetime.now(timezone.utc).date())
+    histories = {section: _file_history(path) for section, path in SOURCE_FILES.items()}
+    times = {section: [timestamp for timestamp, _ in history] for section, history in histories.items()}
+    
+    jobs = []
+    day = start
+    while day <= end:
+        cutoff = datetime(day.year, day.month, day.day, 23, 59, 59, tzinfo=timezone.utc).timestamp()
+        revisions = {}
+        for section, history in histories.items():
+            index = bisect.bisect_right(times[section], cutoff)
+            if index:
+                revisions[section] = history[index - 1]
+        if revisions:
+            jobs.append((day.isoformat(), revisions))
+        day += timedelta(days=1)
+    return jobs
+
+
+@functools.lru_cache(maxsize=256)
+def _load_revision(commit: str, path: str) -> Optional[Dict]:
+    """Load a data file as of a commit (cached per worker process)."""
+    try:
+        return json_codec.loads(_git("show", f"{commit}:{path}"))
+    except (subprocess.CalledProcessError, json_codec.JSONDecodeError):
+        return None
+
+
+def _backfill_worker(job: Tuple[str, Dict[str, Tuple[int, str]]]) -> Optional[Dict]:
+    """Build the snapshot of one past day (runs in a worker process)."""
+    day, revisions = job
+    sources = {
+        section: _load_revision(commit, SOURCE_FILES[section])
+        for section, (_, commit) in revisions.items()
+    }
+    if not any(sources.values()):
+        return None
+    
+    newest = max(timestamp for timestamp, _ in revisions.values())
+    snapshot = build_daily_snapshot(
+        datetime.fromtimestamp(newest, timezone.utc),
+        sources.get("health"),
+        sources.get("mood"),
+        sources.get("weather"),
+        sources.get("developer"),
+    )
+    snapshot["date"] = day
+    return snapshot
+
+
+def backfill_snapshots(
+    output_dir: Path,
+    start: date,
+    end: date,
+    jobs: int = 1,
+    missing_only: bool = False,
+) -> int:
+    """
+    Rebuild daily snapshots for past dates from the git history of the data files.
+    
+    Each day's data files are read from the last commit that touched them
+    before the end of that day. Snapshots are built in a process pool, then
+    written by this process: the daily files first, then the index and the
+    metric columns once for the whole batch, and the affected weekly and
+    monthly summaries are rebuilt in one pass.
+    
+    Args:
+        output_dir: Snapshot directory.
+        start: First day to backfill.
+        end: Last day to backfill.
+        jobs: Worker processes (0 = one per CPU).
+        missing_only: Only build days that have no daily snapshot yet.
+    
+    Returns:
+        Number of daily snapshots written.
+    """
+    plan = plan_backfill(start, end)
+    if missing_only:
+        stored = SnapshotIndex.load(output_dir).daily
+        plan = [job for job in plan if job[0] not in stored]
+    
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(plan) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            snapshots = list(executor.map(_backfill_worker, plan, chunksize=8))
+    else:
+        snapshots = [_backfill_worker(job) for job in plan]
+    
+    snapshots = [snapshot for snapshot in snapshots if snapshot]
+    count = len(snapshots)
+    if count:
+        index = SnapshotIndex.load(output_dir)
+        for snapshot in snapshots:
+            index.record_daily(snapshot, write_daily_file(snapshot, output_dir))
         
-        with open(monthly_file, "w") as f:
-            json.dump(monthly_summary, f, indent=2)
+        store = get_metric_store(output_dir)
+        if store.exists():
+            store.import_daily(snapshots)
+        else:
+            rebuild_metric_store(output_dir)
         
-        print(f"Saved monthly snapshot: {monthly_file}", file=sys.stderr)
+        rebuild_aggregates(output_dir, start, end, index)
+        index.save()
+        write_analytics(output_dir)
+    print(f"Backfilled {count} daily snapshots ({start} to {end})", file=sys.stderr)
+    return count
 
 
 def main() -> None:
@@ -280,11 +898,48 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Store historical snapshots for trend analysis")
     parser.add_argument("--output-dir", default="data/snapshots", help="Output directory for snapshots")
     parser.add_argument("--no-aggregate", action="store_true", help="Skip aggregating weekly/monthly summaries")
+    parser.add_argument("--rebuild-columns", action="store_true", help="Rebuild the metric columns from the daily JSON snapshots and exit")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild index.json by scanning the snapshot directory and exit")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), help="Rebuild daily snapshots for a date range (YYYY-MM-DD) from the git history of the data files")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes for --backfill (default: one per CPU)")
+    parser.add_argument("--missing-only", action="store_true", help="With --backfill, only build days without a daily snapshot")
+    parser.add_argument("--compact", action="store_true", help="Compact daily snapshots older than --keep-months into monthly archives and exit")
+    parser.add_argument("--keep-months", type=int, default=DEFAULT_KEEP_MONTHS, help=f"Months of daily snapshots kept by --compact (default: {DEFAULT_KEEP_MONTHS})")
     
     args = parser.parse_args()
     
     output_dir = Path(args.output_dir)
     
+    if args.rebuild_columns:
+        rebuild_metric_store(output_dir)
+        return
+    
+    if args.rebuild_index:
+        index = SnapshotIndex.rebuild(output_dir)
+        index.save()
+        print(f"Rebuilt snapshot index: {len(index.daily)} days", file=sys.stderr)
+        return
+    
+    if args.compact:
+        if args.keep_months < 0:
+            parser.error("--keep-months must not be negative")
+        apply_retention(output_dir, args.keep_months)
+        return
+    
+    if args.backfill:
+        try:
+            start, end = (date.fromisoformat(value) for value in args.backfill)
+        except ValueError as e:
+            parser.error(f"--backfill dates must be YYYY-MM-DD: {e}")
+        if end < start:
+            parser.error("--backfill END must not be before START")
+        try:
+            backfill_snapshots(output_dir, start, end, args.jobs, args.missing_only)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error backfilling snapshots: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
     try:
         # Create daily snapshot
         snapshot = create_daily_snapshot()
@@ -292,7 +947,8 @@ def main() -> None:
         
         # Update aggregated snapshots
         if not args.no_aggregate:
-            update_aggregated_snapshots(output_dir)
+            update_aggregated_snapshots(output_dir, date.fromisoformat(snapshot["date"]))
+            write_analytics(output_dir, date.fromisoformat(snapshot["date"]))
         
         print("Snapshot generation completed successfully", file=sys.stderr)
     except Exception as e:
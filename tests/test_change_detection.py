@@ -4,8 +4,10 @@
 """
 
 import json
+import os
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 
 import pytest
@@ -22,7 +24,16 @@
     has_data_changed,
     update_hash_cache,
     should_regenerate_svg,
+    compute_content_hash,
+    get_stat_signature,
+    find_changed_inputs,
+    find_module_dependencies,
+    have_inputs_changed,
+    update_inputs_cache,
+    hash_cache_transaction,
+    record_data_hash,
 )
+import lib.change_detection as change_detection
 
 
 class TestComputeFileHash:
@@ -224,6 +235,285 @@ def test_modified_data_is_changed(self):
             assert result is True
 
 
+class TestStatSignatureFastPath:
+    """Test stat-signature change detection."""
+    
+    @staticmethod
+    def _write_aged(path: Path, data: dict, age_seconds: int = 60) -> None:
+        """Write JSON and backdate its mtime outside the racy window."""
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        past = os.stat(path).st_mtime - age_seconds
+        os.utime(path, (past, past))
+    
+    def test_cache_entry_records_stat_signature(self):
+        """Test that cache entries store hash and stat signature."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            self._write_aged(data_path, {"key": "value"})
+            
+            update_hash_cache(data_path, cache_path, "test_key")
+            entry = load_hash_cache(cache_path)["test_key"]
+            
+            size, mtime_ns, inode = get_stat_signature(data_path)
+            assert entry["hash"].startswith("blake2b:")
+            assert entry["size"] == size
+            assert entry["mtime_ns"] == mtime_ns
+            assert entry["inode"] == inode
+    
+    def test_matching_stat_skips_hashing(self, monkeypatch):
+        """Test that an unchanged stat signature avoids reading the file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            self._write_aged(data_path, {"key": "value"})
+            update_hash_cache(data_path, cache_path, "test_key")
+            
+            def fail(*args, **kwargs):
+                raise AssertionError("content should not be hashed")
+            
+            monkeypatch.setattr(change_detection, "compute_content_hash", fail)
+            assert has_data_changed(data_path, cache_path, "test_key") is False
+    
+    def test_touched_file_with_same_content_unchanged(self):
+        """Test that a new mtime with identical content is not a change."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            self._write_aged(data_path, {"key": "value"}, age_seconds=120)
+            update_hash_cache(data_path, cache_path, "test_key")
+            
+            self._write_aged(data_path, {"key": "value"}, age_seconds=60)
+            assert has_data_changed(data_path, cache_path, "test_key") is False
+    
+    def test_legacy_sha256_entry_still_valid(self):
+        """Test that caches written by older versions are still honoured."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            self._write_aged(data_path, {"key": "value"})
+            save_hash_cache(cache_path, {"test_key": compute_json_hash(data_path)})
+            
+            assert has_data_changed(data_path, cache_path, "test_key") is False
+    
+    def test_content_hash_normalizes_json(self):
+        """Test that JSON formatting doesn't affect the content hash."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path1 = Path(tmpdir) / "a.json"
+            path2 = Path(tmpdir) / "b.json"
+            path1.write_text('{"a": 1, "b": 2}')
+            path2.write_text('{\n  "b": 2,\n  "a": 1\n}')
+            
+            assert compute_content_hash(path1) == compute_content_hash(path2)
+
+
+class TestMultiInputTracking:
+    """Test dependency tracking across multiple card inputs."""
+    
+    def test_unchanged_inputs_not_changed(self):
+        """Test that a card is current when none of its inputs changed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            theme_path = Path(tmpdir) / "theme.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            data_path.write_text('{"key": "value"}')
+            theme_path.write_text('{"colors": {}}')
+            inputs = [data_path, theme_path]
+            
+            update_inputs_cache(inputs, cache_path, "card")
+            
+            assert have_inputs_changed(inputs, cache_path, "card") is False
+            assert len(load_hash_cache(cache_path)["card"]["inputs"]) == 2
+    
+    def test_theme_change_is_detected(self):
+        """Test that editing a non-data input triggers regeneration."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            theme_path = Path(tmpdir) / "theme.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            data_path.write_text('{"key": "value"}')
+            theme_path.write_text('{"colors": {}}')
+            inputs = [data_path, theme_path]
+            update_inputs_cache(inputs, cache_path, "card")
+            
+            theme_path.write_text('{"colors": {"accent": "#fff"}}')
+            
+            assert find_changed_inputs(inputs, cache_path, "card") == [theme_path]
+    
+    def test_missing_input_tracked(self):
+        """Test that an optional input that stays missing is not a change."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            missing_path = Path(tmpdir) / "timezone.json"
+            cache_path = Path(tmpdir) / "cache.json"
+            data_path.write_text('{"key": "value"}')
+            inputs = [data_path, missing_path]
+            update_inputs_cache(inputs, cache_path, "card")
+            
+            assert have_inputs_changed(inputs, cache_path, "card") is False
+            
+            missing_path.write_text('{"timezone": "UTC"}')
+            assert find_changed_inputs(inputs, cache_path, "card") == [missing_path]
+    
+    def test_input_set_change_is_detected(self):
+        """Test that adding or dropping an input invalidates the card."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            lib_path = Path(tmpdir) / "helper.py"
+            cache_path = Path(tmpdir) / "cache.json"
+            data_path.write_text('{"key": "value"}')
+            lib_path.write_text("X = 1\n")
+            update_inputs_cache([data_path, lib_path], cache_path, "card")
+            
+            assert have_inputs_changed([data_path], cache_path, "card") is True
+    
+    def test_should_regenerate_with_extra_inputs(self):
+        """Test should_regenerate_svg with extra inputs."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / "data.json"
+            theme_path = Path(tmpdir) / "theme.json"
+            svg_path = Path(tmpdir) / "output.svg"
+            cache_path = Path(tmpdir) / "cache.json"
+            data_path.write_text('{"key": "value"}')
+            theme_path.write_text('{"colors": {}}')
+            svg_path.write_text("<svg></svg>")
+            update_inputs_cache([data_path, theme_path], cache_path, "card")
+            
+            assert should_regenerate_svg(
+                data_path, svg_path, cache_path, "card", extra_inputs=[theme_path]
+            ) is False
+            
+            theme_path.write_text('{"colors": {"accent": "#000"}}')
+            assert should_regenerate_svg(
+                data_path, svg_path, cache_path, "card", extra_inputs=[theme_path]
+            ) is True
+    
+    def test_find_module_dependencies(self):
+        """Test that generator lib imports are discovered transitively."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            lib_dir = Path(tmpdir) / "lib"
+            lib_dir.mkdir()
+            (lib_dir / "__init__.py").write_text("from .utils import helper\n")
+            (lib_dir / "utils.py").write_text("from . import codec\nimport json\n")
+            (lib_dir / "codec.py").write_text("import os\n")
+            (lib_dir / "unused.py").write_text("")
+            script = Path(tmpdir) / "generate-card.py"
+            script.write_text("import sys\nfrom lib.utils import helper\n")
+            
+            names = sorted(p.name for p in find_module_dependencies(script, lib_dir))
+            
+            assert names == ["__init__.py", "codec.py", "generate-card.py", "utils.py"]
+
+
+def _update_key_in_child(data_path: str, cache_path: str, key: str) -> None:
+    """Update one cache key; run in a separate process."""
+    update_hash_cache(Path(data_path), Path(cache_path), key)
+
+
+class TestHashCacheTransaction:
+    """Test batched, lock-protected hash cache updates."""
+    
+    def test_batch_writes_once(self, monkeypatch):
+        """Test that many updates in one transaction produce a single write."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = Path(tmpdir) / "cache.json"
+            paths = []
+            for i in range(5):
+                path = Path(tmpdir) / f"data{i}.json"
+                path.write_text(json.dumps({"i": i}))
+                paths.append(path)
+            
+            writes = []
+            original_save = change_detection.save_hash_cache
+            
+            def counting_save(*args, **kwargs):
+                writes.append(args)
+                original_save(*args, **kwargs)
+            
+            monkeypatch.setattr(change_detection, "save_hash_cache", counting_save)
+            
+            with hash_cache_transaction(cache_path) as cache:
+                for i, path in enumerate(paths):
+                    record_data_hash(cache, path, f"key{i}")
+            
+            assert len(writes) == 1
+            assert sorted(load_hash_cache(cache_path)) == [f"key{i}" for i in range(5)]
+    
+    def test_no_write_on_error(self):
+        """Test that a failing transaction leaves the cache untouched."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = Path(tmpdir) / "cache.json"
+            save_hash_cache(cache_path, {"existing": "hash"})
+            
+            with pytest.raises(RuntimeError):
+                with hash_cache_transaction(cache_path) as cache:
+                    cache["new"] = "value"
+                    raise RuntimeError("generation failed")
+            
+            assert load_hash_cache(cache_path) == {"existing": "hash"}
+    
+    def test_no_write_when_unchanged(self):
+        """Test that a read-only transaction does not rewrite the cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = Path(tmpdir) / "cache.json"
+            save_hash_cache(cache_path, {"existing": "hash"})
+            before = os.stat(cache_path).st_mtime_ns
+            
+            with hash_cache_transaction(cache_path) as cache:
+                assert cache["existing"] == "hash"
+            
+            assert os.stat(cache_path).st_mtime_ns == before
+    
+    def test_unchanged_inputs_skip_lock_and_write(self, monkeypatch):
+        """Test that re-recording unchanged inputs keeps checked_ns and takes no lock."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = Path(tmpdir) / "cache.json"
+            paths = [Path(tmpdir) / f"input{i}.json" for i in range(3)]
+            old = time.time_ns() - 10 * change_detection.RACY_WINDOW_NS
+            for path in paths:
+                path.write_text('{"key": "value"}')
+                os.utime(path, ns=(old, old))
+            
+            update_inputs_cache(paths, cache_path, "card")
+            update_hash_cache(paths[0], cache_path, "data")
+            before = load_hash_cache(cache_path)
+            
+            transactions = []
+            monkeypatch.setattr(change_detection, "hash_cache_transaction",
+                                lambda *args: transactions.append(args))
+            update_inputs_cache(paths, cache_path, "card")
+            update_hash_cache(paths[0], cache_path, "data")
+            
+            assert transactions == []
+            assert load_hash_cache(cache_path) == before
+    
+    @pytest.mark.skipif(not change_detection.FCNTL_AVAILABLE, reason="requires fcntl")
+    def test_concurrent_updates_not_lost(self):
+        """Test that parallel processes updating the cache keep every key."""
+        import multiprocessing
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = Path(tmpdir) / "cache.json"
+            data_path = Path(tmpdir) / "data.json"
+            data_path.write_text('{"key": "value"}')
+            
+            ctx = multiprocessing.get_context("fork")
+            workers = [
+                ctx.Process(
+                    target=_update_key_in_child,
+                    args=(str(data_path), str(cache_path), f"card{i}"),
+                )
+                for i in range(8)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            
+            assert sorted(load_hash_cache(cache_path)) == sorted(f"card{i}" for i in range(8))
+
+
 class TestShouldRegenerateSvg:
     """Test should_regenerate_svg function."""
     
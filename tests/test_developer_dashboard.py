@@ -181,3 +181,86 @@ def test_valid_grid_structure(self):
         assert len(valid_grid) == 7
         for row in valid_grid:
             assert len(row) == 24
+
+
+def _load_dashboard_module():
+    """Import generate-developer-dashboard.py (hyphenated file name)."""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(
+        "generate_developer_dashboard",
+        os.path.join(os.path.dirname(__file__), '..', 'scripts', 'generate-developer-dashboard.py'),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestHeatmapEncoding:
+    """Tests for the compact heatmap encoding."""
+
+    def setup_method(self):
+        """Load the dashboard module and a sample grid."""
+        self.module = _load_dashboard_module()
+        self.grid = [[(day * 24 + hour) % 5 for hour in range(24)] for day in range(7)]
+
+    def _cells(self, markup):
+        """Resolve heatmap markup to a sorted list of (x, y, width, height, opacity)."""
+        import re
+        cells = []
+        for x, y, w, h, opacity in re.findall(
+            r'<rect x="([\d.]+)" y="([\d.]+)" width="([\d.]+)" height="([\d.]+)" rx="1" '
+            r'fill="[^"]+" fill-opacity="([\d.]+)"', markup
+        ):
+            cells.append((float(x), float(y), float(w), float(h), opacity))
+        cell = re.search(r'<rect id="[^"]+" width="([\d.]+)" height="([\d.]+)" rx="1"(?:/>|></rect>)', markup)
+        for opacity, uses in re.findall(r'<g fill="[^"]+" fill-opacity="([\d.]+)">(.*?)</g>', markup):
+            for x, y in re.findall(r'<use href="#[^"]+" x="([\d.]+)" y="([\d.]+)"/>', uses):
+                cells.append((float(x), float(y), float(cell.group(1)), float(cell.group(2)), opacity))
+        return sorted(cells)
+
+    def test_encodings_render_the_same_cells(self):
+        """Test that <use> encoding places the same cells as per-cell rects."""
+        rects = self.module.generate_activity_heatmap(self.grid, 400, 100, 375, 50, "#0f0", encoding="rects")
+        compact = self.module.generate_activity_heatmap(self.grid, 400, 100, 375, 50, "#0f0")
+
+        assert len(self._cells(rects)) == 7 * 24
+        assert self._cells(compact) == self._cells(rects)
+        assert len(compact) < len(rects) * 0.6
+
+    def test_one_group_per_opacity_with_tooltips(self):
+        """Test that cells are grouped by opacity and each group has a tooltip."""
+        compact = self.module.generate_activity_heatmap(
+            self.grid, 0, 0, 240, 70, "#0f0", tooltips=True
+        )
+
+        assert compact.count("<g ") == 5
+        assert "<title>No commits</title>" in compact
+        assert "<title>1 commit</title>" in compact
+        assert "<title>4 commits</title>" in compact
+
+    def test_cell_registered_in_shared_defs(self):
+        """Test that the cell goes through the card's registry without ID clashes."""
+        import re
+        from lib.svg_defs import DefsRegistry
+
+        defs = DefsRegistry()
+        defs.register("rect", {"width": 5, "height": 5}, def_id="heatmap-cell")
+        markup = self.module.generate_activity_heatmap(self.grid, 0, 0, 240, 70, "#0f0", defs=defs)
+        rendered = defs.render()
+
+        assert "<defs>" not in markup
+        assert rendered.count("<rect ") == 2
+        [cell_id] = set(re.findall(r'<use href="#([^"]+)"', markup))
+        assert cell_id != "heatmap-cell"
+        assert f'<rect id="{cell_id}"' in rendered
+
+    def test_week_columns_and_invalid_grids(self):
+        """Test year-long grids, invalid grids and unknown encodings."""
+        year = [[1] * 53 for _ in range(7)]
+        markup = self.module.generate_activity_heatmap(year, 0, 0, 530, 70, "#0f0")
+
+        assert markup.count("<use ") == 7 * 53
+        assert 'x="520"' in markup
+        assert self.module.generate_activity_heatmap([[1] * 24], 0, 0, 10, 10, "#0f0") == ""
+        with pytest.raises(ValueError):
+            self.module.generate_activity_heatmap(year, 0, 0, 10, 10, "#0f0", encoding="paths")
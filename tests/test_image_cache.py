@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/image_cache.py.
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import image_cache
+from lib.utils import PILLOW_AVAILABLE, detect_image_mime
+
+
+pytestmark = pytest.mark.skipif(not PILLOW_AVAILABLE, reason="Pillow not installed")
+
+
+def _write_png(path: Path, seed: int = 0, size=(200, 150)) -> None:
+    """Write a noisy PNG that the optimizer will shrink."""
+    from PIL import Image
+
+    noise = random.Random(seed).randbytes(size[0] * size[1] * 3)
+    Image.frombytes("RGB", size, noise).save(path, format="PNG")
+
+
+class TestGetOptimizedImage:
+    """Tests for get_optimized_image function."""
+
+    def test_miss_then_hit(self, monkeypatch):
+        """Test that the second call is served from the cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = Path(tmpdir) / "map.png"
+            cache_dir = Path(tmpdir) / "cache"
+            _write_png(source)
+
+            first = image_cache.get_optimized_image(source, 100, 100, cache_dir=cache_dir)
+
+            def fail(*args, **kwargs):
+                raise AssertionError("optimize_image called on a cache hit")
+
+            monkeypatch.setattr(image_cache, "optimize_image", fail)
+            second = image_cache.get_optimized_image(source, 100, 100, cache_dir=cache_dir)
+
+            assert first == second
+            assert len(list(cache_dir.glob("*.uri"))) == 1
+
+    def test_data_uri_matches_bytes(self):
+        """Test that the data URI embeds the optimized bytes with their MIME type."""
+        import base64
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = Path(tmpdir) / "map.png"
+            _write_png(source)
+
+            data, data_uri = image_cache.get_optimized_image(
+                source, 100, 100, cache_dir=Path(tmpdir) / "cache"
+            )
+
+            header, _, payload = data_uri.partition(",")
+            assert header == f"data:{detect_image_mime(data)};base64"
+            assert base64.b64decode(payload) == data
+
+    def test_settings_change_key(self):
+        """Test that different target dimensions create separate entries."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = Path(tmpdir) / "map.png"
+            cache_dir = Path(tmpdir) / "cache"
+            _write_png(source)
+
+            small, _ = image_cache.get_optimized_image(source, 50, 50, cache_dir=cache_dir)
+            large, _ = image_cache.get_optimized_image(source, 150, 150, cache_dir=cache_dir)
+
+            assert small != large
+            assert len(list(cache_dir.glob("*.uri"))) == 2
+
+    def test_missing_file_raises(self):
+        """Test that a missing source image raises FileNotFoundError."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(FileNotFoundError):
+                image_cache.get_optimized_image(
+                    Path(tmpdir) / "missing.png", cache_dir=Path(tmpdir) / "cache"
+                )
+
+
+class TestPruneCache:
+    """Tests for LRU eviction."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest entry is evicted once the cap is exceeded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir) / "cache"
+            sources = []
+            for seed in range(3):
+                source = Path(tmpdir) / f"img{seed}.png"
+                _write_png(source, seed=seed)
+                sources.append(source)
+                image_cache.get_optimized_image(source, 100, 100, cache_dir=cache_dir)
+
+            # Age every entry, then use the first one again
+            for i, path in enumerate(sorted(cache_dir.iterdir())):
+                os.utime(path, ns=(i, i))
+            image_cache.get_optimized_image(sources[0], 100, 100, cache_dir=cache_dir)
+            keep_uri = max(cache_dir.glob("*.uri"), key=lambda p: p.stat().st_mtime_ns)
+            entry_size = keep_uri.stat().st_size + keep_uri.with_suffix(".bin").stat().st_size
+
+            evicted = image_cache.prune_cache(cache_dir, max_bytes=entry_size)
+
+            assert evicted == 2
+            assert list(cache_dir.glob("*.uri")) == [keep_uri]
+
+    def test_under_cap_keeps_everything(self):
+        """Test that nothing is evicted while the cache fits."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir) / "cache"
+            source = Path(tmpdir) / "img.png"
+            _write_png(source)
+            image_cache.get_optimized_image(source, 100, 100, cache_dir=cache_dir)
+
+            assert image_cache.prune_cache(cache_dir, max_bytes=10 ** 9) == 0
+            assert len(list(cache_dir.glob("*.bin"))) == 1
+
+
+class TestDetectImageMime:
+    """Tests for detect_image_mime function."""
+
+    def test_png_and_jpeg(self):
+        """Test that PNG and JPEG signatures are recognized."""
+        from PIL import Image
+
+        img = Image.new("RGB", (4, 4))
+        for fmt, mime in (("PNG", "image/png"), ("JPEG", "image/jpeg")):
+            output = io.BytesIO()
+            img.save(output, format=fmt)
+            assert detect_image_mime(output.getvalue()) == mime
+
+    def test_unknown(self):
+        """Test that unrecognized data returns None."""
+        assert detect_image_mime(b"not an image") is None
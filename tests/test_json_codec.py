@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/json_codec.py.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import json_codec
+
+
+SAMPLE = {
+    "b": [1, 2.5, None, True],
+    "a": {"nested": "value", "unicode": "café ☕"},
+    "count": 42,
+}
+
+
+@pytest.fixture(params=["orjson", "msgspec", "json"])
+def backend(request, monkeypatch):
+    """Run a test against every installed backend."""
+    if request.param == "orjson" and not json_codec.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    if request.param == "msgspec" and not json_codec.MSGSPEC_AVAILABLE:
+        pytest.skip("msgspec not installed")
+    monkeypatch.setattr(json_codec, "BACKEND", request.param)
+    return request.param
+
+
+class TestCodec:
+    """Tests for loads/dumps across backends."""
+
+    def test_roundtrip(self, backend):
+        """Test that dumps_bytes output parses back to the same value."""
+        assert json_codec.loads(json_codec.dumps_bytes(SAMPLE)) == SAMPLE
+
+    def test_dumps_bytes_returns_bytes(self, backend):
+        """Test that dumps_bytes returns bytes, dumps returns str."""
+        assert isinstance(json_codec.dumps_bytes(SAMPLE), bytes)
+        assert isinstance(json_codec.dumps(SAMPLE), str)
+
+    def test_compact_sorted_matches_stdlib(self, backend):
+        """Test that sorted compact output is byte-identical to the stdlib."""
+        expected = json.dumps(
+            SAMPLE, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        assert json_codec.dumps_bytes(SAMPLE, sort_keys=True) == expected
+
+    def test_indent_matches_stdlib(self, backend):
+        """Test that indented output is byte-identical to the stdlib."""
+        expected = json.dumps(SAMPLE, indent=2, ensure_ascii=False).encode("utf-8")
+        assert json_codec.dumps_bytes(SAMPLE, indent=2) == expected
+
+    def test_loads_accepts_str(self, backend):
+        """Test that loads accepts str input as well as bytes."""
+        assert json_codec.loads('{"x": 1}') == {"x": 1}
+
+    def test_invalid_json_raises_json_decode_error(self, backend):
+        """Test that every backend raises json.JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads(b"{not json")
+
+    def test_invalid_utf8_raises_json_decode_error(self, backend):
+        """Test that undecodable bytes raise json.JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads(b'{"x": "\xff"}')
+
+    def test_large_int_falls_back(self, backend):
+        """Test that values outside orjson's range are still serialized."""
+        value = {"big": 2 ** 70}
+        assert json_codec.loads(json_codec.dumps_bytes(value)) == value
+
+    def test_unserializable_raises_type_error(self, backend):
+        """Test that unserializable values raise TypeError."""
+        with pytest.raises(TypeError):
+            json_codec.dumps_bytes({"x": object()})
+
+    @pytest.mark.parametrize("value", [date(2025, 3, 1), datetime(2025, 3, 1, 12, 0)])
+    def test_dates_raise_type_error(self, backend, value):
+        """Test that no backend serializes dates on its own."""
+        with pytest.raises(TypeError):
+            json_codec.dumps_bytes({"day": value})
+
+    def test_non_finite_floats_written_as_null(self, backend):
+        """Test that NaN and infinity become null on every backend."""
+        value = {"a": float("nan"), "b": [float("inf"), 1.5]}
+        assert json_codec.dumps_bytes(value) == b'{"a":null,"b":[null,1.5]}'
+
+    def test_uuid_written_as_string(self, backend):
+        """Test that UUIDs are serialized the same way on every backend."""
+        value = uuid.UUID(int=1)
+        assert json_codec.loads(json_codec.dumps_bytes([value])) == [str(value)]
+
+    def test_circular_reference_raises_value_error(self, backend):
+        """Test that circular references still raise ValueError."""
+        value: list = []
+        value.append(value)
+        with pytest.raises(ValueError):
+            json_codec.dumps_bytes(value)
+
+    def test_ensure_ascii_matches_stdlib(self, backend):
+        """Test that ensure_ascii output is byte-identical to the stdlib default."""
+        expected = json.dumps(SAMPLE, indent=2).encode("utf-8")
+        assert json_codec.dumps_bytes(SAMPLE, indent=2, ensure_ascii=True) == expected
+
+
+class TestFileHelpers:
+    """Tests for load_path and dump_path."""
+
+    def test_dump_and_load_path(self):
+        """Test writing and reading a file through the codec."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "data.json"
+            json_codec.dump_path(SAMPLE, path)
+            assert json_codec.load_path(path) == SAMPLE
+            # Written as UTF-8 without ASCII escaping
+            assert "café" in path.read_text(encoding="utf-8")
+
+    def test_load_path_missing_file(self):
+        """Test that missing files raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            json_codec.load_path("/nonexistent/file.json")
+
+
+class TestBackendSelection:
+    """Tests for backend selection."""
+
+    def test_env_var_selects_stdlib(self, monkeypatch):
+        """Test that PROFILE_JSON_BACKEND=json pins the stdlib backend."""
+        monkeypatch.setenv(json_codec.BACKEND_ENV_VAR, "json")
+        assert json_codec._select_backend() == "json"
+
+    def test_unknown_backend_falls_back(self, monkeypatch):
+        """Test that an unknown backend name is ignored."""
+        monkeypatch.setenv(json_codec.BACKEND_ENV_VAR, "does-not-exist")
+        assert json_codec._select_backend() in ("orjson", "msgspec", "json")
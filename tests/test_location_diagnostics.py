@@ -8,6 +8,7 @@
 
 import json
 import os
+import re
 import subprocess
 import sys
 import tempfile
@@ -189,7 +190,7 @@ def test_successful_card_generation_with_diagnostics(self):
         with open(output_path, 'r') as f:
             svg_content = f.read()
             assert svg_content.startswith('<svg')
-            assert 'data:image/png;base64,' in svg_content
+            assert re.search(r'data:image/(png|webp|avif);base64,', svg_content)
 
     def test_empty_map_file_detection(self):
         """Test that empty map file produces actionable error."""
@@ -125,6 +125,36 @@ def test_fallback_map_creates_directory(self):
         
         assert os.path.exists(nested_path), "Fallback map not created in nested directory"
 
+    def test_fallback_map_cached_by_coordinates(self):
+        """Test that repeated coordinates are served from the cache."""
+        generate_fallback_map = self.module.generate_fallback_map
+        cache_dir = Path(self.test_dir) / "cache"
+        first = os.path.join(self.test_dir, "first.png")
+        second = os.path.join(self.test_dir, "second.png")
+
+        generate_fallback_map(first, 40.7128, -74.0060, cache_dir=cache_dir)
+        # Rounds to the same displayed coordinates
+        generate_fallback_map(second, 40.71281, -74.00601, cache_dir=cache_dir)
+
+        assert Path(first).read_bytes() == Path(second).read_bytes()
+        assert len(list(cache_dir.glob("map-*.png"))) == 1
+
+    def test_fallback_map_different_coordinates_differ(self):
+        """Test that only the coordinate text differs between locations."""
+        cache_dir = Path(self.test_dir) / "cache"
+        nyc = self.module.render_fallback_map(40.7128, -74.0060, cache_dir)
+        sydney = self.module.render_fallback_map(-33.8688, 151.2093, cache_dir)
+
+        from PIL import ImageChops
+        bbox = ImageChops.difference(nyc, sydney).getbbox()
+        assert bbox is not None
+        # Differences are confined to the coordinate line
+        assert 220 <= bbox[1] and bbox[3] <= 260
+
+    def test_format_coordinates(self):
+        """Test coordinate formatting with hemisphere suffixes."""
+        assert self.module.format_coordinates(-33.8688, 151.2093) == "33.8688°S, 151.2093°E"
+
 
 class TestFallbackMapScript:
     """Tests for the fallback map generation script."""
@@ -195,5 +225,6 @@ def test_script_invalid_coordinates(self):
         assert result.returncode != 0, "Script should fail with invalid coordinates"
 
 
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/metric_store.py.
+"""
+
+import math
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib.metric_store import MetricStore, flatten_snapshot
+
+
+def _snapshot(day, sleep=None, steps=None, mood=None):
+    """Build a minimal daily snapshot."""
+    snapshot = {"date": day, "health": {}, "mood": {}, "weather": {}, "developer": {}}
+    if sleep is not None:
+        snapshot["health"]["sleep_score"] = sleep
+    if steps is not None:
+        snapshot["health"]["activity_steps"] = steps
+    if mood is not None:
+        snapshot["mood"] = {"mood_name": "Calm", "mood_score": mood}
+    return snapshot
+
+
+class TestMetricStore:
+    """Tests for MetricStore."""
+
+    def setup_method(self):
+        """Create a temporary store."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name) / "columns"
+        self.store = MetricStore(self.root)
+
+    def teardown_method(self):
+        """Remove the temporary store."""
+        self.tmpdir.cleanup()
+
+    def test_flatten_snapshot_keeps_numbers_only(self):
+        """Test that text, booleans and missing values are not columns."""
+        snapshot = _snapshot("2025-01-01", sleep=80, mood=70.5)
+        snapshot["weather"] = {"condition": "Clear", "temperature": -3.5, "alert": True, "wind": None}
+
+        assert flatten_snapshot(snapshot) == {
+            "health.sleep_score": 80,
+            "mood.mood_score": 70.5,
+            "weather.temperature": -3.5,
+        }
+
+    def test_append_and_read_range(self):
+        """Test that appended days read back in date order with gaps as NaN."""
+        self.store.append(_snapshot("2025-03-01", sleep=80, steps=5000))
+        self.store.append(_snapshot("2025-03-03", sleep=70))
+
+        dates, values = self.store.read("health.sleep_score", "2025-03-01", "2025-03-03")
+
+        assert dates == [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)]
+        assert values[0] == 80 and values[2] == 70
+        assert math.isnan(values[1])
+        assert self.store.metrics() == ["health.activity_steps", "health.sleep_score"]
+        assert self.store.kind("health.sleep_score") == "int"
+
+    def test_one_file_per_metric_per_year(self):
+        """Test the on-disk layout and reads that span years."""
+        self.store.append(_snapshot("2024-12-31", sleep=60))
+        self.store.append(_snapshot("2025-01-01", sleep=65))
+
+        assert (self.root / "2024" / "health.sleep_score.f64").stat().st_size == 366 * 8
+        assert (self.root / "2025" / "health.sleep_score.f64").exists()
+
+        dates, values = self.store.read("health.sleep_score", "2024-12-30", "2025-01-02")
+        assert len(dates) == 4
+        assert list(values[1:3]) == [60.0, 65.0]
+
+    def test_rewriting_a_day_replaces_it(self):
+        """Test that metrics missing from a rewritten day are cleared."""
+        self.store.append(_snapshot("2025-05-05", sleep=80, steps=1000))
+        self.store.append(_snapshot("2025-05-05", sleep=82))
+
+        _, steps = self.store.read("health.activity_steps", "2025-05-05", "2025-05-05")
+        _, sleep = self.store.read("health.sleep_score", "2025-05-05", "2025-05-05")
+        assert math.isnan(steps[0])
+        assert sleep[0] == 82
+
+    def test_rows_and_export_restore_kinds(self):
+        """Test snapshot-shaped rows and the JSON export."""
+        self.store.append(_snapshot("2025-06-01", sleep=80, mood=70.5))
+        self.store.append(_snapshot("2025-06-03", sleep=75))
+
+        rows = list(self.store.rows("2025-06-01", "2025-06-03"))
+        assert [row["date"] for row in rows] == ["2025-06-01", "2025-06-03"]
+        assert rows[0]["health"] == {"sleep_score": 80}
+        assert isinstance(rows[0]["health"]["sleep_score"], int)
+        assert rows[0]["mood"] == {"mood_score": 70.5}
+        assert rows[1]["mood"] == {}
+
+        exported = self.store.export_json("2025-06-01", "2025-06-03", ["health.sleep_score"])
+        assert exported == {
+            "dates": ["2025-06-01", "2025-06-02", "2025-06-03"],
+            "metrics": {"health.sleep_score": [80, None, 75]},
+        }
+
+    def test_missing_store_reads_empty(self):
+        """Test that an empty store returns NaN columns and no rows."""
+        dates, values = self.store.read("health.sleep_score", "2025-01-01", "2025-01-05")
+
+        assert len(dates) == 5
+        assert all(math.isnan(v) for v in values)
+        assert list(self.store.rows("2025-01-01", "2025-01-05")) == []
+        assert not self.store.exists()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batch mood computation in scripts/oura-mood-engine.py.
+"""
+
+import importlib.util
+import itertools
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib.metric_store import MetricStore
+
+
+def _load_mood_module():
+    """Import oura-mood-engine.py (hyphenated file name)."""
+    spec = importlib.util.spec_from_file_location(
+        "oura_mood_engine",
+        os.path.join(os.path.dirname(__file__), '..', 'scripts', 'oura-mood-engine.py'),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+mood_engine = _load_mood_module()
+
+# Run every test on the pure-Python backend, and on NumPy when installed
+BACKENDS = [False] + ([True] if mood_engine.HAS_NUMPY else [])
+
+
+def _grid_columns():
+    """Input columns covering every branch of the decision tree."""
+    levels = [None, 40, 55, 65, 72, 78, 85, float("nan")]
+    rows = list(itertools.product(levels, levels, levels, [None, 60, 75]))
+    columns = {
+        "sleep_score": [r[0] for r in rows],
+        "readiness_score": [r[1] for r in rows],
+        "activity_score": [r[2] for r in rows],
+        "hrv": [r[3] for r in rows],
+        "resting_hr": [(i * 7) % 101 for i in range(len(rows))],
+        "temp_deviation": [(i * 13) % 101 for i in range(len(rows))],
+    }
+    return rows, columns
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestMoodBatch:
+    """Tests for compute_mood_batch(), per backend."""
+
+    def test_matches_scalar_functions(self, use_numpy):
+        """Test that every day gets the same score and category as the scalar path."""
+        rows, columns = _grid_columns()
+        batch = mood_engine.compute_mood_batch(columns, use_numpy=use_numpy)
+
+        for i in range(len(rows)):
+            metrics = {
+                name: None if values[i] != values[i] else values[i]
+                for name, values in columns.items()
+            }
+            assert batch["mood_score"][i] == mood_engine.compute_mood_score(metrics)
+            assert batch["mood_key"][i] == mood_engine.classify_mood(metrics)
+
+    def test_custom_weights_and_missing_columns(self, use_numpy):
+        """Test that weights are applied and absent columns count as neutral."""
+        batch = mood_engine.compute_mood_batch(
+            {"sleep_score": [100, 0]},
+            weights={"sleep_score": 1.0},
+            use_numpy=use_numpy,
+        )
+
+        assert batch["mood_score"] == [100.0, 0.0]
+        assert batch["mood_key"] == ["restorative_drift", "storm_state"]
+
+    def test_numpy_array_columns(self, use_numpy):
+        """Test that NumPy arrays are accepted as input columns."""
+        np = pytest.importorskip("numpy")
+        batch = mood_engine.compute_mood_batch(
+            {"sleep_score": np.array([100.0, np.nan]), "readiness_score": np.array([90.0, 40.0])},
+            use_numpy=use_numpy,
+        )
+        expected = mood_engine.compute_mood_batch(
+            {"sleep_score": [100.0, None], "readiness_score": [90.0, 40.0]},
+            use_numpy=use_numpy,
+        )
+
+        assert batch == expected
+
+    def test_unknown_weight_rejected(self, use_numpy):
+        """Test that weights for inputs the engine doesn't know raise ValueError."""
+        with pytest.raises(ValueError, match="sleep_scroe"):
+            mood_engine.compute_mood_batch({"sleep_score": [80]}, weights={"sleep_scroe": 1.0}, use_numpy=use_numpy)
+
+    def test_empty_input(self, use_numpy):
+        """Test that no columns give empty results."""
+        assert mood_engine.compute_mood_batch({}, use_numpy=use_numpy) == {
+            "mood_score": [], "mood_key": []
+        }
+
+
+class TestMoodHistory:
+    """Tests for compute_mood_history() and its cache."""
+
+    def setup_method(self):
+        """Create a metric store with two days of inputs."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshots_dir = Path(self.tmpdir.name)
+        self.store = MetricStore(self.snapshots_dir / "columns")
+        self.store.write("2025-03-01", {
+            "health.sleep_score": 85, "health.readiness_score": 82,
+            "health.activity_score": 60, "health.readiness_hrv": 75,
+            "health.resting_hr": 90, "health.readiness_body_temp": 95,
+        })
+        self.store.write("2025-03-03", {"health.sleep_score": 40})
+
+    def teardown_method(self):
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def test_history_and_empty_days(self):
+        """Test per-day results, with None for days without inputs."""
+        history = mood_engine.compute_mood_history(
+            self.snapshots_dir, date(2025, 3, 1), date(2025, 3, 3)
+        )
+
+        assert history["dates"] == ["2025-03-01", "2025-03-02", "2025-03-03"]
+        assert history["mood_key"] == ["cosmic_clarity", None, "storm_state"]
+        assert history["mood_score"][0] == mood_engine.compute_mood_score({
+            "sleep_score": 85, "readiness_score": 82, "activity_score": 60,
+            "hrv": 75, "resting_hr": 90, "temp_deviation": 95,
+        })
+        assert history["mood_score"][1] is None
+        assert (self.snapshots_dir / mood_engine.MOOD_HISTORY_FILE).exists()
+
+    def test_cache_reused_until_inputs_or_weights_change(self):
+        """Test that the cached history is returned only for identical inputs."""
+        start, end = date(2025, 3, 1), date(2025, 3, 3)
+        first = mood_engine.compute_mood_history(self.snapshots_dir, start, end)
+
+        cache_file = self.snapshots_dir / mood_engine.MOOD_HISTORY_FILE
+        cached = cache_file.read_text().replace('"storm_state"', '"cached_marker"')
+        cache_file.write_text(cached)
+        assert mood_engine.compute_mood_history(self.snapshots_dir, start, end)["mood_key"][2] == "cached_marker"
+
+        weights = dict(mood_engine.MOOD_WEIGHTS, sleep_score=0.5)
+        reweighted = mood_engine.compute_mood_history(self.snapshots_dir, start, end, weights)
+        assert reweighted["key"] != first["key"]
+        assert reweighted["mood_key"][2] == "storm_state"
+        assert reweighted["mood_score"][0] != first["mood_score"][0]
+
+        self.store.write("2025-03-02", {"health.sleep_score": 90})
+        changed = mood_engine.compute_mood_history(self.snapshots_dir, start, end, weights)
+        assert changed["mood_key"][1] is not None
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/ops_store.py.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import metrics as metrics_module
+from lib.ops_store import RUN_HISTORY_LIMIT, SCHEMA_VERSION, OpsStore
+
+
+@pytest.fixture
+def temp_root():
+    """Create a temporary repository root."""
+    temp_dir = tempfile.mkdtemp()
+    yield Path(temp_dir)
+    shutil.rmtree(temp_dir)
+
+
+class TestOpsStore:
+    """Tests for the SQLite tables and queries."""
+
+    def test_database_uses_wal_and_schema_version(self, temp_root):
+        """Test that the database is created in WAL mode with the current schema."""
+        with OpsStore(temp_root / "ops.sqlite3") as store:
+            assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert store.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            indexes = {row[0] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert {"run_history_workflow_time", "run_history_time"} <= indexes
+
+    def test_record_workflow_run_matches_file_metrics(self, temp_root, monkeypatch):
+        """Test that counters follow lib.metrics.record_workflow_run()."""
+        metrics_dir = temp_root / "data" / "metrics"
+        metrics_dir.mkdir(parents=True)
+        monkeypatch.setattr('lib.metrics.get_metrics_dir', lambda: metrics_dir)
+
+        with OpsStore(temp_root / "ops.sqlite3") as store:
+            for success, run_time, calls in ((True, 10.0, {"oura": 2}), (False, 20.0, {"oura": 1}), (False, None, None)):
+                expected = metrics_module.record_workflow_run("oura", success, run_time, calls, None if success else "boom")
+                actual = store.record_workflow_run("oura", success, run_time, calls, None if success else "boom")
+
+            for key in ("total_runs", "successful_runs", "failed_runs", "consecutive_failures",
+                        "last_run_time_seconds", "api_calls"):
+                assert actual[key] == expected[key]
+            assert actual["avg_run_time_seconds"] == pytest.approx(expected["avg_run_time_seconds"])
+            assert [r["success"] for r in actual["run_history"]] == [True, False, False]
+
+    def test_recent_runs_across_workflows(self, temp_root):
+        """Test the newest-first run query, overall and per workflow."""
+        with OpsStore(temp_root / "ops.sqlite3") as store:
+            for i in range(30):
+                store.record_workflow_run("oura" if i % 2 else "weather", True, float(i),
+                                          timestamp=f"2025-03-01T00:{i:02d}:00Z")
+
+            runs = store.recent_runs(limit=5)
+            assert [r["run_time_seconds"] for r in runs] == [29.0, 28.0, 27.0, 26.0, 25.0]
+            assert {r["workflow"] for r in store.recent_runs(5, "oura")} == {"oura"}
+            assert len(store.workflow_metrics("oura")["run_history"]) == RUN_HISTORY_LIMIT - 5
+            assert [m["workflow_name"] for m in store.all_workflow_metrics()] == ["oura", "weather"]
+
+    def test_transaction_rolls_back_on_error(self, temp_root):
+        """Test that a failed block leaves no partial writes."""
+        with OpsStore(temp_root / "ops.sqlite3") as store:
+            with pytest.raises(RuntimeError):
+                with store.transaction() as conn:
+                    conn.execute("INSERT INTO run_history (workflow, timestamp, success) VALUES ('oura', 'now', 1)")
+                    raise RuntimeError("abort")
+            assert store.recent_runs() == []
+
+    def test_concurrent_connections_serialize_writes(self, temp_root):
+        """Test that two connections updating the same counters lose no runs."""
+        path = temp_root / "ops.sqlite3"
+        with OpsStore(path) as first, OpsStore(path) as second:
+            for _ in range(5):
+                first.record_workflow_run("oura", True)
+                second.record_workflow_run("oura", False)
+            assert first.workflow_metrics("oura")["total_runs"] == 10
+
+    def test_version_1_database_upgraded(self, temp_root):
+        """Test that the unused tables of schema version 1 are dropped and the runs kept."""
+        path = temp_root / "ops.sqlite3"
+        with OpsStore(path) as store:
+            store.record_workflow_run("oura", True)
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE hash_cache (key TEXT PRIMARY KEY, entry TEXT NOT NULL, updated_at TEXT NOT NULL)")
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        conn.close()
+
+        with OpsStore(path) as store:
+            tables = {row[0] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            assert tables == {"workflow_metrics", "run_history"}
+            assert store.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            assert store.workflow_metrics("oura")["total_runs"] == 1
+
+    def test_newer_schema_rejected(self, temp_root):
+        """Test that a database from a newer version is not modified."""
+        path = temp_root / "ops.sqlite3"
+        conn = sqlite3.connect(path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        conn.close()
+        with pytest.raises(sqlite3.DatabaseError):
+            OpsStore(path)
+
+
+class TestMigration:
+    """Tests for importing data/metrics."""
+
+    def test_migrate_from_files(self, temp_root):
+        """Test that data/metrics is imported, and re-imports replace rows."""
+        metrics_dir = temp_root / "data" / "metrics"
+        metrics_dir.mkdir(parents=True)
+        (metrics_dir / "oura.json").write_text(json.dumps({
+            "workflow_name": "oura", "total_runs": 2, "successful_runs": 1, "failed_runs": 1,
+            "consecutive_failures": 1, "last_success": "2025-03-01T00:00:00Z",
+            "last_failure": "2025-03-02T00:00:00Z", "last_run_time_seconds": 5.0,
+            "avg_run_time_seconds": 4.0, "api_calls": {"oura": 3},
+            "run_history": [
+                {"timestamp": "2025-03-01T00:00:00Z", "success": True, "run_time_seconds": 3.0, "error_message": None},
+                {"timestamp": "2025-03-02T00:00:00Z", "success": False, "run_time_seconds": 5.0, "error_message": "x"},
+            ],
+        }))
+
+        with OpsStore(temp_root / "ops.sqlite3") as store:
+            counts = store.migrate_from_files(temp_root)
+            assert counts == {"workflow_metrics": 1, "run_history": 2}
+            store.migrate_from_files(temp_root)
+
+            oura = store.workflow_metrics("oura")
+            assert oura["total_runs"] == 2
+            assert oura["api_calls"] == {"oura": 3}
+            assert [r["error_message"] for r in oura["run_history"]] == [None, "x"]
+
+
+class TestMetricsMirror:
+    """Tests for the OPS_DB_PATH hook in lib.metrics."""
+
+    def test_record_workflow_run_mirrors_into_store(self, temp_root, monkeypatch):
+        """Test that a recorded run also lands in the configured database."""
+        metrics_dir = temp_root / "data" / "metrics"
+        metrics_dir.mkdir(parents=True)
+        monkeypatch.setattr('lib.metrics.get_metrics_dir', lambda: metrics_dir)
+        monkeypatch.setenv(metrics_module.OPS_DB_ENV, str(temp_root / "ops.sqlite3"))
+
+        metrics_module.record_workflow_run("weather", True, 3.5)
+
+        with OpsStore(temp_root / "ops.sqlite3") as store:
+            [run] = store.recent_runs()
+            assert run["workflow"] == "weather"
+            assert run["run_time_seconds"] == 3.5
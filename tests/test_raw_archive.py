@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/raw_archive.py.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib.raw_archive import RawArchive, RawArchiveError, payload_hash
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'archive-raw-response.py')
+
+
+def _at(day, hour=12):
+    """UTC fetch time on a day."""
+    return datetime.fromisoformat(f"{day}T{hour:02d}:00:00").replace(tzinfo=timezone.utc)
+
+
+class TestRawArchive:
+    """Tests for storing, deduplicating, replaying and pruning payloads."""
+
+    def setup_method(self):
+        """Create an empty gzip archive in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.archive = RawArchive(self.root, codec="gzip")
+
+    def teardown_method(self):
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def _objects(self):
+        return sorted(self.root.glob("objects/*/*"))
+
+    def test_store_and_load_round_trip(self):
+        """Test that a payload is compressed, hashed and read back unchanged."""
+        payload = b'{"data": [{"day": "2025-03-01", "score": 81}]}' * 20
+        digest = self.archive.store("oura", "daily_sleep", payload, fetched_at=_at("2025-03-01"))
+
+        assert digest == payload_hash(payload)
+        assert self.archive.load(digest) == payload
+        [obj] = self._objects()
+        assert obj.name == f"{digest}.gz"
+        assert obj.stat().st_size < len(payload)
+
+        [entry] = self.archive.entries("2025-03-01")
+        assert entry["source"] == "oura"
+        assert entry["name"] == "daily_sleep"
+        assert entry["status"] == "ok"
+        assert entry["size"] == len(payload)
+
+    def test_identical_payloads_are_stored_once(self):
+        """Test deduplication across endpoints, fetches and days."""
+        self.archive.store("oura", "personal_info", b'{"age": 30}', fetched_at=_at("2025-03-01", 6))
+        self.archive.store("oura", "personal_info", b'{"age": 30}', fetched_at=_at("2025-03-01", 18))
+        self.archive.store("oura", "personal_info", b'{"age": 30}', fetched_at=_at("2025-03-02"))
+        self.archive.store("oura", "daily_sleep", b'{"age": 30}', fetched_at=_at("2025-03-02"))
+
+        assert len(self._objects()) == 1
+        [entry] = self.archive.entries("2025-03-01")
+        assert entry["fetched_at"] == "2025-03-01T06:00:00Z"
+        assert entry["last_seen"] == "2025-03-01T18:00:00Z"
+        assert len(self.archive.entries("2025-03-02")) == 2
+
+    def test_replay_history_and_latest(self):
+        """Test offline replay in fetch order, skipping invalid responses."""
+        self.archive.store("oura", "daily_sleep", b"v1", fetched_at=_at("2025-03-01"))
+        self.archive.store("oura", "daily_sleep", b"<html>", status="invalid", fetched_at=_at("2025-03-02"))
+        self.archive.store("oura", "daily_sleep", b"v3", fetched_at=_at("2025-03-03"))
+
+        assert [p for _, p in self.archive.history("oura", "daily_sleep")] == [b"v1", b"v3"]
+        assert [p for _, p in self.archive.history("oura", "daily_sleep", status=None)] == [b"v1", b"<html>", b"v3"]
+        assert self.archive.latest("oura", "daily_sleep", "2025-03-02") == b"v1"
+        assert self.archive.latest("oura", "daily_sleep") == b"v3"
+        assert self.archive.latest("oura", "heart_rate") is None
+
+    def test_corrupt_or_missing_payload_raises(self):
+        """Test that damaged objects are detected by their hash."""
+        digest = self.archive.store("developer", "stats", b"payload", fetched_at=_at("2025-03-01"))
+        [obj] = self._objects()
+        obj.write_bytes(b"not gzip")
+
+        with pytest.raises(RawArchiveError):
+            self.archive.load(digest)
+        with pytest.raises(RawArchiveError):
+            self.archive.load("0" * 32)
+
+    def test_prune_drops_old_manifests_and_unreferenced_payloads(self):
+        """Test that payloads still referenced by kept days survive pruning."""
+        shared = self.archive.store("oura", "personal_info", b"same", fetched_at=_at("2025-01-01"))
+        self.archive.store("oura", "daily_sleep", b"old", fetched_at=_at("2025-01-01"))
+        self.archive.store("oura", "personal_info", b"same", fetched_at=_at("2025-03-01"))
+
+        assert self.archive.prune(keep_days=30, today=date(2025, 3, 10)) == (1, 1)
+        assert self.archive.days() == [date(2025, 3, 1)]
+        assert self.archive.load(shared) == b"same"
+        assert not (self.root / "manifests" / "2025" / "2025-01-01.json").exists()
+
+    def test_unknown_codec_rejected(self):
+        """Test codec validation."""
+        with pytest.raises(ValueError):
+            RawArchive(self.root, codec="lzma")
+
+    def test_cli_store_and_replay(self):
+        """Test the archive-raw-response.py store and replay commands."""
+        subprocess.run(
+            [sys.executable, SCRIPT, "--archive-dir", str(self.root), "store", "oura", "daily_sleep"],
+            input=b'{"data": []}\n', check=True, capture_output=True,
+        )
+        result = subprocess.run(
+            [sys.executable, SCRIPT, "--archive-dir", str(self.root), "replay", "oura", "daily_sleep"],
+            check=True, capture_output=True,
+        )
+        assert result.stdout == b'{"data": []}\n'
+
+        missing = subprocess.run(
+            [sys.executable, SCRIPT, "--archive-dir", str(self.root), "replay", "oura", "heart_rate"],
+            capture_output=True,
+        )
+        assert missing.returncode == 1
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/rolling_stats.py and incremental snapshot aggregates.
+"""
+
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import json_codec
+from lib.rolling_stats import RunningStats
+
+
+def _load_snapshot_module():
+    """Import store-historical-snapshot.py (hyphenated file name)."""
+    spec = importlib.util.spec_from_file_location(
+        "store_historical_snapshot",
+        os.path.join(os.path.dirname(__file__), '..', 'scripts', 'store-historical-snapshot.py'),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestRunningStats:
+    """Tests for RunningStats."""
+
+    def test_matches_statistics_module(self):
+        """Test mean, extremes and standard deviation against statistics."""
+        values = [80, 75, 90, 62, 88]
+        stats = RunningStats().update(values)
+
+        assert stats.count == 5
+        assert stats.total == sum(values)
+        assert stats.mean() == statistics.mean(values)
+        assert stats.minimum == 62 and stats.maximum == 90
+        assert abs(stats.stdev() - statistics.pstdev(values)) < 1e-9
+
+    def test_merge_equals_single_pass(self):
+        """Test that merging partial states equals aggregating everything."""
+        left = RunningStats().update([1, 5, 3])
+        right = RunningStats().update([10, -2])
+
+        assert left.merge(right) == RunningStats().update([1, 5, 3, 10, -2])
+        assert RunningStats().merge(RunningStats()).count == 0
+
+    def test_ignores_missing_values_and_round_trips(self):
+        """Test that None/NaN are skipped and the state serializes losslessly."""
+        stats = RunningStats().update([None, 4, float("nan"), 6])
+        restored = RunningStats.from_dict(json_codec.loads(json_codec.dumps(stats.to_dict())))
+
+        assert restored == stats
+        assert restored.count == 2
+        assert RunningStats().mean() is None
+
+
+class TestIncrementalAggregates:
+    """Tests for weekly/monthly aggregates kept up to date day by day."""
+
+    def setup_method(self):
+        """Create a temporary snapshot directory."""
+        self.module = _load_snapshot_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmpdir.name)
+
+    def teardown_method(self):
+        """Remove the temporary snapshot directory."""
+        self.tmpdir.cleanup()
+
+    def _store_day(self, day, sleep, steps):
+        """Save a daily snapshot and fold it into the aggregates."""
+        snapshot = {
+            "date": day,
+            "health": {"sleep_score": sleep, "activity_steps": steps},
+            "mood": {}, "weather": {}, "developer": {},
+        }
+        self.module.save_snapshot(snapshot, self.output_dir)
+        self.module.update_aggregated_snapshots(self.output_dir, date.fromisoformat(day))
+        return snapshot
+
+    def _monthly(self):
+        return json_codec.load_path(self.output_dir / "monthly" / "2025-03.json")
+
+    def test_incremental_matches_full_aggregate(self):
+        """Test that day-by-day updates equal aggregating the whole month."""
+        snapshots = [
+            self._store_day(f"2025-03-{day:02d}", 60 + day, 1000 * day)
+            for day in (3, 4, 5, 10, 11)
+        ]
+        monthly = self._monthly()
+        state = monthly.pop("state")
+
+        assert monthly == self.module.aggregate_monthly_snapshot(snapshots)
+        assert list(state["days"]) == [s["date"] for s in snapshots]
+
+        weekly = json_codec.load_path(self.output_dir / "weekly" / "2025-W11.json")
+        assert (weekly["start_date"], weekly["end_date"], weekly["days_count"]) == ("2025-03-10", "2025-03-11", 2)
+
+    def test_corrected_day_triggers_rebuild(self, capsys):
+        """Test that changing an already counted day rebuilds the period."""
+        self._store_day("2025-03-03", 70, 1000)
+        self._store_day("2025-03-04", 80, 2000)
+        capsys.readouterr()
+
+        self._store_day("2025-03-03", 90, 1000)
+
+        assert "Rebuilt monthly aggregate from 2 days" in capsys.readouterr().err
+        monthly = self._monthly()
+        assert monthly["health"]["avg_sleep_score"] == 85.0
+        assert monthly["health"]["max_sleep_score"] == 90
+        assert monthly["health"]["min_sleep_score"] == 80
+        assert monthly["days_count"] == 2
+
+    def test_unchanged_day_is_not_counted_twice(self):
+        """Test that re-running for the same day leaves the summary as is."""
+        self._store_day("2025-03-03", 70, 1000)
+        self._store_day("2025-03-03", 70, 1000)
+
+        monthly = self._monthly()
+        assert monthly["days_count"] == 1
+        assert monthly["health"]["total_steps"] == 1000
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/snapshot_analytics.py.
+"""
+
+import math
+import os
+import statistics
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import snapshot_analytics as analytics
+from lib.metric_store import MetricStore
+
+NAN = float("nan")
+
+# Run every test on the pure-Python backend, and on NumPy when installed
+BACKENDS = [False] + ([True] if analytics.HAS_NUMPY else [])
+
+
+def _same(left, right):
+    """Compare lists of floats, treating NaN as equal."""
+    assert len(left) == len(right)
+    for a, b in zip(left, right):
+        assert (math.isnan(a) and math.isnan(b)) or a == pytest.approx(b)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestAnalytics:
+    """Tests for the column analytics, per backend."""
+
+    def test_rolling_mean_skips_missing_days(self, use_numpy):
+        """Test the trailing mean over a window with gaps."""
+        values = [1.0, NAN, 3.0, 5.0, NAN, NAN, NAN]
+
+        _same(analytics.rolling_mean(values, 3, use_numpy), [1.0, 1.0, 2.0, 4.0, 4.0, 5.0, NAN])
+
+    def test_percentiles_interpolate(self, use_numpy):
+        """Test linear interpolation between ranks."""
+        result = analytics.percentiles([10.0, NAN, 20.0, 30.0, 40.0], (0, 50, 90), use_numpy)
+
+        assert result == {"p0": 10.0, "p50": 25.0, "p90": pytest.approx(37.0)}
+        assert analytics.percentiles([NAN], (50,), use_numpy) == {"p50": None}
+
+    def test_zscores_match_population_stdev(self, use_numpy):
+        """Test z-scores, including constant input."""
+        values = [2.0, 4.0, NAN, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]
+        data = [v for v in values if not math.isnan(v)]
+        mean, std = statistics.mean(data), statistics.pstdev(data)
+
+        _same(analytics.zscores(values, use_numpy), [NAN if math.isnan(v) else (v - mean) / std for v in values])
+        _same(analytics.zscores([3.0, 3.0, NAN], use_numpy), [0.0, 0.0, NAN])
+
+    def test_trend_slope(self, use_numpy):
+        """Test the least-squares slope with gaps."""
+        assert analytics.trend_slope([1.0, NAN, 5.0, 7.0], use_numpy) == pytest.approx(2.0)
+        assert analytics.trend_slope([1.0, NAN], use_numpy) is None
+
+    def test_snapshot_analytics_document(self, use_numpy):
+        """Test the exported document built from the metric store."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = MetricStore(Path(tmpdir))
+            start = date(2025, 1, 1)
+            for i in range(60):
+                sleep = 40 if i == 45 else 70 + i * 0.1
+                store.append({"date": (start + timedelta(days=i)).isoformat(), "health": {"sleep_score": sleep}})
+
+            result = analytics.compute_snapshot_analytics(
+                store, end=start + timedelta(days=59), days=60, use_numpy=use_numpy
+            )
+
+        sleep = result["metrics"]["sleep"]
+        assert result["backend"] == ("numpy" if use_numpy else "python")
+        assert len(result["dates"]) == len(sleep["rolling_7d"]) == 60
+        assert sleep["count"] == 60
+        assert sleep["latest"] == pytest.approx(75.9)
+        assert sleep["trend_per_week"] == pytest.approx(0.7, abs=0.5)
+        assert [a["date"] for a in sleep["anomalies"]] == ["2025-02-15"]
+        assert result["metrics"]["steps"]["count"] == 0
+        assert result["metrics"]["steps"]["percentiles"]["p50"] is None
+
+
+@pytest.mark.skipif(not analytics.HAS_NUMPY, reason="NumPy not installed")
+def test_backends_agree_on_random_history():
+    """Test that the NumPy and pure-Python backends give the same results."""
+    import random
+    rng = random.Random(7)
+    values = [NAN if rng.random() < 0.2 else rng.uniform(50, 100) for _ in range(400)]
+    dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(400)]
+
+    assert analytics.analyze_metric(dates, values, use_numpy=True) == analytics.analyze_metric(dates, values, use_numpy=False)
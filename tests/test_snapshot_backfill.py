@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the snapshot backfill in scripts/store-historical-snapshot.py.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import json_codec
+
+
+def _load_snapshot_module():
+    """Import store-historical-snapshot.py (hyphenated file name)."""
+    spec = importlib.util.spec_from_file_location(
+        "store_historical_snapshot",
+        os.path.join(os.path.dirname(__file__), '..', 'scripts', 'store-historical-snapshot.py'),
+    )
+    module = importlib.util.module_from_spec(spec)
+    # Registered so worker processes can unpickle the backfill worker
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestBackfill:
+    """Tests for rebuilding past snapshots from git history."""
+
+    def setup_method(self):
+        """Create a git repository with three days of data file commits."""
+        self.module = _load_snapshot_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmpdir.name)
+        self.old_cwd = os.getcwd()
+        os.chdir(self.repo)
+
+        self._git("init", "-q")
+        (self.repo / "oura").mkdir()
+        for day, sleep in (("2025-03-03", 70), ("2025-03-05", 80), ("2025-03-10", 90)):
+            (self.repo / "oura" / "health_snapshot.json").write_text(
+                json.dumps({"sleep": {"score": sleep}, "activity": {"steps": sleep * 100}})
+            )
+            self._git("add", "oura")
+            self._git("commit", "-q", "-m", f"data {day}", date=f"{day}T12:00:00Z")
+
+    def teardown_method(self):
+        """Restore the working directory and remove the repository."""
+        os.chdir(self.old_cwd)
+        self.tmpdir.cleanup()
+
+    def _git(self, *args, date=None):
+        env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@example.com",
+                   GIT_COMMITTER_NAME="t", GIT_COMMITTER_EMAIL="t@example.com")
+        if date:
+            env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+        subprocess.run(["git", *args], check=True, cwd=self.repo, env=env)
+
+    def test_plan_picks_version_as_of_each_day(self):
+        """Test that each day uses the last commit before its end."""
+        plan = dict(self.module.plan_backfill(date(2025, 3, 2), date(2025, 3, 6)))
+
+        assert sorted(plan) == ["2025-03-03", "2025-03-04", "2025-03-05", "2025-03-06"]
+        assert list(plan["2025-03-04"]) == ["health"]
+        assert plan["2025-03-04"] == plan["2025-03-03"]
+        assert plan["2025-03-05"] != plan["2025-03-04"]
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_backfill_writes_days_and_aggregates(self, jobs):
+        """Test daily files, columns and rebuilt summaries, serial and parallel."""
+        output_dir = self.repo / "snapshots"
+
+        count = self.module.backfill_snapshots(output_dir, date(2025, 3, 3), date(2025, 3, 10), jobs=jobs)
+
+        assert count == 8
+        day = json_codec.load_path(output_dir / "daily" / "2025" / "03" / "2025-03-04.json")
+        assert day["date"] == "2025-03-04"
+        assert day["health"]["sleep_score"] == 70
+
+        weekly = json_codec.load_path(output_dir / "weekly" / "2025-W10.json")
+        assert weekly["days_count"] == 7
+        assert weekly["health"]["avg_sleep_score"] == round((70 * 2 + 80 * 5) / 7, 1)
+
+        monthly = json_codec.load_path(output_dir / "monthly" / "2025-03.json")
+        assert monthly["days_count"] == 8
+        assert monthly["health"]["max_sleep_score"] == 90
+
+    def test_missing_only_keeps_existing_days(self):
+        """Test that --missing-only leaves already stored days alone."""
+        output_dir = self.repo / "snapshots"
+        self.module.backfill_snapshots(output_dir, date(2025, 3, 3), date(2025, 3, 3))
+
+        count = self.module.backfill_snapshots(output_dir, date(2025, 3, 3), date(2025, 3, 5), missing_only=True)
+
+        assert count == 2
+        stored = self.module.SnapshotIndex.load(output_dir).daily
+        assert sorted(stored) == ["2025-03-03", "2025-03-04", "2025-03-05"]
+        dates, values = self.module.get_metric_store(output_dir).read("health.sleep_score", "2025-03-03", "2025-03-05")
+        assert list(values) == [70.0, 70.0, 80.0]
+
+    def test_index_saved_once_per_backfill(self, monkeypatch):
+        """Test that a backfill records every day in one index write."""
+        output_dir = self.repo / "snapshots"
+        saves = []
+        original_save = self.module.SnapshotIndex.save
+        monkeypatch.setattr(self.module.SnapshotIndex, "save", lambda index: saves.append(index) or original_save(index))
+
+        self.module.backfill_snapshots(output_dir, date(2025, 3, 3), date(2025, 3, 10))
+
+        assert len(saves) == 1
+        assert len(self.module.SnapshotIndex.load(output_dir).daily) == 8
+
+    def test_plan_clamps_end_to_today(self):
+        """Test that days after today are never planned."""
+        today = date.today()
+        plan = self.module.plan_backfill(today.replace(day=1), date(today.year + 1, 1, 1))
+
+        assert plan and max(day for day, _ in plan) <= (today + timedelta(days=1)).isoformat()
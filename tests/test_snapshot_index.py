@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/snapshot_index.py.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import json_codec
+from lib.snapshot_index import INDEX_FILE, SnapshotIndex
+
+
+def _load_script(name):
+    """Import a hyphenated script from scripts/."""
+    spec = importlib.util.spec_from_file_location(
+        name.replace("-", "_"),
+        os.path.join(os.path.dirname(__file__), '..', 'scripts', f"{name}.py"),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestSnapshotIndex:
+    """Tests for the snapshot manifest."""
+
+    def setup_method(self):
+        """Store days in two weeks and two months."""
+        self.store = _load_script("store-historical-snapshot")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmpdir.name)
+        for day, sleep in (("2025-02-27", 70), ("2025-03-03", 80), ("2025-03-04", None)):
+            health = {"activity_steps": 1000}
+            if sleep is not None:
+                health["sleep_score"] = sleep
+            snapshot = {"date": day, "health": health, "mood": {}, "weather": {}, "developer": {}}
+            self.store.save_snapshot(snapshot, self.output_dir)
+            self.store.update_aggregated_snapshots(self.output_dir, date.fromisoformat(day))
+
+    def teardown_method(self):
+        """Remove the temporary snapshot directory."""
+        self.tmpdir.cleanup()
+
+    def test_writes_keep_index_current(self):
+        """Test that every daily and summary write is recorded."""
+        data = json_codec.load_path(self.output_dir / INDEX_FILE)
+
+        assert list(data["daily"]) == ["2025-02-27", "2025-03-03", "2025-03-04"]
+        assert data["daily"]["2025-03-03"]["path"] == "daily/2025/03/2025-03-03.json"
+        assert list(data["weekly"]) == ["2025-W09", "2025-W10"]
+        assert data["monthly"]["2025-03"]["days_count"] == 2
+        assert SnapshotIndex.rebuild(self.output_dir).daily == data["daily"]
+
+    def test_latest_range_and_coverage(self):
+        """Test queries answered from the index."""
+        index = SnapshotIndex.load(self.output_dir)
+
+        assert index.latest("weekly")[0] == "2025-W10"
+        assert index.latest("monthly")[0] == "2025-03"
+        assert index.latest("yearly") is None
+        assert [day for day, _ in index.daily_range("2025-03-01", "2025-03-31")] == ["2025-03-03", "2025-03-04"]
+        assert index.coverage("health.sleep_score") == ["2025-02-27", "2025-03-03"]
+        assert index.latest_daily()[0] == "2025-03-04"
+
+    def test_readers_do_not_scan_directories(self):
+        """Test that range and latest lookups never list or probe the filesystem."""
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("glob")), \
+                mock.patch.object(Path, "exists", side_effect=AssertionError("exists")):
+            snapshots = self.store.load_daily_snapshots(
+                self.output_dir, datetime(2025, 1, 1), datetime(2025, 12, 31)
+            )
+            index = SnapshotIndex.load(self.output_dir)
+
+        assert [s["date"] for s in snapshots] == ["2025-02-27", "2025-03-03", "2025-03-04"]
+        assert index.latest("weekly")[0] == "2025-W10"
+
+    def test_compaction_repoints_entries(self):
+        """Test that compacted days point at their month archive."""
+        self.store.apply_retention(self.output_dir, keep_months=0, today=date(2025, 4, 1))
+        index = SnapshotIndex.load(self.output_dir)
+
+        assert index.daily["2025-02-27"]["path"] == "archive/2025/2025-02.jsonl.gz"
+        assert "2025" in index.periods["yearly"]
+        assert len(self.store.load_daily_snapshots(
+            self.output_dir, datetime(2025, 1, 1), datetime(2025, 12, 31)
+        )) == 3
+
+    def test_stale_index_is_rebuilt(self):
+        """Test that a daily file written without updating the index is still found."""
+        day_dir = self.output_dir / "daily" / "2025" / "03"
+        (day_dir / "2025-03-05.json").write_text(json.dumps({"date": "2025-03-05", "health": {}}))
+        index_mtime = os.stat(self.output_dir / INDEX_FILE).st_mtime_ns
+        os.utime(day_dir, ns=(index_mtime + 10 ** 9, index_mtime + 10 ** 9))
+
+        snapshots = self.store.load_daily_snapshots(self.output_dir, datetime(2025, 3, 1), datetime(2025, 3, 31))
+
+        assert [s["date"] for s in snapshots] == ["2025-03-03", "2025-03-04", "2025-03-05"]
+
+    def test_missing_index_is_rebuilt(self):
+        """Test that readers fall back to a scan when index.json is missing."""
+        (self.output_dir / INDEX_FILE).unlink()
+
+        assert SnapshotIndex.load(self.output_dir).latest("monthly")[0] == "2025-03"
+
+
+class TestSummaryCardIndex:
+    """Tests for load_latest_snapshot in generate-summary-card.py."""
+
+    def test_latest_snapshot_from_index(self):
+        """Test that the newest summary is found even when it is not the current period."""
+        summary_card = _load_script("generate-summary-card")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "weekly").mkdir()
+            summary = {"period": "weekly", "start_date": "2024-01-01", "end_date": "2024-01-07", "days_count": 7}
+            json_codec.dump_path(summary, root / "weekly" / "2024-W01.json")
+            index = SnapshotIndex(root)
+            index.record_period("weekly", "2024-W01", root / "weekly" / "2024-W01.json", summary)
+            index.save()
+
+            assert summary_card.load_latest_snapshot("weekly", tmpdir) == summary
+            assert summary_card.load_latest_snapshot("monthly", tmpdir) is None
+            assert summary_card.load_latest_snapshot("daily", tmpdir) is None
+
+    def test_card_names_period_and_flags_stale_summary(self):
+        """Test that an old summary is labelled with its own dates, not as the current period."""
+        summary_card = _load_script("generate-summary-card")
+        summary = {"start_date": "2024-01-02", "end_date": "2024-01-05", "days_count": 4}
+
+        title, subtitle = summary_card.describe_period(summary, "weekly", today=date(2024, 1, 4))
+        assert title == "Weekly Summary · Jan 1–Jan 7, 2024"
+        assert "No newer data" not in subtitle
+
+        title, subtitle = summary_card.describe_period(summary, "monthly", today=date(2024, 3, 1))
+        assert title == "Monthly Summary · January 2024"
+        assert subtitle.endswith("No newer data since 2024-01-05")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for snapshot retention and compaction in scripts/store-historical-snapshot.py.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib import json_codec
+
+
+def _load_snapshot_module():
+    """Import store-historical-snapshot.py (hyphenated file name)."""
+    spec = importlib.util.spec_from_file_location(
+        "store_historical_snapshot",
+        os.path.join(os.path.dirname(__file__), '..', 'scripts', 'store-historical-snapshot.py'),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestRetention:
+    """Tests for compacting old daily snapshots."""
+
+    def setup_method(self):
+        """Store a few days in January, February and June 2025."""
+        self.module = _load_snapshot_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmpdir.name)
+        self.days = ["2025-01-30", "2025-01-31", "2025-02-01", "2025-06-10"]
+        for i, day in enumerate(self.days):
+            snapshot = {
+                "timestamp": f"{day}T06:00:00Z",
+                "date": day,
+                "health": {"sleep_score": 70 + i, "activity_steps": 1000 * (i + 1)},
+                "mood": {"mood_name": "Calm", "mood_score": 60.5},
+                "weather": {}, "developer": {},
+            }
+            self.module.save_snapshot(snapshot, self.output_dir)
+            self.module.update_aggregated_snapshots(self.output_dir, date.fromisoformat(day))
+
+    def teardown_method(self):
+        """Remove the temporary snapshot directory."""
+        self.tmpdir.cleanup()
+
+    def test_old_months_are_compacted(self):
+        """Test that months outside the window move into archives."""
+        compacted = self.module.apply_retention(self.output_dir, keep_months=3, today=date(2025, 6, 15))
+
+        assert compacted == 3
+        assert not (self.output_dir / "daily" / "2025" / "01").exists()
+        assert not (self.output_dir / "daily" / "2025" / "02").exists()
+        assert (self.output_dir / "daily" / "2025" / "06" / "2025-06-10.json").exists()
+        assert (self.output_dir / "archive" / "2025" / "2025-01.jsonl.gz").exists()
+
+    def test_compacted_days_read_through_same_api(self):
+        """Test that archived days are returned like daily files, text fields included."""
+        before = self.module.load_daily_snapshots(
+            self.output_dir, datetime(2025, 1, 1), datetime(2025, 6, 30)
+        )
+        self.module.apply_retention(self.output_dir, keep_months=0, today=date(2025, 7, 1))
+        after = self.module.load_daily_snapshots(
+            self.output_dir, datetime(2025, 1, 1), datetime(2025, 6, 30)
+        )
+
+        assert after == before
+        assert [s["date"] for s in after] == self.days
+        assert after[0]["mood"]["mood_name"] == "Calm"
+        assert [s["date"] for s in self.module.iter_daily_snapshots(self.output_dir)] == self.days
+
+    def test_archive_is_reproducible_and_mergeable(self):
+        """Test that recompacting a month with a late day merges it into the archive."""
+        self.module.apply_retention(self.output_dir, keep_months=0, today=date(2025, 7, 1))
+        archive = self.module.archive_path(self.output_dir, 2025, 1)
+        first = archive.read_bytes()
+
+        late = {"date": "2025-01-05", "health": {"sleep_score": 99}, "mood": {}, "weather": {}, "developer": {}}
+        self.module.save_snapshot(late, self.output_dir)
+        self.module.compact_month(self.output_dir, 2025, 1)
+
+        assert archive.read_bytes() != first
+        assert list(self.module.load_archived_month(self.output_dir, 2025, 1)) == [
+            "2025-01-05", "2025-01-30", "2025-01-31",
+        ]
+
+    def test_yearly_summary_merges_months(self):
+        """Test that the derived yearly summary equals aggregating every day."""
+        self.module.apply_retention(self.output_dir, keep_months=0, today=date(2025, 7, 1))
+
+        yearly = json_codec.load_path(self.output_dir / "yearly" / "2025.json")
+        state = yearly.pop("state")
+        snapshots = self.module.load_daily_snapshots(
+            self.output_dir, datetime(2025, 1, 1), datetime(2025, 12, 31)
+        )
+        expected = self.module.build_period_summary(
+            "yearly", "2025-01-30", "2025-06-10", 4, self.module.collect_period_stats(snapshots)
+        )
+
+        assert yearly == expected
+        assert yearly["health"]["max_sleep_score"] == 73
+        assert list(state["days"]) == self.days
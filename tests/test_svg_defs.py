@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scripts/lib/svg_defs.py.
+"""
+
+import os
+import sys
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from lib.card_base import CardBase
+from lib.svg_defs import DefsRegistry
+
+
+class TestDefsRegistry:
+    """Tests for DefsRegistry."""
+
+    def test_identical_definitions_are_interned(self):
+        """Test that the same content registered twice yields one definition."""
+        defs = DefsRegistry()
+        first = defs.glow_filter(2)
+        second = defs.glow_filter(2)
+        other = defs.glow_filter(3)
+
+        assert first == second
+        assert other != first
+        assert len(defs) == 2
+        assert defs.render().count("<filter") == 2
+
+    def test_formatting_does_not_defeat_interning(self):
+        """Test that whitespace between child tags is ignored."""
+        defs = DefsRegistry()
+        compact = defs.register("pattern", {"width": 4, "height": 4}, '<rect width="2" height="2"/>')
+        spaced = defs.register("pattern", {"height": "4", "width": "4"}, '\n  <rect width="2" height="2"/>\n')
+
+        assert compact == spaced == "p0"
+
+    def test_generated_ids_are_short_and_stable(self):
+        """Test that anonymous definitions get sequential IDs per element type."""
+        defs = DefsRegistry()
+        assert defs.linear_gradient([("0%", "#000"), ("100%", "#fff")]) == "g0"
+        assert defs.glow_filter(2) == "f0"
+        assert defs.shadow_filter() == "f1"
+        assert defs.linear_gradient([("0%", "#111"), ("100%", "#eee")]) == "g1"
+
+    def test_preferred_id_and_alias(self):
+        """Test that a preferred ID for duplicate content becomes an alias."""
+        defs = DefsRegistry()
+        glow = defs.glow_filter(2, def_id="glow")
+        panel_glow = defs.glow_filter(2, def_id="panel-glow")
+
+        assert glow == panel_glow == "glow"
+        assert defs.resolve("panel-glow") == "glow"
+        assert (
+            defs.rewrite_references('<g filter="url(#panel-glow)"><use href="#panel-glow"/></g>')
+            == '<g filter="url(#glow)"><use href="#glow"/></g>'
+        )
+
+    def test_preferred_id_taken_by_other_content(self):
+        """Test that a clashing preferred ID falls back to a generated one."""
+        defs = DefsRegistry()
+        defs.glow_filter(2, def_id="glow")
+        assert defs.glow_filter(5, def_id="glow") == "f0"
+
+    def test_render_only_referenced(self):
+        """Test that unused definitions are left out, keeping indirect references."""
+        defs = DefsRegistry()
+        base = defs.linear_gradient([("0%", "#000"), ("100%", "#fff")], def_id="base")
+        defs.register("linearGradient", {"href": f"#{base}", "x2": "0%"}, def_id="vertical")
+        defs.glow_filter(2, def_id="glow")
+
+        rendered = defs.render(used_in='<rect fill="url(#vertical)"/>')
+
+        assert 'id="vertical"' in rendered
+        assert 'id="base"' in rendered
+        assert 'id="glow"' not in rendered
+        assert defs.render(used_in="<rect/>") == ""
+
+    def test_register_markup(self):
+        """Test that a defs fragment is interned element by element."""
+        defs = DefsRegistry()
+        defs.glow_filter(2, def_id="glow")
+        ids = defs.register_markup('''
+    <filter id="my-glow" x="-20%" y="-20%" width="140%" height="140%">
+      <feGaussianBlur stdDeviation="2" result="coloredBlur"/>
+      <feMerge>
+        <feMergeNode in="coloredBlur"/>
+        <feMergeNode in="SourceGraphic"/>
+      </feMerge>
+    </filter>
+    <clipPath id="clip"><rect width="10" height="10"/></clipPath>''')
+
+        assert ids == ["glow", "clip"]
+        assert defs.resolve("my-glow") == "glow"
+
+
+class _Card(CardBase):
+    """Minimal card that registers its own definitions."""
+
+    def generate_content(self) -> str:
+        glow = self.defs.glow_filter(self.get_glow_settings().get("stdDeviation", 2))
+        return f'<text filter="url(#{glow})">A</text><text filter="url(#{glow})">B</text>'
+
+
+class TestCardBaseDefs:
+    """Tests for CardBase definitions handling."""
+
+    def test_glow_registered_by_content_is_emitted_once(self):
+        """Test that the content's glow is shared with the standard glow filter."""
+        svg = _Card("weather").generate_svg()
+
+        assert svg.count("<filter") == 1
+        assert svg.count('<linearGradient id="bg-gradient"') == 1
+
+    def test_unused_filters_are_omitted(self):
+        """Test that filters the card never references are not emitted."""
+        class PlainCard(CardBase):
+            def generate_content(self) -> str:
+                return "<text>Plain</text>"
+
+        svg = PlainCard("weather").generate_svg(include_glow=True, include_shadow=True)
+
+        assert "<filter" not in svg
+        assert 'fill="url(#bg-gradient)"' in svg
+
+    def test_extra_defs_duplicates_are_aliased(self):
+        """Test that duplicate extra defs are interned and references rewritten."""
+        class ExtraCard(CardBase):
+            def generate_content(self) -> str:
+                return '<text filter="url(#extra-glow)">A</text>'
+
+        card = ExtraCard("weather")
+        std = card.get_glow_settings().get("stdDeviation", 2)
+        extra = (
+            f'<filter id="extra-glow" x="-20%" y="-20%" width="140%" height="140%">'
+            f'<feGaussianBlur stdDeviation="{std}" result="coloredBlur"/>'
+            f'<feMerge><feMergeNode in="coloredBlur"/><feMergeNode in="SourceGraphic"/></feMerge>'
+            f'</filter>'
+        )
+        svg = card.generate_svg(extra_defs=extra)
+
+        assert svg.count("<filter") == 1
+        assert 'filter="url(#glow)"' in svg
+        assert "extra-glow" not in svg
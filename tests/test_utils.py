@@ -4,6 +4,7 @@
 """
 
 import pytest
+import re
 import sys
 import os
 import tempfile
@@ -18,7 +19,15 @@
     safe_value,
     generate_sparkline_path,
     fallback_exists,
+    compute_render_fingerprint,
+    read_render_stamp,
+    write_svg_if_changed,
+    optimize_image,
+    detect_image_mime,
+    PILLOW_AVAILABLE,
+    WEBP_AVAILABLE,
 )
+from lib import utils as lib_utils
 
 
 class TestEscapeXml:
@@ -353,3 +362,298 @@ def test_svg_uppercase_extension(self):
             assert fallback_exists(temp_path) is True
         finally:
             Path(temp_path).unlink()
+
+
+def _render(body: str, updated: str = "2h ago", color: str = "#4a5568") -> str:
+    """Build a minimal card with a volatile staleness badge."""
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50">\n'
+        f'  <text>{body}</text>\n'
+        '  <!-- Staleness Badge -->\n'
+        f'  <g class="volatile" transform="translate(90, 10)">'
+        f'<text fill="{color}">Updated: {updated}</text></g>\n'
+        '</svg>'
+    )
+
+
+class TestRenderFingerprint:
+    """Tests for compute_render_fingerprint function."""
+
+    def test_ignores_volatile_text(self):
+        """Test that only the volatile badge text changing keeps the fingerprint."""
+        assert compute_render_fingerprint(_render("20°C", "2h ago")) == \
+            compute_render_fingerprint(_render("20°C", "5h ago"))
+
+    def test_detects_content_change(self):
+        """Test that a change outside volatile regions changes the fingerprint."""
+        assert compute_render_fingerprint(_render("20°C")) != \
+            compute_render_fingerprint(_render("21°C"))
+
+    def test_detects_volatile_attribute_change(self):
+        """Test that a badge switching to its stale color changes the fingerprint."""
+        assert compute_render_fingerprint(_render("20°C", color="#4a5568")) != \
+            compute_render_fingerprint(_render("20°C", color="#ff6b6b"))
+
+    def test_ignores_whitespace_and_comments(self):
+        """Test that formatting-only differences keep the fingerprint."""
+        compact = _render("20°C").replace("\n  ", "").replace("<!-- Staleness Badge -->", "")
+        assert compute_render_fingerprint(compact) == compute_render_fingerprint(_render("20°C"))
+
+
+class TestWriteSvgIfChanged:
+    """Tests for write_svg_if_changed function."""
+
+    def test_first_write_embeds_stamp(self):
+        """Test that a new file is written with a render stamp."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            assert write_svg_if_changed(path, _render("20°C")) is True
+
+            fingerprint, rendered_at = read_render_stamp(path)
+            assert fingerprint == compute_render_fingerprint(_render("20°C"))
+            assert rendered_at is not None
+
+    def test_skips_when_only_volatile_changed(self):
+        """Test that an unchanged render does not touch the file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            write_svg_if_changed(path, _render("20°C", "2h ago"))
+            before = path.read_bytes()
+
+            assert write_svg_if_changed(path, _render("20°C", "3h ago")) is False
+            assert path.read_bytes() == before
+
+    def test_writes_when_content_changed(self):
+        """Test that a real change rewrites the file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            write_svg_if_changed(path, _render("20°C"))
+
+            assert write_svg_if_changed(path, _render("21°C")) is True
+            assert "21°C" in path.read_text(encoding="utf-8")
+
+    def test_stamp_survives_reformatting(self):
+        """Test that a post-processed (minified) file is still recognized."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            write_svg_if_changed(path, _render("20°C"))
+            minified = path.read_text(encoding="utf-8").replace("\n  ", "")
+            path.write_text(minified, encoding="utf-8")
+
+            assert write_svg_if_changed(path, _render("20°C", "9h ago")) is False
+
+    def test_rewrites_after_max_age(self):
+        """Test that an unchanged card is refreshed once it is too old."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            write_svg_if_changed(path, _render("20°C"))
+            aged = re.sub(
+                r'data-render-at="[^"]*"',
+                'data-render-at="2000-01-01T00:00:00Z"',
+                path.read_text(encoding="utf-8"),
+            )
+            path.write_text(aged, encoding="utf-8")
+
+            assert write_svg_if_changed(path, _render("20°C"), max_age_hours=24) is True
+            assert write_svg_if_changed(path, _render("20°C"), max_age_hours=24) is False
+
+    def test_no_max_age(self):
+        """Test that max_age_hours=0 never refreshes an unchanged card."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            write_svg_if_changed(path, _render("20°C"))
+            aged = re.sub(
+                r'data-render-at="[^"]*"',
+                'data-render-at="2000-01-01T00:00:00Z"',
+                path.read_text(encoding="utf-8"),
+            )
+            path.write_text(aged, encoding="utf-8")
+
+            assert write_svg_if_changed(path, _render("20°C"), max_age_hours=0) is False
+
+    def test_disabled_by_env(self, monkeypatch):
+        """Test that PROFILE_STABLE_SVG=0 always writes the raw render."""
+        monkeypatch.setenv("PROFILE_STABLE_SVG", "0")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "card.svg"
+            assert write_svg_if_changed(path, _render("20°C")) is True
+            assert write_svg_if_changed(path, _render("20°C")) is True
+            assert path.read_text(encoding="utf-8") == _render("20°C")
+
+
+def _png_bytes(size=(800, 600), mode="RGB") -> bytes:
+    """Build a noisy PNG that quantization and resizing make smaller."""
+    from PIL import Image
+    import io
+    import random
+
+    channels = len(mode)
+    noise = random.Random(0).randbytes(size[0] * size[1] * channels)
+    img = Image.frombytes(mode, size, noise)
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+def _optimization_settings(monkeypatch, **overrides):
+    """Pin optimizer settings so tests don't depend on config/theme.json."""
+    settings = {
+        "jpeg_quality": 85,
+        "png_colors": 256,
+        "max_width": 600,
+        "max_height": 400,
+        "target_bytes": 0,
+        "webp": False,
+        "webp_quality": 80,
+        "avif": False,
+        "avif_quality": 60,
+        "min_psnr": 0,
+        "enabled": True,
+    }
+    settings.update(overrides)
+    monkeypatch.setattr(lib_utils, "get_image_optimization_settings", lambda: dict(settings))
+
+
+def _map_png_bytes(size=(440, 350)) -> bytes:
+    """Build a map-like PNG: flat regions, anti-aliased roads and labels."""
+    from PIL import Image, ImageDraw
+    import io
+    import random
+
+    rng = random.Random(1)
+    width, height = size[0] * 2, size[1] * 2
+    img = Image.new("RGB", (width, height), (242, 239, 233))
+    draw = ImageDraw.Draw(img)
+    for _ in range(60):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle((x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)),
+                       fill=rng.choice([(170, 211, 223), (200, 250, 204), (224, 223, 223)]))
+    for _ in range(80):
+        draw.line((rng.randrange(width), rng.randrange(height),
+                   rng.randrange(width), rng.randrange(height)),
+                  fill=rng.choice([(255, 255, 255), (248, 178, 156), (252, 214, 164)]),
+                  width=rng.randrange(2, 8))
+    for _ in range(30):
+        draw.text((rng.randrange(width), rng.randrange(height)), "Strasse", fill=(60, 60, 60))
+    # Downscaling anti-aliases edges, like a real map tile
+    img = img.resize(size, Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.mark.skipif(not PILLOW_AVAILABLE, reason="Pillow not installed")
+class TestOptimizeImage:
+    """Tests for optimize_image function."""
+
+    @pytest.fixture(autouse=True)
+    def _settings(self, monkeypatch):
+        _optimization_settings(monkeypatch)
+
+    def test_png_resized_and_smaller(self):
+        """Test that a large PNG is resized to the maximum dimensions."""
+        from PIL import Image
+        import io
+
+        data = _png_bytes()
+        result = optimize_image(data, "png", max_width=200, max_height=200)
+        img = Image.open(io.BytesIO(result))
+        assert len(result) < len(data)
+        assert img.width <= 200 and img.height <= 200
+
+    def test_png_is_deterministic(self):
+        """Test that parallel encoding always picks the same candidate."""
+        data = _png_bytes(size=(300, 200))
+        results = {optimize_image(data, "png", max_width=150, max_height=150) for _ in range(3)}
+        assert len(results) == 1
+
+    def test_png_early_stop_returns_first_candidate(self):
+        """Test that a candidate below target_bytes is accepted immediately."""
+        from PIL import Image
+        import io
+
+        data = _png_bytes(size=(300, 200))
+        result = optimize_image(
+            data, "png", max_width=150, max_height=150, target_bytes=10 ** 9
+        )
+        # The preferred (quantized) strategy wins without comparing the others
+        assert Image.open(io.BytesIO(result)).mode == "P"
+
+    def test_early_stop_skips_unstarted_candidates(self, monkeypatch):
+        """Test that candidates behind a winner are never encoded."""
+        monkeypatch.setattr(lib_utils.os, "cpu_count", lambda: 1)
+        started = []
+
+        def candidate(name, size):
+            def encode():
+                started.append(name)
+                return b"x" * size
+            return (name, encode)
+
+        results = lib_utils._pick_candidate(
+            [candidate("big", 100), candidate("small", 10), candidate("other", 5)], target_bytes=50
+        )
+        assert [name for name, _ in results] == ["big", "small"]
+        assert started == ["big", "small"]
+
+    def test_rgba_keeps_transparency(self):
+        """Test that RGBA PNGs are not quantized."""
+        from PIL import Image
+        import io
+
+        data = _png_bytes(size=(300, 200), mode="RGBA")
+        result = optimize_image(data, "png", max_width=150, max_height=150)
+        assert Image.open(io.BytesIO(result)).mode == "RGBA"
+
+    def test_jpeg_resized(self):
+        """Test that JPEGs are resized and re-encoded."""
+        from PIL import Image
+        import io
+
+        output = io.BytesIO()
+        Image.open(io.BytesIO(_png_bytes())).save(output, format="JPEG", quality=100)
+        result = optimize_image(output.getvalue(), "jpeg", max_width=200, max_height=200)
+        assert Image.open(io.BytesIO(result)).width <= 200
+
+    def test_invalid_data_returns_original(self):
+        """Test that undecodable data is returned unchanged."""
+        assert optimize_image(b"not an image", "png") == b"not an image"
+
+    def test_unknown_format_returns_original(self):
+        """Test that unsupported formats are returned unchanged."""
+        data = _png_bytes(size=(10, 10))
+        assert optimize_image(data, "gif") == data
+
+
+@pytest.mark.skipif(not WEBP_AVAILABLE, reason="Pillow built without WebP")
+class TestModernFormatCandidates:
+    """Tests for WebP candidates and the quality floor."""
+
+    def test_webp_chosen_when_smaller(self, monkeypatch):
+        """Test that WebP wins when it is the smallest payload."""
+        _optimization_settings(monkeypatch, webp=True, min_psnr=30)
+        result = optimize_image(_map_png_bytes(), "png")
+        assert detect_image_mime(result) == "image/webp"
+
+    def test_quality_floor_rejects_lossy_candidates(self, monkeypatch):
+        """Test that candidates below min_psnr are discarded."""
+        _optimization_settings(monkeypatch, webp=True, webp_quality=1, min_psnr=60)
+        result = optimize_image(_map_png_bytes(), "png")
+        # Only the lossless resized PNG (or the original) can pass a 60 dB floor
+        assert detect_image_mime(result) == "image/png"
+
+    def test_webp_keeps_transparency(self, monkeypatch):
+        """Test that WebP candidates of RGBA sources keep their alpha channel."""
+        from PIL import Image
+        import io
+
+        _optimization_settings(monkeypatch, webp=True)
+        result = optimize_image(_png_bytes(size=(120, 80), mode="RGBA"), "png")
+        if detect_image_mime(result) == "image/webp":
+            assert Image.open(io.BytesIO(result)).mode == "RGBA"
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that no WebP is produced unless enabled."""
+        _optimization_settings(monkeypatch)
+        result = optimize_image(_map_png_bytes(), "png")
+        assert detect_image_mime(result) == "image/png"